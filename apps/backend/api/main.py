@@ -25,7 +25,7 @@ from datetime import datetime, timezone
 from config.settings import settings
 from config.logging import get_logger
 from config.database import init_database, close_database
-from config.cache import init_cache, close_cache
+from config.cache import init_cache, close_cache, tiered_cache
 from config.authentik_config import init_authentik_config
 from core.middleware.auth import NeonAuthMiddleware
 from core.middleware.audit import AuditLoggingMiddleware
@@ -37,6 +37,9 @@ from middleware.security import (
     JWTAuthenticationMiddleware,
 )
 from services.health import health_service
+from services.monitoring import CollectedMetric, MetricType, monitoring_service
+from services.audit_sink import audit_sink
+from api.services.llm_response_cache import CACHE_STAT_FIELDS as LLM_CACHE_STAT_FIELDS, llm_response_cache_stats
 
 # Get logger
 logger = get_logger("main")
@@ -58,6 +61,7 @@ async def lifespan(app: FastAPI):
                     audience=settings.authentik_audience,
                     algorithm=settings.authentik_jwt_algorithm,
                     jwks_cache_ttl=settings.authentik_jwks_cache_ttl,
+                    token_cache_size=settings.verified_token_cache_size,
                 )
                 logger.info("Authentik configuration initialized")
             else:
@@ -76,6 +80,9 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         raise
 
+    # Start the batched audit log writer
+    await audit_sink.start()
+
     # Initialize cache connections
     try:
         await init_cache()
@@ -107,6 +114,12 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Starting application shutdown")
+
+    # Drain queued audit records while the database is still open
+    try:
+        await audit_sink.stop()
+    except Exception as e:
+        logger.error(f"Error draining audit sink: {e}")
     
     # Close database connections
     try:
@@ -264,8 +277,12 @@ app.add_middleware(
 )
 
 # Add production-ready middleware (order matters!)
+# All of these are pure ASGI middleware: bodies stream through without buffering
 app.add_middleware(AuditLoggingMiddleware)  # Audit logging for compliance
 app.add_middleware(ErrorHandlingMiddleware)
+# Rate limiting sits inside auth and org isolation so per-user and per-org
+# policies see the authenticated identity (anonymous requests are keyed by IP)
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(OrgIsolationMiddleware)  # Org isolation and context injection
 app.add_middleware(SecurityHeadersMiddleware)
 if settings.neon_auth_enabled and settings.is_production:
@@ -280,33 +297,11 @@ app.add_middleware(
     compresslevel=6     # Balance between compression ratio and speed
 )
 
-# Add rate limiting middleware with custom configuration
-app.add_middleware(
-    RateLimitMiddleware,
-    requests_per_minute=settings.rate_limit_requests
-)
-
 # API Versioning Middleware
 try:
-    from api.versioning import get_version_registry, add_version_headers
+    from api.versioning import VersionHeadersMiddleware
     
-    @app.middleware("http")
-    async def version_header_middleware(request: Request, call_next):
-        """Add API version headers to all responses."""
-        response = await call_next(request)
-        
-        try:
-            registry = get_version_registry()
-            # For now, we default to the latest stable version for all responses
-            # In the future, this could be determined by the URL path (e.g., /api/v1/...)
-            latest_version = registry.get_latest_stable()
-            if latest_version:
-                add_version_headers(response, latest_version)
-        except Exception as e:
-            # Don't fail the request if versioning fails
-            logger.warning(f"Failed to add version headers: {e}")
-            
-        return response
+    app.add_middleware(VersionHeadersMiddleware)
 except Exception as e:
     logger.warning(f"Could not load versioning middleware: {e}")
 @app.options("/{full_path:path}")
@@ -515,6 +510,43 @@ async def liveness_check():
     return await health_service.get_liveness_status()
 
 
+def _tiered_cache_metrics():
+    """Cumulative per-namespace cache lookups by result, read at scrape time."""
+    return [
+        CollectedMetric("cache.requests", count, MetricType.COUNTER, {"namespace": namespace, "result": result})
+        for namespace, counts in tiered_cache.stats().items()
+        for result, count in counts.items()
+    ]
+
+
+def _llm_response_cache_metrics():
+    """Cumulative LLM response cache lookups by result, plus its size, read at scrape time."""
+    stats = llm_response_cache_stats()
+    if not stats:
+        return []
+    return [
+        CollectedMetric("llm_response_cache.requests", stats[result], MetricType.COUNTER, {"result": result})
+        for result in LLM_CACHE_STAT_FIELDS
+    ] + [
+        CollectedMetric("llm_response_cache.entries", stats["entries"], MetricType.GAUGE),
+        CollectedMetric("llm_response_cache.hit_rate", stats["hit_rate"], MetricType.GAUGE),
+    ]
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """
+    Prometheus scrape endpoint (text exposition format).
+
+    Public to the auth middlewares, as scrapers send no bearer token; expose
+    it only to the monitoring network (ingress or network policy).
+    """
+    return Response(
+        content=monitoring_service.metrics.render_prometheus([_tiered_cache_metrics, _llm_response_cache_metrics]),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -10,8 +10,11 @@ from enum import Enum
 from dataclasses import dataclass
 from fastapi import APIRouter, Request, Response
 from functools import wraps
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from core.logging import get_logger
+from core.middleware.asgi import send_with_headers
 
 
 logger = get_logger(__name__)
@@ -156,15 +159,44 @@ def add_version_headers(
     version: APIVersion
 ):
     """Add version information to response headers."""
-    response.headers["X-API-Version"] = version.version
-    response.headers["X-API-Status"] = version.status.value
+    set_version_headers(response.headers, version)
+
+
+def set_version_headers(headers: MutableHeaders, version: APIVersion):
+    """Set version information on a mutable header mapping."""
+    headers["X-API-Version"] = version.version
+    headers["X-API-Status"] = version.status.value
     
     if version.is_deprecated():
-        response.headers["X-API-Deprecated"] = "true"
+        headers["X-API-Deprecated"] = "true"
         if version.sunset_date:
-            response.headers["X-API-Sunset-Date"] = version.sunset_date.isoformat()
+            headers["X-API-Sunset-Date"] = version.sunset_date.isoformat()
         if version.migration_guide_url:
-            response.headers["X-API-Migration-Guide"] = version.migration_guide_url
+            headers["X-API-Migration-Guide"] = version.migration_guide_url
+
+
+class VersionHeadersMiddleware:
+    """Pure ASGI middleware adding latest stable API version headers to all responses."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, send_with_headers(send, (), self._add_headers))
+
+    def _add_headers(self, headers: MutableHeaders) -> None:
+        try:
+            # For now, we default to the latest stable version for all responses
+            # In the future, this could be determined by the URL path (e.g., /api/v1/...)
+            latest_version = get_version_registry().get_latest_stable()
+            if latest_version:
+                set_version_headers(headers, latest_version)
+        except Exception as e:
+            # Don't fail the request if versioning fails
+            logger.warning(f"Failed to add version headers: {e}")
 
 
 # Global version registry
@@ -8,54 +8,14 @@ while maintaining backwards compatibility with internal HS256 tokens.
 
 import json
 import logging
-import httpx
-from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
-from functools import lru_cache
 from jwt import decode as jwt_decode
-from jwt.exceptions import InvalidTokenError, ExpiredSignatureError, DecodeError
-from cryptography.hazmat.primitives.serialization import load_pem_public_key
+from jwt.exceptions import InvalidTokenError, ExpiredSignatureError, DecodeError, PyJWTError
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
 
-logger = logging.getLogger(__name__)
-
-
-class JWKSCache:
-    """Cache JWKS from Authentik with TTL."""
-
-    def __init__(self, ttl_seconds: int = 3600):
-        """Initialize JWKS cache.
+from config.jwks import JWKSProvider, VerifiedTokenCache
 
-        Args:
-            ttl_seconds: Cache time-to-live in seconds (default: 1 hour)
-        """
-        self.ttl_seconds = ttl_seconds
-        self.cached_jwks: Optional[Dict[str, Any]] = None
-        self.cache_time: Optional[datetime] = None
-
-    def is_expired(self) -> bool:
-        """Check if cache has expired."""
-        if self.cache_time is None:
-            return True
-        return datetime.utcnow() > self.cache_time + timedelta(seconds=self.ttl_seconds)
-
-    def get(self) -> Optional[Dict[str, Any]]:
-        """Get cached JWKS if valid."""
-        if not self.is_expired():
-            return self.cached_jwks
-        return None
-
-    def set(self, jwks: Dict[str, Any]) -> None:
-        """Cache JWKS data."""
-        self.cached_jwks = jwks
-        self.cache_time = datetime.utcnow()
-        logger.debug("JWKS cached successfully")
-
-    def invalidate(self) -> None:
-        """Invalidate cache."""
-        self.cached_jwks = None
-        self.cache_time = None
+logger = logging.getLogger(__name__)
 
 
 class AuthentikConfig:
@@ -68,6 +28,7 @@ class AuthentikConfig:
         audience: str,
         algorithm: str = "RS256",
         jwks_cache_ttl: int = 3600,
+        token_cache_size: int = 10000,
     ):
         """Initialize Authentik configuration.
 
@@ -77,13 +38,14 @@ class AuthentikConfig:
             audience: Expected token audience (aud claim)
             algorithm: Token signing algorithm (default: RS256)
             jwks_cache_ttl: JWKS cache TTL in seconds (default: 1 hour)
+            token_cache_size: Max verified tokens cached until expiry (0 disables)
         """
         self.jwks_url = jwks_url
         self.issuer = issuer
         self.audience = audience
         self.algorithm = algorithm
-        self.jwks_cache = JWKSCache(ttl_seconds=jwks_cache_ttl)
-        self._cached_public_keys: Dict[str, Any] = {}
+        self.jwks_provider = JWKSProvider(jwks_url, ttl=jwks_cache_ttl)
+        self.token_cache = VerifiedTokenCache(token_cache_size)
 
         logger.info(
             f"Authentik config initialized: "
@@ -96,23 +58,9 @@ class AuthentikConfig:
         Returns:
             JWKS dict if successful, None otherwise
         """
-        # Check cache first
-        cached = self.jwks_cache.get()
-        if cached is not None:
-            logger.debug("Using cached JWKS")
-            return cached
-
         try:
-            logger.debug(f"Fetching JWKS from {self.jwks_url}")
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(self.jwks_url)
-                response.raise_for_status()
-
-                jwks = response.json()
-                self.jwks_cache.set(jwks)
-                return jwks
-
-        except httpx.RequestError as e:
+            return await self.jwks_provider.get_jwks()
+        except PyJWTError as e:
             logger.error(f"Failed to fetch JWKS: {str(e)}")
             return None
         except Exception as e:
@@ -146,7 +94,6 @@ class AuthentikConfig:
             # Convert JWK to PEM format
             if key_data.get("kty") == "RSA":
                 # Extract RSA public key components
-                from jwt import PyJWKClient
                 from jwt.algorithms import RSAAlgorithm
 
                 # Use PyJWT's built-in JWK to PEM conversion
@@ -176,6 +123,12 @@ class AuthentikConfig:
         Returns:
             Decoded token payload if valid, None otherwise
         """
+        # Tokens already verified with the default options skip verification
+        if not options:
+            cached = self.token_cache.get(token)
+            if cached is not None:
+                return cached
+
         try:
             # Decode header to get key ID without verification
             import jwt as pyjwt
@@ -187,17 +140,15 @@ class AuthentikConfig:
                 logger.warning("JWT missing key ID (kid) in header")
                 return None
 
-            # Fetch JWKS
-            jwks = await self.fetch_jwks()
-            if not jwks:
-                logger.error("Failed to fetch JWKS for token validation")
-                return None
-
-            # Get public key
-            public_key = self.get_public_key(kid, jwks)
-            if not public_key:
+            # Get the parsed public key (refetches the JWKS on an unknown kid)
+            try:
+                public_key = (await self.jwks_provider.get_signing_key(kid)).key
+            except InvalidTokenError:
                 logger.warning(f"Public key not found for kid: {kid}")
                 return None
+            except PyJWTError as e:
+                logger.error(f"Failed to fetch JWKS for token validation: {str(e)}")
+                return None
 
             # Validate token
             validate_options = {
@@ -220,6 +171,8 @@ class AuthentikConfig:
             )
 
             logger.debug(f"Token validated for subject: {payload.get('sub', 'unknown')}")
+            if not options:
+                self.token_cache.set(token, payload)
             return payload
 
         except ExpiredSignatureError:
@@ -301,6 +254,7 @@ def init_authentik_config(
     audience: str,
     algorithm: str = "RS256",
     jwks_cache_ttl: int = 3600,
+    token_cache_size: int = 10000,
 ) -> AuthentikConfig:
     """Initialize global Authentik configuration.
 
@@ -310,6 +264,7 @@ def init_authentik_config(
         audience: Expected token audience
         algorithm: Token signing algorithm
         jwks_cache_ttl: JWKS cache TTL in seconds
+        token_cache_size: Max verified tokens cached until expiry
 
     Returns:
         Initialized AuthentikConfig instance
@@ -321,6 +276,7 @@ def init_authentik_config(
         audience=audience,
         algorithm=algorithm,
         jwks_cache_ttl=jwks_cache_ttl,
+        token_cache_size=token_cache_size,
     )
     logger.info("Authentik configuration initialized")
     return authentik_config
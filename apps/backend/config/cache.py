@@ -1,16 +1,32 @@
 """
 Redis caching configuration for production performance.
+
+``CacheManager`` is the raw Redis client wrapper. ``TieredCache`` is the
+read-through cache for API responses: an in-process LRU tier in front of
+Redis, single-flight loading, tag invalidation via generation counters and
+orjson serialization.
 """
 
 import json
+import time
 import pickle
-from typing import Any, Optional, Union, Dict, List
+import asyncio
+import functools
+from collections import OrderedDict, defaultdict
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Optional, Union, Dict, List, Sequence, Tuple
 import logging
 from datetime import timedelta
 import redis.asyncio as redis
 from redis.asyncio import ConnectionPool
 import hashlib
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from .settings import settings
 
 logger = logging.getLogger("fairmind.cache")
@@ -237,19 +253,26 @@ class CacheManager:
             return False
     
     async def delete_pattern(self, pattern: str) -> int:
-        """Delete keys matching a pattern."""
+        """
+        Delete keys matching a pattern.
+
+        Walks the keyspace incrementally with SCAN; prefer tag invalidation
+        on ``tiered_cache`` for anything on a request path.
+        """
         if not self.redis_client:
             return 0
         
         try:
             cache_pattern = self._make_key(pattern)
-            keys = await self.redis_client.keys(cache_pattern)
-            
-            if keys:
-                result = await self.redis_client.delete(*keys)
-                return result
-            
-            return 0
+            deleted, batch = 0, []
+            async for key in self.redis_client.scan_iter(match=cache_pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += await self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis_client.unlink(*batch)
+            return deleted
             
         except Exception as e:
             logger.error(f"Cache delete_pattern error for pattern {pattern}: {e}")
@@ -283,6 +306,7 @@ class CacheManager:
                 "total_commands_processed": info.get("total_commands_processed"),
                 "keyspace_hits": info.get("keyspace_hits"),
                 "keyspace_misses": info.get("keyspace_misses"),
+                "namespaces": tiered_cache.stats(),
             }
             
         except Exception as e:
@@ -294,6 +318,211 @@ class CacheManager:
 cache_manager = CacheManager()
 
 
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps_value(value: Any) -> bytes:
+    """Serialize a JSON-compatible value (datetimes become ISO strings)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            value,
+            default=_json_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def loads_value(data: bytes) -> Any:
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+_MISS = object()
+
+CACHE_STAT_FIELDS = ("local_hits", "redis_hits", "misses", "coalesced", "errors")
+
+
+class TieredCache:
+    """
+    Read-through cache: in-process LRU tier in front of Redis.
+
+    - Concurrent misses for the same key share one loader call.
+    - Entries can carry tags. ``invalidate_tags`` bumps each tag's generation
+      counter (a Redis INCR) instead of deleting keys; entries stored under
+      an older generation are treated as misses and expire by TTL.
+    - Values are stored as orjson bytes in both tiers, so callers never share
+      a mutable cached object and both tiers return identical values.
+
+    The local tier lives ``local_ttl`` seconds at most, which bounds how long
+    another process can serve an entry after an invalidation. Without Redis
+    the local tier is the only tier.
+    """
+
+    def __init__(self, manager: CacheManager, local_ttl: float = 5.0, max_local_entries: int = 10000):
+        self.manager = manager
+        self.local_ttl = local_ttl
+        self.max_local_entries = max_local_entries
+        self._local: "OrderedDict[Tuple[str, str], Tuple[float, Tuple[int, ...], bytes]]" = OrderedDict()
+        self._tag_generations: Dict[str, int] = {}
+        self._flights: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(CACHE_STAT_FIELDS, 0))
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        tags: Sequence[str] = ()
+    ) -> Any:
+        """Cached value, or the result of ``loader()`` (run once per concurrent miss)."""
+        value, generations = await self._lookup(namespace, key, tags)
+        if value is not _MISS:
+            return value
+
+        flight_key = (namespace, key)
+        flight = self._flights.get(flight_key)
+        if flight is not None:
+            self._stats[namespace]["coalesced"] += 1
+        else:
+            flight = asyncio.ensure_future(self._load(namespace, key, loader, ttl, tags, generations))
+            self._flights[flight_key] = flight
+            flight.add_done_callback(lambda _: self._flights.pop(flight_key, None))
+        # Shielded so one cancelled request does not fail the other waiters
+        return await asyncio.shield(flight)
+
+    async def get(self, namespace: str, key: str, tags: Sequence[str] = ()) -> Optional[Any]:
+        value, _ = await self._lookup(namespace, key, tags)
+        return None if value is _MISS else value
+
+    async def set(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None, tags: Sequence[str] = ()):
+        await self._store(namespace, key, value, ttl, tuple(self._tag_generations.get(tag, 0) for tag in tags))
+
+    async def invalidate(self, namespace: str, key: str):
+        """Drop one entry from both tiers."""
+        self._local.pop((namespace, key), None)
+        await self.manager.delete(self._redis_key(namespace, key))
+
+    async def invalidate_tags(self, *tags: str):
+        """Invalidate every entry carrying any of ``tags``."""
+        for tag in tags:
+            self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+        redis_client = self.manager.redis_client
+        if redis_client is None or not tags:
+            return
+        try:
+            pipe = redis_client.pipeline()
+            for tag in tags:
+                pipe.incr(self._tag_key(tag))
+            for tag, generation in zip(tags, await pipe.execute()):
+                self._observe_generation(tag, int(generation))
+        except Exception as e:
+            logger.error(f"Cache tag invalidation error for {tags}: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters per namespace."""
+        return {namespace: dict(counts) for namespace, counts in self._stats.items()}
+
+    def clear_local(self):
+        """Drop the local tier (e.g. in tests)."""
+        self._local.clear()
+
+    def _redis_key(self, namespace: str, key: str) -> str:
+        return f"c:{namespace}:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return self.manager._make_key(f"tag:{tag}")
+
+    def _observe_generation(self, tag: str, generation: int):
+        if generation > self._tag_generations.get(tag, 0):
+            self._tag_generations[tag] = generation
+
+    async def _lookup(self, namespace: str, key: str, tags: Sequence[str]) -> Tuple[Any, Tuple[int, ...]]:
+        stats = self._stats[namespace]
+        generations = tuple(self._tag_generations.get(tag, 0) for tag in tags)
+
+        entry = self._local.get((namespace, key))
+        if entry is not None:
+            expires_at, entry_generations, data = entry
+            if expires_at > time.monotonic() and entry_generations == generations:
+                self._local.move_to_end((namespace, key))
+                stats["local_hits"] += 1
+                return loads_value(data), generations
+            del self._local[(namespace, key)]
+
+        redis_client = self.manager.redis_client
+        if redis_client is not None:
+            try:
+                # Tag generations and the value in one round trip
+                values = await redis_client.mget(
+                    [self._tag_key(tag) for tag in tags]
+                    + [self.manager._make_key(self._redis_key(namespace, key))]
+                )
+                for tag, generation in zip(tags, values):
+                    self._observe_generation(tag, int(generation or 0))
+                generations = tuple(self._tag_generations.get(tag, 0) for tag in tags)
+                raw = values[-1]
+                if raw is not None:
+                    header, data = raw.split(b"\n", 1)
+                    if header == self._encode_generations(generations):
+                        self._set_local(namespace, key, generations, data)
+                        stats["redis_hits"] += 1
+                        return loads_value(data), generations
+            except Exception as e:
+                stats["errors"] += 1
+                logger.error(f"Cache get error for {namespace}:{key}: {e}")
+
+        stats["misses"] += 1
+        return _MISS, generations
+
+    async def _load(self, namespace, key, loader, ttl, tags, generations) -> Any:
+        value = await loader()
+        try:
+            await self._store(namespace, key, value, ttl, generations)
+        except Exception as e:
+            self._stats[namespace]["errors"] += 1
+            logger.error(f"Cache set error for {namespace}:{key}: {e}")
+        return value
+
+    async def _store(self, namespace: str, key: str, value: Any, ttl: Optional[int], generations: Tuple[int, ...]):
+        data = dumps_value(value)
+        self._set_local(namespace, key, generations, data)
+        if self.manager.redis_client is not None:
+            await self.manager.redis_client.set(
+                self.manager._make_key(self._redis_key(namespace, key)),
+                self._encode_generations(generations) + b"\n" + data,
+                ex=ttl or self.manager.default_ttl,
+            )
+
+    @staticmethod
+    def _encode_generations(generations: Tuple[int, ...]) -> bytes:
+        return ",".join(map(str, generations)).encode()
+
+    def _set_local(self, namespace: str, key: str, generations: Tuple[int, ...], data: bytes):
+        if self.max_local_entries <= 0:
+            return
+        self._local[(namespace, key)] = (time.monotonic() + self.local_ttl, generations, data)
+        self._local.move_to_end((namespace, key))
+        while len(self._local) > self.max_local_entries:
+            self._local.popitem(last=False)
+
+
+# Global tiered cache instance
+tiered_cache = TieredCache(
+    cache_manager,
+    local_ttl=settings.cache_local_ttl,
+    max_local_entries=settings.cache_local_max_entries,
+)
+
+
 # Utility functions for common caching patterns
 def cache_key_for_model(model_id: str, operation: str = "data") -> str:
     """Generate cache key for model data."""
@@ -324,29 +553,34 @@ def cache_key_for_query(query: str, params: Dict[str, Any] = None) -> str:
 
 
 # Decorator for caching function results
-def cached(ttl: int = None, key_func: callable = None):
-    """Decorator to cache function results."""
+def cached(
+    ttl: int = None,
+    key_func: callable = None,
+    namespace: Optional[str] = None,
+    tags: Sequence[str] = ()
+):
+    """
+    Decorator to cache function results in ``tiered_cache``.
+
+    Concurrent calls with the same key run the function once. The wrapper
+    keeps the wrapped signature, so it can sit under FastAPI route decorators.
+    """
     def decorator(func):
+        cache_namespace = namespace or f"func:{func.__name__}"
+
+        @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key
             if key_func:
                 cache_key = key_func(*args, **kwargs)
             else:
                 # Default key generation
-                func_name = func.__name__
                 args_str = str(args) + str(sorted(kwargs.items()))
-                cache_key = f"func:{func_name}:{hashlib.md5(args_str.encode()).hexdigest()}"
-            
-            # Try to get from cache
-            cached_result = await cache_manager.get(cache_key)
-            if cached_result is not None:
-                return cached_result
+                cache_key = hashlib.md5(args_str.encode()).hexdigest()
             
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            await cache_manager.set(cache_key, result, ttl=ttl)
-            
-            return result
+            return await tiered_cache.get_or_load(
+                cache_namespace, cache_key, lambda: func(*args, **kwargs), ttl=ttl, tags=tags
+            )
         
         return wrapper
     return decorator
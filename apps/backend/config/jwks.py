@@ -0,0 +1,205 @@
+"""
+Async JWKS key provider and verified-token cache.
+
+``JWKSProvider`` fetches a JSON Web Key Set without blocking the event loop
+and parses each key once:
+
+- refresh-ahead: once a key set is older than ``ttl - refresh_ahead`` a
+  background task refetches it while requests keep using the current keys
+- single-flight: concurrent misses share one in-flight fetch
+- kid-miss refetch: an unknown ``kid`` triggers a refetch (rate limited by
+  ``min_refetch_interval``) so rotated keys are picked up immediately
+- a failed refresh keeps serving the last good key set
+
+``VerifiedTokenCache`` maps the digest of a token that passed full signature
+verification to its claims until the token's ``exp``, so repeat requests
+with the same bearer token skip the RSA/EC verification.
+"""
+
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from jwt import PyJWK, PyJWKSet
+from jwt.exceptions import InvalidTokenError, PyJWKClientConnectionError, PyJWKSetError
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSProvider:
+    """Non-blocking, cached access to the signing keys of a JWKS endpoint."""
+
+    def __init__(
+        self,
+        jwks_url: str,
+        ttl: float = 3600.0,
+        refresh_ahead: float = 300.0,
+        min_refetch_interval: float = 30.0,
+        timeout: float = 10.0
+    ):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl / 2)
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+
+        self._jwks: Optional[Dict[str, Any]] = None
+        self._keys: Dict[str, PyJWK] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_attempt: Optional[float] = None
+        self._fetch_task: Optional[asyncio.Task] = None
+        self.fetches = 0
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the current key set was fetched."""
+        if self._fetched_at is None:
+            return None
+        return time.monotonic() - self._fetched_at
+
+    async def get_jwks(self) -> Dict[str, Any]:
+        """
+        The raw key set, refetched when expired.
+
+        Raises ``PyJWKClientConnectionError`` only when no key set has ever
+        been fetched successfully.
+        """
+        await self._ensure_fresh()
+        return self._jwks
+
+    async def get_signing_key(self, kid: Optional[str]) -> PyJWK:
+        """
+        Signing key for ``kid`` (the only key when ``kid`` is None and the
+        set has exactly one).
+
+        Raises ``InvalidTokenError`` when the key is still unknown after a
+        refetch.
+        """
+        await self._ensure_fresh()
+        key = self._find_key(kid)
+        if key is None and self._may_refetch():
+            logger.info(f"Signing key {kid} not in JWKS, refetching {self.jwks_url}")
+            await self._refresh()
+            key = self._find_key(kid)
+        if key is None:
+            raise InvalidTokenError(f"Unable to find a signing key that matches kid {kid!r}")
+        return key
+
+    def invalidate(self):
+        """Forget the key set; the next lookup refetches it."""
+        self._jwks = None
+        self._keys = {}
+        self._fetched_at = None
+
+    async def _ensure_fresh(self):
+        age = self.age
+        if age is None or age >= self.ttl:
+            await self._refresh()
+        elif age >= self.ttl - self.refresh_ahead:
+            self._start_fetch()
+
+    def _find_key(self, kid: Optional[str]) -> Optional[PyJWK]:
+        if kid is None:
+            return next(iter(self._keys.values())) if len(self._keys) == 1 else None
+        return self._keys.get(kid)
+
+    def _may_refetch(self) -> bool:
+        return (
+            self._last_attempt is None
+            or time.monotonic() - self._last_attempt >= self.min_refetch_interval
+        )
+
+    def _start_fetch(self) -> asyncio.Task:
+        # Single flight: every caller awaits the same task
+        if self._fetch_task is None or self._fetch_task.done():
+            self._fetch_task = asyncio.create_task(self._fetch())
+        return self._fetch_task
+
+    async def _refresh(self):
+        # Shielded so a cancelled request does not cancel the shared fetch
+        await asyncio.shield(self._start_fetch())
+        if self._jwks is None:
+            raise PyJWKClientConnectionError(f"Failed to fetch JWKS from {self.jwks_url}")
+
+    async def _fetch(self):
+        self._last_attempt = time.monotonic()
+        self.fetches += 1
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.get(self.jwks_url)
+                response.raise_for_status()
+                jwks = response.json()
+            keys = {
+                key.key_id: key
+                for key in PyJWKSet.from_dict(jwks).keys
+                if key.public_key_use in (None, "sig")
+            }
+        except (httpx.HTTPError, ValueError, PyJWKSetError) as e:
+            if self._jwks is not None:
+                logger.warning(f"JWKS refresh from {self.jwks_url} failed, keeping current keys: {e}")
+            else:
+                logger.error(f"Failed to fetch JWKS from {self.jwks_url}: {e}")
+            return
+
+        self._jwks = jwks
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        logger.debug(f"Fetched {len(keys)} signing keys from {self.jwks_url}")
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU map from token digest to verified claims.
+
+    Only tokens with an ``exp`` claim are cached, and an entry is never
+    returned at or after that ``exp``. Tokens are keyed by SHA-256 digest so
+    the raw bearer tokens are not kept in memory.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Claims of a previously verified, unexpired token, else None."""
+        key = self._digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Callers may annotate the claims; keep the cached copy pristine
+        return dict(claims)
+
+    def set(self, token: str, claims: Dict[str, Any]):
+        """Remember the claims of a token that passed verification."""
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or self.max_entries <= 0:
+            return
+        key = self._digest(token)
+        self._entries[key] = (float(exp), dict(claims))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
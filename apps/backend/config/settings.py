@@ -51,6 +51,7 @@ class Settings(BaseSettings):
     # Neon Auth + Data API
     neon_auth_enabled: bool = False
     neon_jwks_url: Optional[str] = None
+    neon_jwks_cache_ttl: int = 3600
     neon_jwt_issuer: Optional[str] = None
     neon_jwt_audience: Optional[str] = None
     neon_data_api_url: Optional[str] = None
@@ -70,6 +71,7 @@ class Settings(BaseSettings):
     authentik_oauth_redirect_uri: Optional[str] = "http://localhost:3000/auth/callback"
     authentik_token_endpoint: Optional[str] = None  # Will default to {authentik_server_url}/application/o/token/
     authentik_refresh_token_ttl: int = 604800  # 7 days in seconds
+    verified_token_cache_size: int = 10000  # Verified JWTs cached until exp (0 disables)
     
     # File Storage
     upload_dir: str = "uploads"
@@ -83,8 +85,15 @@ class Settings(BaseSettings):
     log_file: Optional[str] = None
     
     # Rate Limiting
-    rate_limit_requests: int = 100
+    rate_limit_requests: int = 100  # Per client (user, else IP) per window
     rate_limit_window: int = 60
+    rate_limit_org_requests: int = 1000  # Per organization per window
+    rate_limit_llm_requests: int = 20  # Per client on LLM-backed endpoints
+    rate_limit_llm_window: int = 60
+    rate_limit_llm_paths: List[str] = [
+        "/api/v1/bias/llm-judge",
+        "/api/v1/compliance/gap-remediation",
+    ]
     
     # Health Checks
     health_check_timeout: int = 30
@@ -96,6 +105,8 @@ class Settings(BaseSettings):
     # Redis (for caching and rate limiting)
     redis_url: Optional[str] = None
     redis_ttl: int = 3600
+    cache_local_ttl: float = 5.0  # In-process tier; bounds cross-worker staleness
+    cache_local_max_entries: int = 10000
     
     # Email Configuration
     email_backend: str = "console"  # "console", "smtp", "sendgrid", "ses", "resend"
@@ -127,10 +138,53 @@ class Settings(BaseSettings):
     # Bias Detection Configuration
     bias_detection_timeout: int = 600
     max_dataset_size: int = 1000000  # 1M rows
+
+    # Comprehensive Bias Evaluation Configuration
+    bias_evaluation_max_workers: int = 4  # Threads running evaluation phases
+    bias_evaluation_phase_timeout: float = 300.0  # Seconds, per phase
+    bias_evaluation_history_size: int = 100
+    bias_evaluation_history_file: Optional[str] = None  # Defaults to <database_dir>/bias_evaluation_history.jsonl
     
     # LLM Configuration
     google_api_key: Optional[str] = None
     llm_model: str = "gemini-1.5-flash"
+
+    # Model Provider Clients (real-time model integration)
+    model_provider_max_concurrency: int = 8  # In-flight requests per provider and credentials
+    model_provider_requests_per_second: Optional[float] = None  # Pacing per provider; None disables it
+    model_provider_burst: int = 4  # Requests allowed back to back before pacing applies
+    model_provider_retry_backoff: float = 0.5  # Seconds; doubled per attempt, with full jitter
+    model_provider_hedge_after: Optional[float] = None  # Seconds before a duplicate request is sent
+
+    # LLM Response Cache (bias probing and LLM-as-judge)
+    llm_response_cache_enabled: bool = True
+    llm_response_cache_path: Optional[str] = None  # Defaults to <database_dir>/llm_response_cache.sqlite3
+    llm_response_cache_ttl: float = 7 * 24 * 3600  # Seconds
+    llm_response_cache_max_entries: int = 100000  # Least recently used are evicted past this
+    llm_response_cache_stochastic: bool = True  # False sends sampled (temperature > 0) requests to the provider every time
+
+    # Project File Scanner (AI-BOM model and dataset discovery)
+    project_scan_hash_workers: int = 4  # Threads hashing matched files
+    project_scan_hash_cache_enabled: bool = True
+    project_scan_hash_cache_path: Optional[str] = None  # Defaults to <database_dir>/file_hash_cache.sqlite3
+
+    # Vulnerability Index (AI-BOM vulnerability scans)
+    vulnerability_db_path: Optional[str] = None  # Defaults to <database_dir>/vulnerabilities.sqlite3
+    vulnerability_db_online_refresh: bool = True  # False for air-gapped deployments: only imported dumps are used
+    vulnerability_db_refresh_ttl: float = 24 * 3600  # Seconds before a package is re-queried online
+    vulnerability_db_osv_url: str = "https://api.osv.dev/v1"
+    vulnerability_db_timeout: float = 10.0  # Seconds per online refresh
+    vulnerability_db_refresh_concurrency: int = 8  # Concurrent OSV record downloads
+
+    # AI BOM Store (local persistence behind AIBOMDatabaseService)
+    ai_bom_store_path: Optional[str] = None  # Defaults to <database_dir>/ai_bom.sqlite3
+    ai_bom_cache_size: int = 256  # Documents kept in the read-through cache
+    ai_bom_cache_ttl: float = 5.0  # Seconds a cached document may lag other workers' writes
+
+    # Regulatory RAG Configuration
+    rag_index_dir: Optional[str] = None  # Defaults to <database_dir>/rag_index
+    rag_embedding_model: str = "hashing"  # "hashing", "none" or a sentence-transformers model name
+    rag_hybrid_alpha: float = 0.7  # Weight of BM25 against embedding similarity
     
     # Encryption Configuration
     compliance_encryption_key: Optional[str] = None
@@ -139,11 +193,17 @@ class Settings(BaseSettings):
     # RBAC Configuration
     enable_rbac: bool = True
     default_role: str = "compliance_viewer"
+    rbac_local_cache_ttl: float = 30.0  # Seconds; bounds staleness across processes
+    rbac_redis_cache_ttl: int = 300
     
     # Audit Logging Configuration
     enable_audit_logging: bool = True
     audit_log_retention_days: int = 90
-    audit_log_file: Optional[str] = None
+    audit_log_file: Optional[str] = None  # Spill file for audit records that could not be queued or written
+    audit_queue_size: int = 10000
+    audit_batch_size: int = 500
+    audit_flush_interval_seconds: float = 1.0
+    audit_overflow_policy: str = "spill"  # block, spill or drop
     
     class Config:
         env_file = ".env"
@@ -10,6 +10,7 @@ from .org_permissions import (
     require_permissions,
     audit_org_action,
 )
+from .permission_resolver import EffectivePermissions, PermissionResolver, permission_resolver
 
 __all__ = [
     "isolate_by_org",
@@ -20,4 +21,7 @@ __all__ = [
     "require_permission",
     "require_permissions",
     "audit_org_action",
+    "EffectivePermissions",
+    "PermissionResolver",
+    "permission_resolver",
 ]
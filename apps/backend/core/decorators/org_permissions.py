@@ -24,6 +24,8 @@ import logging
 
 from fastapi import HTTPException, status, Request
 
+from .permission_resolver import EffectivePermissions, permission_resolver
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,6 +36,18 @@ class PermissionDenied(HTTPException):
         super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
 
 
+async def _resolve_permissions(db, org_id: str, user_id: str, **log_extra) -> EffectivePermissions:
+    """Cached role and permissions lookup; database errors deny the request."""
+    try:
+        return await permission_resolver.resolve(db, org_id, user_id)
+    except Exception as e:
+        logger.error(
+            f"Database error resolving permissions: {e}",
+            extra={"org_id": org_id, "user_id": user_id, **log_extra},
+        )
+        raise PermissionDenied("Permission check failed")
+
+
 # ── Role-Based Decorators ────────────────────────────────────────────────
 
 
@@ -145,32 +159,22 @@ def require_org_admin(func: Callable) -> Callable:
             raise PermissionDenied("Database connection unavailable")
 
         # Check membership and role
-        try:
-            member = await db.fetch_one(
-                "SELECT role FROM org_members WHERE org_id = :org_id AND user_id = :user_id",
-                {"org_id": str(org_id), "user_id": str(user_id)},
-            )
-        except Exception as e:
-            logger.error(
-                f"Database error checking org membership: {e}",
-                extra={"org_id": org_id, "user_id": user_id},
-            )
-            raise PermissionDenied("Permission check failed")
+        member = await _resolve_permissions(db, org_id, user_id)
 
-        if not member or member["role"] not in ["admin", "owner"]:
+        if member.role not in ["admin", "owner"]:
             logger.warning(
                 f"Admin check denied",
                 extra={
                     "user_id": user_id,
                     "org_id": org_id,
-                    "role": member["role"] if member else None,
+                    "role": member.role,
                 },
             )
             raise PermissionDenied("Admin access required")
 
         logger.debug(
             f"Admin check passed",
-            extra={"user_id": user_id, "org_id": org_id, "role": member["role"]},
+            extra={"user_id": user_id, "org_id": org_id, "role": member.role},
         )
 
         return await func(*args, org_id=org_id, request=request, **kwargs)
@@ -221,19 +225,9 @@ def require_org_member(func: Callable) -> Callable:
             raise PermissionDenied("Database connection unavailable")
 
         # Check membership (any role)
-        try:
-            member = await db.fetch_one(
-                "SELECT id FROM org_members WHERE org_id = :org_id AND user_id = :user_id",
-                {"org_id": str(org_id), "user_id": str(user_id)},
-            )
-        except Exception as e:
-            logger.error(
-                f"Database error checking org membership: {e}",
-                extra={"org_id": org_id, "user_id": user_id},
-            )
-            raise PermissionDenied("Permission check failed")
+        member = await _resolve_permissions(db, org_id, user_id)
 
-        if not member:
+        if not member.is_member:
             logger.warning(
                 f"Member check denied: user not member of org",
                 extra={"user_id": user_id, "org_id": org_id},
@@ -257,8 +251,8 @@ def require_permission(permission: str) -> Callable:
     """
     Decorator that checks if user has a specific permission.
 
-    Retrieves the user's role from org_members, then checks the role's
-    permissions from org_roles table.
+    Resolves the user's role and the role's permissions (org_members joined
+    with org_roles) through the cached permission resolver.
 
     Permission format: "resource:action" (e.g., "members:invite", "reports:export")
 
@@ -298,24 +292,10 @@ def require_permission(permission: str) -> Callable:
                 logger.error(f"No database connection in {func.__name__}")
                 raise PermissionDenied("Database connection unavailable")
 
-            # Get user's role in organization
-            try:
-                member = await db.fetch_one(
-                    "SELECT role FROM org_members WHERE org_id = :org_id AND user_id = :user_id",
-                    {"org_id": str(org_id), "user_id": str(user_id)},
-                )
-            except Exception as e:
-                logger.error(
-                    f"Database error checking membership: {e}",
-                    extra={
-                        "org_id": org_id,
-                        "user_id": user_id,
-                        "permission": permission,
-                    },
-                )
-                raise PermissionDenied("Permission check failed")
+            # Get user's role and its permissions (one cached lookup)
+            member = await _resolve_permissions(db, org_id, user_id, permission=permission)
 
-            if not member:
+            if not member.is_member:
                 logger.warning(
                     f"Permission denied: user not member of org",
                     extra={
@@ -326,30 +306,13 @@ def require_permission(permission: str) -> Callable:
                 )
                 raise PermissionDenied("Not a member of this organization")
 
-            # Get role's permissions
-            try:
-                role = await db.fetch_one(
-                    "SELECT permissions FROM org_roles WHERE org_id = :org_id AND name = :name",
-                    {"org_id": str(org_id), "name": member["role"]},
-                )
-            except Exception as e:
-                logger.error(
-                    f"Database error checking role permissions: {e}",
-                    extra={
-                        "org_id": org_id,
-                        "role": member["role"],
-                        "permission": permission,
-                    },
-                )
-                raise PermissionDenied("Permission check failed")
-
-            if not role or permission not in role["permissions"]:
+            if permission not in member.permissions:
                 logger.warning(
                     f"Permission denied: missing required permission",
                     extra={
                         "user_id": user_id,
                         "org_id": org_id,
-                        "role": member["role"],
+                        "role": member.role,
                         "permission": permission,
                     },
                 )
@@ -360,7 +323,7 @@ def require_permission(permission: str) -> Callable:
                 extra={
                     "user_id": user_id,
                     "org_id": org_id,
-                    "role": member["role"],
+                    "role": member.role,
                     "permission": permission,
                 },
             )
@@ -425,41 +388,24 @@ def require_permissions(permissions: List[str], require_all: bool = True) -> Cal
                 logger.error(f"No database connection in {func.__name__}")
                 raise PermissionDenied("Database connection unavailable")
 
-            # Get user's role
-            try:
-                member = await db.fetch_one(
-                    "SELECT role FROM org_members WHERE org_id = :org_id AND user_id = :user_id",
-                    {"org_id": str(org_id), "user_id": str(user_id)},
-                )
-            except Exception as e:
-                logger.error(f"Database error checking membership: {e}")
-                raise PermissionDenied("Permission check failed")
+            # Get user's role and its permissions (one cached lookup)
+            member = await _resolve_permissions(db, org_id, user_id, permissions=permissions)
 
-            if not member:
+            if not member.is_member:
                 logger.warning(
                     f"Permission denied: user not member of org",
                     extra={"user_id": user_id, "org_id": org_id},
                 )
                 raise PermissionDenied("Not a member of this organization")
 
-            # Get role's permissions
-            try:
-                role = await db.fetch_one(
-                    "SELECT permissions FROM org_roles WHERE org_id = :org_id AND name = :name",
-                    {"org_id": str(org_id), "name": member["role"]},
-                )
-            except Exception as e:
-                logger.error(f"Database error checking role permissions: {e}")
-                raise PermissionDenied("Permission check failed")
-
-            if not role:
+            if not member.role_configured:
                 logger.warning(
                     f"Permission denied: role has no permissions",
-                    extra={"org_id": org_id, "role": member["role"]},
+                    extra={"org_id": org_id, "role": member.role},
                 )
                 raise PermissionDenied("Role has no permissions configured")
 
-            role_permissions = role["permissions"]
+            role_permissions = member.permissions
 
             # Check permissions based on require_all flag
             if require_all:
@@ -495,7 +441,7 @@ def require_permissions(permissions: List[str], require_all: bool = True) -> Cal
                 extra={
                     "user_id": user_id,
                     "org_id": org_id,
-                    "role": member["role"],
+                    "role": member.role,
                     "permissions": permissions,
                 },
             )
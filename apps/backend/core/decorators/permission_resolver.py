@@ -0,0 +1,215 @@
+"""
+Cached RBAC permission resolution.
+
+Resolves a user's role and the role's permissions in an organization with one
+joined query, and caches the effective permission set per (org_id, user_id):
+
+1. Local tier: in-process TTL/LRU map, checked first.
+2. Redis tier (when ``cache_manager`` is connected): one hash per org, so an
+   org-wide invalidation is a single DEL.
+
+Membership and role changes in org_management call ``invalidate``. Other
+processes drop their local entries when the local TTL expires, so keep
+``rbac_local_cache_ttl`` short.
+"""
+
+import json
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MEMBER_PERMISSIONS_QUERY = """
+    SELECT m.role AS role, r.id AS role_id, r.permissions AS permissions
+    FROM org_members m
+    LEFT JOIN org_roles r ON r.org_id = m.org_id AND r.name = m.role
+    WHERE m.org_id = :org_id AND m.user_id = :user_id
+"""
+
+
+@dataclass(frozen=True)
+class EffectivePermissions:
+    """A user's role and permission set in one organization."""
+    role: Optional[str] = None  # None when the user is not a member
+    role_configured: bool = False  # Whether the role has a row in org_roles
+    permissions: FrozenSet[str] = field(default_factory=frozenset)
+
+    @property
+    def is_member(self) -> bool:
+        return self.role is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "role": self.role,
+            "role_configured": self.role_configured,
+            "permissions": sorted(self.permissions),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EffectivePermissions":
+        return cls(data["role"], data["role_configured"], frozenset(data["permissions"]))
+
+
+def _parse_permissions(value: Any) -> FrozenSet[str]:
+    """Permissions column as a set (JSON text, JSON array or native array)."""
+    if value is None:
+        return frozenset()
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return frozenset({value})
+    return frozenset(value)
+
+
+class PermissionResolver:
+    """Resolve and cache effective permissions per (org_id, user_id)."""
+
+    def __init__(
+        self,
+        local_ttl: float = 30.0,
+        redis_ttl: int = 300,
+        max_entries: int = 10000
+    ):
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.max_entries = max_entries
+        self._local: "OrderedDict[Tuple[str, str], Tuple[float, EffectivePermissions]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def resolve(self, db, org_id: str, user_id: str) -> EffectivePermissions:
+        """
+        Effective permissions of ``user_id`` in ``org_id``.
+
+        Cache misses cost one joined query; database errors propagate so the
+        caller can deny the request.
+        """
+        key = (str(org_id), str(user_id))
+        cached = self._get_local(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        cached = await self._get_redis(key)
+        if cached is not None:
+            self.hits += 1
+            self._set_local(key, cached)
+            return cached
+
+        self.misses += 1
+        row = await db.fetch_one(
+            MEMBER_PERMISSIONS_QUERY, {"org_id": key[0], "user_id": key[1]}
+        )
+        if row is None:
+            resolved = EffectivePermissions()
+        else:
+            resolved = EffectivePermissions(
+                role=row["role"],
+                role_configured=row["role_id"] is not None,
+                permissions=_parse_permissions(row["permissions"]),
+            )
+
+        self._set_local(key, resolved)
+        await self._set_redis(key, resolved)
+        return resolved
+
+    async def invalidate(self, org_id: str, user_id: Optional[str] = None):
+        """Drop one member's entry, or every entry of the org when ``user_id`` is None."""
+        org_id = str(org_id)
+        if user_id is None:
+            for key in [k for k in self._local if k[0] == org_id]:
+                del self._local[key]
+        else:
+            self._local.pop((org_id, str(user_id)), None)
+
+        redis_client = self._redis()
+        if redis_client is None:
+            return
+        try:
+            if user_id is None:
+                await redis_client.delete(self._redis_key(org_id))
+            else:
+                await redis_client.hdel(self._redis_key(org_id), str(user_id))
+        except Exception as e:
+            logger.warning(f"Failed to invalidate cached permissions for org {org_id}: {e}")
+
+    def clear(self):
+        """Drop the local tier (e.g. in tests)."""
+        self._local.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "local_entries": len(self._local)}
+
+    # Local tier
+
+    def _get_local(self, key: Tuple[str, str]) -> Optional[EffectivePermissions]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    def _set_local(self, key: Tuple[str, str], value: EffectivePermissions):
+        self._local[key] = (time.monotonic() + self.local_ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    # Redis tier
+
+    @staticmethod
+    def _redis():
+        from config.cache import cache_manager
+        return cache_manager.redis_client
+
+    @staticmethod
+    def _redis_key(org_id: str) -> str:
+        return f"fairmind:rbac:{org_id}"
+
+    async def _get_redis(self, key: Tuple[str, str]) -> Optional[EffectivePermissions]:
+        redis_client = self._redis()
+        if redis_client is None:
+            return None
+        try:
+            value = await redis_client.hget(self._redis_key(key[0]), key[1])
+            if not value:
+                return None
+            data = json.loads(value)
+            # The hash TTL is refreshed on every write, so entries carry their own
+            if data.get("expires_at", 0) < time.time():
+                return None
+            return EffectivePermissions.from_dict(data)
+        except Exception as e:
+            logger.debug(f"Redis permission cache read failed: {e}")
+            return None
+
+    async def _set_redis(self, key: Tuple[str, str], value: EffectivePermissions):
+        redis_client = self._redis()
+        if redis_client is None:
+            return
+        try:
+            redis_key = self._redis_key(key[0])
+            pipe = redis_client.pipeline()
+            data = dict(value.to_dict(), expires_at=time.time() + self.redis_ttl)
+            pipe.hset(redis_key, key[1], json.dumps(data))
+            pipe.expire(redis_key, self.redis_ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Redis permission cache write failed: {e}")
+
+
+# Global permission resolver instance
+permission_resolver = PermissionResolver(
+    local_ttl=settings.rbac_local_cache_ttl,
+    redis_ttl=settings.rbac_redis_cache_ttl,
+)
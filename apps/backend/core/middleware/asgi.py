@@ -0,0 +1,57 @@
+"""
+Helpers for pure ASGI middleware.
+
+Middleware built on these helpers wraps the ``receive``/``send`` callables
+instead of going through ``BaseHTTPMiddleware``, so request and response
+bodies stream through untouched and no extra task or memory stream is
+created per request.
+"""
+
+from typing import Callable, Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import Message, Scope, Send
+
+
+def get_client_ip(scope: Scope) -> str:
+    """Get client IP address from the scope (reverse proxy headers first)."""
+    headers = Headers(scope=scope)
+    forwarded_for = headers.get("x-forwarded-for")
+    if forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+
+    real_ip = headers.get("x-real-ip")
+    if real_ip:
+        return real_ip
+
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def get_state(scope: Scope) -> dict:
+    """The dict backing ``request.state`` for this scope."""
+    return scope.setdefault("state", {})
+
+
+def send_with_headers(
+    send: Send,
+    headers: Iterable[Tuple[str, str]],
+    on_start: Optional[Callable[[MutableHeaders], None]] = None
+) -> Send:
+    """
+    Wrap ``send`` so the response start message carries extra headers.
+
+    Headers are set (replacing any value the endpoint used), matching
+    ``response.headers[name] = value`` in ``BaseHTTPMiddleware``.
+    ``on_start`` may edit the headers further.
+    """
+    async def wrapped(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            response_headers = MutableHeaders(scope=message)
+            for name, value in headers:
+                response_headers[name] = value
+            if on_start is not None:
+                on_start(response_headers)
+        await send(message)
+
+    return wrapped
@@ -7,17 +7,19 @@ Records user actions with context for regulatory reporting and security analysis
 
 import logging
 import time
-from typing import Optional, Dict, Any
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from typing import Optional, Dict, Any, List
+from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from datetime import datetime
 import json
 
+from core.middleware.asgi import get_client_ip
+from services.audit_sink import audit_sink, build_audit_record
+
 logger = logging.getLogger("fairmind.audit")
 
 
-class AuditLoggingMiddleware(BaseHTTPMiddleware):
+class AuditLoggingMiddleware:
     """
     Middleware to log API requests for audit trail and compliance.
 
@@ -27,6 +29,10 @@ class AuditLoggingMiddleware(BaseHTTPMiddleware):
     - Request/response timing
     - Error details for failures
     - IP address and user agent
+
+    The request body is never read ahead of the endpoint: chunks of small
+    POST/PUT/PATCH bodies are copied as the endpoint receives them and parsed
+    for the audit record once the response has been sent.
     """
 
     # Sensitive fields to exclude from logging
@@ -44,84 +50,115 @@ class AuditLoggingMiddleware(BaseHTTPMiddleware):
     }
 
     # Endpoints to exclude from audit logging (health checks, etc.)
-    EXCLUDED_PATHS = {
+    EXCLUDED_PATHS = (
         "/health",
         "/health/live",
         "/health/ready",
         "/docs",
         "/openapi.json",
         "/redoc",
-    }
+    )
+
+    # Larger request bodies are not copied into the audit record
+    MAX_AUDITED_BODY_BYTES = 64 * 1024
 
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
         self.app = app
 
-    async def dispatch(self, request: Request, call_next) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Log incoming request and outgoing response."""
 
         # Skip logging for excluded paths
-        if any(request.url.path.startswith(path) for path in self.EXCLUDED_PATHS):
-            return await call_next(request)
+        if scope["type"] != "http" or scope["path"].startswith(self.EXCLUDED_PATHS):
+            await self.app(scope, receive, send)
+            return
 
         # Capture request information
         start_time = time.time()
-        request_id = self._generate_request_id()
-        user_id = self._extract_user_id(request)
-        ip_address = self._get_client_ip(request)
-        user_agent = request.headers.get("user-agent", "unknown")
-
-        # Prepare audit context
+        request = Request(scope)
         audit_context = {
-            "request_id": request_id,
+            "request_id": self._generate_request_id(),
             "timestamp": datetime.utcnow().isoformat(),
             "method": request.method,
             "path": request.url.path,
             "query_params": dict(request.query_params) if request.query_params else {},
-            "user_id": user_id,
-            "ip_address": ip_address,
-            "user_agent": user_agent,
+            "user_id": self._extract_user_id(request),
+            "ip_address": get_client_ip(scope),
+            "user_agent": request.headers.get("user-agent", "unknown"),
         }
 
-        # Capture request body for audit (if applicable)
-        if request.method in ("POST", "PUT", "PATCH"):
-            try:
-                body = await request.body()
-                if body:
-                    body_dict = json.loads(body)
-                    # Sanitize sensitive fields
-                    sanitized_body = self._sanitize_sensitive_data(body_dict)
-                    audit_context["request_body"] = sanitized_body
-            except Exception as e:
-                logger.debug(f"Error capturing request body: {e}")
-
-        # Call the next middleware/route handler
-        try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-
-            # Add response information to audit context
-            audit_context["status_code"] = response.status_code
-            audit_context["duration_ms"] = round(process_time * 1000, 2)
-            audit_context["status"] = "success" if 200 <= response.status_code < 400 else "error"
+        # Copy the request body for audit (if applicable) as the endpoint reads it
+        body_chunks: Optional[List[bytes]] = None
+        if request.method in ("POST", "PUT", "PATCH") and self._body_is_auditable(request):
+            body_chunks = []
+            body_size = 0
+
+            async def receive_wrapper() -> Message:
+                nonlocal body_chunks, body_size
+                message = await receive()
+                if body_chunks is not None and message["type"] == "http.request":
+                    chunk = message.get("body", b"")
+                    body_size += len(chunk)
+                    if body_size > self.MAX_AUDITED_BODY_BYTES:
+                        body_chunks = None
+                    else:
+                        body_chunks.append(chunk)
+                return message
+        else:
+            receive_wrapper = receive
 
-            # Log audit event
-            self._log_audit_event(audit_context)
+        status_code = 500
 
-            return response
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
+        # Call the next middleware/route handler
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
         except Exception as e:
-            process_time = time.time() - start_time
-
             # Log error with audit context
             audit_context["status_code"] = 500
             audit_context["status"] = "error"
-            audit_context["duration_ms"] = round(process_time * 1000, 2)
+            audit_context["duration_ms"] = round((time.time() - start_time) * 1000, 2)
             audit_context["error"] = str(e)
+            self._add_request_body(audit_context, body_chunks)
 
-            self._log_audit_event(audit_context)
+            await self._log_audit_event(audit_context)
             raise
 
+        # Add response information to audit context
+        audit_context["status_code"] = status_code
+        audit_context["duration_ms"] = round((time.time() - start_time) * 1000, 2)
+        audit_context["status"] = "success" if 200 <= status_code < 400 else "error"
+        self._add_request_body(audit_context, body_chunks)
+
+        # Log audit event
+        await self._log_audit_event(audit_context)
+
+    def _body_is_auditable(self, request: Request) -> bool:
+        """Only JSON-compatible bodies below the size cap are copied."""
+        content_type = request.headers.get("content-type", "")
+        if content_type and "json" not in content_type:
+            return False
+        content_length = request.headers.get("content-length")
+        return not (content_length and content_length.isdigit()
+                    and int(content_length) > self.MAX_AUDITED_BODY_BYTES)
+
+    def _add_request_body(self, audit_context: Dict[str, Any], body_chunks: Optional[List[bytes]]) -> None:
+        """Parse and sanitize the copied request body into the audit context."""
+        if not body_chunks:
+            return
+        try:
+            body = b"".join(body_chunks)
+            if body:
+                # Sanitize sensitive fields
+                audit_context["request_body"] = self._sanitize_sensitive_data(json.loads(body))
+        except Exception as e:
+            logger.debug(f"Error capturing request body: {e}")
+
     def _generate_request_id(self) -> str:
         """Generate a unique request ID for tracking."""
         import uuid
@@ -153,16 +190,7 @@ class AuditLoggingMiddleware(BaseHTTPMiddleware):
 
     def _get_client_ip(self, request: Request) -> str:
         """Get client IP address from request."""
-        # Check X-Forwarded-For header (for proxied requests)
-        if "x-forwarded-for" in request.headers:
-            return request.headers["x-forwarded-for"].split(",")[0].strip()
-
-        # Check X-Real-IP header
-        if "x-real-ip" in request.headers:
-            return request.headers["x-real-ip"]
-
-        # Fall back to direct connection
-        return request.client.host if request.client else "unknown"
+        return get_client_ip(request.scope)
 
     def _sanitize_sensitive_data(self, data: Any) -> Any:
         """
@@ -189,17 +217,17 @@ class AuditLoggingMiddleware(BaseHTTPMiddleware):
         else:
             return data
 
-    def _log_audit_event(self, context: Dict[str, Any]) -> None:
+    async def _log_audit_event(self, context: Dict[str, Any]) -> None:
         """
-        Log audit event to file or database.
+        Log audit event and queue it for the audit_logs table.
 
         This is called for every API request (except excluded paths).
-        In production, this should also persist to audit_logs table.
+        Records are persisted in batches by the audit sink's background
+        flusher; a full queue applies the configured overflow policy.
 
         Args:
             context: Audit context dictionary with request/response info
         """
-        # Log to file/stdout for now
         log_message = (
             f"[AUDIT] {context.get('status')} | "
             f"{context['method']} {context['path']} | "
@@ -216,40 +244,25 @@ class AuditLoggingMiddleware(BaseHTTPMiddleware):
         else:
             logger.info(log_message)
 
-        # Persist to audit_logs table asynchronously
-        import asyncio
-        asyncio.create_task(self._persist_audit_log(context))
-
-    async def _persist_audit_log(self, context: Dict[str, Any]) -> None:
-        """Persist audit log to database for regulatory compliance."""
         try:
-            from config.database import get_db
-            from sqlalchemy import text
-            import uuid as uuid_lib
-
-            action = f"{context['method']} {context['path']}"
-            async with get_db() as db:
-                await db.execute(
-                    text(
-                        "INSERT INTO audit_logs (id, action, resource_type, status, ip_address, user_agent, details, timestamp) "
-                        "VALUES (:id, :action, :resource_type, :status, :ip_address, :user_agent, :details::jsonb, :timestamp)"
-                    ),
-                    {
-                        "id": str(uuid_lib.uuid4()),
-                        "action": action,
-                        "resource_type": context.get("path", "").split("/")[3] if len(context.get("path", "").split("/")) > 3 else None,
-                        "status": context.get("status", "unknown"),
-                        "ip_address": context.get("ip_address"),
-                        "user_agent": context.get("user_agent"),
-                        "details": json.dumps({
-                            "request_id": context.get("request_id"),
-                            "status_code": context.get("status_code"),
-                            "duration_ms": context.get("duration_ms"),
-                        }),
-                        "timestamp": datetime.utcnow(),
-                    },
-                )
-                await db.commit()
-
+            await audit_sink.submit(self._build_audit_record(context))
         except Exception as e:
-            logger.debug(f"Could not persist audit log (non-critical): {e}")
+            logger.debug(f"Could not queue audit log (non-critical): {e}")
+
+    def _build_audit_record(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Map an audit context onto an audit_logs row."""
+        path_parts = context.get("path", "").split("/")
+        return build_audit_record(
+            action=f"{context['method']} {context['path']}",
+            status=context.get("status", "unknown"),
+            resource_type=path_parts[3] if len(path_parts) > 3 else None,
+            ip_address=context.get("ip_address"),
+            user_agent=context.get("user_agent"),
+            details={
+                "request_id": context.get("request_id"),
+                "user_id": context.get("user_id"),
+                "status_code": context.get("status_code"),
+                "duration_ms": context.get("duration_ms"),
+            },
+            error_message=context.get("error"),
+        )
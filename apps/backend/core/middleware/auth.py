@@ -1,39 +1,92 @@
 
 import logging
-from fastapi import Request, Response, status
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.types import ASGIApp
+from typing import Optional
+from fastapi import Response, status
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 import jwt
-from jwt import PyJWKClient
 
+from config.jwks import JWKSProvider, VerifiedTokenCache
 from config.settings import settings
+from core.middleware.asgi import get_state
 
 logger = logging.getLogger(__name__)
 
-class NeonAuthMiddleware(BaseHTTPMiddleware):
+class NeonAuthMiddleware:
     """
     Middleware to verify Neon JWT tokens and inject user info into request.
     """
+
+    PUBLIC_PATHS = frozenset({
+        "/health",
+        "/health/live",
+        "/health/ready",
+        "/metrics",  # Prometheus scrapes carry no token; restrict it at the network level
+        "/docs",
+        "/openapi.json",
+        "/api/v1/auth/login",
+        "/api/v1/auth/register",
+        "/",
+        "/api"
+    })
+
+    # In development, also allow API access without auth for testing
+    DEVELOPMENT_PUBLIC_PREFIXES = (
+        "/api/v1/database",
+        "/api/v1/core",
+        "/api/v1/bias-detection",
+        "/api/v1/bias/llm-judge",
+        "/api/v1/modern-bias-detection",
+        "/api/v1/multimodal-bias-detection",
+        "/api/v1/ai-bom",
+        "/api/v1/ai-governance",
+        "/api/v1/analytics",
+        "/api/v1/remediation",
+        "/api/v1/compliance",
+        "/api/v1/marketplace",
+        "/api/v1/reports",
+        "/api/v1/settings",
+        "/api/v1/datasets",
+        "/api/v1/monitoring",
+        "/api/v1/mlops"
+    )
     
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
         self.jwt_secret = settings.jwt_secret
-        self.neon_jwks_client = (
-            PyJWKClient(settings.neon_jwks_url) if settings.neon_jwks_url else None
+        self.jwks_provider = (
+            JWKSProvider(settings.neon_jwks_url, ttl=settings.neon_jwks_cache_ttl)
+            if settings.neon_jwks_url else None
         )
+        self.token_cache = VerifiedTokenCache(settings.verified_token_cache_size)
         
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Skip auth for public endpoints
-        if self._is_public_endpoint(request.url.path):
-            return await call_next(request)
-            
-        auth_header = request.headers.get("Authorization")
+        if scope["type"] != "http" or self._is_public_endpoint(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        response = await self._authenticate(scope)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    async def _authenticate(self, scope: Scope) -> Optional[Response]:
+        """Verify the bearer token into ``request.state.user``; returns an error response on failure."""
+        auth_header = Headers(scope=scope).get("Authorization")
         if not auth_header or not auth_header.startswith("Bearer "):
             # Enforce auth globally for non-public endpoints
             return Response("Missing or invalid authentication token", status_code=status.HTTP_401_UNAUTHORIZED)
             
         token = auth_header.split(" ")[1]
-        
+
+        # Tokens already verified by this process skip signature verification
+        payload = self.token_cache.get(token)
+        if payload is not None:
+            get_state(scope)["user"] = payload
+            return None
+
         try:
             verify_kwargs = {}
             if settings.neon_jwt_audience:
@@ -41,8 +94,10 @@ class NeonAuthMiddleware(BaseHTTPMiddleware):
             if settings.neon_jwt_issuer:
                 verify_kwargs["issuer"] = settings.neon_jwt_issuer
 
-            if self.neon_jwks_client:
-                signing_key = self.neon_jwks_client.get_signing_key_from_jwt(token)
+            if self.jwks_provider:
+                signing_key = await self.jwks_provider.get_signing_key(
+                    jwt.get_unverified_header(token).get("kid")
+                )
                 payload = jwt.decode(
                     token,
                     signing_key.key,
@@ -65,8 +120,10 @@ class NeonAuthMiddleware(BaseHTTPMiddleware):
                     "JWT verification configuration missing",
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 )
-                
-            request.state.user = payload
+
+            if self.jwks_provider or settings.jwt_secret:
+                self.token_cache.set(token, payload)
+            get_state(scope)["user"] = payload
             
         except jwt.ExpiredSignatureError:
             return Response("Token expired", status_code=status.HTTP_401_UNAUTHORIZED)
@@ -77,42 +134,10 @@ class NeonAuthMiddleware(BaseHTTPMiddleware):
             logger.error(f"Auth error: {e}")
             return Response("Authentication failed", status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
-        return await call_next(request)
+        return None
         
     def _is_public_endpoint(self, path: str) -> bool:
-        public_paths = [
-            "/health",
-            "/health/live",
-            "/health/ready",
-            "/docs",
-            "/openapi.json",
-            "/api/v1/auth/login",
-            "/api/v1/auth/register",
-            "/",
-            "/api"
-        ]
-        
-        # In development, also allow API access without auth for testing
-        if settings.is_development:
-            if any(path.startswith(p) for p in [
-                "/api/v1/database",
-                "/api/v1/core",
-                "/api/v1/bias-detection",
-                "/api/v1/bias/llm-judge",
-                "/api/v1/modern-bias-detection",
-                "/api/v1/multimodal-bias-detection",
-                "/api/v1/ai-bom",
-                "/api/v1/ai-governance",
-                "/api/v1/analytics",
-                "/api/v1/remediation",
-                "/api/v1/compliance",
-                "/api/v1/marketplace",
-                "/api/v1/reports",
-                "/api/v1/settings",
-                "/api/v1/datasets",
-                "/api/v1/monitoring",
-                "/api/v1/mlops"
-            ]):
-                return True
+        if settings.is_development and path.startswith(self.DEVELOPMENT_PUBLIC_PREFIXES):
+            return True
                 
-        return path in public_paths or path.startswith("/static")
+        return path in self.PUBLIC_PATHS or path.startswith("/static")
@@ -4,12 +4,11 @@ Enhanced error handling middleware.
 Integrates with core exception hierarchy for consistent error responses.
 """
 
-from typing import Callable
-from fastapi import Request, Response
+from fastapi import Request
 from fastapi.exceptions import HTTPException, RequestValidationError
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR, HTTP_422_UNPROCESSABLE_ENTITY
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from core.exceptions import AppException
 from core.logging import get_logger
@@ -19,7 +18,7 @@ from config.settings import settings
 logger = get_logger(__name__)
 
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
+class ErrorHandlingMiddleware:
     """
     Global error handling middleware with structured error responses.
     
@@ -29,13 +28,39 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
     - Includes request context
     - Masks sensitive data in production
     - Integrates with core exception hierarchy
+
+    Pure ASGI: the response streams through unchanged. An exception raised
+    after the response has started cannot be turned into a JSON error, so it
+    is logged and re-raised.
     """
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            return await call_next(request)
-        
-        except AppException as e:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            response = self.handle_exception(Request(scope), e)
+            if response_started:
+                raise
+            await response(scope, receive, send)
+
+    def handle_exception(self, request: Request, e: Exception) -> Response:
+        """Log ``e`` and build its error response; re-raises HTTP exceptions."""
+        if isinstance(e, AppException):
             # Handle our application exceptions
             logger.error(
                 "Application exception",
@@ -51,7 +76,7 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
                 content=e.to_dict()
             )
         
-        except HTTPException as e:
+        if isinstance(e, HTTPException):
             # Let FastAPI handle its own HTTP exceptions
             logger.warning(
                 "HTTP exception",
@@ -60,9 +85,9 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
                 path=request.url.path,
                 method=request.method
             )
-            raise
+            raise e
         
-        except RequestValidationError as e:
+        if isinstance(e, RequestValidationError):
             # Handle validation errors
             logger.warning(
                 "Validation error",
@@ -80,32 +105,30 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
                 }
             )
         
-        except Exception as e:
-            # Handle unexpected exceptions
-            logger.error(
-                "Unhandled exception",
-                exception_type=type(e).__name__,
-                error=str(e),
-                path=request.url.path,
-                method=request.method,
-                exc_info=True
+        # Handle unexpected exceptions
+        logger.error(
+            "Unhandled exception",
+            exception_type=type(e).__name__,
+            error=str(e),
+            path=request.url.path,
+            method=request.method,
+            exc_info=True
+        )
+        
+        # Return generic error in production, detailed in development
+        if settings.is_production:
+            return JSONResponse(
+                status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+                content={
+                    "error": "Internal Server Error",
+                    "message": "An unexpected error occurred. Please try again later."
+                }
             )
-            
-            # Return generic error in production, detailed in development
-            if settings.is_production:
-                return JSONResponse(
-                    status_code=HTTP_500_INTERNAL_SERVER_ERROR,
-                    content={
-                        "error": "Internal Server Error",
-                        "message": "An unexpected error occurred. Please try again later."
-                    }
-                )
-            else:
-                return JSONResponse(
-                    status_code=HTTP_500_INTERNAL_SERVER_ERROR,
-                    content={
-                        "error": "Internal Server Error",
-                        "message": str(e),
-                        "type": type(e).__name__
-                    }
-                )
+        return JSONResponse(
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "error": "Internal Server Error",
+                "message": str(e),
+                "type": type(e).__name__
+            }
+        )
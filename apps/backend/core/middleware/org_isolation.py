@@ -8,16 +8,15 @@ Enforces multi-tenancy at the middleware layer by:
 """
 
 import logging
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 from typing import Optional
-import uuid
+
+from core.middleware.asgi import get_state
 
 logger = logging.getLogger(__name__)
 
 
-class OrgIsolationMiddleware(BaseHTTPMiddleware):
+class OrgIsolationMiddleware:
     """
     Extracts org_id from JWT claims and injects into request context.
     Prevents requests from users without valid org membership.
@@ -28,51 +27,63 @@ class OrgIsolationMiddleware(BaseHTTPMiddleware):
     3. Endpoint decorators enforce org isolation on database queries
     """
 
+    PUBLIC_PATHS = frozenset({
+        "/health",
+        "/health/live",
+        "/health/ready",
+        "/metrics",
+        "/docs",
+        "/openapi.json",
+        "/api/v1/auth/login",
+        "/api/v1/auth/register",
+        "/",
+        "/api",
+    })
+
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Main middleware dispatch - extract org context and inject into request.
+        Extract org context into ``request.state`` and pass the request through.
         """
         # Skip org context injection for public/health endpoints
-        if self._is_public_endpoint(request.url.path):
-            return await call_next(request)
+        if scope["type"] != "http" or self._is_public_endpoint(scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
         # Extract user from request.state (set by auth middleware)
-        user = getattr(request.state, 'user', None)
-
-        if not user:
-            # No authenticated user = skip org injection (public endpoint allowed)
-            # Auth middleware will reject if endpoint requires auth
-            return await call_next(request)
-
-        # Extract org_id from user object
-        # JWT claims: user might be a dict with org_id, or a User model
-        org_id = self._extract_org_id(user)
-
-        if org_id:
-            # Inject org context into request for endpoint use
-            request.state.org_id = str(org_id)
-            request.state.user_id = self._extract_user_id(user)
-
-            logger.debug(
-                f"Org context injected: user_id={request.state.user_id}, "
-                f"org_id={request.state.org_id} for {request.method} {request.url.path}"
-            )
-        else:
-            # User exists but has no org assignment
-            # Log this but don't block - endpoint decorator will enforce
-            logger.warning(
-                f"User has no org assignment: {self._extract_user_id(user)} "
-                f"for {request.method} {request.url.path}"
-            )
-            request.state.org_id = None
-            request.state.user_id = self._extract_user_id(user)
-
-        # Continue to next middleware/endpoint
-        response = await call_next(request)
-        return response
+        state = get_state(scope)
+        user = state.get('user')
+
+        if user:
+            # Extract org_id from user object
+            # JWT claims: user might be a dict with org_id, or a User model
+            org_id = self._extract_org_id(user)
+            user_id = self._extract_user_id(user)
+
+            if org_id:
+                # Inject org context into request for endpoint use
+                state['org_id'] = str(org_id)
+                state['user_id'] = user_id
+
+                logger.debug(
+                    f"Org context injected: user_id={user_id}, "
+                    f"org_id={state['org_id']} for {scope['method']} {scope['path']}"
+                )
+            else:
+                # User exists but has no org assignment
+                # Log this but don't block - endpoint decorator will enforce
+                logger.warning(
+                    f"User has no org assignment: {user_id} "
+                    f"for {scope['method']} {scope['path']}"
+                )
+                state['org_id'] = None
+                state['user_id'] = user_id
+
+        # No authenticated user = skip org injection (public endpoint allowed);
+        # auth middleware will reject if endpoint requires auth
+        await self.app(scope, receive, send)
 
     def _extract_org_id(self, user) -> Optional[str]:
         """
@@ -106,16 +117,4 @@ class OrgIsolationMiddleware(BaseHTTPMiddleware):
         """
         Determine if endpoint is public (skip org isolation).
         """
-        public_paths = [
-            "/health",
-            "/health/live",
-            "/health/ready",
-            "/docs",
-            "/openapi.json",
-            "/api/v1/auth/login",
-            "/api/v1/auth/register",
-            "/",
-            "/api",
-        ]
-
-        return path in public_paths or path.startswith("/static")
+        return path in self.PUBLIC_PATHS or path.startswith("/static")
@@ -7,7 +7,6 @@ and easy configuration.
 
 from typing import List, Callable, Type
 from fastapi import FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware
 from dataclasses import dataclass, field
 
 from core.logging import get_logger
@@ -18,8 +17,8 @@ logger = get_logger(__name__)
 
 @dataclass
 class MiddlewareConfig:
-    """Configuration for a middleware component."""
-    middleware_class: Type[BaseHTTPMiddleware]
+    """Configuration for a middleware component (any ASGI middleware class)."""
+    middleware_class: Type
     priority: int  # Lower = earlier in pipeline
     enabled: bool = True
     kwargs: dict = field(default_factory=dict)
@@ -31,6 +30,11 @@ class MiddlewarePipeline:
     
     Middleware execution order is critical. This class ensures
     middleware is applied in the correct order.
+
+    Prefer pure ASGI middleware (``__init__(app, **kwargs)`` and
+    ``async __call__(scope, receive, send)``, see ``core.middleware.asgi``):
+    each ``BaseHTTPMiddleware`` layer adds a task and a memory stream per
+    request and buffers the request body it reads.
     
     Recommended order:
     1. Error handling (100) - Catch all errors first
@@ -48,7 +52,7 @@ class MiddlewarePipeline:
     
     def add(
         self,
-        middleware_class: Type[BaseHTTPMiddleware],
+        middleware_class: Type,
         priority: int,
         enabled: bool = True,
         **kwargs
@@ -5,18 +5,19 @@ Integrates with core logging system for consistent log format.
 """
 
 import time
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from core.logging import get_logger
+from core.middleware.asgi import get_client_ip, get_state, send_with_headers
 from shared.utils import generate_id
 
 
 logger = get_logger(__name__)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """
     Log all requests with structured logging.
     
@@ -27,19 +28,27 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
     - Client IP extraction
     - User context (if authenticated)
     """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Generate request ID
         request_id = generate_id("req_")
-        request.state.request_id = request_id
+        get_state(scope)["request_id"] = request_id
         
         # Set logging context
         logger.set_context(request_id=request_id)
         
         start_time = time.time()
+        request = Request(scope)
         
         # Extract client info
-        client_ip = self._get_client_ip(request)
+        client_ip = get_client_ip(scope)
         user_agent = request.headers.get("User-Agent", "")
         
         # Log request
@@ -50,17 +59,26 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             client_ip=client_ip,
             user_agent=user_agent
         )
+
+        status_code = 500
+
+        def on_start(headers: MutableHeaders) -> None:
+            # Add request ID and process time headers
+            headers["X-Request-ID"] = request_id
+            headers["X-Process-Time"] = f"{time.time() - start_time:.4f}"
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
         
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_headers(send_wrapper, (), on_start))
             
             # Calculate processing time
             process_time = time.time() - start_time
             
-            # Add request ID and process time headers
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Process-Time"] = f"{process_time:.4f}"
-            
             # Extract user info if authenticated
             user_id = None
             if hasattr(request.state, 'user') and hasattr(request.state.user, 'user_id'):
@@ -71,13 +89,11 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 "Request completed",
                 method=request.method,
                 path=request.url.path,
-                status_code=response.status_code,
+                status_code=status_code,
                 process_time=round(process_time, 4),
                 client_ip=client_ip,
                 user_id=user_id
             )
-            
-            return response
         
         except Exception as e:
             process_time = time.time() - start_time
@@ -99,13 +115,4 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
     
     def _get_client_ip(self, request: Request) -> str:
         """Get client IP address from request."""
-        # Check for forwarded headers (reverse proxy)
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip
-        
-        return request.client.host if request.client else "unknown"
+        return get_client_ip(request.scope)
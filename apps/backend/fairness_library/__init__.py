@@ -23,11 +23,16 @@ from .llm_bias import (
     embedding_bias_analysis
 )
 
+from .embeddings import EmbeddingMatrix
+
 from .monitoring import (
     FairnessMonitor,
     BiasDetector,
     AlertManager,
-    DriftDetector
+    DriftDetector,
+    EWMAChangeDetector,
+    CUSUMChangeDetector,
+    PageHinkleyChangeDetector
 )
 
 from .governance import (
@@ -60,12 +65,16 @@ __all__ = [
     "minimal_pairs_test",
     "behavioral_bias_detection",
     "embedding_bias_analysis",
+    "EmbeddingMatrix",
     
     # Monitoring
     "FairnessMonitor",
     "BiasDetector", 
     "AlertManager",
     "DriftDetector",
+    "EWMAChangeDetector",
+    "CUSUMChangeDetector",
+    "PageHinkleyChangeDetector",
     
     # Governance
     "GovernanceGate",
@@ -0,0 +1,225 @@
+"""
+Resampling Bootstrap Engine
+Vectorized bootstrap confidence intervals for group fairness metrics.
+"""
+
+import numpy as np
+from typing import Callable, Iterator, Optional, Tuple, Union
+import logging
+
+from .kernels import (
+    calibration_cells,
+    calibration_spread,
+    confusion_cells,
+    factorize_groups,
+)
+
+logger = logging.getLogger(__name__)
+
+RandomState = Optional[Union[int, np.random.Generator]]
+
+# Upper bound on the number of elements materialized per resampling chunk
+DEFAULT_MAX_CHUNK_ELEMENTS = 1 << 24
+
+
+def resolve_rng(random_state: RandomState = None) -> np.random.Generator:
+    """Return a numpy Generator from a seed, an existing Generator or None."""
+    if isinstance(random_state, np.random.Generator):
+        return random_state
+    return np.random.default_rng(random_state)
+
+
+class BootstrapEngine:
+    """
+    Batched nonparametric bootstrap over grouped observations.
+
+    All resamples are drawn at once (in memory-bounded chunks) and the group
+    statistics are aggregated with ``np.bincount`` instead of calling a Python
+    closure per resample.
+    """
+
+    def __init__(
+        self,
+        n_bootstrap: int = 1000,
+        confidence_level: float = 0.95,
+        random_state: RandomState = None,
+        max_chunk_elements: int = DEFAULT_MAX_CHUNK_ELEMENTS
+    ):
+        if n_bootstrap < 1:
+            raise ValueError("n_bootstrap must be positive")
+        if not 0 < confidence_level < 1:
+            raise ValueError("confidence_level must be between 0 and 1")
+
+        self.n_bootstrap = n_bootstrap
+        self.confidence_level = confidence_level
+        self.rng = resolve_rng(random_state)
+        self.max_chunk_elements = max(1, int(max_chunk_elements))
+
+    def _chunks(self, row_width: int) -> Iterator[int]:
+        """Yield resample counts per chunk so chunk * row_width stays bounded."""
+        per_chunk = max(1, self.max_chunk_elements // max(1, row_width))
+        remaining = self.n_bootstrap
+        while remaining > 0:
+            size = min(per_chunk, remaining)
+            remaining -= size
+            yield size
+
+    def iter_cell_counts(self, cell_counts: np.ndarray) -> Iterator[np.ndarray]:
+        """
+        Bootstrap counts of categorical cells, one memory-bounded block at a time.
+
+        Resampling n rows with replacement and counting rows per cell is
+        distributed exactly as Multinomial(n, observed cell frequencies), so
+        (chunk, n_cells) count blocks are drawn directly from the observed
+        ``cell_counts`` without materializing row indices.
+        """
+        cell_counts = np.asarray(cell_counts, dtype=np.int64)
+        n = int(cell_counts.sum())
+        for size in self._chunks(len(cell_counts)):
+            if n == 0:
+                yield np.zeros((size, len(cell_counts)), dtype=np.int64)
+            else:
+                yield self.rng.multinomial(n, cell_counts / n, size=size)
+
+    def resample_cell_counts(self, cell_codes: np.ndarray, n_cells: int) -> np.ndarray:
+        """Bootstrap (n_bootstrap, n_cells) counts of per-row cell codes."""
+        cell_counts = np.bincount(np.asarray(cell_codes, dtype=np.int64), minlength=n_cells)
+        return np.concatenate(list(self.iter_cell_counts(cell_counts)), axis=0)
+
+    def resample_indices(self, n: int) -> Iterator[np.ndarray]:
+        """Yield (chunk, n) row index matrices covering all resamples."""
+        for size in self._chunks(n):
+            yield self.rng.integers(0, n, size=(size, n))
+
+    def resample_weighted_sums(
+        self,
+        cell_codes: np.ndarray,
+        n_cells: int,
+        weights: Tuple[np.ndarray, ...] = ()
+    ) -> Tuple[np.ndarray, ...]:
+        """
+        Row-level bootstrap of per-cell counts and weighted sums.
+
+        Use this when the statistic depends on row values inside a cell (e.g.
+        predicted probabilities) rather than on cell counts alone. Rows with a
+        negative cell code are ignored. Returns the (n_bootstrap, n_cells) count
+        matrix followed by one sum matrix per weight array.
+        """
+        cell_codes = np.asarray(cell_codes, dtype=np.int64)
+        weights = tuple(np.asarray(w, dtype=np.float64) for w in weights)
+        n = len(cell_codes)
+
+        counts = np.zeros((self.n_bootstrap, n_cells), dtype=np.float64)
+        sums = [np.zeros((self.n_bootstrap, n_cells), dtype=np.float64) for _ in weights]
+        if n == 0:
+            return (counts, *sums)
+
+        start = 0
+        for idx in self.resample_indices(n):
+            size = idx.shape[0]
+            cells = cell_codes[idx]
+            valid = cells >= 0
+            flat = (np.arange(size)[:, None] * n_cells + cells)[valid]
+            length = size * n_cells
+
+            counts[start:start + size] = np.bincount(flat, minlength=length).reshape(size, n_cells)
+            for out, w in zip(sums, weights):
+                out[start:start + size] = np.bincount(
+                    flat, weights=w[idx][valid], minlength=length
+                ).reshape(size, n_cells)
+            start += size
+
+        return (counts, *sums)
+
+    def interval(self, samples: np.ndarray) -> Tuple[float, float]:
+        """Percentile interval of bootstrap replicates, ignoring undefined ones."""
+        samples = np.asarray(samples, dtype=np.float64)
+        samples = samples[~np.isnan(samples)]
+        if samples.size == 0:
+            return (0.0, 0.0)
+
+        alpha = 1 - self.confidence_level
+        lower, upper = np.percentile(samples, [(alpha / 2) * 100, (1 - alpha / 2) * 100])
+        return (float(lower), float(upper))
+
+    def intervals(self, samples: np.ndarray) -> np.ndarray:
+        """(k, 2) percentile intervals for (n_bootstrap, k) replicates."""
+        samples = np.asarray(samples, dtype=np.float64)
+        alpha = 1 - self.confidence_level
+        defined = ~np.isnan(samples).all(axis=0)
+        bounds = np.zeros((samples.shape[1], 2))
+        if defined.any():
+            bounds[defined] = np.nanpercentile(
+                samples[:, defined], [(alpha / 2) * 100, (1 - alpha / 2) * 100], axis=0
+            ).T
+        return bounds
+
+    def confusion_replicates(
+        self,
+        y_true: Optional[np.ndarray],
+        y_pred: np.ndarray,
+        group_codes: np.ndarray,
+        n_groups: int
+    ) -> np.ndarray:
+        """Bootstrap (n_bootstrap, n_groups, 2, 2) confusion tensors."""
+        cells = confusion_cells(group_codes, y_true, y_pred)
+        counts = self.resample_cell_counts(cells, n_groups * 4)
+        return counts.reshape(self.n_bootstrap, n_groups, 2, 2)
+
+    def confusion_statistics(
+        self,
+        statistic: Callable[[np.ndarray], np.ndarray],
+        confusion: np.ndarray
+    ) -> np.ndarray:
+        """
+        Bootstrap replicates of ``statistic`` from an observed confusion tensor.
+
+        Replicate tensors are built and reduced one chunk at a time, so memory
+        stays bounded even with thousands of groups.
+        """
+        shape = confusion.shape
+        blocks = [
+            statistic(counts.reshape((len(counts),) + shape))
+            for counts in self.iter_cell_counts(confusion.reshape(-1))
+        ]
+        return np.concatenate(blocks, axis=0)
+
+    def confusion_ci(
+        self,
+        statistic: Callable[[np.ndarray], np.ndarray],
+        y_true: Optional[np.ndarray],
+        y_pred: np.ndarray,
+        sensitive_attr: np.ndarray
+    ) -> Tuple[float, float]:
+        """Confidence interval for a statistic of the grouped confusion tensor."""
+        codes, groups = factorize_groups(sensitive_attr)
+        replicates = self.confusion_replicates(y_true, y_pred, codes, len(groups))
+        return self.interval(statistic(replicates))
+
+    def calibration_ci(
+        self,
+        y_true: np.ndarray,
+        y_pred_proba: np.ndarray,
+        sensitive_attr: np.ndarray,
+        n_bins: int
+    ) -> Tuple[float, float]:
+        """Confidence interval for the calibration-error spread across groups."""
+        codes, groups = factorize_groups(sensitive_attr)
+        n_groups = len(groups)
+        y_pred_proba = np.asarray(y_pred_proba, dtype=np.float64)
+
+        # One extra "out of range" bin per group keeps group sizes intact
+        cells = calibration_cells(codes, y_pred_proba, n_bins)
+        counts, proba_sums, true_sums = self.resample_weighted_sums(
+            cells,
+            n_groups * (n_bins + 1),
+            (y_pred_proba, np.asarray(y_true, dtype=np.float64))
+        )
+        shape = (self.n_bootstrap, n_groups, n_bins + 1)
+        replicates = calibration_spread(
+            counts.reshape(shape),
+            proba_sums.reshape(shape),
+            true_sums.reshape(shape),
+            n_bins
+        )
+        return self.interval(replicates)
@@ -0,0 +1,240 @@
+"""
+Embedding Association Engine
+Vectorized WEAT/SEAT statistics over a single (optionally memory-mapped) embedding matrix.
+"""
+
+import json
+import numpy as np
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass, field
+import logging
+
+from .bootstrap import BootstrapEngine, RandomState, resolve_rng
+from .permutation import PermutationEngine, PermutationResult
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingMatrix:
+    """
+    Vocabulary of embeddings stored as one float32 matrix.
+
+    The matrix may be a read-only ``np.memmap`` over a ``.npy`` file, so a
+    large vocabulary is never loaded as a whole: only the rows a test looks up
+    are read and L2-normalized on access. Matrices saved with
+    ``save(normalized=True)`` skip the per-lookup normalization.
+    """
+
+    def __init__(self, words: Sequence[str], vectors: np.ndarray, normalized: bool = False):
+        if len(words) != len(vectors):
+            raise ValueError("Number of words and embedding rows must match")
+        self.words = list(words)
+        self.index: Dict[str, int] = {word: i for i, word in enumerate(self.words)}
+        self.vectors = vectors
+        self.normalized = normalized
+
+    @classmethod
+    def from_dict(
+        cls,
+        embeddings: Mapping[str, np.ndarray],
+        words: Optional[Iterable[str]] = None
+    ) -> "EmbeddingMatrix":
+        """Build a normalized matrix from a word -> vector mapping (optionally only ``words``)."""
+        if words is None:
+            keys = list(embeddings)
+        else:
+            keys = list(dict.fromkeys(w for w in words if w in embeddings))
+        if not keys:
+            return cls([], np.zeros((0, 0), dtype=np.float32), normalized=True)
+        vectors = np.asarray([embeddings[w] for w in keys], dtype=np.float32)
+        return cls(keys, _normalize_rows(vectors), normalized=True)
+
+    @classmethod
+    def load(
+        cls,
+        matrix_path: str,
+        vocab_path: str,
+        mmap: bool = True,
+        normalized: Optional[bool] = None
+    ) -> "EmbeddingMatrix":
+        """
+        Load a ``.npy`` matrix and its vocabulary (JSON list or one word per line).
+
+        With ``mmap=True`` the matrix stays on disk. ``normalized`` defaults to
+        what ``save`` recorded in the vocabulary file, else False.
+        """
+        with open(vocab_path, "r", encoding="utf-8") as f:
+            if vocab_path.endswith(".json"):
+                vocab = json.load(f)
+            else:
+                vocab = [line.rstrip("\n") for line in f]
+        if isinstance(vocab, dict):
+            normalized = vocab.get("normalized", False) if normalized is None else normalized
+            vocab = vocab["words"]
+        vectors = np.load(matrix_path, mmap_mode="r" if mmap else None)
+        return cls(vocab, vectors, normalized=bool(normalized))
+
+    def save(self, matrix_path: str, vocab_path: str, normalized: bool = True):
+        """Write the matrix as float32 ``.npy`` (normalized by default) plus a JSON vocabulary."""
+        vectors = np.asarray(self.vectors, dtype=np.float32)
+        if normalized and not self.normalized:
+            vectors = _normalize_rows(vectors)
+        np.save(matrix_path, vectors)
+        with open(vocab_path, "w", encoding="utf-8") as f:
+            json.dump({"words": self.words, "normalized": normalized or self.normalized}, f)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.index
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def lookup(self, words: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Split ``words`` into (present, missing), keeping order and duplicates."""
+        present, missing = [], []
+        for word in words:
+            (present if word in self.index else missing).append(word)
+        return present, missing
+
+    def rows(self, words: Sequence[str]) -> np.ndarray:
+        """Unit-norm (len(words), dim) float32 rows; all words must be present."""
+        indices = np.fromiter((self.index[w] for w in words), dtype=np.int64, count=len(words))
+        rows = np.asarray(self.vectors[indices], dtype=np.float32)
+        return rows if self.normalized else _normalize_rows(rows)
+
+    def similarity(self, words_x: Sequence[str], words_y: Sequence[str]) -> np.ndarray:
+        """All pairwise cosine similarities as one (len(x), len(y)) matrix product."""
+        return self.rows(words_x) @ self.rows(words_y).T
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.where(norms > 0, norms, 1)).astype(np.float32, copy=False)
+
+
+def as_embedding_matrix(
+    embeddings: Union[EmbeddingMatrix, Mapping[str, np.ndarray]],
+    words: Iterable[str]
+) -> EmbeddingMatrix:
+    """Use an ``EmbeddingMatrix`` as-is, or gather just ``words`` from a dict."""
+    if isinstance(embeddings, EmbeddingMatrix):
+        return embeddings
+    return EmbeddingMatrix.from_dict(embeddings, words)
+
+
+@dataclass
+class AssociationResult:
+    """WEAT-style association between one target set and two attribute sets"""
+    score: float
+    effect_size: float
+    confidence_interval: Tuple[float, float]
+    permutation: Optional[PermutationResult]
+    associations_a: List[float]
+    associations_b: List[float]
+    targets: List[str]
+    missing_words: List[str] = field(default_factory=list)
+
+    @property
+    def p_value(self) -> float:
+        return self.permutation.p_value if self.permutation else 1.0
+
+
+class AssociationEngine:
+    """
+    WEAT statistics computed from one target x attribute similarity matrix.
+
+    ``S = T @ [A; B].T`` is built once. The score (mean association with A
+    minus mean association with B), its effect size, bootstrap replicates and
+    permutation nulls are then all reductions of ``S``:
+
+    - the bootstrap draws multinomial resampling weights for targets and for
+      each attribute set, so a block of replicates is two matrix products;
+    - the permutation test re-partitions A ∪ B into sets of the original
+      sizes, which only permutes the per-attribute column means of ``S``.
+    """
+
+    def __init__(
+        self,
+        n_bootstrap: int = 1000,
+        n_permutations: int = 1000,
+        confidence_level: float = 0.95,
+        random_state: RandomState = None
+    ):
+        self.rng = resolve_rng(random_state)
+        self.bootstrap = BootstrapEngine(n_bootstrap, confidence_level, self.rng)
+        self.permutation = PermutationEngine(
+            n_permutations, alpha=1 - confidence_level, random_state=self.rng
+        ) if n_permutations > 0 else None
+
+    def associate(
+        self,
+        matrix: EmbeddingMatrix,
+        targets: Sequence[str],
+        attribute_a: Sequence[str],
+        attribute_b: Sequence[str]
+    ) -> AssociationResult:
+        targets, missing_t = matrix.lookup(targets)
+        attribute_a, missing_a = matrix.lookup(attribute_a)
+        attribute_b, missing_b = matrix.lookup(attribute_b)
+        if not targets:
+            raise ValueError("No valid associations found")
+
+        n_a = len(attribute_a)
+        sims = matrix.similarity(targets, list(attribute_a) + list(attribute_b)).astype(np.float64)
+        sims_a, sims_b = sims[:, :n_a], sims[:, n_a:]
+
+        # Per-target associations (0 when an attribute set has no known words)
+        assoc_a = sims_a.mean(axis=1) if n_a else np.zeros(len(targets))
+        assoc_b = sims_b.mean(axis=1) if len(attribute_b) else np.zeros(len(targets))
+        differential = assoc_a - assoc_b
+        score = float(differential.mean())
+        std = differential.std(ddof=1) if len(differential) > 1 else 0.0
+        effect_size = float(score / std) if std > 0 else 0.0
+
+        ci = self.bootstrap.interval(self._bootstrap_scores(sims_a, sims_b))
+        permutation = None
+        if self.permutation and n_a and len(attribute_b):
+            permutation = self._permutation_test(sims.mean(axis=0), n_a, abs(score))
+
+        return AssociationResult(
+            score=score,
+            effect_size=effect_size,
+            confidence_interval=ci,
+            permutation=permutation,
+            associations_a=assoc_a.tolist(),
+            associations_b=assoc_b.tolist(),
+            targets=targets,
+            missing_words=missing_t + missing_a + missing_b
+        )
+
+    def _resampling_weights(self, n: int, size: int) -> np.ndarray:
+        """(size, n) multinomial resampling weights, normalized to sum to one."""
+        if n == 0:
+            return np.zeros((size, 0))
+        return self.rng.multinomial(n, np.full(n, 1 / n), size=size) / n
+
+    def _bootstrap_scores(self, sims_a: np.ndarray, sims_b: np.ndarray) -> np.ndarray:
+        """Score replicates with targets and both attribute sets resampled."""
+        n_t, n_a, n_b = sims_a.shape[0], sims_a.shape[1], sims_b.shape[1]
+        blocks = []
+        for size in self.bootstrap._chunks(max(n_t, n_a, n_b)):
+            w_t = self._resampling_weights(n_t, size)
+            scores = np.zeros(size)
+            if n_a:
+                scores += np.einsum("bt,bt->b", w_t, self._resampling_weights(n_a, size) @ sims_a.T)
+            if n_b:
+                scores -= np.einsum("bt,bt->b", w_t, self._resampling_weights(n_b, size) @ sims_b.T)
+            blocks.append(scores)
+        return np.concatenate(blocks)
+
+    def _permutation_test(self, column_means: np.ndarray, n_a: int, observed: float) -> PermutationResult:
+        """Two-sided test over random re-partitions of A ∪ B."""
+        n = len(column_means)
+        n_b = n - n_a
+
+        def draw_block(size: int) -> np.ndarray:
+            shuffled = self.rng.permuted(np.tile(column_means, (size, 1)), axis=1)
+            permuted = shuffled[:, :n_a].mean(axis=1) - shuffled[:, n_a:].sum(axis=1) / n_b
+            return np.abs(permuted)
+
+        return self.permutation.run(draw_block, observed)
@@ -0,0 +1,327 @@
+"""
+Grouped Counting Kernels
+Single-pass grouped confusion tensors and the rate statistics derived from them.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+
+
+def factorize_groups(sensitive_attr: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode group labels as dense integer codes.
+
+    Returns (codes, groups) with ``groups[codes]`` reproducing the input.
+    Groups are sorted when the labels are mutually comparable.
+    """
+    values = np.asarray(sensitive_attr).reshape(-1)
+    try:
+        codes, groups = pd.factorize(values, sort=True, use_na_sentinel=False)
+    except TypeError:
+        codes, groups = pd.factorize(values, sort=False, use_na_sentinel=False)
+    return codes.astype(np.int64), np.asarray(groups)
+
+
+def factorize_combinations(
+    attributes: Sequence[Any]
+) -> Tuple[np.ndarray, List[Tuple[Any, ...]]]:
+    """
+    Encode rows by their combination of attribute values.
+
+    Each attribute is factorized once and the per-attribute codes are folded
+    into a single mixed-radix key, so only combinations that actually occur get
+    a code. Returns (cell codes, one value tuple per cell).
+    """
+    per_attribute = [factorize_groups(values) for values in attributes]
+    code_matrix = np.stack([codes for codes, _ in per_attribute], axis=1)
+    radices = [max(1, len(levels)) for _, levels in per_attribute]
+
+    if float(np.prod(radices, dtype=np.float64)) < np.iinfo(np.int64).max:
+        keys = np.zeros(len(code_matrix), dtype=np.int64)
+        for column, radix in enumerate(radices):
+            keys = keys * radix + code_matrix[:, column]
+        cell_codes, unique_keys = pd.factorize(keys, sort=True)
+        # Unfold the observed keys back into per-attribute codes
+        observed = np.empty((len(unique_keys), len(radices)), dtype=np.int64)
+        remainder = np.asarray(unique_keys, dtype=np.int64)
+        for column in range(len(radices) - 1, -1, -1):
+            observed[:, column] = remainder % radices[column]
+            remainder = remainder // radices[column]
+    else:
+        observed, cell_codes = np.unique(code_matrix, axis=0, return_inverse=True)
+
+    level_lists = [levels.tolist() for _, levels in per_attribute]
+    combinations = [
+        tuple(levels[code] for levels, code in zip(level_lists, row))
+        for row in observed.tolist()
+    ]
+    return np.asarray(cell_codes, dtype=np.int64).reshape(-1), combinations
+
+
+def as_binary(values: Any, positive_label: Any = 1) -> np.ndarray:
+    """Encode labels or predictions as int64 0/1 against ``positive_label``."""
+    return (np.asarray(values) == positive_label).astype(np.int64)
+
+
+def confusion_cells(
+    group_codes: np.ndarray,
+    y_true: Optional[np.ndarray],
+    y_pred: np.ndarray,
+    positive_label: Any = 1
+) -> np.ndarray:
+    """Per-row cell id ``group * 4 + y_true * 2 + y_pred`` (y_true=None counts as 0)."""
+    cells = np.asarray(group_codes, dtype=np.int64) * 4 + as_binary(y_pred, positive_label)
+    if y_true is not None:
+        cells += as_binary(y_true, positive_label) * 2
+    return cells
+
+
+def confusion_tensor(
+    group_codes: np.ndarray,
+    n_groups: int,
+    y_true: Optional[np.ndarray],
+    y_pred: np.ndarray,
+    positive_label: Any = 1
+) -> np.ndarray:
+    """
+    Grouped confusion counts with one ``np.bincount``.
+
+    ``group_codes`` may carry leading batch axes (e.g. a block of permuted
+    codes of shape (batch, n)); the result then has shape
+    (batch, n_groups, 2, 2), indexed as ``[..., group, y_true, y_pred]``.
+    """
+    group_codes = np.asarray(group_codes, dtype=np.int64)
+    cell_pred = as_binary(y_pred, positive_label)
+    if y_true is not None:
+        cell_pred = cell_pred + as_binary(y_true, positive_label) * 2
+
+    batch_shape = group_codes.shape[:-1]
+    n_batches = int(np.prod(batch_shape)) if batch_shape else 1
+    width = n_groups * 4
+
+    cells = group_codes * 4 + cell_pred
+    if batch_shape:
+        offsets = np.arange(n_batches, dtype=np.int64).reshape(batch_shape + (1,)) * width
+        cells = cells + offsets
+
+    counts = np.bincount(cells.reshape(-1), minlength=n_batches * width)
+    return counts.reshape(batch_shape + (n_groups, 2, 2))
+
+
+@dataclass
+class GroupedConfusion:
+    """Per-group confusion counts, indexed as ``matrix[group, y_true, y_pred]``."""
+    groups: np.ndarray
+    matrix: np.ndarray
+
+    @property
+    def tn(self) -> np.ndarray:
+        return self.matrix[..., 0, 0]
+
+    @property
+    def fp(self) -> np.ndarray:
+        return self.matrix[..., 0, 1]
+
+    @property
+    def fn(self) -> np.ndarray:
+        return self.matrix[..., 1, 0]
+
+    @property
+    def tp(self) -> np.ndarray:
+        return self.matrix[..., 1, 1]
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self.matrix.sum(axis=(-2, -1))
+
+    @property
+    def selection_rate(self) -> np.ndarray:
+        return selection_rates(self.matrix)
+
+    @property
+    def true_positive_rate(self) -> np.ndarray:
+        return true_positive_rates(self.matrix)
+
+    @property
+    def false_positive_rate(self) -> np.ndarray:
+        return false_positive_rates(self.matrix)
+
+    @property
+    def positive_predictive_value(self) -> np.ndarray:
+        return positive_predictive_values(self.matrix)
+
+    def by_group(self, rates: np.ndarray, fill: Optional[float] = None) -> Dict[Any, float]:
+        """
+        Map group labels to rates.
+
+        Undefined (NaN) rates are kept as NaN, replaced by ``fill`` when given.
+        """
+        result = {}
+        for group, rate in zip(self.groups.tolist(), rates.tolist()):
+            if np.isnan(rate) and fill is not None:
+                rate = fill
+            result[group] = rate
+        return result
+
+
+def grouped_confusion_matrix(
+    y_true: Optional[np.ndarray],
+    y_pred: np.ndarray,
+    sensitive_attr: np.ndarray,
+    positive_label: Any = 1
+) -> GroupedConfusion:
+    """Factorize groups once and build the (n_groups, 2, 2) confusion tensor."""
+    codes, groups = factorize_groups(sensitive_attr)
+    matrix = confusion_tensor(codes, len(groups), y_true, y_pred, positive_label)
+    return GroupedConfusion(groups=groups, matrix=matrix)
+
+
+def one_vs_rest(confusion: np.ndarray) -> np.ndarray:
+    """
+    Pair every group with the pooled remainder of the population.
+
+    Maps (..., groups, 2, 2) counts to (..., groups, 2, 2, 2), where axis -3
+    holds [group, rest]; any group statistic then yields one value per group.
+    """
+    totals = confusion.sum(axis=-3, keepdims=True)
+    return np.stack([confusion, totals - confusion], axis=-3)
+
+
+# Rate statistics over (..., groups, 2, 2) confusion counts
+
+def _safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def selection_rates(confusion: np.ndarray) -> np.ndarray:
+    """P(Ŷ=1 | group); NaN for empty groups."""
+    positives = confusion[..., 0, 1] + confusion[..., 1, 1]
+    return _safe_ratio(positives, confusion.sum(axis=(-2, -1)))
+
+
+def true_positive_rates(confusion: np.ndarray) -> np.ndarray:
+    """P(Ŷ=1 | Y=1, group); NaN when a group has no positives."""
+    tp, fn = confusion[..., 1, 1], confusion[..., 1, 0]
+    return _safe_ratio(tp, tp + fn)
+
+
+def false_positive_rates(confusion: np.ndarray) -> np.ndarray:
+    """P(Ŷ=1 | Y=0, group); NaN when a group has no negatives."""
+    tn, fp = confusion[..., 0, 0], confusion[..., 0, 1]
+    return _safe_ratio(fp, fp + tn)
+
+
+def positive_predictive_values(confusion: np.ndarray) -> np.ndarray:
+    """P(Y=1 | Ŷ=1, group); NaN when a group has no positive predictions."""
+    tp, fp = confusion[..., 1, 1], confusion[..., 0, 1]
+    return _safe_ratio(tp, tp + fp)
+
+
+def spread(rates: np.ndarray) -> np.ndarray:
+    """Max minus min over the group axis, ignoring undefined (NaN) groups."""
+    defined = ~np.isnan(rates)
+    high = np.where(defined, rates, -np.inf).max(axis=-1)
+    low = np.where(defined, rates, np.inf).min(axis=-1)
+    return np.where(defined.any(axis=-1), high - low, 0.0)
+
+
+def demographic_parity_stat(confusion: np.ndarray) -> np.ndarray:
+    """Selection-rate spread from (..., groups, 2, 2) confusion counts."""
+    return spread(selection_rates(confusion))
+
+
+def equal_opportunity_stat(confusion: np.ndarray) -> np.ndarray:
+    """TPR spread from (..., groups, 2, 2) confusion counts."""
+    return spread(true_positive_rates(confusion))
+
+
+def equalized_odds_stat(confusion: np.ndarray) -> np.ndarray:
+    """Max of TPR and FPR spreads from (..., groups, 2, 2) confusion counts."""
+    return np.maximum(
+        spread(true_positive_rates(confusion)),
+        spread(false_positive_rates(confusion))
+    )
+
+
+def predictive_parity_stat(confusion: np.ndarray) -> np.ndarray:
+    """PPV (precision) spread from (..., groups, 2, 2) confusion counts."""
+    return spread(positive_predictive_values(confusion))
+
+
+def calibration_bins(y_pred_proba: np.ndarray, n_bins: int) -> np.ndarray:
+    """Bin index per score; -1 for scores outside the [0, 1) bin edges."""
+    bin_edges = np.linspace(0, 1, n_bins + 1)
+    bins = np.digitize(y_pred_proba, bin_edges) - 1
+    return np.where((bins >= 0) & (bins < n_bins), bins, -1)
+
+
+def calibration_errors(
+    counts: np.ndarray,
+    proba_sums: np.ndarray,
+    true_sums: np.ndarray,
+    n_bins: int
+) -> np.ndarray:
+    """
+    Per-group calibration error from (..., groups, n_bins + 1) sums.
+
+    The error is the mean |mean score - positive rate| over non-empty bins. The
+    last bin holds out-of-range scores; it counts toward group size but not
+    toward the error. Groups with ``n_bins`` rows or fewer are NaN.
+    """
+    group_sizes = counts.sum(axis=-1)
+    in_range = counts[..., :n_bins]
+    gaps = np.abs(
+        _safe_ratio(proba_sums[..., :n_bins], in_range)
+        - _safe_ratio(true_sums[..., :n_bins], in_range)
+    )
+    filled = in_range > 0
+    n_filled = filled.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        errors = np.where(
+            n_filled > 0,
+            np.where(filled, gaps, 0.0).sum(axis=-1) / n_filled,
+            0.0
+        )
+    return np.where(group_sizes > n_bins, errors, np.nan)
+
+
+def calibration_spread(
+    counts: np.ndarray,
+    proba_sums: np.ndarray,
+    true_sums: np.ndarray,
+    n_bins: int
+) -> np.ndarray:
+    """Spread of per-group calibration error (see ``calibration_errors``)."""
+    return spread(calibration_errors(counts, proba_sums, true_sums, n_bins))
+
+
+def calibration_cells(
+    group_codes: np.ndarray,
+    y_pred_proba: np.ndarray,
+    n_bins: int
+) -> np.ndarray:
+    """Per-row cell id over (group, bin) with one overflow bin per group."""
+    bins = calibration_bins(y_pred_proba, n_bins)
+    return np.asarray(group_codes, dtype=np.int64) * (n_bins + 1) + np.where(bins >= 0, bins, n_bins)
+
+
+def calibration_sums(
+    group_codes: np.ndarray,
+    n_groups: int,
+    y_true: np.ndarray,
+    y_pred_proba: np.ndarray,
+    n_bins: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(counts, score sums, label sums), each shaped (n_groups, n_bins + 1)."""
+    y_pred_proba = np.asarray(y_pred_proba, dtype=np.float64)
+    cells = calibration_cells(group_codes, y_pred_proba, n_bins)
+    length = n_groups * (n_bins + 1)
+    shape = (n_groups, n_bins + 1)
+    return (
+        np.bincount(cells, minlength=length).reshape(shape),
+        np.bincount(cells, weights=y_pred_proba, minlength=length).reshape(shape),
+        np.bincount(cells, weights=np.asarray(y_true, dtype=np.float64), minlength=length).reshape(shape),
+    )
@@ -5,11 +5,14 @@ Standardized methods for detecting bias in language models and embeddings.
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Union
 from dataclasses import dataclass
 import logging
 from enum import Enum
 
+from .bootstrap import RandomState
+from .embeddings import AssociationEngine, EmbeddingMatrix, as_embedding_matrix
+
 logger = logging.getLogger(__name__)
 
 class BiasType(Enum):
@@ -28,71 +31,56 @@ class LLMBiasResult:
     details: Dict[str, Any]
 
 def weat_score(
-    embeddings: Dict[str, np.ndarray],
+    embeddings: Union[Dict[str, np.ndarray], EmbeddingMatrix],
     target_words: List[str],
     attribute_words_a: List[str],
     attribute_words_b: List[str],
-    threshold: float = 0.1
+    threshold: float = 0.1,
+    n_bootstrap: int = 1000,
+    n_permutations: int = 1000,
+    random_state: RandomState = None
 ) -> LLMBiasResult:
     """
     Compute WEAT (Word Embedding Association Test) score.
     
     Args:
-        embeddings: Dict mapping words to embedding vectors
+        embeddings: Dict mapping words to embedding vectors, or an
+            ``EmbeddingMatrix`` (e.g. memory-mapped from ``.npy``)
         target_words: List of target concept words
         attribute_words_a: List of first attribute words
         attribute_words_b: List of second attribute words
         threshold: Bias threshold
+        n_bootstrap: Bootstrap resamples for the confidence interval
+        n_permutations: Maximum attribute-partition permutations for the p-value
+        random_state: Seed or numpy Generator for reproducible results
     
     Returns:
         LLMBiasResult with WEAT score and analysis
     """
     try:
-        def cosine_similarity(a, b):
-            return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
-        
-        def association(word, attribute_set):
-            similarities = []
-            for attr in attribute_set:
-                if word in embeddings and attr in embeddings:
-                    sim = cosine_similarity(embeddings[word], embeddings[attr])
-                    similarities.append(sim)
-            return np.mean(similarities) if similarities else 0
-        
-        # Compute associations
-        associations_a = []
-        associations_b = []
-        
-        for target in target_words:
-            if target in embeddings:
-                assoc_a = association(target, attribute_words_a)
-                assoc_b = association(target, attribute_words_b)
-                associations_a.append(assoc_a)
-                associations_b.append(assoc_b)
-        
-        if not associations_a or not associations_b:
-            raise ValueError("No valid associations found")
-        
-        # Compute WEAT score
-        score = np.mean(associations_a) - np.mean(associations_b)
-        
-        # Bootstrap confidence interval
-        ci_lower, ci_upper = _bootstrap_weat_ci(
-            embeddings, target_words, attribute_words_a, attribute_words_b
+        matrix = as_embedding_matrix(
+            embeddings, [*target_words, *attribute_words_a, *attribute_words_b]
         )
+        association = AssociationEngine(
+            n_bootstrap, n_permutations, random_state=random_state
+        ).associate(matrix, target_words, attribute_words_a, attribute_words_b)
+        score = association.score
         
         return LLMBiasResult(
             bias_type=BiasType.REPRESENTATIONAL,
             score=score,
-            confidence_interval=(ci_lower, ci_upper),
+            confidence_interval=association.confidence_interval,
             is_biased=abs(score) > threshold,
             threshold=threshold,
             details={
                 "target_words": target_words,
                 "attribute_a": attribute_words_a,
                 "attribute_b": attribute_words_b,
-                "associations_a": associations_a,
-                "associations_b": associations_b,
+                "associations_a": association.associations_a,
+                "associations_b": association.associations_b,
+                "effect_size": association.effect_size,
+                "p_value": association.p_value,
+                "missing_words": association.missing_words,
                 "interpretation": f"WEAT score: {score:.3f} (higher = more biased)",
                 "recommendation": "Consider debiasing embeddings" if abs(score) > threshold else "No significant bias detected"
             }
@@ -103,68 +91,56 @@ def weat_score(
         raise
 
 def seat_score(
-    embeddings: Dict[str, np.ndarray],
+    embeddings: Union[Dict[str, np.ndarray], EmbeddingMatrix],
     sentence_templates: List[str],
     target_words: List[str],
     attribute_words_a: List[str],
     attribute_words_b: List[str],
-    threshold: float = 0.1
+    threshold: float = 0.1,
+    n_bootstrap: int = 1000,
+    n_permutations: int = 1000,
+    random_state: RandomState = None
 ) -> LLMBiasResult:
     """
     Compute SEAT (Sentence Embedding Association Test) score.
     
     Args:
-        embeddings: Dict mapping sentences to embedding vectors
+        embeddings: Dict mapping sentences to embedding vectors, or an
+            ``EmbeddingMatrix`` keyed by sentence
         sentence_templates: List of sentence templates
         target_words: List of target concept words
         attribute_words_a: List of first attribute words
         attribute_words_b: List of second attribute words
         threshold: Bias threshold
+        n_bootstrap: Bootstrap resamples for the confidence interval
+        n_permutations: Maximum attribute-partition permutations for the p-value
+        random_state: Seed or numpy Generator for reproducible results
     
     Returns:
         LLMBiasResult with SEAT score and analysis
     """
     try:
-        def cosine_similarity(a, b):
-            return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
-        
-        def sentence_association(sentence_emb, attribute_set):
-            similarities = []
-            for attr in attribute_set:
-                if attr in embeddings:
-                    sim = cosine_similarity(sentence_emb, embeddings[attr])
-                    similarities.append(sim)
-            return np.mean(similarities) if similarities else 0
-        
-        # Generate sentences and compute associations
-        associations_a = []
-        associations_b = []
-        
-        for template in sentence_templates:
-            for target in target_words:
-                sentence = template.format(target=target)
-                if sentence in embeddings:
-                    sentence_emb = embeddings[sentence]
-                    assoc_a = sentence_association(sentence_emb, attribute_words_a)
-                    assoc_b = sentence_association(sentence_emb, attribute_words_b)
-                    associations_a.append(assoc_a)
-                    associations_b.append(assoc_b)
-        
-        if not associations_a or not associations_b:
-            raise ValueError("No valid sentence associations found")
-        
-        # Compute SEAT score
-        score = np.mean(associations_a) - np.mean(associations_b)
-        
-        # Bootstrap confidence interval
-        ci_lower, ci_upper = _bootstrap_seat_ci(
-            embeddings, sentence_templates, target_words, attribute_words_a, attribute_words_b
+        # Every (template, target) sentence is one row of the target set
+        sentences = [
+            template.format(target=target)
+            for template in sentence_templates
+            for target in target_words
+        ]
+        matrix = as_embedding_matrix(
+            embeddings, [*sentences, *attribute_words_a, *attribute_words_b]
         )
+        try:
+            association = AssociationEngine(
+                n_bootstrap, n_permutations, random_state=random_state
+            ).associate(matrix, sentences, attribute_words_a, attribute_words_b)
+        except ValueError:
+            raise ValueError("No valid sentence associations found")
+        score = association.score
         
         return LLMBiasResult(
             bias_type=BiasType.REPRESENTATIONAL,
             score=score,
-            confidence_interval=(ci_lower, ci_upper),
+            confidence_interval=association.confidence_interval,
             is_biased=abs(score) > threshold,
             threshold=threshold,
             details={
@@ -172,8 +148,11 @@ def seat_score(
                 "target_words": target_words,
                 "attribute_a": attribute_words_a,
                 "attribute_b": attribute_words_b,
-                "associations_a": associations_a,
-                "associations_b": associations_b,
+                "associations_a": association.associations_a,
+                "associations_b": association.associations_b,
+                "effect_size": association.effect_size,
+                "p_value": association.p_value,
+                "missing_words": association.missing_words,
                 "interpretation": f"SEAT score: {score:.3f} (higher = more biased)",
                 "recommendation": "Consider debiasing sentence embeddings" if abs(score) > threshold else "No significant bias detected"
             }
@@ -393,45 +372,6 @@ def _compute_behavioral_score(output: Dict[str, Any]) -> float:
     except:
         return 0.0
 
-def _bootstrap_weat_ci(embeddings, target_words, attribute_a, attribute_b, n_bootstrap=1000):
-    """Bootstrap confidence interval for WEAT"""
-    try:
-        bootstrap_scores = []
-        for _ in range(n_bootstrap):
-            # Bootstrap sampling
-            boot_targets = np.random.choice(target_words, size=len(target_words), replace=True)
-            boot_attr_a = np.random.choice(attribute_a, size=len(attribute_a), replace=True)
-            boot_attr_b = np.random.choice(attribute_b, size=len(attribute_b), replace=True)
-            
-            # Compute WEAT score with bootstrapped samples
-            score = weat_score(embeddings, boot_targets, boot_attr_a, boot_attr_b).score
-            bootstrap_scores.append(score)
-        
-        return np.percentile(bootstrap_scores, [2.5, 97.5])
-    except Exception as e:
-        logger.error(f"Error in WEAT bootstrap: {e}")
-        return (0, 0)
-
-def _bootstrap_seat_ci(embeddings, sentence_templates, target_words, attribute_a, attribute_b, n_bootstrap=1000):
-    """Bootstrap confidence interval for SEAT"""
-    try:
-        bootstrap_scores = []
-        for _ in range(n_bootstrap):
-            # Bootstrap sampling
-            boot_templates = np.random.choice(sentence_templates, size=len(sentence_templates), replace=True)
-            boot_targets = np.random.choice(target_words, size=len(target_words), replace=True)
-            boot_attr_a = np.random.choice(attribute_a, size=len(attribute_a), replace=True)
-            boot_attr_b = np.random.choice(attribute_b, size=len(attribute_b), replace=True)
-            
-            # Compute SEAT score with bootstrapped samples
-            score = seat_score(embeddings, boot_templates, boot_targets, boot_attr_a, boot_attr_b).score
-            bootstrap_scores.append(score)
-        
-        return np.percentile(bootstrap_scores, [2.5, 97.5])
-    except Exception as e:
-        logger.error(f"Error in SEAT bootstrap: {e}")
-        return (0, 0)
-
 def _bootstrap_minimal_pairs_ci(model_outputs, n_bootstrap=1000):
     """Bootstrap confidence interval for minimal pairs"""
     try:
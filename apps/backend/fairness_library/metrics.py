@@ -5,13 +5,30 @@ Core fairness metrics with statistical rigor and confidence intervals.
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Callable
 from dataclasses import dataclass
 from enum import Enum
+import inspect
 import logging
-from sklearn.metrics import confusion_matrix
 from scipy import stats
 
+from .bootstrap import BootstrapEngine, RandomState, resolve_rng
+from .kernels import (
+    calibration_errors,
+    calibration_sums,
+    confusion_tensor,
+    demographic_parity_stat,
+    equalized_odds_stat,
+    equal_opportunity_stat,
+    factorize_combinations,
+    factorize_groups,
+    grouped_confusion_matrix,
+    one_vs_rest,
+    selection_rates,
+    spread,
+)
+from .permutation import PermutationEngine, PermutationResult
+
 logger = logging.getLogger(__name__)
 
 class FairnessMetric(Enum):
@@ -36,7 +53,10 @@ def demographic_parity_diff(
     y_pred: np.ndarray,
     sensitive_attr: np.ndarray,
     confidence_level: float = 0.95,
-    threshold: float = 0.05
+    threshold: float = 0.05,
+    n_bootstrap: int = 1000,
+    n_permutations: int = 1000,
+    random_state: RandomState = None
 ) -> MetricResult:
     """
     Compute demographic parity difference with statistical rigor.
@@ -46,33 +66,32 @@ def demographic_parity_diff(
         sensitive_attr: Array of group labels
         confidence_level: Confidence level for CI
         threshold: Fairness threshold (default 0.05 = 5 percentage points)
+        n_bootstrap: Number of bootstrap resamples for the CI
+        n_permutations: Maximum permutations for the p-value (stops early once decided)
+        random_state: Seed or numpy Generator for reproducible resampling
     
     Returns:
         MetricResult with value, CI, p-value, and fairness assessment
     """
     try:
-        groups = np.unique(sensitive_attr)
-        if len(groups) < 2:
+        confusion = grouped_confusion_matrix(None, y_pred, sensitive_attr)
+        if len(confusion.groups) < 2:
             raise ValueError("Need at least 2 groups for fairness analysis")
         
         # Compute group rates
-        rates = {}
-        for group in groups:
-            mask = (sensitive_attr == group)
-            rates[group] = y_pred[mask].mean()
-        
-        # Compute difference
-        values = list(rates.values())
-        diff = max(values) - min(values)
+        rates = confusion.by_group(confusion.selection_rate)
+        diff = float(demographic_parity_stat(confusion.matrix))
         
         # Bootstrap confidence interval
-        ci_lower, ci_upper = _bootstrap_metric_ci(
-            lambda: _compute_dp_diff(y_pred, sensitive_attr),
-            confidence_level
+        bootstrap, permutation = _engines(confidence_level, n_bootstrap, n_permutations, random_state)
+        ci_lower, ci_upper = bootstrap.confusion_ci(
+            demographic_parity_stat, None, y_pred, sensitive_attr
         )
         
         # Permutation test for p-value
-        p_value = _permutation_test_dp(y_pred, sensitive_attr, diff)
+        p_value = _permutation_p_value(lambda: permutation.confusion_test(
+            demographic_parity_stat, diff, None, y_pred, sensitive_attr
+        ))
         
         return MetricResult(
             metric_name="demographic_parity_difference",
@@ -97,7 +116,10 @@ def equalized_odds_diff(
     y_pred: np.ndarray,
     sensitive_attr: np.ndarray,
     confidence_level: float = 0.95,
-    threshold: float = 0.05
+    threshold: float = 0.05,
+    n_bootstrap: int = 1000,
+    n_permutations: int = 1000,
+    random_state: RandomState = None
 ) -> MetricResult:
     """
     Compute equalized odds difference (TPR and FPR differences).
@@ -108,45 +130,41 @@ def equalized_odds_diff(
         sensitive_attr: Array of group labels
         confidence_level: Confidence level for CI
         threshold: Fairness threshold
+        n_bootstrap: Number of bootstrap resamples for the CI
+        n_permutations: Maximum permutations for the p-value (stops early once decided)
+        random_state: Seed or numpy Generator for reproducible resampling
     
     Returns:
         MetricResult with TPR and FPR differences
     """
     try:
-        groups = np.unique(sensitive_attr)
-        if len(groups) < 2:
+        confusion = grouped_confusion_matrix(y_true, y_pred, sensitive_attr)
+        if len(confusion.groups) < 2:
             raise ValueError("Need at least 2 groups for fairness analysis")
         
         # Compute TPR and FPR by group
-        tpr_by_group = {}
-        fpr_by_group = {}
-        
-        for group in groups:
-            mask = (sensitive_attr == group)
-            if np.sum(mask) > 0:
-                tn, fp, fn, tp = confusion_matrix(y_true[mask], y_pred[mask], labels=[0, 1]).ravel()
-                
-                tpr_by_group[group] = tp / (tp + fn) if (tp + fn) > 0 else np.nan
-                fpr_by_group[group] = fp / (fp + tn) if (fp + tn) > 0 else np.nan
+        tpr = confusion.true_positive_rate
+        fpr = confusion.false_positive_rate
+        tpr_by_group = confusion.by_group(tpr)
+        fpr_by_group = confusion.by_group(fpr)
         
         # Compute differences
-        valid_tpr = [v for v in tpr_by_group.values() if not np.isnan(v)]
-        valid_fpr = [v for v in fpr_by_group.values() if not np.isnan(v)]
-        
-        tpr_diff = max(valid_tpr) - min(valid_tpr) if valid_tpr else 0
-        fpr_diff = max(valid_fpr) - min(valid_fpr) if valid_fpr else 0
+        tpr_diff = float(spread(tpr))
+        fpr_diff = float(spread(fpr))
         
         # Overall difference (max of TPR and FPR differences)
         overall_diff = max(tpr_diff, fpr_diff)
         
         # Bootstrap confidence interval
-        ci_lower, ci_upper = _bootstrap_metric_ci(
-            lambda: _compute_eo_diff(y_true, y_pred, sensitive_attr),
-            confidence_level
+        bootstrap, permutation = _engines(confidence_level, n_bootstrap, n_permutations, random_state)
+        ci_lower, ci_upper = bootstrap.confusion_ci(
+            equalized_odds_stat, y_true, y_pred, sensitive_attr
         )
         
         # Permutation test
-        p_value = _permutation_test_eo(y_true, y_pred, sensitive_attr, overall_diff)
+        p_value = _permutation_p_value(lambda: permutation.confusion_test(
+            equalized_odds_stat, overall_diff, y_true, y_pred, sensitive_attr
+        ))
         
         return MetricResult(
             metric_name="equalized_odds_difference",
@@ -174,37 +192,35 @@ def equal_opportunity_diff(
     y_pred: np.ndarray,
     sensitive_attr: np.ndarray,
     confidence_level: float = 0.95,
-    threshold: float = 0.05
+    threshold: float = 0.05,
+    n_bootstrap: int = 1000,
+    n_permutations: int = 1000,
+    random_state: RandomState = None
 ) -> MetricResult:
     """
     Compute equal opportunity difference (TPR difference only).
     """
     try:
-        groups = np.unique(sensitive_attr)
-        if len(groups) < 2:
+        confusion = grouped_confusion_matrix(y_true, y_pred, sensitive_attr)
+        if len(confusion.groups) < 2:
             raise ValueError("Need at least 2 groups for fairness analysis")
         
         # Compute TPR by group
-        tpr_by_group = {}
-        
-        for group in groups:
-            mask = (sensitive_attr == group)
-            if np.sum(mask) > 0:
-                tn, fp, fn, tp = confusion_matrix(y_true[mask], y_pred[mask], labels=[0, 1]).ravel()
-                tpr_by_group[group] = tp / (tp + fn) if (tp + fn) > 0 else np.nan
+        tpr_by_group = confusion.by_group(confusion.true_positive_rate)
         
         # Compute TPR difference
-        valid_tpr = [v for v in tpr_by_group.values() if not np.isnan(v)]
-        tpr_diff = max(valid_tpr) - min(valid_tpr) if valid_tpr else 0
+        tpr_diff = float(equal_opportunity_stat(confusion.matrix))
         
         # Bootstrap confidence interval
-        ci_lower, ci_upper = _bootstrap_metric_ci(
-            lambda: _compute_eopp_diff(y_true, y_pred, sensitive_attr),
-            confidence_level
+        bootstrap, permutation = _engines(confidence_level, n_bootstrap, n_permutations, random_state)
+        ci_lower, ci_upper = bootstrap.confusion_ci(
+            equal_opportunity_stat, y_true, y_pred, sensitive_attr
         )
         
         # Permutation test
-        p_value = _permutation_test_eopp(y_true, y_pred, sensitive_attr, tpr_diff)
+        p_value = _permutation_p_value(lambda: permutation.confusion_test(
+            equal_opportunity_stat, tpr_diff, y_true, y_pred, sensitive_attr
+        ))
         
         return MetricResult(
             metric_name="equal_opportunity_difference",
@@ -228,12 +244,18 @@ def statistical_parity_diff(
     y_pred: np.ndarray,
     sensitive_attr: np.ndarray,
     confidence_level: float = 0.95,
-    threshold: float = 0.05
+    threshold: float = 0.05,
+    n_bootstrap: int = 1000,
+    n_permutations: int = 1000,
+    random_state: RandomState = None
 ) -> MetricResult:
     """
     Compute statistical parity difference (same as demographic parity).
     """
-    return demographic_parity_diff(y_pred, sensitive_attr, confidence_level, threshold)
+    return demographic_parity_diff(
+        y_pred, sensitive_attr, confidence_level, threshold,
+        n_bootstrap, n_permutations, random_state
+    )
 
 def calibration_by_group(
     y_true: np.ndarray,
@@ -241,51 +263,54 @@ def calibration_by_group(
     sensitive_attr: np.ndarray,
     n_bins: int = 10,
     confidence_level: float = 0.95,
-    threshold: float = 0.05
+    threshold: float = 0.05,
+    n_bootstrap: int = 1000,
+    n_permutations: int = 1000,
+    random_state: RandomState = None
 ) -> MetricResult:
     """
     Analyze calibration by group to detect calibration bias.
     """
     try:
-        groups = np.unique(sensitive_attr)
+        codes, groups = factorize_groups(sensitive_attr)
         if len(groups) < 2:
             raise ValueError("Need at least 2 groups for calibration analysis")
         
-        calibration_errors = {}
-        
-        for group in groups:
-            mask = (sensitive_attr == group)
-            if np.sum(mask) > n_bins:
-                group_true = y_true[mask]
-                group_proba = y_pred_proba[mask]
-                
-                # Compute calibration error
-                error = _compute_calibration_error(group_true, group_proba, n_bins)
-                calibration_errors[group] = error
+        # Per-group calibration error from one pass of (group, bin) sums;
+        # groups with n_bins rows or fewer are left out
+        errors = calibration_errors(
+            *calibration_sums(codes, len(groups), y_true, y_pred_proba, n_bins),
+            n_bins
+        )
+        calibration_errors_by_group = {
+            group: error
+            for group, error in zip(groups.tolist(), errors.tolist())
+            if not np.isnan(error)
+        }
         
         # Compute max calibration difference
-        if calibration_errors:
-            max_error = max(calibration_errors.values())
-            min_error = min(calibration_errors.values())
-            calibration_diff = max_error - min_error
-        else:
-            calibration_diff = 0
+        calibration_diff = float(spread(errors))
         
         # Bootstrap confidence interval
-        ci_lower, ci_upper = _bootstrap_metric_ci(
-            lambda: _compute_calibration_diff(y_true, y_pred_proba, sensitive_attr, n_bins),
-            confidence_level
+        bootstrap, permutation = _engines(confidence_level, n_bootstrap, n_permutations, random_state)
+        ci_lower, ci_upper = bootstrap.calibration_ci(
+            y_true, y_pred_proba, sensitive_attr, n_bins
         )
         
+        # Permutation test
+        p_value = _permutation_p_value(lambda: permutation.calibration_test(
+            calibration_diff, y_true, y_pred_proba, sensitive_attr, n_bins
+        ))
+        
         return MetricResult(
             metric_name="calibration_by_group",
             value=calibration_diff,
             confidence_interval=(ci_lower, ci_upper),
-            p_value=0.0,  # No p-value for calibration
+            p_value=p_value,
             is_fair=calibration_diff <= threshold,
             threshold=threshold,
             details={
-                "calibration_errors": calibration_errors,
+                "calibration_errors": calibration_errors_by_group,
                 "interpretation": f"Max calibration difference: {calibration_diff:.3f}",
                 "recommendation": "Consider calibration post-processing" if calibration_diff > threshold else "Calibration is fair across groups"
             }
@@ -295,17 +320,40 @@ def calibration_by_group(
         logger.error(f"Error computing calibration by group: {e}")
         raise
 
+# Confusion-tensor statistics behind the metrics that intersectional analysis
+# can evaluate with a single grouped aggregation
+_CONFUSION_STATISTICS = {
+    demographic_parity_diff: ("demographic_parity_difference", demographic_parity_stat),
+    statistical_parity_diff: ("demographic_parity_difference", demographic_parity_stat),
+    equalized_odds_diff: ("equalized_odds_difference", equalized_odds_stat),
+    equal_opportunity_diff: ("equal_opportunity_difference", equal_opportunity_stat),
+}
+
 def intersectional_fairness(
     y_true: np.ndarray,
     y_pred: np.ndarray,
     sensitive_attributes: Dict[str, np.ndarray],
     metric_func=demographic_parity_diff,
     confidence_level: float = 0.95,
-    threshold: float = 0.05
+    threshold: float = 0.05,
+    min_support: int = 50,
+    n_bootstrap: int = 1000,
+    n_permutations: int = 1000,
+    random_state: RandomState = None,
+    y_prob: Optional[np.ndarray] = None
 ) -> Dict[str, MetricResult]:
     """
     Analyze fairness across intersectional groups.
     
+    Rows are encoded by their attribute combination once, so only combinations
+    that actually occur are visited. Each cell is compared against the rest of
+    the population (one-vs-rest) on the chosen metric.
+    
+    Other metrics (e.g. calibration_by_group) are called once per cell with
+    cell-vs-rest membership as ``sensitive_attr`` and the remaining arguments
+    by keyword: ``y_true``, ``y_pred``, ``y_pred_proba`` (from ``y_prob``)
+    and the options below, as far as the metric accepts them.
+    
     Args:
         y_true: True labels
         y_pred: Predicted labels
@@ -313,43 +361,99 @@ def intersectional_fairness(
         metric_func: Fairness metric function to use
         confidence_level: Confidence level
         threshold: Fairness threshold
+        min_support: Cells with fewer rows are pruned from the report
+        n_bootstrap: Number of bootstrap resamples for the CIs
+        n_permutations: Maximum permutations per cell p-value
+        random_state: Seed or numpy Generator for reproducible resampling
+        y_prob: Predicted probabilities, for metrics taking ``y_pred_proba``
     
     Returns:
         Dict of MetricResult for each intersectional group
+    
+    Raises:
+        ValueError: If metric_func needs an argument that cannot be supplied
     """
     try:
         if len(sensitive_attributes) < 2:
             raise ValueError("Need at least 2 sensitive attributes for intersectional analysis")
         
-        results = {}
-        
-        # Generate all intersectional combinations
-        from itertools import product
         attr_names = list(sensitive_attributes.keys())
-        attr_values = [np.unique(sensitive_attributes[attr]) for attr in attr_names]
-        
-        for combination in product(*attr_values):
-            group_name = "_".join([f"{attr}={val}" for attr, val in zip(attr_names, combination)])
-            
-            # Create mask for this intersectional group
-            mask = np.ones(len(y_true), dtype=bool)
-            for attr, val in zip(attr_names, combination):
-                mask &= (sensitive_attributes[attr] == val)
-            
-            # Only analyze if sufficient samples
-            if np.sum(mask) > 50:  # Minimum sample size
-                group_true = y_true[mask]
-                group_pred = y_pred[mask]
-                
-                # Create a dummy sensitive attribute (all same group)
-                dummy_attr = np.zeros(len(group_true), dtype=int)
-                
-                # Compute fairness metric for this group
-                try:
-                    result = metric_func(group_pred, dummy_attr, confidence_level, threshold)
-                    results[group_name] = result
-                except Exception as e:
-                    logger.warning(f"Could not compute metric for {group_name}: {e}")
+        cell_codes, combinations = factorize_combinations(
+            [sensitive_attributes[attr] for attr in attr_names]
+        )
+        group_names = [
+            "_".join([f"{attr}={val}" for attr, val in zip(attr_names, combination)])
+            for combination in combinations
+        ]
+        
+        if metric_func not in _CONFUSION_STATISTICS:
+            arguments = _membership_arguments(metric_func, {
+                "y_true": y_true,
+                "y_pred": y_pred,
+                "y_pred_proba": y_prob,
+                "confidence_level": confidence_level,
+                "threshold": threshold,
+                "n_bootstrap": n_bootstrap,
+                "n_permutations": n_permutations,
+                "random_state": resolve_rng(random_state),
+            })
+            return _intersectional_by_membership(
+                cell_codes, group_names, metric_func, arguments, min_support
+            )
+        
+        metric_name, statistic = _CONFUSION_STATISTICS[metric_func]
+        label_free = statistic is demographic_parity_stat
+        labels = None if label_free else y_true
+        
+        # One grouped aggregation over the observed cells
+        n_cells = len(combinations)
+        confusion = confusion_tensor(cell_codes, n_cells, labels, y_pred)
+        support = confusion.sum(axis=(1, 2))
+        kept = np.flatnonzero(support >= min_support)
+        if len(kept) == 0:
+            return {}
+        
+        # Pruned cells are pooled into one trailing cell: they still count
+        # toward "the rest" but are never resampled or tested on their own
+        pruned = np.ones(n_cells, dtype=bool)
+        pruned[kept] = False
+        reduced = np.concatenate([confusion[kept], confusion[pruned].sum(axis=0, keepdims=True)])
+        n_kept = len(kept)
+        
+        def cell_statistic(tensor: np.ndarray) -> np.ndarray:
+            return statistic(one_vs_rest(tensor))[..., :n_kept]
+        
+        values = cell_statistic(reduced)
+        
+        # Bootstrap CIs and permutation p-values for every cell at once
+        bootstrap, permutation = _engines(confidence_level, n_bootstrap, n_permutations, random_state)
+        intervals = bootstrap.intervals(bootstrap.confusion_statistics(cell_statistic, reduced))
+        p_values = permutation.run_many(
+            lambda size: cell_statistic(permutation.permuted_subgroup_confusion(reduced, size)),
+            values
+        )
+        
+        selection = selection_rates(reduced)
+        results = {}
+        for position, index in enumerate(kept.tolist()):
+            value = float(values[position])
+            ci_lower, ci_upper = intervals[position].tolist()
+            p_value = float(p_values[position])
+            results[group_names[index]] = MetricResult(
+                metric_name=f"intersectional_{metric_name}",
+                value=value,
+                confidence_interval=(ci_lower, ci_upper),
+                p_value=p_value,
+                is_fair=value <= threshold,
+                threshold=threshold,
+                details={
+                    "attributes": dict(zip(attr_names, combinations[index])),
+                    "support": int(support[index]),
+                    "selection_rate": float(selection[position]),
+                    "interpretation": f"Difference from the rest of the population: {value:.3f}",
+                    "recommendation": "Investigate this intersectional group" if value > threshold else "No significant bias detected"
+                }
+            )
         
         return results
         
@@ -357,145 +461,76 @@ def intersectional_fairness(
         logger.error(f"Error computing intersectional fairness: {e}")
         raise
 
-# Helper functions
-
-def _compute_dp_diff(y_pred: np.ndarray, sensitive_attr: np.ndarray) -> float:
-    """Helper function for demographic parity difference"""
-    groups = np.unique(sensitive_attr)
-    rates = {g: y_pred[sensitive_attr == g].mean() for g in groups}
-    values = list(rates.values())
-    return max(values) - min(values)
-
-def _compute_eo_diff(y_true: np.ndarray, y_pred: np.ndarray, sensitive_attr: np.ndarray) -> float:
-    """Helper function for equalized odds difference"""
-    groups = np.unique(sensitive_attr)
-    tpr_diffs = []
-    fpr_diffs = []
-    
-    for group in groups:
-        mask = (sensitive_attr == group)
-        if np.sum(mask) > 0:
-            tn, fp, fn, tp = confusion_matrix(y_true[mask], y_pred[mask], labels=[0, 1]).ravel()
-            tpr = tp / (tp + fn) if (tp + fn) > 0 else np.nan
-            fpr = fp / (fp + tn) if (fp + tn) > 0 else np.nan
-            tpr_diffs.append(tpr)
-            fpr_diffs.append(fpr)
-    
-    valid_tpr = [v for v in tpr_diffs if not np.isnan(v)]
-    valid_fpr = [v for v in fpr_diffs if not np.isnan(v)]
-    
-    tpr_diff = max(valid_tpr) - min(valid_tpr) if valid_tpr else 0
-    fpr_diff = max(valid_fpr) - min(valid_fpr) if valid_fpr else 0
-    
-    return max(tpr_diff, fpr_diff)
-
-def _compute_eopp_diff(y_true: np.ndarray, y_pred: np.ndarray, sensitive_attr: np.ndarray) -> float:
-    """Helper function for equal opportunity difference"""
-    groups = np.unique(sensitive_attr)
-    tpr_by_group = {}
-    
-    for group in groups:
-        mask = (sensitive_attr == group)
-        if np.sum(mask) > 0:
-            tn, fp, fn, tp = confusion_matrix(y_true[mask], y_pred[mask], labels=[0, 1]).ravel()
-            tpr_by_group[group] = tp / (tp + fn) if (tp + fn) > 0 else np.nan
-    
-    valid_tpr = [v for v in tpr_by_group.values() if not np.isnan(v)]
-    return max(valid_tpr) - min(valid_tpr) if valid_tpr else 0
-
-def _compute_calibration_diff(y_true: np.ndarray, y_pred_proba: np.ndarray, sensitive_attr: np.ndarray, n_bins: int) -> float:
-    """Helper function for calibration difference"""
-    groups = np.unique(sensitive_attr)
-    errors = []
-    
-    for group in groups:
-        mask = (sensitive_attr == group)
-        if np.sum(mask) > n_bins:
-            group_true = y_true[mask]
-            group_proba = y_pred_proba[mask]
-            error = _compute_calibration_error(group_true, group_proba, n_bins)
-            errors.append(error)
-    
-    return max(errors) - min(errors) if errors else 0
-
-def _compute_calibration_error(y_true: np.ndarray, y_pred_proba: np.ndarray, n_bins: int) -> float:
-    """Compute calibration error using binning"""
+def _membership_arguments(
+    metric_func: Callable[..., MetricResult],
+    available: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Keyword arguments for calling metric_func with cell-vs-rest membership
+    as ``sensitive_attr``: the available values it accepts. Raises
+    ValueError if it needs anything else.
+    """
+    name = getattr(metric_func, "__name__", repr(metric_func))
     try:
-        # Create bins
-        bin_edges = np.linspace(0, 1, n_bins + 1)
-        bin_indices = np.digitize(y_pred_proba, bin_edges) - 1
-        
-        # Compute calibration error
-        errors = []
-        for i in range(n_bins):
-            mask = (bin_indices == i)
-            if np.sum(mask) > 0:
-                predicted_rate = y_pred_proba[mask].mean()
-                actual_rate = y_true[mask].mean()
-                errors.append(abs(predicted_rate - actual_rate))
-        
-        return np.mean(errors) if errors else 0
-    except:
-        return 0
+        parameters = inspect.signature(metric_func).parameters
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Unsupported metric_func {name}: cannot inspect its signature") from e
+    if "sensitive_attr" not in parameters:
+        raise ValueError(f"Unsupported metric_func {name}: it must take a sensitive_attr argument")
+    
+    arguments = {}
+    for parameter in parameters.values():
+        if parameter.name == "sensitive_attr" or parameter.kind in (
+            inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD
+        ):
+            continue
+        value = available.get(parameter.name)
+        if value is not None and parameter.kind is not inspect.Parameter.POSITIONAL_ONLY:
+            arguments[parameter.name] = value
+        elif parameter.default is inspect.Parameter.empty:
+            raise ValueError(
+                f"Unsupported metric_func {name}: cannot supply its '{parameter.name}' argument"
+                + (" (pass y_prob)" if parameter.name == "y_pred_proba" else "")
+            )
+    return arguments
 
-def _bootstrap_metric_ci(metric_func, confidence_level: float = 0.95, n_bootstrap: int = 1000) -> Tuple[float, float]:
-    """Compute bootstrap confidence interval"""
-    try:
-        bootstrap_samples = []
-        for _ in range(n_bootstrap):
-            sample = metric_func()
-            bootstrap_samples.append(sample)
-        
-        alpha = 1 - confidence_level
-        lower_percentile = (alpha / 2) * 100
-        upper_percentile = (1 - alpha / 2) * 100
-        
-        return np.percentile(bootstrap_samples, [lower_percentile, upper_percentile])
-    except Exception as e:
-        logger.error(f"Error computing bootstrap CI: {e}")
-        return (0, 0)
+def _intersectional_by_membership(
+    cell_codes: np.ndarray,
+    group_names: List[str],
+    metric_func: Callable[..., MetricResult],
+    arguments: Dict[str, Any],
+    min_support: int
+) -> Dict[str, MetricResult]:
+    """Fallback for other metrics: call metric_func on cell-vs-rest membership"""
+    results = {}
+    support = np.bincount(cell_codes, minlength=len(group_names))
+    for index in np.flatnonzero(support >= min_support).tolist():
+        membership = (cell_codes == index).astype(int)
+        try:
+            results[group_names[index]] = metric_func(sensitive_attr=membership, **arguments)
+        except Exception as e:
+            logger.warning(f"Could not compute metric for {group_names[index]}: {e}")
+    return results
 
-def _permutation_test_dp(y_pred: np.ndarray, sensitive_attr: np.ndarray, observed_diff: float, n_permutations: int = 1000) -> float:
-    """Permutation test for demographic parity"""
-    try:
-        perm_diffs = []
-        for _ in range(n_permutations):
-            perm_attr = np.random.permutation(sensitive_attr)
-            perm_diff = _compute_dp_diff(y_pred, perm_attr)
-            perm_diffs.append(perm_diff)
-        
-        p_value = np.mean(np.array(perm_diffs) >= observed_diff)
-        return p_value
-    except Exception as e:
-        logger.error(f"Error in permutation test: {e}")
-        return 1.0
+# Helper functions
 
-def _permutation_test_eo(y_true: np.ndarray, y_pred: np.ndarray, sensitive_attr: np.ndarray, observed_diff: float, n_permutations: int = 1000) -> float:
-    """Permutation test for equalized odds"""
-    try:
-        perm_diffs = []
-        for _ in range(n_permutations):
-            perm_attr = np.random.permutation(sensitive_attr)
-            perm_diff = _compute_eo_diff(y_true, y_pred, perm_attr)
-            perm_diffs.append(perm_diff)
-        
-        p_value = np.mean(np.array(perm_diffs) >= observed_diff)
-        return p_value
-    except Exception as e:
-        logger.error(f"Error in permutation test: {e}")
-        return 1.0
+def _engines(
+    confidence_level: float,
+    n_bootstrap: int,
+    n_permutations: int,
+    random_state: RandomState
+) -> Tuple[BootstrapEngine, PermutationEngine]:
+    """Bootstrap and permutation engines drawing from one shared Generator"""
+    rng = resolve_rng(random_state)
+    return (
+        BootstrapEngine(n_bootstrap, confidence_level, rng),
+        PermutationEngine(n_permutations, alpha=1 - confidence_level, random_state=rng)
+    )
 
-def _permutation_test_eopp(y_true: np.ndarray, y_pred: np.ndarray, sensitive_attr: np.ndarray, observed_diff: float, n_permutations: int = 1000) -> float:
-    """Permutation test for equal opportunity"""
+def _permutation_p_value(run_test: Callable[[], PermutationResult]) -> float:
+    """Run a permutation test, falling back to p=1.0 on failure"""
     try:
-        perm_diffs = []
-        for _ in range(n_permutations):
-            perm_attr = np.random.permutation(sensitive_attr)
-            perm_diff = _compute_eopp_diff(y_true, y_pred, perm_attr)
-            perm_diffs.append(perm_diff)
-        
-        p_value = np.mean(np.array(perm_diffs) >= observed_diff)
-        return p_value
+        return run_test().p_value
     except Exception as e:
         logger.error(f"Error in permutation test: {e}")
         return 1.0
@@ -6,12 +6,13 @@ Continuously monitors model performance and fairness metrics in production.
 import asyncio
 import json
 import time
+from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
-from collections import defaultdict, deque
+from collections import defaultdict
 import numpy as np
 from threading import Lock
 
@@ -45,80 +46,366 @@ class Alert:
     model_id: str
     details: Dict[str, Any]
 
+class ChangeDetector(ABC):
+    """
+    Sequential change detector fed one value at a time.
+
+    ``update`` returns alert details when a change is signalled (and resets its
+    own state), otherwise None. Each monitored metric gets its own instance.
+    """
+    
+    alert_type = "change_detected"
+    
+    @abstractmethod
+    def update(self, value: float, baseline_mean: float) -> Optional[Dict[str, Any]]:
+        """Feed one value; alert details if a change is signalled, else None"""
+    
+    def reset(self) -> None:
+        pass
+
+class EWMAChangeDetector(ChangeDetector):
+    """Exponentially weighted moving average compared against the baseline mean"""
+    
+    alert_type = "ewma_drift"
+    
+    def __init__(self, alpha: float = 0.1, threshold: float = 0.05):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.ewma: Optional[float] = None
+    
+    def update(self, value: float, baseline_mean: float) -> Optional[Dict[str, Any]]:
+        if self.ewma is None:
+            self.ewma = baseline_mean
+        self.ewma = self.alpha * value + (1 - self.alpha) * self.ewma
+        deviation = self.ewma - baseline_mean
+        if abs(deviation) > self.threshold:
+            details = {"ewma": self.ewma, "deviation": deviation}
+            self.reset()
+            return details
+        return None
+    
+    def reset(self) -> None:
+        self.ewma = None
+
+class CUSUMChangeDetector(ChangeDetector):
+    """Two-sided tabular CUSUM around the baseline mean"""
+    
+    alert_type = "cusum_drift"
+    
+    def __init__(self, k: float = 0.01, h: float = 0.1):
+        self.k = k  # Allowed slack per sample
+        self.h = h  # Decision threshold
+        self.upper = 0.0
+        self.lower = 0.0
+    
+    def update(self, value: float, baseline_mean: float) -> Optional[Dict[str, Any]]:
+        self.upper = max(0.0, self.upper + value - baseline_mean - self.k)
+        self.lower = max(0.0, self.lower + baseline_mean - value - self.k)
+        if self.upper > self.h or self.lower > self.h:
+            details = {
+                "direction": "increase" if self.upper > self.h else "decrease",
+                "cusum_upper": self.upper,
+                "cusum_lower": self.lower
+            }
+            self.reset()
+            return details
+        return None
+    
+    def reset(self) -> None:
+        self.upper = 0.0
+        self.lower = 0.0
+
+class PageHinkleyChangeDetector(ChangeDetector):
+    """Two-sided Page-Hinkley test on deviations from the running mean"""
+    
+    alert_type = "page_hinkley_drift"
+    
+    def __init__(self, delta: float = 0.005, threshold: float = 0.1):
+        self.delta = delta
+        self.threshold = threshold
+        self.reset()
+    
+    def update(self, value: float, baseline_mean: float) -> Optional[Dict[str, Any]]:
+        self.count += 1
+        self.mean += (value - self.mean) / self.count
+        self.cumulative_up += value - self.mean - self.delta
+        self.cumulative_down += value - self.mean + self.delta
+        self.min_up = min(self.min_up, self.cumulative_up)
+        self.max_down = max(self.max_down, self.cumulative_down)
+        
+        up = self.cumulative_up - self.min_up
+        down = self.max_down - self.cumulative_down
+        if up > self.threshold or down > self.threshold:
+            details = {
+                "direction": "increase" if up > self.threshold else "decrease",
+                "statistic": max(up, down),
+                "running_mean": self.mean
+            }
+            self.reset()
+            return details
+        return None
+    
+    def reset(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.cumulative_up = 0.0
+        self.cumulative_down = 0.0
+        self.min_up = 0.0
+        self.max_down = 0.0
+
+class MetricWindow:
+    """
+    Rolling statistics for one metric, updated in O(1) per sample.
+    
+    Keeps a ring buffer of the last ``window_size`` values with running sums,
+    a running sum over the last ``recent_size`` values and prefix sums of the
+    first ``baseline_size`` values ever seen (the frozen baseline).
+    """
+    
+    def __init__(
+        self,
+        window_size: int,
+        baseline_size: int = 20,
+        recent_size: int = 10,
+        change_detectors: Optional[List[ChangeDetector]] = None
+    ):
+        self.lock = Lock()
+        self.values = np.zeros(window_size)
+        self.head = 0
+        self.count = 0
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.recent = np.zeros(recent_size)
+        self.recent_head = 0
+        self.recent_count = 0
+        self.recent_sum = 0.0
+        self.baseline_size = baseline_size
+        self.baseline_prefix = [0.0]
+        self.total_seen = 0
+        self.latest: Optional[MonitoringMetric] = None
+        self.change_detectors = change_detectors or []
+    
+    def push(self, value: float) -> None:
+        window_size = len(self.values)
+        if self.count == window_size:
+            evicted = self.values[self.head]
+            self.sum -= evicted
+            self.sum_sq -= evicted * evicted
+        else:
+            self.count += 1
+        self.values[self.head] = value
+        self.head = (self.head + 1) % window_size
+        self.sum += value
+        self.sum_sq += value * value
+        
+        if self.recent_count == len(self.recent):
+            self.recent_sum -= self.recent[self.recent_head]
+        else:
+            self.recent_count += 1
+        self.recent[self.recent_head] = value
+        self.recent_head = (self.recent_head + 1) % len(self.recent)
+        self.recent_sum += value
+        
+        if len(self.baseline_prefix) <= self.baseline_size:
+            self.baseline_prefix.append(self.baseline_prefix[-1] + value)
+        
+        self.total_seen += 1
+        if self.total_seen % window_size == 0:
+            # Re-sync running sums to bound floating point error
+            window = self.window_values()
+            self.sum = float(window.sum())
+            self.sum_sq = float(np.dot(window, window))
+            self.recent_sum = float(self.recent[:self.recent_count].sum())
+    
+    @property
+    def baseline_count(self) -> int:
+        """Baseline covers the first 20% of samples seen, capped at baseline_size"""
+        return min(self.baseline_size, self.total_seen // 5)
+    
+    @property
+    def baseline_frozen(self) -> bool:
+        return self.baseline_count == self.baseline_size
+    
+    @property
+    def baseline_mean(self) -> float:
+        count = self.baseline_count
+        return self.baseline_prefix[count] / count if count else 0.0
+    
+    @property
+    def recent_mean(self) -> float:
+        return self.recent_sum / self.recent_count if self.recent_count else 0.0
+    
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+    
+    @property
+    def std(self) -> float:
+        if not self.count:
+            return 0.0
+        return float(np.sqrt(max(0.0, self.sum_sq / self.count - self.mean ** 2)))
+    
+    def window_values(self) -> np.ndarray:
+        """Window contents in arrival order"""
+        if self.count < len(self.values):
+            return self.values[:self.count]
+        return np.roll(self.values, -self.head)
+    
+    def reset_baseline(self) -> None:
+        """Re-freeze the baseline from the next samples"""
+        self.baseline_prefix = [0.0]
+        self.total_seen = 0
+        for detector in self.change_detectors:
+            detector.reset()
+
 class FairnessMonitor:
-    """Real-time fairness monitoring system"""
+    """
+    Real-time fairness monitoring system
+    
+    Every metric name gets its own ``MetricWindow`` and lock, so ingest is
+    O(1) per sample and different metrics never contend. Drift compares the
+    mean of the last ``recent_size`` samples with a frozen baseline made of
+    the first samples seen; optional ``change_detectors`` (factories such as
+    ``CUSUMChangeDetector``) run on every sample once the baseline is frozen.
+    """
     
-    def __init__(self, window_size: int = 1000, alert_threshold: float = 0.05):
+    def __init__(
+        self,
+        window_size: int = 1000,
+        alert_threshold: float = 0.05,
+        baseline_size: int = 20,
+        recent_size: int = 10,
+        min_samples: int = 10,
+        change_detectors: Optional[List[Callable[[], ChangeDetector]]] = None
+    ):
         self.window_size = window_size
         self.alert_threshold = alert_threshold
-        self.metrics_buffer = defaultdict(lambda: deque(maxlen=window_size))
+        self.baseline_size = baseline_size
+        self.recent_size = recent_size
+        self.min_samples = min_samples
+        self.change_detectors = change_detectors or []
+        self.metrics_buffer: Dict[str, MetricWindow] = {}
         self.alerts = []
         self.alert_callbacks = []
-        self.lock = Lock()
+        self.lock = Lock()  # Guards window creation only
+        self.alerts_lock = Lock()
         
         # Initialize monitoring for different metric types
         self.fairness_metrics = {}
         self.bias_metrics = {}
         self.performance_metrics = {}
     
+    def _window(self, metric_name: str) -> MetricWindow:
+        window = self.metrics_buffer.get(metric_name)
+        if window is None:
+            with self.lock:
+                window = self.metrics_buffer.get(metric_name)
+                if window is None:
+                    window = MetricWindow(
+                        self.window_size,
+                        self.baseline_size,
+                        self.recent_size,
+                        [factory() for factory in self.change_detectors]
+                    )
+                    self.metrics_buffer[metric_name] = window
+        return window
+    
+    def _record_latest(self, metric: MonitoringMetric) -> None:
+        name = metric.metric_name.lower()
+        if "fairness" in name:
+            self.fairness_metrics[metric.metric_name] = metric
+        elif "bias" in name:
+            self.bias_metrics[metric.metric_name] = metric
+        else:
+            self.performance_metrics[metric.metric_name] = metric
+    
     def add_metric(self, metric: MonitoringMetric) -> None:
         """Add a new metric to the monitoring system"""
+        self.add_metrics([metric])
+    
+    def add_metrics(self, metrics: List[MonitoringMetric]) -> None:
+        """
+        Add a batch of metrics
+        
+        Samples are grouped by metric name and each window is locked once per
+        batch. Change detectors see every sample; the threshold drift check
+        runs once per metric at the end of the batch.
+        """
         try:
-            with self.lock:
-                # Add to appropriate buffer
-                if "fairness" in metric.metric_name.lower():
-                    self.fairness_metrics[metric.metric_name] = metric
-                    self.metrics_buffer[metric.metric_name].append(metric)
-                elif "bias" in metric.metric_name.lower():
-                    self.bias_metrics[metric.metric_name] = metric
-                    self.metrics_buffer[metric.metric_name].append(metric)
-                else:
-                    self.performance_metrics[metric.metric_name] = metric
-                    self.metrics_buffer[metric.metric_name].append(metric)
-                
-                # Check for drift
-                self._check_drift(metric)
+            by_name: Dict[str, List[MonitoringMetric]] = defaultdict(list)
+            for metric in metrics:
+                by_name[metric.metric_name].append(metric)
+            
+            pending_alerts = []
+            for metric_name, batch in by_name.items():
+                window = self._window(metric_name)
+                with window.lock:
+                    for metric in batch:
+                        window.push(float(metric.value))
+                        if window.baseline_frozen:
+                            for detector in window.change_detectors:
+                                details = detector.update(float(metric.value), window.baseline_mean)
+                                if details is not None:
+                                    pending_alerts.append((detector.alert_type, metric, details))
+                    window.latest = batch[-1]
+                    drift = self._check_drift(window, batch[-1])
+                    if drift is not None:
+                        pending_alerts.append(("fairness_drift", batch[-1], drift))
+                self._record_latest(batch[-1])
+            
+            # Alerts and callbacks run outside the per-metric locks
+            for alert_type, metric, details in pending_alerts:
+                self._raise_alert(alert_type, metric, details)
                 
         except Exception as e:
             logger.error(f"Error adding metric: {e}")
     
-    def _check_drift(self, metric: MonitoringMetric) -> None:
-        """Check for fairness drift in the metric"""
+    def reset_baseline(self, metric_name: str) -> None:
+        """Re-freeze a metric's baseline from its next samples (e.g. after a model update)"""
+        window = self._window(metric_name)
+        with window.lock:
+            window.reset_baseline()
+    
+    def _check_drift(self, window: MetricWindow, metric: MonitoringMetric) -> Optional[Dict[str, Any]]:
+        """Check for fairness drift in the metric; returns alert details if drifted"""
         try:
-            if len(self.metrics_buffer[metric.metric_name]) < 10:
-                return  # Need minimum data points
-            
-            # Calculate baseline (first 20% of data)
-            baseline_size = min(20, len(self.metrics_buffer[metric.metric_name]) // 5)
-            baseline_metrics = list(self.metrics_buffer[metric.metric_name])[:baseline_size]
-            baseline_mean = np.mean([m.value for m in baseline_metrics])
-            
-            # Calculate current window mean
-            current_metrics = list(self.metrics_buffer[metric.metric_name])[-10:]
-            current_mean = np.mean([m.value for m in current_metrics])
+            if window.total_seen < self.min_samples or window.baseline_count == 0:
+                return None  # Need minimum data points
             
-            # Calculate drift
+            baseline_mean = window.baseline_mean
+            current_mean = window.recent_mean
             drift = abs(current_mean - baseline_mean)
             
             if drift > self.alert_threshold:
-                self._create_alert(
-                    alert_type="fairness_drift",
-                    level=AlertLevel.WARNING,
-                    message=f"Fairness drift detected in {metric.metric_name}",
-                    metric_name=metric.metric_name,
-                    current_value=current_mean,
-                    threshold=self.alert_threshold,
-                    model_id=metric.metadata.get("model_id", "unknown"),
-                    details={
-                        "baseline_mean": baseline_mean,
-                        "current_mean": current_mean,
-                        "drift": drift,
-                        "baseline_size": baseline_size
-                    }
-                )
+                return {
+                    "baseline_mean": baseline_mean,
+                    "current_mean": current_mean,
+                    "drift": drift,
+                    "baseline_size": window.baseline_count
+                }
+            return None
                 
         except Exception as e:
             logger.error(f"Error checking drift: {e}")
+            return None
+    
+    def _raise_alert(self, alert_type: str, metric: MonitoringMetric, details: Dict[str, Any]) -> None:
+        if alert_type == "fairness_drift":
+            message = f"Fairness drift detected in {metric.metric_name}"
+            current_value = details["current_mean"]
+        else:
+            message = f"Change detected in {metric.metric_name} ({alert_type})"
+            current_value = float(metric.value)
+        self._create_alert(
+            alert_type=alert_type,
+            level=AlertLevel.WARNING,
+            message=message,
+            metric_name=metric.metric_name,
+            current_value=current_value,
+            threshold=self.alert_threshold,
+            model_id=metric.metadata.get("model_id", "unknown"),
+            details=details
+        )
     
     def _create_alert(self, alert_type: str, level: AlertLevel, message: str, 
                      metric_name: str, current_value: float, threshold: float,
@@ -138,7 +425,8 @@ class FairnessMonitor:
                 details=details
             )
             
-            self.alerts.append(alert)
+            with self.alerts_lock:
+                self.alerts.append(alert)
             
             # Trigger alert callbacks
             for callback in self.alert_callbacks:
@@ -159,36 +447,36 @@ class FairnessMonitor:
     def get_metrics_summary(self, metric_name: Optional[str] = None) -> Dict[str, Any]:
         """Get summary of monitored metrics"""
         try:
-            with self.lock:
-                if metric_name:
-                    metrics = list(self.metrics_buffer[metric_name])
-                    if not metrics:
-                        return {"error": f"No metrics found for {metric_name}"}
-                    
-                    values = [m.value for m in metrics]
+            if metric_name:
+                window = self.metrics_buffer.get(metric_name)
+                if window is None or not window.count:
+                    return {"error": f"No metrics found for {metric_name}"}
+                
+                with window.lock:
+                    values = window.window_values()
                     return {
                         "metric_name": metric_name,
-                        "count": len(values),
-                        "mean": np.mean(values),
-                        "std": np.std(values),
-                        "min": np.min(values),
-                        "max": np.max(values),
-                        "latest_value": values[-1],
-                        "latest_timestamp": metrics[-1].timestamp.isoformat()
+                        "count": window.count,
+                        "mean": window.mean,
+                        "std": window.std,
+                        "min": float(values.min()),
+                        "max": float(values.max()),
+                        "latest_value": window.latest.value,
+                        "latest_timestamp": window.latest.timestamp.isoformat()
                     }
-                else:
-                    # Return summary for all metrics
-                    summary = {}
-                    for name, buffer in self.metrics_buffer.items():
-                        if buffer:
-                            values = [m.value for m in buffer]
+            else:
+                # Return summary for all metrics
+                summary = {}
+                for name, window in list(self.metrics_buffer.items()):
+                    with window.lock:
+                        if window.count:
                             summary[name] = {
-                                "count": len(values),
-                                "mean": np.mean(values),
-                                "std": np.std(values),
-                                "latest_value": values[-1]
+                                "count": window.count,
+                                "mean": window.mean,
+                                "std": window.std,
+                                "latest_value": window.latest.value
                             }
-                    return summary
+                return summary
                     
         except Exception as e:
             logger.error(f"Error getting metrics summary: {e}")
@@ -198,7 +486,8 @@ class FairnessMonitor:
         """Get recent alerts within specified hours"""
         try:
             cutoff_time = datetime.now() - timedelta(hours=hours)
-            recent_alerts = [alert for alert in self.alerts if alert.timestamp > cutoff_time]
+            with self.alerts_lock:
+                recent_alerts = [alert for alert in self.alerts if alert.timestamp > cutoff_time]
             return recent_alerts
         except Exception as e:
             logger.error(f"Error getting recent alerts: {e}")
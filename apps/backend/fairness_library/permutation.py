@@ -0,0 +1,340 @@
+"""
+Permutation Test Engine
+Blocked, vectorized permutation p-values with sequential early stopping.
+"""
+
+import time
+import numpy as np
+from typing import Any, Callable, Optional
+from dataclasses import dataclass
+import logging
+from scipy import stats
+
+from .bootstrap import DEFAULT_MAX_CHUNK_ELEMENTS, RandomState, resolve_rng
+from .kernels import (
+    calibration_cells,
+    calibration_spread,
+    confusion_tensor,
+    factorize_groups,
+)
+
+logger = logging.getLogger(__name__)
+
+# Relative tolerance when comparing permuted statistics with the observed one
+_TIE_TOLERANCE = 1e-12
+
+# numpy's hypergeometric sampler requires fewer than 1e9 items per pool
+_HYPERGEOMETRIC_LIMIT = 10**9
+
+
+@dataclass
+class PermutationResult:
+    """Outcome of a permutation test"""
+    p_value: float
+    n_permutations: int
+    n_exceedances: int
+    stopped_early: bool
+    stop_reason: str
+
+
+class PermutationEngine:
+    """
+    Permutation test over shuffled group labels.
+
+    Permutations are drawn a block at a time and the statistic is evaluated
+    for the whole block at once. For confusion-tensor statistics a permutation
+    of group labels only matters through the per-group cell counts, which are
+    drawn directly from their exact multivariate hypergeometric distribution,
+    so a block costs O(block * groups) regardless of the number of rows. Other
+    statistics permute the group codes and re-count them through the kernel.
+    Sampling stops as soon as the decision at ``alpha`` is settled:
+
+    - Besag–Clifford: after ``h`` permuted statistics reach the observed one,
+      the p-value is ``h / L`` and cannot plausibly fall below ``alpha``.
+    - Significance: once the Clopper–Pearson upper bound on p (at confidence
+      ``1 - stop_confidence``) is below ``alpha``, more draws cannot change
+      the decision.
+
+    ``n_permutations`` and the optional ``time_budget`` (seconds) cap the work
+    done per call.
+    """
+
+    def __init__(
+        self,
+        n_permutations: int = 1000,
+        alpha: float = 0.05,
+        h: int = 10,
+        block_size: int = 100,
+        early_stopping: bool = True,
+        stop_confidence: float = 0.001,
+        time_budget: Optional[float] = None,
+        random_state: RandomState = None,
+        max_chunk_elements: int = DEFAULT_MAX_CHUNK_ELEMENTS
+    ):
+        if n_permutations < 1:
+            raise ValueError("n_permutations must be positive")
+
+        self.n_permutations = n_permutations
+        self.alpha = alpha
+        self.h = max(1, h)
+        self.block_size = max(1, block_size)
+        self.early_stopping = early_stopping
+        self.stop_confidence = stop_confidence
+        self.time_budget = time_budget
+        self.rng = resolve_rng(random_state)
+        self.max_chunk_elements = max(1, int(max_chunk_elements))
+
+    def run(
+        self,
+        draw_block: Callable[[int], np.ndarray],
+        observed: float,
+        block_size: Optional[int] = None
+    ) -> PermutationResult:
+        """
+        Run the sequential test.
+
+        ``draw_block(size)`` returns the statistic for ``size`` fresh
+        permutations as a (size,) array.
+        """
+        block = max(1, block_size or self.block_size)
+        threshold = observed - _TIE_TOLERANCE * max(1.0, abs(observed))
+        deadline = time.monotonic() + self.time_budget if self.time_budget else None
+
+        drawn = 0
+        exceedances = 0
+        while drawn < self.n_permutations:
+            size = min(block, self.n_permutations - drawn)
+            values = np.asarray(draw_block(size), dtype=np.float64)
+            hits = np.cumsum(values >= threshold)
+
+            if self.early_stopping and hits[-1] + exceedances >= self.h:
+                # Besag–Clifford: stop at the draw that produced the h-th exceedance
+                stop = int(np.searchsorted(hits, self.h - exceedances)) + 1
+                drawn += stop
+                return PermutationResult(
+                    p_value=self.h / drawn,
+                    n_permutations=drawn,
+                    n_exceedances=self.h,
+                    stopped_early=drawn < self.n_permutations,
+                    stop_reason="besag_clifford"
+                )
+
+            drawn += size
+            exceedances += int(hits[-1])
+
+            if self.early_stopping and drawn < self.n_permutations:
+                if self._upper_bound(exceedances, drawn) < self.alpha:
+                    return self._result(exceedances, drawn, "significant")
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.warning(f"Permutation test hit its time budget after {drawn} draws")
+                return self._result(exceedances, drawn, "time_budget")
+
+        return self._result(exceedances, drawn, "budget")
+
+    def run_many(
+        self,
+        draw_block: Callable[[int], np.ndarray],
+        observed: np.ndarray
+    ) -> np.ndarray:
+        """
+        Run one sequential test per statistic over shared permutations.
+
+        ``draw_block(size)`` returns a (size, k) array for ``k`` statistics.
+        Each statistic stops counting as soon as its own decision is settled;
+        sampling ends when all are settled or the budget is spent. Returns the
+        (k,) p-values.
+        """
+        observed = np.asarray(observed, dtype=np.float64)
+        thresholds = observed - _TIE_TOLERANCE * np.maximum(1.0, np.abs(observed))
+        deadline = time.monotonic() + self.time_budget if self.time_budget else None
+
+        drawn = np.zeros(observed.shape, dtype=np.int64)
+        exceedances = np.zeros(observed.shape, dtype=np.int64)
+        p_values = np.full(observed.shape, np.nan)
+        active = np.ones(observed.shape, dtype=bool)
+        total = 0
+
+        while total < self.n_permutations and active.any():
+            size = min(self.block_size, self.n_permutations - total)
+            values = np.asarray(draw_block(size), dtype=np.float64)
+            hits = np.cumsum(values >= thresholds, axis=0)
+
+            if self.early_stopping:
+                running = exceedances + hits
+                settled = active & (running[-1] >= self.h)
+                if settled.any():
+                    stop = drawn + np.argmax(running >= self.h, axis=0) + 1
+                    p_values[settled] = self.h / stop[settled]
+                    active &= ~settled
+
+            drawn[active] += size
+            exceedances[active] += hits[-1][active]
+            total += size
+
+            if self.early_stopping and total < self.n_permutations:
+                significant = active & (self._upper_bound(exceedances, drawn) < self.alpha)
+                p_values[significant] = exceedances[significant] / drawn[significant]
+                active &= ~significant
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.warning(f"Permutation test hit its time budget after {total} draws")
+                break
+
+        p_values[active] = exceedances[active] / np.maximum(drawn[active], 1)
+        return p_values
+
+    def _upper_bound(self, exceedances: Any, drawn: Any) -> Any:
+        """One-sided Clopper–Pearson upper bound on the true p-value."""
+        exceedances = np.asarray(exceedances)
+        drawn = np.asarray(drawn)
+        bound = stats.beta.ppf(
+            1 - self.stop_confidence,
+            exceedances + 1,
+            np.maximum(drawn - exceedances, 1)
+        )
+        return np.where(exceedances >= drawn, 1.0, bound)
+
+    def _result(self, exceedances: int, drawn: int, reason: str) -> PermutationResult:
+        return PermutationResult(
+            p_value=exceedances / drawn,
+            n_permutations=drawn,
+            n_exceedances=exceedances,
+            stopped_early=drawn < self.n_permutations,
+            stop_reason=reason
+        )
+
+    def run_permuted_codes(
+        self,
+        group_codes: np.ndarray,
+        block_statistic: Callable[[np.ndarray], np.ndarray],
+        observed: float
+    ) -> PermutationResult:
+        """
+        Run the test by shuffling group codes row by row.
+
+        ``block_statistic`` maps a (block, n) array of permuted codes to a
+        (block,) array of statistics; blocks are sized so that block * n stays
+        under ``max_chunk_elements``.
+        """
+        group_codes = np.asarray(group_codes, dtype=np.int64)
+        n = len(group_codes)
+        block = max(1, min(self.block_size, self.max_chunk_elements // max(1, n)))
+
+        def draw_block(size: int) -> np.ndarray:
+            return block_statistic(self.rng.permuted(np.tile(group_codes, (size, 1)), axis=1))
+
+        return self.run(draw_block, observed, block)
+
+    def permuted_confusion(self, confusion: np.ndarray, size: int) -> np.ndarray:
+        """Draw (size, n_groups, 2, 2) confusion tensors under shuffled groups."""
+        return self.permuted_cell_counts(confusion, size)
+
+    def permuted_cell_counts(self, counts: np.ndarray, size: int) -> np.ndarray:
+        """
+        Draw (size, n_groups, ...) per-group cell counts under shuffled groups.
+
+        ``counts`` has the group on axis 0 and any cell layout after it. Group
+        sizes and overall cell totals are fixed; each group takes its cells
+        from what earlier groups left, one cell type at a time, which is the
+        exact distribution of a random relabelling of the rows.
+        """
+        n_groups = counts.shape[0]
+        cells = counts.reshape(n_groups, -1).astype(np.int64)
+        n_types = cells.shape[1]
+        group_sizes = cells.sum(axis=1)
+        remaining = np.tile(cells.sum(axis=0), (size, 1))
+        drawn = np.zeros((size, n_groups, n_types), dtype=np.int64)
+
+        for group in range(n_groups - 1):
+            left = np.full(size, group_sizes[group], dtype=np.int64)
+            pool = remaining.sum(axis=1)
+            for cell in range(n_types - 1):
+                pool = pool - remaining[:, cell]
+                taken = self.rng.hypergeometric(remaining[:, cell], pool, left)
+                drawn[:, group, cell] = taken
+                left = left - taken
+            drawn[:, group, n_types - 1] = left
+            remaining = remaining - drawn[:, group]
+        drawn[:, n_groups - 1] = remaining
+
+        return drawn.reshape((size,) + counts.shape)
+
+    def permuted_subgroup_confusion(self, confusion: np.ndarray, size: int) -> np.ndarray:
+        """
+        Draw (size, n_groups, 2, 2) confusion tensors for one-vs-rest tests.
+
+        Each group is an independent random subset of its own size drawn from
+        the whole population, which is the exact null distribution of that
+        group's counts under shuffled labels (groups are not jointly
+        consistent, so use this only for per-group marginal statistics).
+        """
+        n_groups = confusion.shape[0]
+        cells = confusion.reshape(n_groups, 4).astype(np.int64)
+        totals = cells.sum(axis=0)
+        left = np.tile(cells.sum(axis=1), (size, 1))
+        pool = int(totals.sum())
+        drawn = np.zeros((size, n_groups, 4), dtype=np.int64)
+
+        for cell in range(3):
+            pool -= int(totals[cell])
+            taken = self.rng.hypergeometric(int(totals[cell]), pool, left)
+            drawn[..., cell] = taken
+            left = left - taken
+        drawn[..., 3] = left
+
+        return drawn.reshape(size, n_groups, 2, 2)
+
+    def confusion_test(
+        self,
+        statistic: Callable[[np.ndarray], np.ndarray],
+        observed: float,
+        y_true: Optional[np.ndarray],
+        y_pred: np.ndarray,
+        sensitive_attr: np.ndarray
+    ) -> PermutationResult:
+        """Permutation test for a statistic of the grouped confusion tensor."""
+        codes, groups = factorize_groups(sensitive_attr)
+        n_groups = len(groups)
+        if len(codes) >= _HYPERGEOMETRIC_LIMIT:
+            return self.run_permuted_codes(
+                codes,
+                lambda permuted: statistic(confusion_tensor(permuted, n_groups, y_true, y_pred)),
+                observed
+            )
+
+        confusion = confusion_tensor(codes, n_groups, y_true, y_pred)
+        return self.run(
+            lambda size: statistic(self.permuted_confusion(confusion, size)),
+            observed
+        )
+
+    def calibration_test(
+        self,
+        observed: float,
+        y_true: np.ndarray,
+        y_pred_proba: np.ndarray,
+        sensitive_attr: np.ndarray,
+        n_bins: int
+    ) -> PermutationResult:
+        """Permutation test for the calibration-error spread across groups."""
+        codes, groups = factorize_groups(sensitive_attr)
+        n_groups = len(groups)
+        y_pred_proba = np.asarray(y_pred_proba, dtype=np.float64)
+        y_true = np.asarray(y_true, dtype=np.float64)
+        width = n_groups * (n_bins + 1)
+
+        def block_statistic(permuted: np.ndarray) -> np.ndarray:
+            size = permuted.shape[0]
+            cells = calibration_cells(permuted, y_pred_proba, n_bins)
+            cells = (cells + np.arange(size)[:, None] * width).reshape(-1)
+            length = size * width
+            shape = (size, n_groups, n_bins + 1)
+            counts = np.bincount(cells, minlength=length).reshape(shape)
+            proba_sums = np.bincount(
+                cells, weights=np.tile(y_pred_proba, size), minlength=length
+            ).reshape(shape)
+            true_sums = np.bincount(
+                cells, weights=np.tile(y_true, size), minlength=length
+            ).reshape(shape)
+            return calibration_spread(counts, proba_sums, true_sums, n_bins)
+
+        return self.run_permuted_codes(codes, block_statistic, observed)
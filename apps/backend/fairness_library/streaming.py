@@ -0,0 +1,373 @@
+"""
+Streaming Fairness Metrics
+Mergeable per-group sufficient statistics for datasets larger than memory.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+from .bootstrap import BootstrapEngine, RandomState, resolve_rng
+from .kernels import (
+    calibration_bins,
+    calibration_errors,
+    confusion_tensor,
+    demographic_parity_stat,
+    equal_opportunity_stat,
+    equalized_odds_stat,
+    factorize_groups,
+    false_positive_rates,
+    positive_predictive_values,
+    predictive_parity_stat,
+    selection_rates,
+    spread,
+    true_positive_rates,
+)
+from .metrics import MetricResult
+from .permutation import PermutationEngine
+
+logger = logging.getLogger(__name__)
+
+
+def _group_key(label: Any) -> Any:
+    """Normalize a group label so equal labels from different chunks collide."""
+    if isinstance(label, float) and math.isnan(label):
+        return None
+    if isinstance(label, np.generic):
+        return label.item()
+    return label
+
+
+class StreamingFairnessAccumulator:
+    """
+    Accumulate fairness sufficient statistics chunk by chunk.
+
+    State is a per-group confusion tensor and, when scores are supplied,
+    per-(group, score bin, label) counts and score sums. Both are plain sums, so
+    accumulators built on different chunks (or processes) combine with
+    ``merge`` and finalize to the same metrics as a single in-memory pass.
+    """
+
+    def __init__(self, n_bins: int = 10, positive_label: Any = 1):
+        self.n_bins = n_bins
+        self.positive_label = positive_label
+        self.groups: List[Any] = []
+        self._group_index: Dict[Any, int] = {}
+        self.confusion = np.zeros((0, 2, 2), dtype=np.int64)
+        self.calibration_counts = np.zeros((0, n_bins + 1, 2), dtype=np.int64)
+        self.calibration_score_sums = np.zeros((0, n_bins + 1, 2), dtype=np.float64)
+        self.n_rows = 0
+        self.has_labels = False
+        self.has_scores = False
+
+    def _check_columns(self, has_labels: bool, has_scores: bool, source: str):
+        """Reject state that would mix rows with and without labels or scores."""
+        if self.n_rows == 0:
+            return
+        if has_labels != self.has_labels:
+            raise ValueError(
+                f"{source} {'has' if has_labels else 'lacks'} y_true but earlier rows "
+                f"{'do' if self.has_labels else 'do not'}; labels must be given for all rows or none"
+            )
+        if has_scores != self.has_scores:
+            raise ValueError(
+                f"{source} {'has' if has_scores else 'lacks'} y_score but earlier rows "
+                f"{'do' if self.has_scores else 'do not'}; scores must be given for all rows or none"
+            )
+
+    def _group_slots(self, labels: np.ndarray) -> np.ndarray:
+        """Map chunk-level unique labels to accumulator slots, growing state."""
+        slots = []
+        for label in labels.tolist():
+            key = _group_key(label)
+            if key not in self._group_index:
+                self._group_index[key] = len(self.groups)
+                self.groups.append(key)
+            slots.append(self._group_index[key])
+
+        grow = len(self.groups) - len(self.confusion)
+        if grow > 0:
+            self.confusion = np.concatenate(
+                [self.confusion, np.zeros((grow, 2, 2), dtype=np.int64)]
+            )
+            self.calibration_counts = np.concatenate(
+                [self.calibration_counts, np.zeros((grow, self.n_bins + 1, 2), dtype=np.int64)]
+            )
+            self.calibration_score_sums = np.concatenate(
+                [self.calibration_score_sums, np.zeros((grow, self.n_bins + 1, 2))]
+            )
+        return np.asarray(slots, dtype=np.int64)
+
+    def update(
+        self,
+        y_pred: np.ndarray,
+        sensitive_attr: np.ndarray,
+        y_true: Optional[np.ndarray] = None,
+        y_score: Optional[np.ndarray] = None
+    ) -> "StreamingFairnessAccumulator":
+        """
+        Fold one chunk of predictions (and optional labels/scores) into the state.
+
+        Every chunk must supply the same columns: labels (and scores) for all
+        rows or for none, otherwise ValueError is raised. Scores need labels.
+        """
+        if y_score is not None and y_true is None:
+            raise ValueError("y_score requires y_true: calibration needs labels")
+        codes, labels = factorize_groups(sensitive_attr)
+        if len(codes) == 0:
+            return self
+        self._check_columns(y_true is not None, y_score is not None, "Chunk")
+        slots = self._group_slots(labels)
+        n_groups = len(labels)
+
+        self.confusion[slots] += confusion_tensor(
+            codes, n_groups, y_true, y_pred, self.positive_label
+        )
+
+        self.has_labels = y_true is not None
+        self.has_scores = y_score is not None
+        if y_true is not None:
+            if y_score is not None:
+                y_score = np.asarray(y_score, dtype=np.float64)
+                truth = (np.asarray(y_true) == self.positive_label).astype(np.int64)
+                bins = calibration_bins(y_score, self.n_bins)
+                bins = np.where(bins >= 0, bins, self.n_bins)
+                cells = (codes * (self.n_bins + 1) + bins) * 2 + truth
+                length = n_groups * (self.n_bins + 1) * 2
+                shape = (n_groups, self.n_bins + 1, 2)
+                self.calibration_counts[slots] += np.bincount(
+                    cells, minlength=length
+                ).reshape(shape)
+                self.calibration_score_sums[slots] += np.bincount(
+                    cells, weights=y_score, minlength=length
+                ).reshape(shape)
+
+        self.n_rows += len(codes)
+        return self
+
+    def update_frame(
+        self,
+        frame: pd.DataFrame,
+        prediction_col: str,
+        group_col: str,
+        label_col: Optional[str] = None,
+        score_col: Optional[str] = None
+    ) -> "StreamingFairnessAccumulator":
+        """Fold one DataFrame chunk into the state."""
+        return self.update(
+            frame[prediction_col].to_numpy(),
+            frame[group_col].to_numpy(),
+            frame[label_col].to_numpy() if label_col else None,
+            frame[score_col].to_numpy() if score_col else None
+        )
+
+    def merge(self, other: "StreamingFairnessAccumulator") -> "StreamingFairnessAccumulator":
+        """Add another accumulator's state into this one (groups aligned by label)."""
+        if other.n_bins != self.n_bins:
+            raise ValueError("Cannot merge accumulators with different n_bins")
+        if other.positive_label != self.positive_label:
+            raise ValueError("Cannot merge accumulators with different positive labels")
+        if not other.groups:
+            return self
+        self._check_columns(other.has_labels, other.has_scores, "Merged accumulator")
+
+        slots = self._group_slots(np.asarray(other.groups, dtype=object))
+        self.confusion[slots] += other.confusion
+        self.calibration_counts[slots] += other.calibration_counts
+        self.calibration_score_sums[slots] += other.calibration_score_sums
+        self.n_rows += other.n_rows
+        self.has_labels = other.has_labels
+        self.has_scores = other.has_scores
+        return self
+
+    @classmethod
+    def combine(cls, accumulators: Iterable["StreamingFairnessAccumulator"]) -> "StreamingFairnessAccumulator":
+        """Merge partial states, e.g. from chunks processed in parallel."""
+        accumulators = list(accumulators)
+        if not accumulators:
+            return cls()
+        total = cls(accumulators[0].n_bins, accumulators[0].positive_label)
+        for accumulator in accumulators:
+            total.merge(accumulator)
+        return total
+
+    def finalize(
+        self,
+        confidence_level: float = 0.95,
+        threshold: float = 0.05,
+        n_bootstrap: int = 1000,
+        n_permutations: int = 1000,
+        random_state: RandomState = None
+    ) -> Dict[str, MetricResult]:
+        """
+        Compute metrics from the accumulated state.
+
+        Demographic parity is always reported; equalized odds, equal
+        opportunity and predictive parity need labels; calibration needs labels
+        and scores. Confusion-based CIs and p-values are exact functions of the
+        counts. Calibration resamples binned (group, bin, label) cells, so
+        score variation within a bin is not resampled.
+        """
+        if len(self.groups) < 2:
+            raise ValueError("Need at least 2 groups for fairness analysis")
+
+        rng = resolve_rng(random_state)
+        bootstrap = BootstrapEngine(n_bootstrap, confidence_level, rng)
+        permutation = PermutationEngine(n_permutations, alpha=1 - confidence_level, random_state=rng)
+        confusion = self.confusion
+
+        metrics = [("demographic_parity", "demographic_parity_difference", demographic_parity_stat, selection_rates)]
+        if self.has_labels:
+            metrics += [
+                ("equalized_odds", "equalized_odds_difference", equalized_odds_stat, None),
+                ("equal_opportunity", "equal_opportunity_difference", equal_opportunity_stat, true_positive_rates),
+                ("predictive_parity", "predictive_parity_difference", predictive_parity_stat, positive_predictive_values),
+            ]
+
+        results = {}
+        for key, metric_name, statistic, rates in metrics:
+            value = float(statistic(confusion))
+            ci_lower, ci_upper = bootstrap.interval(bootstrap.confusion_statistics(statistic, confusion))
+            p_value = permutation.run(
+                lambda size: statistic(permutation.permuted_confusion(confusion, size)),
+                value
+            ).p_value
+            if rates is None:
+                details = {
+                    "tpr_by_group": self._by_group(true_positive_rates(confusion)),
+                    "fpr_by_group": self._by_group(false_positive_rates(confusion)),
+                }
+            else:
+                details = {"group_rates": self._by_group(rates(confusion))}
+            details["rows"] = self.n_rows
+            results[key] = MetricResult(
+                metric_name=metric_name,
+                value=value,
+                confidence_interval=(ci_lower, ci_upper),
+                p_value=p_value,
+                is_fair=value <= threshold,
+                threshold=threshold,
+                details=details
+            )
+
+        if self.has_scores:
+            results["calibration"] = self._finalize_calibration(bootstrap, permutation, threshold)
+
+        return results
+
+    def _finalize_calibration(
+        self,
+        bootstrap: BootstrapEngine,
+        permutation: PermutationEngine,
+        threshold: float
+    ) -> MetricResult:
+        counts = self.calibration_counts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_scores = np.where(counts > 0, self.calibration_score_sums / counts, 0.0)
+        n_bins = self.n_bins
+
+        def statistic(cell_counts: np.ndarray) -> np.ndarray:
+            return spread(_binned_calibration_errors(cell_counts, mean_scores, n_bins))
+
+        errors = _binned_calibration_errors(counts, mean_scores, n_bins)
+        value = float(spread(errors))
+        ci_lower, ci_upper = bootstrap.interval(bootstrap.confusion_statistics(statistic, counts))
+        p_value = permutation.run(
+            lambda size: statistic(permutation.permuted_cell_counts(counts, size)),
+            value
+        ).p_value
+
+        return MetricResult(
+            metric_name="calibration_by_group",
+            value=value,
+            confidence_interval=(ci_lower, ci_upper),
+            p_value=p_value,
+            is_fair=value <= threshold,
+            threshold=threshold,
+            details={
+                "calibration_errors": {
+                    group: error
+                    for group, error in zip(self.groups, errors.tolist())
+                    if not np.isnan(error)
+                },
+                "rows": self.n_rows,
+            }
+        )
+
+    def _by_group(self, rates: np.ndarray) -> Dict[Any, float]:
+        return dict(zip(self.groups, rates.tolist()))
+
+
+def _binned_calibration_errors(
+    cell_counts: np.ndarray,
+    mean_scores: np.ndarray,
+    n_bins: int
+) -> np.ndarray:
+    """Calibration errors from (..., groups, n_bins + 1, 2) label-split bin counts."""
+    counts = cell_counts.sum(axis=-1)
+    score_sums = (cell_counts * mean_scores).sum(axis=-1)
+    true_sums = cell_counts[..., 1]
+    return calibration_errors(counts, score_sums, true_sums, n_bins)
+
+
+def accumulate_frames(
+    frames: Iterable[pd.DataFrame],
+    prediction_col: str,
+    group_col: str,
+    label_col: Optional[str] = None,
+    score_col: Optional[str] = None,
+    n_bins: int = 10,
+    positive_label: Any = 1
+) -> StreamingFairnessAccumulator:
+    """Accumulate statistics over an iterable of DataFrame chunks."""
+    accumulator = StreamingFairnessAccumulator(n_bins, positive_label)
+    for frame in frames:
+        accumulator.update_frame(frame, prediction_col, group_col, label_col, score_col)
+    return accumulator
+
+
+def accumulate_csv(
+    path: str,
+    prediction_col: str,
+    group_col: str,
+    label_col: Optional[str] = None,
+    score_col: Optional[str] = None,
+    chunksize: int = 1_000_000,
+    n_bins: int = 10,
+    positive_label: Any = 1
+) -> StreamingFairnessAccumulator:
+    """Stream a CSV with ``read_csv(chunksize=...)``, parsing only the needed columns."""
+    columns = [c for c in (prediction_col, group_col, label_col, score_col) if c]
+    with pd.read_csv(path, usecols=columns, chunksize=chunksize) as reader:
+        return accumulate_frames(
+            reader, prediction_col, group_col, label_col, score_col, n_bins, positive_label
+        )
+
+
+def accumulate_record_batches(
+    batches: Iterable[Any],
+    prediction_col: str,
+    group_col: str,
+    label_col: Optional[str] = None,
+    score_col: Optional[str] = None,
+    n_bins: int = 10,
+    positive_label: Any = 1
+) -> StreamingFairnessAccumulator:
+    """Accumulate statistics over Arrow record batches (e.g. from a Parquet scanner)."""
+    accumulator = StreamingFairnessAccumulator(n_bins, positive_label)
+
+    def column(batch: Any, name: Optional[str]) -> Optional[np.ndarray]:
+        if not name:
+            return None
+        return batch.column(name).to_numpy(zero_copy_only=False)
+
+    for batch in batches:
+        accumulator.update(
+            column(batch, prediction_col),
+            column(batch, group_col),
+            column(batch, label_col),
+            column(batch, score_col)
+        )
+    return accumulator
@@ -2,37 +2,44 @@
 Production-ready security middleware for FairMind backend.
 """
 
+import math
 import time
-from typing import Callable
-from fastapi import Request, Response, HTTPException, status
+from typing import List, Optional, Sequence, Tuple
+from fastapi import Request, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
-import asyncio
 
 from config.settings import settings
-from config.cache import cache_manager
+from core.middleware.asgi import get_client_ip, get_state, send_with_headers
+from api.middleware.rate_limiting import (
+    RateLimitPolicy,
+    RateLimiter,
+    default_rate_limit_policies,
+    rate_limiter,
+)
 
 logger = logging.getLogger("fairmind.security")
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """Add security headers to all responses."""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-        
-        # Security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.headers = [
+            ("X-Content-Type-Options", "nosniff"),
+            ("X-Frame-Options", "DENY"),
+            ("X-XSS-Protection", "1; mode=block"),
+            ("Referrer-Policy", "strict-origin-when-cross-origin"),
+            ("Permissions-Policy", "geolocation=(), microphone=(), camera=()"),
+        ]
         
         if settings.is_production:
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-            response.headers["Content-Security-Policy"] = (
+            self.headers.append(("Strict-Transport-Security", "max-age=31536000; includeSubDomains"))
+            self.headers.append(("Content-Security-Policy", (
                 "default-src 'self'; "
                 "script-src 'self' 'unsafe-inline'; "
                 "style-src 'self' 'unsafe-inline'; "
@@ -40,162 +47,114 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
                 "font-src 'self'; "
                 "connect-src 'self'; "
                 "frame-ancestors 'none';"
-            )
-        
-        return response
+            )))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, send_with_headers(send, self.headers))
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Redis-based rate limiting middleware for production scalability."""
+class RateLimitMiddleware:
+    """
+    Rate limiting middleware backed by the shared GCRA engine.
+
+    Every applicable policy (per client, per org, per endpoint) is checked
+    in one atomic call; the response carries the headers of the most
+    constrained policy. Runs inside the auth and org isolation middleware so
+    buckets are keyed by the authenticated user and org where available.
+    """
+
+    EXEMPT_PATHS = frozenset({"/health", "/", "/docs", "/redoc", "/openapi.json"})
     
-    def __init__(self, app, requests_per_minute: int = 100):
-        super().__init__(app)
-        self.requests_per_minute = requests_per_minute
-        self.window_size = 60  # 1 minute window
-        self.fallback_clients = {}  # Fallback to in-memory if Redis unavailable
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests_per_minute: Optional[int] = None,
+        policies: Optional[Sequence[RateLimitPolicy]] = None,
+        limiter: Optional[RateLimiter] = None
+    ):
+        self.app = app
+        self.policies = list(policies) if policies is not None else default_rate_limit_policies(requests_per_minute)
+        self.limiter = limiter or rate_limiter
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Skip rate limiting for health checks
-        if request.url.path in ["/health", "/", "/docs", "/redoc", "/openapi.json"]:
-            return await call_next(request)
-        
-        client_ip = self.get_client_ip(request)
-        current_time = time.time()
-        
-        # Check rate limit
-        is_limited, remaining, reset_time = await self.check_rate_limit(client_ip, current_time)
-        
-        if is_limited:
-            logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-            return JSONResponse(
+        if scope["type"] != "http" or scope["path"] in self.EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        checks = self.resolve_checks(scope)
+        results = await self.limiter.hit(checks)
+        if not results:
+            await self.app(scope, receive, send)
+            return
+
+        denied = [result for result in results if not result.allowed]
+        if denied:
+            result = max(denied, key=lambda r: r.retry_after)
+            identity = next(i for p, i in checks if p is result.policy)
+            logger.warning(f"Rate limit '{result.policy.name}' exceeded for {identity}")
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={
                     "error": "Rate limit exceeded",
-                    "message": f"Maximum {self.requests_per_minute} requests per minute allowed",
-                    "retry_after": int(reset_time - current_time)
+                    "message": f"Maximum {result.limit} requests per {int(result.policy.period)} seconds allowed",
+                    "retry_after": max(1, math.ceil(result.retry_after))
                 },
-                headers={
-                    "Retry-After": str(int(reset_time - current_time)),
-                    "X-RateLimit-Limit": str(self.requests_per_minute),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(int(reset_time))
-                }
+                headers=dict(result.headers())
             )
-        
-        response = await call_next(request)
-        
-        # Add rate limit headers
-        response.headers["X-RateLimit-Limit"] = str(self.requests_per_minute)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(reset_time))
-        
-        return response
-    
-    async def check_rate_limit(self, client_ip: str, current_time: float) -> tuple[bool, int, float]:
-        """Check rate limit using Redis sliding window or fallback to in-memory."""
-        window_start = current_time - self.window_size
-        reset_time = current_time + self.window_size
-        
-        try:
-            # Try Redis-based rate limiting
-            if cache_manager.redis_client:
-                return await self._redis_rate_limit(client_ip, current_time, window_start, reset_time)
-        except Exception as e:
-            logger.warning(f"Redis rate limiting failed, falling back to in-memory: {e}")
-        
-        # Fallback to in-memory rate limiting
-        return await self._memory_rate_limit(client_ip, current_time, window_start, reset_time)
-    
-    async def _redis_rate_limit(self, client_ip: str, current_time: float, window_start: float, reset_time: float) -> tuple[bool, int, float]:
-        """Redis-based sliding window rate limiting."""
-        key = f"rate_limit:{client_ip}"
-        
-        # Use Redis pipeline for atomic operations
-        pipe = cache_manager.redis_client.pipeline()
-        
-        # Remove old entries
-        pipe.zremrangebyscore(key, 0, window_start)
-        
-        # Count current requests
-        pipe.zcard(key)
-        
-        # Add current request
-        pipe.zadd(key, {str(current_time): current_time})
-        
-        # Set expiration
-        pipe.expire(key, self.window_size)
-        
-        results = await pipe.execute()
-        current_requests = results[1]
-        
-        is_limited = current_requests >= self.requests_per_minute
-        remaining = max(0, self.requests_per_minute - current_requests - 1)
-        
-        return is_limited, remaining, reset_time
-    
-    async def _memory_rate_limit(self, client_ip: str, current_time: float, window_start: float, reset_time: float) -> tuple[bool, int, float]:
-        """In-memory sliding window rate limiting."""
-        if client_ip not in self.fallback_clients:
-            self.fallback_clients[client_ip] = []
-        
-        # Remove old entries
-        self.fallback_clients[client_ip] = [
-            req_time for req_time in self.fallback_clients[client_ip]
-            if req_time > window_start
-        ]
-        
-        current_requests = len(self.fallback_clients[client_ip])
-        is_limited = current_requests >= self.requests_per_minute
-        
-        if not is_limited:
-            self.fallback_clients[client_ip].append(current_time)
-            current_requests += 1
-        
-        remaining = max(0, self.requests_per_minute - current_requests)
-        
-        # Cleanup old clients periodically
-        if len(self.fallback_clients) > 1000:
-            asyncio.create_task(self._cleanup_old_clients(current_time))
-        
-        return is_limited, remaining, reset_time
-    
-    async def _cleanup_old_clients(self, current_time: float):
-        """Clean up old client entries from memory."""
-        cutoff_time = current_time - self.window_size * 2  # Keep some buffer
-        
-        clients_to_remove = []
-        for client_ip, requests in self.fallback_clients.items():
-            # Remove old requests
-            recent_requests = [req for req in requests if req > cutoff_time]
-            
-            if not recent_requests:
-                clients_to_remove.append(client_ip)
-            else:
-                self.fallback_clients[client_ip] = recent_requests
-        
-        # Remove inactive clients
-        for client_ip in clients_to_remove:
-            del self.fallback_clients[client_ip]
+            await response(scope, receive, send)
+            return
+
+        # Report the policy closest to its limit
+        result = min(results, key=lambda r: r.remaining / r.limit)
+        await self.app(scope, receive, send_with_headers(send, result.headers()))
+
+    def resolve_checks(self, scope: Scope) -> List[Tuple[RateLimitPolicy, str]]:
+        """(policy, identity) pairs that apply to this request."""
+        state = get_state(scope)
+        user_id = state.get("user_id") or self._user_id(state.get("user"))
+        identities = {
+            "client": f"user:{user_id}" if user_id else f"ip:{get_client_ip(scope)}",
+            "user": f"user:{user_id}" if user_id else None,
+            "org": f"org:{state['org_id']}" if state.get("org_id") else None,
+        }
+        checks = []
+        for policy in self.policies:
+            identity = identities.get(policy.scope)
+            if identity and policy.applies_to(scope["method"], scope["path"]):
+                checks.append((policy, identity))
+        return checks
+
+    @staticmethod
+    def _user_id(user) -> Optional[str]:
+        if user is None:
+            return None
+        if isinstance(user, dict):
+            return user.get("user_id") or user.get("sub")
+        return getattr(user, "user_id", None) or getattr(user, "sub", None)
     
     def get_client_ip(self, request: Request) -> str:
         """Get client IP address."""
-        # Check for forwarded headers (for reverse proxy setups)
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip
-        
-        return request.client.host if request.client else "unknown"
+        return get_client_ip(request.scope)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """Log all requests for monitoring and debugging."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
+        request = Request(scope)
+        client_ip = get_client_ip(scope)
         
         # Log request
         logger.info(
@@ -203,34 +162,25 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             extra={
                 "method": request.method,
                 "url": str(request.url),
-                "client_ip": self.get_client_ip(request),
+                "client_ip": client_ip,
                 "user_agent": request.headers.get("User-Agent", ""),
             }
         )
+
+        def on_start(headers) -> None:
+            # Add processing time header
+            headers["X-Process-Time"] = str(round(time.time() - start_time, 4))
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
         
         try:
-            response = await call_next(request)
-            
-            # Calculate processing time
-            process_time = time.time() - start_time
-            
-            # Log response
-            logger.info(
-                f"Request completed",
-                extra={
-                    "method": request.method,
-                    "url": str(request.url),
-                    "status_code": response.status_code,
-                    "process_time": round(process_time, 4),
-                    "client_ip": self.get_client_ip(request),
-                }
-            )
-            
-            # Add processing time header
-            response.headers["X-Process-Time"] = str(round(process_time, 4))
-            
-            return response
-            
+            await self.app(scope, receive, send_with_headers(send_wrapper, (), on_start))
         except Exception as e:
             process_time = time.time() - start_time
             
@@ -241,50 +191,72 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                     "url": str(request.url),
                     "error": str(e),
                     "process_time": round(process_time, 4),
-                    "client_ip": self.get_client_ip(request),
+                    "client_ip": client_ip,
                 },
                 exc_info=True
             )
             
             raise
+
+        # Log response
+        logger.info(
+            f"Request completed",
+            extra={
+                "method": request.method,
+                "url": str(request.url),
+                "status_code": status_code,
+                "process_time": round(time.time() - start_time, 4),
+                "client_ip": client_ip,
+            }
+        )
     
     def get_client_ip(self, request: Request) -> str:
         """Get client IP address."""
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip
-        
-        return request.client.host if request.client else "unknown"
+        return get_client_ip(request.scope)
 
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
+class ErrorHandlingMiddleware:
     """Global error handling middleware."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            return await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except HTTPException:
             # Let FastAPI handle HTTP exceptions
             raise
         except Exception as e:
+            request = Request(scope)
             logger.error(
                 f"Unhandled exception",
                 extra={
                     "method": request.method,
                     "url": str(request.url),
                     "error": str(e),
-                    "client_ip": self.get_client_ip(request),
+                    "client_ip": get_client_ip(scope),
                 },
                 exc_info=True
             )
+            if response_started:
+                raise
             
             # Return generic error response in production
             if settings.is_production:
-                return JSONResponse(
+                response = JSONResponse(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     content={
                         "error": "Internal server error",
@@ -292,7 +264,7 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
                     }
                 )
             else:
-                return JSONResponse(
+                response = JSONResponse(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     content={
                         "error": "Internal server error",
@@ -300,26 +272,47 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
                         "type": type(e).__name__,
                     }
                 )
+            await response(scope, receive, send)
     
     def get_client_ip(self, request: Request) -> str:
         """Get client IP address."""
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip
-        
-        return request.client.host if request.client else "unknown"
+        return get_client_ip(request.scope)
 
 
 # JWT Authentication Middleware
-class JWTAuthenticationMiddleware(BaseHTTPMiddleware):
+class JWTAuthenticationMiddleware:
     """JWT authentication middleware using new secure JWT infrastructure."""
+
+    # Skip authentication for paths starting with any of these
+    PUBLIC_PATHS = (
+        "/health", "/metrics", "/", "/docs", "/redoc", "/openapi.json",
+        "/auth/login", "/auth/refresh", "/auth/health",
+        "/api/v1/auth/login", "/api/v1/auth/register"
+    )
+
+    # In development, allow database routes without auth
+    DEVELOPMENT_PUBLIC_PATHS = (
+        "/api/v1/database",
+        "/api/v1/core",
+        "/api/v1/bias-detection",
+        "/api/v1/bias/llm-judge",
+        "/api/v1/modern-bias-detection",
+        "/api/v1/multimodal-bias-detection",
+        "/api/v1/ai-bom",
+        "/api/v1/ai-governance",
+        "/api/v1/analytics",
+        "/api/v1/remediation",
+        "/api/v1/compliance",
+        "/api/v1/marketplace",
+        "/api/v1/reports",
+        "/api/v1/settings",
+        "/api/v1/datasets",
+        "/api/v1/monitoring",
+        "/api/v1/mlops"
+    )
     
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         # Import here to avoid circular imports
         from config.auth import auth_manager
         from config.jwt_exceptions import (
@@ -333,56 +326,42 @@ class JWTAuthenticationMiddleware(BaseHTTPMiddleware):
         self.InvalidTokenException = InvalidTokenException
         self.TokenMissingException = TokenMissingException
         self.log_jwt_security_event = log_jwt_security_event
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Skip authentication for public endpoints
-        public_paths = [
-            "/health", "/", "/docs", "/redoc", "/openapi.json",
-            "/auth/login", "/auth/refresh", "/auth/health",
-            "/api/v1/auth/login", "/api/v1/auth/register"
-        ]
-        
-        # In development, allow database routes without auth
+        self.public_paths = self.PUBLIC_PATHS
         if settings.environment == "development":
-            public_paths.extend([
-                "/api/v1/database",
-                "/api/v1/core",
-                "/api/v1/bias-detection",
-                "/api/v1/bias/llm-judge",
-                "/api/v1/modern-bias-detection",
-                "/api/v1/multimodal-bias-detection",
-                "/api/v1/ai-bom",
-                "/api/v1/ai-governance",
-                "/api/v1/analytics",
-                "/api/v1/remediation",
-                "/api/v1/compliance",
-                "/api/v1/marketplace",
-                "/api/v1/reports",
-                "/api/v1/settings",
-                "/api/v1/datasets",
-                "/api/v1/monitoring",
-                "/api/v1/mlops"
-            ])
-        
-        # Always allow OPTIONS requests (CORS preflight)
-        if request.method == "OPTIONS":
-            return await call_next(request)
-        
-        # Check if path starts with any public path
-        if any(request.url.path.startswith(path) for path in public_paths):
-            return await call_next(request)
-        
+            self.public_paths += self.DEVELOPMENT_PUBLIC_PATHS
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Always allow OPTIONS requests (CORS preflight) and public endpoints
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or scope["path"].startswith(self.public_paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        response = await self._authenticate(scope)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    async def _authenticate(self, scope: Scope) -> Optional[JSONResponse]:
+        """Verify the bearer token into ``request.state``; returns an error response on failure."""
+        path = scope["path"]
+        method = scope["method"]
+
         # Extract JWT token from Authorization header
-        auth_header = request.headers.get("Authorization")
+        auth_header = Headers(scope=scope).get("Authorization")
         
         if not auth_header or not auth_header.startswith("Bearer "):
             # Log security event
             self.log_jwt_security_event(
                 "missing_token",
                 {
-                    "path": request.url.path,
-                    "method": request.method,
-                    "ip": self.get_client_ip(request)
+                    "path": path,
+                    "method": method,
+                    "ip": get_client_ip(scope)
                 }
             )
             
@@ -403,23 +382,13 @@ class JWTAuthenticationMiddleware(BaseHTTPMiddleware):
             # For now, we'll use our internal auth manager which should be configured with the same secret
             token_data = await self.auth_manager.verify_token(token)
             
-            # Add user information to request state
-            request.state.user = token_data
-            request.state.authenticated = True
-            
-            # Log successful authentication
-            logger.debug(f"User authenticated: {token_data.email}")
-            
-            response = await call_next(request)
-            return response
-            
         except self.TokenExpiredException:
             self.log_jwt_security_event(
                 "token_expired",
                 {
-                    "path": request.url.path,
-                    "method": request.method,
-                    "ip": self.get_client_ip(request)
+                    "path": path,
+                    "method": method,
+                    "ip": get_client_ip(scope)
                 }
             )
             
@@ -436,9 +405,9 @@ class JWTAuthenticationMiddleware(BaseHTTPMiddleware):
             self.log_jwt_security_event(
                 "invalid_token",
                 {
-                    "path": request.url.path,
-                    "method": request.method,
-                    "ip": self.get_client_ip(request),
+                    "path": path,
+                    "method": method,
+                    "ip": get_client_ip(scope),
                     "token_preview": token[:20] + "..." if len(token) > 20 else token
                 }
             )
@@ -457,9 +426,9 @@ class JWTAuthenticationMiddleware(BaseHTTPMiddleware):
             self.log_jwt_security_event(
                 "auth_error",
                 {
-                    "path": request.url.path,
-                    "method": request.method,
-                    "ip": self.get_client_ip(request),
+                    "path": path,
+                    "method": method,
+                    "ip": get_client_ip(scope),
                     "error": str(e)
                 }
             )
@@ -471,18 +440,19 @@ class JWTAuthenticationMiddleware(BaseHTTPMiddleware):
                     "message": "Unable to verify authentication. Please try again."
                 }
             )
+
+        # Add user information to request state
+        state = get_state(scope)
+        state["user"] = token_data
+        state["authenticated"] = True
+        
+        # Log successful authentication
+        logger.debug(f"User authenticated: {token_data.email}")
+        return None
     
     def get_client_ip(self, request: Request) -> str:
         """Get client IP address."""
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip
-        
-        return request.client.host if request.client else "unknown"
+        return get_client_ip(request.scope)
 
 
 # Security utilities
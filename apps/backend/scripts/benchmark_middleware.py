@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of per-request middleware overhead.
+
+Drives three in-process ASGI apps with the same trivial JSON endpoint and
+reports p50/p99 latency and the overhead over the bare app:
+
+- ``bare``: no user middleware
+- ``base_http``: one ``BaseHTTPMiddleware`` pass-through layer for each layer
+  of the production stack (the audit layer also reads the request body),
+  i.e. the structural cost the previous stack paid before doing any work
+- ``asgi``: the production middleware classes, which are pure ASGI
+
+Requests are sent straight to the ASGI callable, so no network or server
+time is included.
+
+Usage:
+    python scripts/benchmark_middleware.py [--requests 5000] [--method POST]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from api.versioning import VersionHeadersMiddleware
+from core.middleware import ErrorHandlingMiddleware
+from core.middleware.audit import AuditLoggingMiddleware
+from core.middleware.org_isolation import OrgIsolationMiddleware
+from middleware.security import (
+    JWTAuthenticationMiddleware,
+    RateLimitMiddleware,
+    SecurityHeadersMiddleware,
+)
+
+
+async def endpoint(request: Request):
+    if request.method == "POST":
+        await request.body()
+    return JSONResponse({"status": "ok"})
+
+
+class PassThroughMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+class BodyReadingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        if request.method in ("POST", "PUT", "PATCH"):
+            await request.body()
+        return await call_next(request)
+
+
+def build_app(variant: str) -> Starlette:
+    app = Starlette(routes=[Route("/api/v1/ping", endpoint, methods=["GET", "POST"])])
+    if variant == "bare":
+        return app
+
+    app.add_middleware(CORSMiddleware, allow_origins=["*"])
+    if variant == "base_http":
+        # Audit, error handling, rate limiting, org isolation, security headers, auth
+        app.add_middleware(BodyReadingMiddleware)
+        for _ in range(5):
+            app.add_middleware(PassThroughMiddleware)
+        app.add_middleware(GZipMiddleware, minimum_size=1000)
+        # Version headers
+        app.add_middleware(PassThroughMiddleware)
+    else:
+        app.add_middleware(AuditLoggingMiddleware)
+        app.add_middleware(ErrorHandlingMiddleware)
+        app.add_middleware(RateLimitMiddleware, requests_per_minute=10 ** 9)
+        app.add_middleware(OrgIsolationMiddleware)
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(JWTAuthenticationMiddleware)
+        app.add_middleware(GZipMiddleware, minimum_size=1000)
+        app.add_middleware(VersionHeadersMiddleware)
+    return app
+
+
+async def call(app, method: str, body: bytes) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": "/api/v1/ping",
+        "raw_path": b"/api/v1/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"bench"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app, n_requests: int, method: str, body: bytes) -> np.ndarray:
+    for _ in range(min(200, n_requests)):
+        await call(app, method, body)
+    latencies = np.empty(n_requests)
+    for i in range(n_requests):
+        start = time.perf_counter()
+        await call(app, method, body)
+        latencies[i] = time.perf_counter() - start
+    return latencies * 1e6
+
+
+async def main(n_requests: int, method: str):
+    logging.disable(logging.CRITICAL)
+    # Keep the benchmark off the database
+    async def skip_audit(self, context):
+        pass
+
+    AuditLoggingMiddleware._log_audit_event = skip_audit
+    body = json.dumps({"payload": "x" * 512}).encode() if method == "POST" else b""
+
+    results = {}
+    for variant in ("bare", "base_http", "asgi"):
+        results[variant] = await measure(build_app(variant), n_requests, method, body)
+
+    bare_p50, bare_p99 = np.percentile(results["bare"], [50, 99])
+    print(f"{method} x {n_requests} requests (microseconds)")
+    print(f"{'stack':<10} {'p50':>9} {'p99':>9} {'p50 overhead':>14} {'p99 overhead':>14}")
+    for variant, latencies in results.items():
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"{variant:<10} {p50:>9.1f} {p99:>9.1f} {p50 - bare_p50:>14.1f} {p99 - bare_p99:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark middleware overhead")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--method", choices=["GET", "POST"], default="GET")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.method))
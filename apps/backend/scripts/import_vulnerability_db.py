@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Import OSV and NVD vulnerability dumps into the local vulnerability index
+used by AI-BOM scans (e.g. for air-gapped deployments)
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.vulnerability_index import VulnerabilityIndex, get_vulnerability_index
+
+
+def import_dumps(paths, db_path=None):
+    """Import every dump into the index"""
+    index = VulnerabilityIndex(db_path) if db_path else get_vulnerability_index()
+    for path in paths:
+        if not Path(path).exists():
+            print(f"Skipping missing dump: {path}")
+            continue
+        counts = index.import_path(path)
+        print(f"{path}: {counts['osv']} OSV records, {counts['nvd']} NVD CVEs")
+    stats = index.stats()
+    print(f"Index: {stats['advisories']} advisories for {stats['affected_packages']} packages")
+    index.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import vulnerability dumps")
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="OSV all.zip archives or record JSON files, NVD 2.0 JSON feeds (.json or .json.gz), or directories of them"
+    )
+    parser.add_argument("--db", help="Index path (defaults to the configured vulnerability_db_path)")
+    args = parser.parse_args()
+    import_dumps(args.paths, args.db)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Rebuild the dataset and test result metadata catalogs from the JSON files on disk
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.metadata_catalog import MetadataCatalog
+
+
+def rebuild(paths):
+    """Re-index every storage root"""
+    for path in paths:
+        if not os.path.isdir(path):
+            print(f"Skipping missing storage path: {path}")
+            continue
+        catalog = MetadataCatalog(path)
+        counts = catalog.rebuild()
+        catalog.close()
+        print(f"{path}: {counts['datasets']} datasets, {counts['test_results']} test results")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild metadata catalogs")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[
+            os.getenv("DATASET_STORAGE_PATH", "./uploads/datasets"),
+            os.getenv("TEST_RESULTS_PATH", "./uploads/test_results"),
+        ],
+        help="Storage roots to re-index (defaults to the dataset and test result paths)"
+    )
+    rebuild(parser.parse_args().paths)
@@ -0,0 +1,303 @@
+"""
+Batched audit log sink for FairMind backend.
+
+Request handlers hand audit records to a bounded in-process queue; a single
+background flusher writes them to ``audit_logs`` in multi-row batches, by
+size or after a flush interval, whichever comes first.
+"""
+
+import os
+import json
+import uuid
+import asyncio
+import logging
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger("fairmind.audit")
+
+AUDIT_COLUMNS = (
+    "id", "action", "resource_type", "status", "ip_address",
+    "user_agent", "details", "error_message", "timestamp",
+)
+
+AuditWriter = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+
+class AuditOverflowPolicy(str, Enum):
+    """What to do with a record when the queue is full."""
+    BLOCK = "block"  # Wait for space (backpressure on the request)
+    SPILL = "spill"  # Append to the local spill file
+    DROP = "drop"    # Discard and count
+
+
+async def write_audit_batch(records: List[Dict[str, Any]]) -> None:
+    """
+    Write a batch of audit records through the shared database manager.
+
+    PostgreSQL batches go through ``COPY``; other databases get one
+    multi-row ``INSERT``.
+    """
+    from config.database import db_manager
+
+    if db_manager._pool is not None:
+        async with db_manager._pool.acquire() as connection:
+            await connection.copy_records_to_table(
+                "audit_logs",
+                records=[
+                    tuple(
+                        uuid.UUID(record["id"]) if column == "id" else record[column]
+                        for column in AUDIT_COLUMNS
+                    )
+                    for record in records
+                ],
+                columns=list(AUDIT_COLUMNS),
+            )
+        return
+
+    if db_manager.database is None:
+        raise RuntimeError("Database not initialized")
+
+    placeholders, values = [], {}
+    for i, record in enumerate(records):
+        placeholders.append("(" + ", ".join(f":{column}_{i}" for column in AUDIT_COLUMNS) + ")")
+        for column in AUDIT_COLUMNS:
+            values[f"{column}_{i}"] = record[column]
+    await db_manager.database.execute(
+        f"INSERT INTO audit_logs ({', '.join(AUDIT_COLUMNS)}) VALUES {', '.join(placeholders)}",
+        values,
+    )
+
+
+class AuditSink:
+    """
+    Bounded queue plus background batch writer for audit records.
+
+    ``submit`` never creates a task or opens a connection. When the queue is
+    full the overflow policy applies. Batches that fail to write are spilled
+    (when a spill file is configured) rather than retried in the request path.
+    ``stop`` drains the queue, spilling whatever cannot be written in time.
+    """
+
+    def __init__(
+        self,
+        writer: AuditWriter = write_audit_batch,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        overflow_policy: str = AuditOverflowPolicy.SPILL,
+        spill_path: Optional[str] = None
+    ):
+        self.writer = writer
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = AuditOverflowPolicy(overflow_policy)
+        self.spill_path = spill_path
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._in_flight: List[Dict[str, Any]] = []
+        self._stopping = False
+
+        self.submitted = 0
+        self.written = 0
+        self.spilled = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._flusher is not None and not self._flusher.done()
+
+    def _ensure_queue(self):
+        if self._queue is None:
+            self._bind_queue()
+
+    def _bind_queue(self):
+        """
+        A new queue and event for the running event loop, keeping whatever is
+        queued: both bind to the loop that first waits on them, so they are
+        rebuilt whenever the flusher starts (e.g. after a restart on a new loop).
+        """
+        pending = self._drain(self._queue.qsize()) if self._queue is not None else []
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._batch_ready = asyncio.Event()
+        for record in pending:
+            self._queue.put_nowait(record)
+
+    def _on_flusher_done(self, task: asyncio.Task):
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.error(
+            f"Audit sink flusher failed; records are queued until it is restarted: {self.stats()}",
+            exc_info=task.exception()
+        )
+
+    async def start(self):
+        """Start the background flusher (idempotent)."""
+        if self.running:
+            return
+        self._bind_queue()
+        self._stopping = False
+        self._flusher = asyncio.create_task(self._run())
+        self._flusher.add_done_callback(self._on_flusher_done)
+        logger.info(
+            f"Audit sink started (batch_size={self.batch_size}, "
+            f"flush_interval={self.flush_interval}s, overflow={self.overflow_policy.value})"
+        )
+
+    async def stop(self, timeout: float = 10.0):
+        """Flush everything queued, then stop the flusher."""
+        if not self.running:
+            return
+        self._stopping = True
+        self._batch_ready.set()
+        try:
+            await asyncio.wait_for(self._flusher, timeout)
+        except asyncio.TimeoutError:
+            self._flusher.cancel()
+            # The batch being written may or may not have landed; keep it
+            remaining = self._in_flight + self._drain(self._queue.qsize())
+            logger.warning(f"Audit sink drain timed out; spilling {len(remaining)} records")
+            self._overflow(remaining)
+        finally:
+            self._flusher = None
+        logger.info(f"Audit sink stopped: {self.stats()}")
+
+    async def submit(self, record: Dict[str, Any]) -> bool:
+        """Queue one record. Returns False if it was spilled or dropped."""
+        self._ensure_queue()
+        self.submitted += 1
+        if self.overflow_policy is AuditOverflowPolicy.BLOCK and self.running:
+            await self._queue.put(record)
+        else:
+            try:
+                self._queue.put_nowait(record)
+            except asyncio.QueueFull:
+                self._overflow([record])
+                return False
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "submitted": self.submitted,
+            "written": self.written,
+            "spilled": self.spilled,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+        }
+
+    async def flush(self):
+        """Write everything currently queued, in batches."""
+        while self._queue is not None and not self._queue.empty():
+            await self._write(self._drain(self.batch_size))
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+                timed_out = False
+            except asyncio.TimeoutError:
+                timed_out = True
+            self._batch_ready.clear()
+            if timed_out or self._stopping:
+                await self.flush()
+            else:
+                # Size trigger: write full batches, leave the remainder for the timer
+                while self._queue.qsize() >= self.batch_size:
+                    await self._write(self._drain(self.batch_size))
+            if self._stopping:
+                return
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        self._in_flight = batch
+        try:
+            await self.writer(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed_batches += 1
+            logger.warning(f"Could not persist {len(batch)} audit records: {e}")
+            if self.spill_path:
+                self._spill(batch)
+            else:
+                self._drop(batch)
+        finally:
+            self._in_flight = []
+
+    def _overflow(self, records: List[Dict[str, Any]]):
+        if self.overflow_policy is not AuditOverflowPolicy.DROP and self.spill_path:
+            self._spill(records)
+        else:
+            self._drop(records)
+
+    def _drop(self, records: List[Dict[str, Any]]):
+        previous = self.dropped
+        self.dropped += len(records)
+        # Warn on the first drop and then once per thousand
+        if previous == 0 or previous // 1000 != self.dropped // 1000:
+            logger.warning(f"Audit records dropped: {self.dropped} so far")
+
+    def _spill(self, records: List[Dict[str, Any]]):
+        """Append records as JSON lines to the spill file."""
+        try:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(record, default=str) + "\n" for record in records)
+            self.spilled += len(records)
+        except Exception as e:
+            self._drop(records)
+            logger.error(f"Could not spill {len(records)} audit records: {e}")
+
+
+def build_audit_record(
+    action: str,
+    status: str,
+    resource_type: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None,
+    error_message: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build an ``audit_logs`` row."""
+    return {
+        "id": str(uuid.uuid4()),
+        "action": action,
+        "resource_type": resource_type,
+        "status": status,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "details": json.dumps(details or {}, default=str),
+        "error_message": error_message,
+        "timestamp": datetime.utcnow(),
+    }
+
+
+# Global audit sink instance
+audit_sink = AuditSink(
+    max_queue_size=settings.audit_queue_size,
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval_seconds,
+    overflow_policy=settings.audit_overflow_policy,
+    spill_path=settings.audit_log_file or os.path.join(settings.database_dir, "audit_spill.jsonl"),
+)
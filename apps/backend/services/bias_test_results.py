@@ -9,6 +9,8 @@ import logging
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 
+from .metadata_catalog import MetadataCatalog
+
 logger = logging.getLogger(__name__)
 
 # Import MLOps integration (lazy import to avoid circular dependencies)
@@ -30,6 +32,13 @@ class BiasTestResultService:
         
         # Ensure local storage directory exists
         os.makedirs(self.local_storage_path, exist_ok=True)
+        
+        # Indexed listing catalog; listings fall back to a directory scan without it
+        try:
+            self.catalog: Optional[MetadataCatalog] = MetadataCatalog(self.local_storage_path)
+        except Exception as e:
+            logger.warning(f"Metadata catalog unavailable, listing from disk: {e}")
+            self.catalog = None
     
     async def save_test_result(
         self,
@@ -118,6 +127,9 @@ class BiasTestResultService:
             with open(result_path, 'w') as f:
                 json.dump(test_record, f, indent=2)
             
+            if self.catalog:
+                self.catalog.upsert_test_result(test_record)
+            
             logger.info(f"Test result saved locally: {result_path}")
             
         except Exception as e:
@@ -156,11 +168,48 @@ class BiasTestResultService:
         offset: int = 0
     ) -> List[Dict[str, Any]]:
         """List test results with optional filtering"""
+        page = await self.list_test_results_page(
+            user_id, model_id=model_id, test_type=test_type, limit=limit, offset=offset
+        )
+        return page["items"]
+    
+    async def list_test_results_page(
+        self,
+        user_id: str,
+        model_id: Optional[str] = None,
+        test_type: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List test results with filtering and keyset pagination
+        
+        Args:
+            since: Only results at or after this ISO timestamp
+            until: Only results before this ISO timestamp
+            cursor: ``next_cursor`` from the previous page (replaces offset)
+        
+        Returns:
+            Dict with ``items`` and ``next_cursor`` (None on the last page)
+        """
         try:
-            return await self._list_local(user_id, model_id, test_type, limit, offset)
+            if self.catalog:
+                try:
+                    items, next_cursor = self.catalog.list_test_results(
+                        user_id, model_id, test_type, since, until, limit, offset, cursor
+                    )
+                    return {"items": items, "next_cursor": next_cursor}
+                except Exception as e:
+                    logger.warning(f"Catalog listing failed, scanning disk: {e}")
+            
+            items = await self._list_local(user_id, model_id, test_type, limit, offset, since, until)
+            return {"items": items, "next_cursor": None}
         except Exception as e:
             logger.error(f"Failed to list test results: {e}")
-            return []
+            return {"items": [], "next_cursor": None}
     
     async def _list_local(
         self,
@@ -168,7 +217,9 @@ class BiasTestResultService:
         model_id: Optional[str],
         test_type: Optional[str],
         limit: int,
-        offset: int
+        offset: int,
+        since: Optional[str] = None,
+        until: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """List test results from local storage"""
         try:
@@ -187,6 +238,10 @@ class BiasTestResultService:
                             continue
                         if test_type and result.get("test_type") != test_type:
                             continue
+                        if since and result["timestamp"] < since:
+                            continue
+                        if until and result["timestamp"] >= until:
+                            continue
                         
                         # Return summary only
                         results.append({
@@ -217,6 +272,8 @@ class BiasTestResultService:
             result_path = os.path.join(self.local_storage_path, user_id, f"{test_id}.json")
             if os.path.exists(result_path):
                 os.remove(result_path)
+            if self.catalog:
+                self.catalog.delete_test_result(test_id, user_id)
             
             logger.info(f"Test result deleted: {test_id}")
             return True
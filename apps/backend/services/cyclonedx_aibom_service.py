@@ -13,9 +13,7 @@ Based on CycloneDX specification for AI/ML components:
 
 import os
 import json
-import hashlib
 import subprocess
-import requests
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
@@ -23,6 +21,9 @@ import logging
 from dataclasses import dataclass, asdict
 import uuid
 
+from .project_file_scanner import ProjectFileScanner, ProjectScan, get_project_file_scanner
+from .vulnerability_index import PackageQuery, VulnerabilityIndex, get_vulnerability_index
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -54,13 +55,44 @@ class CycloneDXBOM:
 class CycloneDXAIBOMService:
     """CycloneDX AI/ML-BOM Service with vulnerability detection and visualization"""
     
-    def __init__(self):
-        self.vulnerability_sources = {
-            "nvd": "https://services.nvd.nist.gov/rest/json/cves/2.0",
-            "osv": "https://api.osv.dev/v1/query",
-            "github": "https://api.github.com/advisories"
-        }
-        
+    # Model file extensions and the framework each implies
+    MODEL_FRAMEWORKS = {
+        '.pkl': 'scikit-learn',
+        '.joblib': 'scikit-learn',
+        '.h5': 'tensorflow',
+        '.onnx': 'onnx',
+        '.pt': 'pytorch',
+        '.pth': 'pytorch',
+        '.xgb': 'xgboost',
+        '.lgb': 'lightgbm',
+        '.pb': 'tensorflow'
+    }
+    DATASET_EXTENSIONS = ['.csv', '.parquet', '.json', '.hdf5', '.h5', '.npz', '.pkl']
+    # Package URL types and their OSV ecosystems
+    PURL_ECOSYSTEMS = {'pypi': 'PyPI', 'npm': 'npm'}
+    
+    def __init__(
+        self,
+        file_scanner: Optional[ProjectFileScanner] = None,
+        vulnerability_index: Optional[VulnerabilityIndex] = None
+    ):
+        self._file_scanner = file_scanner
+        self._vulnerability_index = vulnerability_index
+        
+    @property
+    def file_scanner(self) -> ProjectFileScanner:
+        """The injected scanner, or the shared one (opened on first scan)"""
+        if self._file_scanner is None:
+            self._file_scanner = get_project_file_scanner()
+        return self._file_scanner
+    
+    @property
+    def vulnerability_index(self) -> VulnerabilityIndex:
+        """The injected index, or the shared one (opened on first scan)"""
+        if self._vulnerability_index is None:
+            self._vulnerability_index = get_vulnerability_index()
+        return self._vulnerability_index
+    
     async def generate_aibom(self, 
                            project_path: str, 
                            organization_id: str,
@@ -142,11 +174,16 @@ class CycloneDXAIBOMService:
         # Scan for Python dependencies
         components.extend(await self._scan_python_dependencies(project_path))
         
+        # One walk over the project finds and hashes model and dataset files
+        file_scan = await self.file_scanner.scan(
+            str(project_path), [*self.MODEL_FRAMEWORKS, *self.DATASET_EXTENSIONS]
+        )
+        
         # Scan for ML model files
-        components.extend(await self._scan_ml_models(project_path))
+        components.extend(await self._scan_ml_models(project_path, file_scan))
         
         # Scan for datasets
-        components.extend(await self._scan_datasets(project_path))
+        components.extend(await self._scan_datasets(project_path, file_scan))
         
         # Scan for configuration files
         components.extend(await self._scan_config_files(project_path))
@@ -210,76 +247,58 @@ class CycloneDXAIBOMService:
         
         return components
     
-    async def _scan_ml_models(self, project_path: Path) -> List[CycloneDXComponent]:
+    async def _scan_ml_models(self, project_path: Path, file_scan: Optional[ProjectScan] = None) -> List[CycloneDXComponent]:
         """Scan for ML model files"""
         components = []
-        model_extensions = ['.pkl', '.joblib', '.h5', '.onnx', '.pt', '.pth', '.xgb', '.lgb', '.pb']
+        if file_scan is None:
+            file_scan = await self.file_scanner.scan(str(project_path), self.MODEL_FRAMEWORKS)
         
-        for ext in model_extensions:
-            for model_file in project_path.rglob(f"*{ext}"):
-                # Calculate file hash
-                file_hash = self._calculate_file_hash(model_file)
-                
-                # Determine framework based on extension
-                framework_map = {
-                    '.pkl': 'scikit-learn',
-                    '.joblib': 'scikit-learn',
-                    '.h5': 'tensorflow',
-                    '.onnx': 'onnx',
-                    '.pt': 'pytorch',
-                    '.pth': 'pytorch',
-                    '.xgb': 'xgboost',
-                    '.lgb': 'lightgbm',
-                    '.pb': 'tensorflow'
-                }
-                
-                framework = framework_map.get(ext, 'unknown')
-                
-                component = CycloneDXComponent(
-                    type="model",
-                    name=model_file.name,
-                    version="1.0.0",
-                    description=f"ML model file: {model_file.name}",
-                    bomRef=f"file://{model_file.relative_to(project_path)}",
-                    properties=[
-                        {"name": "framework", "value": framework},
-                        {"name": "file_extension", "value": ext},
-                        {"name": "file_size", "value": str(model_file.stat().st_size)},
-                        {"name": "file_hash", "value": file_hash},
-                        {"name": "model_type", "value": "trained_model"}
-                    ]
-                )
-                components.append(component)
+        for model_file in file_scan.matching(self.MODEL_FRAMEWORKS):
+            if model_file.sha256 is None:
+                continue
+            
+            component = CycloneDXComponent(
+                type="model",
+                name=model_file.name,
+                version="1.0.0",
+                description=f"ML model file: {model_file.name}",
+                bomRef=f"file://{model_file.relative_path}",
+                properties=[
+                    {"name": "framework", "value": self.MODEL_FRAMEWORKS[model_file.extension]},
+                    {"name": "file_extension", "value": model_file.extension},
+                    {"name": "file_size", "value": str(model_file.size)},
+                    {"name": "file_hash", "value": model_file.sha256},
+                    {"name": "model_type", "value": "trained_model"}
+                ]
+            )
+            components.append(component)
         
         return components
     
-    async def _scan_datasets(self, project_path: Path) -> List[CycloneDXComponent]:
+    async def _scan_datasets(self, project_path: Path, file_scan: Optional[ProjectScan] = None) -> List[CycloneDXComponent]:
         """Scan for dataset files"""
         components = []
-        dataset_extensions = ['.csv', '.parquet', '.json', '.hdf5', '.h5', '.npz', '.pkl']
+        if file_scan is None:
+            file_scan = await self.file_scanner.scan(str(project_path), self.DATASET_EXTENSIONS)
         
-        for ext in dataset_extensions:
-            for dataset_file in project_path.rglob(f"*{ext}"):
-                # Skip if it's in a cache or temp directory
-                if any(part in str(dataset_file) for part in ['__pycache__', '.git', 'node_modules', 'venv']):
-                    continue
-                
-                file_hash = self._calculate_file_hash(dataset_file)
-                
-                component = CycloneDXComponent(
-                    type="dataset",
-                    name=dataset_file.name,
-                    version="1.0.0",
-                    description=f"Dataset file: {dataset_file.name}",
-                    bomRef=f"file://{dataset_file.relative_to(project_path)}",
-                    properties=[
-                        {"name": "file_extension", "value": ext},
-                        {"name": "file_size", "value": str(dataset_file.stat().st_size)},
-                        {"name": "file_hash", "value": file_hash},
-                        {"name": "dataset_type", "value": "data_file"}
-                    ]
-                )
-                components.append(component)
+        for dataset_file in file_scan.matching(self.DATASET_EXTENSIONS):
+            if dataset_file.sha256 is None:
+                continue
+            
+            component = CycloneDXComponent(
+                type="dataset",
+                name=dataset_file.name,
+                version="1.0.0",
+                description=f"Dataset file: {dataset_file.name}",
+                bomRef=f"file://{dataset_file.relative_path}",
+                properties=[
+                    {"name": "file_extension", "value": dataset_file.extension},
+                    {"name": "file_size", "value": str(dataset_file.size)},
+                    {"name": "file_hash", "value": dataset_file.sha256},
+                    {"name": "dataset_type", "value": "data_file"}
+                ]
+            )
+            components.append(component)
         
         return components
     
@@ -360,126 +379,56 @@ class CycloneDXAIBOMService:
         return dependencies
     
     async def _scan_vulnerabilities(self, components: List[CycloneDXComponent]) -> List[Dict[str, Any]]:
-        """Scan for vulnerabilities in components"""
-        vulnerabilities = []
-        
-        for component in components:
-            if component.type == "library" and component.purl:
-                # Check NVD for vulnerabilities
-                nvd_vulns = await self._check_nvd_vulnerabilities(component)
-                vulnerabilities.extend(nvd_vulns)
-                
-                # Check OSV for vulnerabilities
-                osv_vulns = await self._check_osv_vulnerabilities(component)
-                vulnerabilities.extend(osv_vulns)
-        
-        return vulnerabilities
-    
-    async def _check_nvd_vulnerabilities(self, component: CycloneDXComponent) -> List[Dict[str, Any]]:
-        """Check NVD database for vulnerabilities"""
+        """Scan for vulnerabilities in components, with one batched index lookup"""
         vulnerabilities = []
         
+        libraries = [c for c in components if c.type == "library" and c.purl]
+        queries = [self._package_query(component.purl) for component in libraries]
         try:
-            # Extract package info from purl
-            if component.purl and component.purl.startswith("pkg:pypi/"):
-                package_name = component.purl.split("/")[1].split("@")[0]
-                
-                # Query NVD API
-                url = f"{self.vulnerability_sources['nvd']}?keyword={package_name}"
-                response = requests.get(url, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    for vuln in data.get("vulnerabilities", []):
-                        cve = vuln.get("cve", {})
-                        vuln_id = cve.get("id")
-                        
-                        if vuln_id:
-                            vulnerability = {
-                                "id": vuln_id,
-                                "source": {
-                                    "name": "NVD",
-                                    "url": f"https://nvd.nist.gov/vuln/detail/{vuln_id}"
-                                },
-                                "ratings": [
-                                    {
-                                        "source": {
-                                            "name": "NVD"
-                                        },
-                                        "score": cve.get("metrics", {}).get("cvssMetricV31", [{}])[0].get("cvssData", {}).get("baseScore"),
-                                        "severity": cve.get("metrics", {}).get("cvssMetricV31", [{}])[0].get("cvssData", {}).get("baseSeverity")
-                                    }
-                                ],
-                                "description": cve.get("descriptions", [{}])[0].get("value", ""),
-                                "affects": [
-                                    {
-                                        "ref": component.bomRef
-                                    }
-                                ]
-                            }
-                            vulnerabilities.append(vulnerability)
-        
+            matches = await self.vulnerability_index.lookup_async(queries)
         except Exception as e:
-            logger.warning(f"Error checking NVD vulnerabilities for {component.name}: {e}")
-        
-        return vulnerabilities
-    
-    async def _check_osv_vulnerabilities(self, component: CycloneDXComponent) -> List[Dict[str, Any]]:
-        """Check OSV database for vulnerabilities"""
-        vulnerabilities = []
-        
-        try:
-            if component.purl and component.purl.startswith("pkg:pypi/"):
-                package_name = component.purl.split("/")[1].split("@")[0]
-                
-                # Query OSV API
-                query = {
-                    "package": {
-                        "name": package_name,
-                        "ecosystem": "PyPI"
-                    }
-                }
-                
-                response = requests.post(self.vulnerability_sources["osv"], json=query, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    for vuln in data.get("vulns", []):
-                        vulnerability = {
-                            "id": vuln.get("id"),
+            logger.warning(f"Error checking vulnerabilities: {e}")
+            return vulnerabilities
+        
+        for component, advisories in zip(libraries, matches):
+            for advisory in advisories:
+                vulnerabilities.append({
+                    "id": advisory.id,
+                    "source": {
+                        "name": advisory.source,
+                        "url": (
+                            f"https://nvd.nist.gov/vuln/detail/{advisory.id}" if advisory.source == "NVD"
+                            else f"https://osv.dev/vulnerability/{advisory.id}"
+                        )
+                    },
+                    "ratings": [
+                        {
                             "source": {
-                                "name": "OSV",
-                                "url": f"https://ossf.github.io/osv-schema/#{vuln.get('id')}"
+                                "name": advisory.source
                             },
-                            "ratings": [
-                                {
-                                    "source": {
-                                        "name": "OSV"
-                                    },
-                                    "severity": vuln.get("severity", [{}])[0].get("type", "unknown")
-                                }
-                            ],
-                            "description": vuln.get("summary", ""),
-                            "affects": [
-                                {
-                                    "ref": component.bomRef
-                                }
-                            ]
+                            "score": advisory.cvss_score,
+                            "severity": advisory.severity or "unknown"
                         }
-                        vulnerabilities.append(vulnerability)
-        
-        except Exception as e:
-            logger.warning(f"Error checking OSV vulnerabilities for {component.name}: {e}")
+                    ],
+                    "description": advisory.summary,
+                    "affects": [
+                        {
+                            "ref": component.bomRef
+                        }
+                    ]
+                })
         
         return vulnerabilities
     
-    def _calculate_file_hash(self, file_path: Path) -> str:
-        """Calculate SHA256 hash of a file"""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        return sha256_hash.hexdigest()
+    def _package_query(self, purl: str) -> PackageQuery:
+        """Index query for a package URL such as ``pkg:pypi/name@version``"""
+        package_type, _, rest = purl[len("pkg:"):].partition("/")
+        name, _, version = rest.partition("@")
+        return PackageQuery(
+            ecosystem=self.PURL_ECOSYSTEMS.get(package_type.lower()),
+            name=name.strip(),
+            version=version.strip() or None
+        )
     
     def _get_config_category(self, filename: str) -> str:
         """Get configuration category based on filename"""
@@ -1,29 +1,100 @@
 """
 Dataset Storage Service - Persistent local storage for uploaded datasets.
 Neon/Postgres is used for app DB; dataset blobs are stored on local filesystem.
+
+Uploads are converted to Parquet (typed, low-cardinality strings stored as
+categoricals) when pyarrow is installed, so audits can read just the columns
+and rows they need. Datasets stored as CSV remain readable.
 """
 
 import os
 import io
+import asyncio
 import json
 import logging
 import hashlib
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Iterator
 from datetime import datetime, timezone
 import pandas as pd
 
+from fairness_library.streaming import StreamingFairnessAccumulator, accumulate_frames
+
+from .metadata_catalog import MetadataCatalog
+
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# (column, op, value) predicates, as accepted by pyarrow's Parquet reader
+RowFilters = List[Tuple[str, str, Any]]
+
+# String columns with at most this fraction of distinct values are stored as categoricals
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+
+def _optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Store repetitive string columns as categoricals to shrink the columnar file"""
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)) and len(series):
+            if series.nunique(dropna=True) <= CATEGORICAL_MAX_UNIQUE_RATIO * len(series):
+                df[col] = series.astype("category")
+    return df
+
+
+def _apply_filters(df: pd.DataFrame, filters: Optional[RowFilters]) -> pd.DataFrame:
+    """Apply (column, op, value) row filters to a DataFrame (CSV fallback path)"""
+    if not filters:
+        return df
+    mask = pd.Series(True, index=df.index)
+    for col, op, value in filters:
+        series = df[col]
+        if op in ("=", "=="):
+            mask &= series == value
+        elif op == "!=":
+            mask &= series != value
+        elif op == "<":
+            mask &= series < value
+        elif op == "<=":
+            mask &= series <= value
+        elif op == ">":
+            mask &= series > value
+        elif op == ">=":
+            mask &= series >= value
+        elif op == "in":
+            mask &= series.isin(value)
+        elif op == "not in":
+            mask &= ~series.isin(value)
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+    return df[mask].reset_index(drop=True)
+
 
 class DatasetStorageService:
     """Service for storing and retrieving datasets with metadata"""
     
     def __init__(self):
         self.local_storage_path = os.getenv("DATASET_STORAGE_PATH", "./uploads/datasets")
-        logger.info("Dataset storage initialized with local file system")
+        self.storage_format = os.getenv("DATASET_STORAGE_FORMAT", "parquet").lower()
+        if self.storage_format == "parquet" and not PYARROW_AVAILABLE:
+            logger.warning("pyarrow not installed, storing datasets as CSV")
+            self.storage_format = "csv"
+        logger.info(f"Dataset storage initialized with local file system ({self.storage_format})")
         
         # Ensure local storage directory exists
         os.makedirs(self.local_storage_path, exist_ok=True)
+        
+        # Indexed listing catalog; listings fall back to a directory scan without it
+        try:
+            self.catalog: Optional[MetadataCatalog] = MetadataCatalog(self.local_storage_path)
+        except Exception as e:
+            logger.warning(f"Metadata catalog unavailable, listing from disk: {e}")
+            self.catalog = None
     
     def _generate_dataset_id(self, user_id: str, filename: str) -> str:
         """Generate unique dataset ID"""
@@ -36,6 +107,17 @@ class DatasetStorageService:
         """Calculate MD5 hash of file content"""
         return hashlib.md5(content).hexdigest()
     
+    def _dataset_path(self, dataset_id: str, user_id: str) -> Tuple[Optional[str], Optional[str]]:
+        """Locate a stored dataset, preferring the columnar copy. Returns (path, format)"""
+        user_dir = os.path.join(self.local_storage_path, user_id)
+        parquet_path = os.path.join(user_dir, f"{dataset_id}.parquet")
+        if PYARROW_AVAILABLE and os.path.exists(parquet_path):
+            return parquet_path, "parquet"
+        csv_path = os.path.join(user_dir, f"{dataset_id}.csv")
+        if os.path.exists(csv_path):
+            return csv_path, "csv"
+        return None, None
+    
     async def upload_dataset(
         self,
         file_content: bytes,
@@ -73,7 +155,7 @@ class DatasetStorageService:
             }
             
             # Store file and metadata locally
-            await self._store_local(dataset_id, file_content, dataset_info)
+            await self._store_local(dataset_id, file_content, dataset_info, df)
             
             logger.info(f"Dataset uploaded successfully: {dataset_id}")
             return dataset_id, dataset_info
@@ -82,53 +164,156 @@ class DatasetStorageService:
             logger.error(f"Failed to upload dataset: {e}")
             raise Exception(f"Dataset upload failed: {str(e)}")
     
-    async def _store_local(self, dataset_id: str, file_content: bytes, dataset_info: Dict[str, Any]):
+    async def _store_local(
+        self,
+        dataset_id: str,
+        file_content: bytes,
+        dataset_info: Dict[str, Any],
+        df: Optional[pd.DataFrame] = None
+    ):
         """Store dataset in local file system"""
         try:
             # Create user directory
             user_dir = os.path.join(self.local_storage_path, dataset_info["user_id"])
             os.makedirs(user_dir, exist_ok=True)
             
-            # Save CSV file
-            csv_path = os.path.join(user_dir, f"{dataset_id}.csv")
-            with open(csv_path, 'wb') as f:
-                f.write(file_content)
+            # Save columnar file, falling back to the raw CSV
+            dataset_info["storage_format"] = "csv"
+            if self.storage_format == "parquet" and df is not None:
+                parquet_path = os.path.join(user_dir, f"{dataset_id}.parquet")
+                try:
+                    await asyncio.to_thread(
+                        _optimize_dtypes(df).to_parquet, parquet_path, index=False
+                    )
+                    dataset_info["storage_format"] = "parquet"
+                    logger.info(f"Dataset stored locally: {parquet_path}")
+                except Exception as e:
+                    logger.warning(f"Parquet conversion failed for {dataset_id}, keeping CSV: {e}")
+                    if os.path.exists(parquet_path):
+                        os.remove(parquet_path)
+            
+            if dataset_info["storage_format"] == "csv":
+                csv_path = os.path.join(user_dir, f"{dataset_id}.csv")
+                with open(csv_path, 'wb') as f:
+                    f.write(file_content)
+                logger.info(f"Dataset stored locally: {csv_path}")
             
             # Save metadata
             metadata_path = os.path.join(user_dir, f"{dataset_id}.json")
             with open(metadata_path, 'w') as f:
                 json.dump(dataset_info, f, indent=2)
             
-            logger.info(f"Dataset stored locally: {csv_path}")
+            if self.catalog:
+                self.catalog.upsert_dataset(dataset_info)
             
         except Exception as e:
             logger.error(f"Local storage error: {e}")
             raise
     
-    async def get_dataset(self, dataset_id: str, user_id: str) -> Optional[pd.DataFrame]:
-        """Retrieve dataset as pandas DataFrame"""
+    async def get_dataset(
+        self,
+        dataset_id: str,
+        user_id: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[RowFilters] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Retrieve dataset as pandas DataFrame
+        
+        Args:
+            columns: Only load these columns (all columns if None)
+            filters: Row predicates as (column, op, value) tuples, e.g.
+                [("split", "==", "test"), ("age", ">=", 18)]
+        """
         try:
-            return await self._get_local(dataset_id, user_id)
+            return await self._get_local(dataset_id, user_id, columns, filters)
         except Exception as e:
             logger.error(f"Failed to retrieve dataset {dataset_id}: {e}")
             return None
     
-    async def _get_local(self, dataset_id: str, user_id: str) -> Optional[pd.DataFrame]:
+    async def _get_local(
+        self,
+        dataset_id: str,
+        user_id: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[RowFilters] = None
+    ) -> Optional[pd.DataFrame]:
         """Retrieve dataset from local storage"""
         try:
-            csv_path = os.path.join(self.local_storage_path, user_id, f"{dataset_id}.csv")
+            path, storage_format = self._dataset_path(dataset_id, user_id)
             
-            if not os.path.exists(csv_path):
-                logger.warning(f"Dataset file not found: {csv_path}")
+            if path is None:
+                logger.warning(f"Dataset file not found: {dataset_id}")
                 return None
             
-            df = pd.read_csv(csv_path)
+            if storage_format == "parquet":
+                # Column projection and predicate pushdown happen inside the reader
+                return await asyncio.to_thread(
+                    pd.read_parquet, path, columns=columns, filters=filters or None, memory_map=True
+                )
+            
+            usecols = None
+            if columns is not None:
+                filter_cols = [col for col, _, _ in filters or [] if col not in columns]
+                usecols = list(columns) + filter_cols
+            df = await asyncio.to_thread(pd.read_csv, path, usecols=usecols)
+            df = _apply_filters(df, filters)
+            if columns is not None:
+                df = df[list(columns)]
             return df
             
         except Exception as e:
             logger.error(f"Local retrieval error: {e}")
             return None
     
+    def iter_dataset_chunks(
+        self,
+        dataset_id: str,
+        user_id: str,
+        columns: Optional[List[str]] = None,
+        chunksize: int = 100_000
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the dataset as DataFrame chunks without loading it whole"""
+        path, storage_format = self._dataset_path(dataset_id, user_id)
+        if path is None:
+            raise FileNotFoundError(f"Dataset file not found: {dataset_id}")
+        
+        if storage_format == "parquet":
+            parquet_file = pq.ParquetFile(path, memory_map=True)
+            for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+            return
+        
+        with pd.read_csv(path, usecols=columns, chunksize=chunksize) as reader:
+            yield from reader
+    
+    async def accumulate_fairness_statistics(
+        self,
+        dataset_id: str,
+        user_id: str,
+        prediction_col: str,
+        group_col: str,
+        label_col: Optional[str] = None,
+        score_col: Optional[str] = None,
+        chunksize: int = 100_000,
+        n_bins: int = 10
+    ) -> StreamingFairnessAccumulator:
+        """
+        Stream a stored dataset into mergeable fairness statistics.
+        
+        Only the referenced columns are parsed, one chunk at a time, in a worker
+        thread; call ``finalize()`` on the result to get the metrics.
+        """
+        columns = [c for c in (prediction_col, group_col, label_col, score_col) if c]
+        
+        def accumulate() -> StreamingFairnessAccumulator:
+            return accumulate_frames(
+                self.iter_dataset_chunks(dataset_id, user_id, columns, chunksize),
+                prediction_col, group_col, label_col, score_col, n_bins
+            )
+        
+        return await asyncio.to_thread(accumulate)
+    
     async def get_dataset_metadata(self, dataset_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Get dataset metadata without loading the full dataset"""
         try:
@@ -143,6 +328,33 @@ class DatasetStorageService:
     
     async def list_datasets(self, user_id: str, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
         """List all datasets for a user"""
+        page = await self.list_datasets_page(user_id, limit=limit, offset=offset)
+        return page["items"]
+    
+    async def list_datasets_page(
+        self,
+        user_id: str,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List datasets with keyset pagination
+        
+        Returns:
+            Dict with ``items`` and ``next_cursor`` (None on the last page)
+        """
+        if self.catalog:
+            try:
+                items, next_cursor = self.catalog.list_datasets(user_id, limit, offset, cursor)
+                return {"items": items, "next_cursor": next_cursor}
+            except Exception as e:
+                logger.warning(f"Catalog listing failed, scanning disk: {e}")
+        
+        return {"items": await self._list_local(user_id, limit, offset), "next_cursor": None}
+    
+    async def _list_local(self, user_id: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+        """List datasets by scanning the user's metadata files"""
         try:
             # List local files
             user_dir = os.path.join(self.local_storage_path, user_id)
@@ -175,13 +387,13 @@ class DatasetStorageService:
         """Delete a dataset"""
         try:
             # Delete local files
-            csv_path = os.path.join(self.local_storage_path, user_id, f"{dataset_id}.csv")
-            metadata_path = os.path.join(self.local_storage_path, user_id, f"{dataset_id}.json")
-            
-            if os.path.exists(csv_path):
-                os.remove(csv_path)
-            if os.path.exists(metadata_path):
-                os.remove(metadata_path)
+            user_dir = os.path.join(self.local_storage_path, user_id)
+            for extension in ("parquet", "csv", "json"):
+                path = os.path.join(user_dir, f"{dataset_id}.{extension}")
+                if os.path.exists(path):
+                    os.remove(path)
+            if self.catalog:
+                self.catalog.delete_dataset(dataset_id, user_id)
             return True
                 
         except Exception as e:
@@ -4,11 +4,12 @@ Based on industry standards (Fairlearn, AIF360, AWS Clarify).
 """
 
 import numpy as np
-import pandas as pd
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from fairness_library.kernels import GroupedConfusion, grouped_confusion_matrix
+
 
 class FairnessMetric(Enum):
     """Supported fairness metrics"""
@@ -46,7 +47,8 @@ class FairnessCalculator:
         self,
         predictions: np.ndarray,
         protected_attribute: np.ndarray,
-        positive_label: int = 1
+        positive_label: int = 1,
+        confusion: Optional[GroupedConfusion] = None
     ) -> FairnessResult:
         """
         Demographic Parity (Statistical Parity):
@@ -54,15 +56,11 @@ class FairnessCalculator:
         
         Measures if positive prediction rate is equal across groups.
         """
-        df = pd.DataFrame({
-            'prediction': predictions,
-            'group': protected_attribute
-        })
+        if confusion is None:
+            confusion = self._confusion(None, predictions, protected_attribute, positive_label)
         
         # Calculate positive rate for each group
-        group_rates = df.groupby('group')['prediction'].apply(
-            lambda x: (x == positive_label).mean()
-        ).to_dict()
+        group_rates = confusion.by_group(confusion.selection_rate)
         
         # Calculate disparity (min/max ratio)
         rates = list(group_rates.values())
@@ -95,7 +93,8 @@ class FairnessCalculator:
         predictions: np.ndarray,
         ground_truth: np.ndarray,
         protected_attribute: np.ndarray,
-        positive_label: int = 1
+        positive_label: int = 1,
+        confusion: Optional[GroupedConfusion] = None
     ) -> FairnessResult:
         """
         Equalized Odds:
@@ -103,36 +102,16 @@ class FairnessCalculator:
         
         Measures if TPR and FPR are equal across groups.
         """
-        df = pd.DataFrame({
-            'prediction': predictions,
-            'truth': ground_truth,
-            'group': protected_attribute
-        })
-        
-        group_scores = {}
-        tpr_scores = {}
-        fpr_scores = {}
-        
-        for group in df['group'].unique():
-            group_data = df[df['group'] == group]
-            
-            # True Positive Rate (Recall)
-            tp = ((group_data['prediction'] == positive_label) & 
-                  (group_data['truth'] == positive_label)).sum()
-            fn = ((group_data['prediction'] != positive_label) & 
-                  (group_data['truth'] == positive_label)).sum()
-            tpr = tp / (tp + fn) if (tp + fn) > 0 else 0
-            
-            # False Positive Rate
-            fp = ((group_data['prediction'] == positive_label) & 
-                  (group_data['truth'] != positive_label)).sum()
-            tn = ((group_data['prediction'] != positive_label) & 
-                  (group_data['truth'] != positive_label)).sum()
-            fpr = fp / (fp + tn) if (fp + tn) > 0 else 0
-            
-            tpr_scores[group] = tpr
-            fpr_scores[group] = fpr
-            group_scores[group] = (tpr + (1 - fpr)) / 2  # Combined score
+        if confusion is None:
+            confusion = self._confusion(ground_truth, predictions, protected_attribute, positive_label)
+        
+        # True Positive Rate (Recall) and False Positive Rate per group
+        tpr = np.nan_to_num(confusion.true_positive_rate, nan=0.0)
+        fpr = np.nan_to_num(confusion.false_positive_rate, nan=0.0)
+        
+        tpr_scores = confusion.by_group(tpr)
+        fpr_scores = confusion.by_group(fpr)
+        group_scores = confusion.by_group((tpr + (1 - fpr)) / 2)  # Combined score
         
         # Calculate disparity
         tpr_values = list(tpr_scores.values())
@@ -163,7 +142,8 @@ class FairnessCalculator:
         predictions: np.ndarray,
         ground_truth: np.ndarray,
         protected_attribute: np.ndarray,
-        positive_label: int = 1
+        positive_label: int = 1,
+        confusion: Optional[GroupedConfusion] = None
     ) -> FairnessResult:
         """
         Equal Opportunity:
@@ -171,25 +151,11 @@ class FairnessCalculator:
         
         Measures if TPR (recall) is equal across groups.
         """
-        df = pd.DataFrame({
-            'prediction': predictions,
-            'truth': ground_truth,
-            'group': protected_attribute
-        })
-        
-        group_scores = {}
-        
-        for group in df['group'].unique():
-            group_data = df[df['group'] == group]
-            
-            # True Positive Rate for positive class
-            tp = ((group_data['prediction'] == positive_label) & 
-                  (group_data['truth'] == positive_label)).sum()
-            fn = ((group_data['prediction'] != positive_label) & 
-                  (group_data['truth'] == positive_label)).sum()
-            
-            tpr = tp / (tp + fn) if (tp + fn) > 0 else 0
-            group_scores[group] = tpr
+        if confusion is None:
+            confusion = self._confusion(ground_truth, predictions, protected_attribute, positive_label)
+        
+        # True Positive Rate for positive class
+        group_scores = confusion.by_group(confusion.true_positive_rate, fill=0.0)
         
         # Calculate disparity
         scores = list(group_scores.values())
@@ -215,7 +181,8 @@ class FairnessCalculator:
         predictions: np.ndarray,
         ground_truth: np.ndarray,
         protected_attribute: np.ndarray,
-        positive_label: int = 1
+        positive_label: int = 1,
+        confusion: Optional[GroupedConfusion] = None
     ) -> FairnessResult:
         """
         Predictive Parity (Precision Parity):
@@ -223,25 +190,11 @@ class FairnessCalculator:
         
         Measures if precision is equal across groups.
         """
-        df = pd.DataFrame({
-            'prediction': predictions,
-            'truth': ground_truth,
-            'group': protected_attribute
-        })
-        
-        group_scores = {}
-        
-        for group in df['group'].unique():
-            group_data = df[df['group'] == group]
-            
-            # Precision
-            tp = ((group_data['prediction'] == positive_label) & 
-                  (group_data['truth'] == positive_label)).sum()
-            fp = ((group_data['prediction'] == positive_label) & 
-                  (group_data['truth'] != positive_label)).sum()
-            
-            precision = tp / (tp + fp) if (tp + fp) > 0 else 0
-            group_scores[group] = precision
+        if confusion is None:
+            confusion = self._confusion(ground_truth, predictions, protected_attribute, positive_label)
+        
+        # Precision
+        group_scores = confusion.by_group(confusion.positive_predictive_value, fill=0.0)
         
         # Calculate disparity
         scores = list(group_scores.values())
@@ -272,25 +225,40 @@ class FairnessCalculator:
         """Calculate all applicable fairness metrics"""
         results = {}
         
+        # One grouped confusion tensor feeds every metric below
+        confusion = self._confusion(ground_truth, predictions, protected_attribute, positive_label)
+        
         # Demographic Parity (doesn't need ground truth)
         results['demographic_parity'] = self.calculate_demographic_parity(
-            predictions, protected_attribute, positive_label
+            predictions, protected_attribute, positive_label, confusion=confusion
         )
         
         if ground_truth is not None:
             # Metrics that require ground truth
             results['equalized_odds'] = self.calculate_equalized_odds(
-                predictions, ground_truth, protected_attribute, positive_label
+                predictions, ground_truth, protected_attribute, positive_label, confusion=confusion
             )
             results['equal_opportunity'] = self.calculate_equal_opportunity(
-                predictions, ground_truth, protected_attribute, positive_label
+                predictions, ground_truth, protected_attribute, positive_label, confusion=confusion
             )
             results['predictive_parity'] = self.calculate_predictive_parity(
-                predictions, ground_truth, protected_attribute, positive_label
+                predictions, ground_truth, protected_attribute, positive_label, confusion=confusion
             )
         
         return results
     
+    def _confusion(
+        self,
+        ground_truth: Optional[np.ndarray],
+        predictions: np.ndarray,
+        protected_attribute: np.ndarray,
+        positive_label: int
+    ) -> GroupedConfusion:
+        """Grouped confusion tensor shared by every rate metric"""
+        return grouped_confusion_matrix(
+            ground_truth, predictions, protected_attribute, positive_label
+        )
+    
     # Interpretation helpers
     def _interpret_demographic_parity(self, group_rates: Dict, disparity: float) -> str:
         """Generate human-readable interpretation"""
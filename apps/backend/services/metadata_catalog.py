@@ -0,0 +1,300 @@
+"""
+Metadata Catalog - Indexed SQLite catalog over local JSON metadata files.
+
+Dataset sidecars and bias test result files remain the source of truth on
+disk; the catalog mirrors their listing fields so that listings are filtered,
+ordered and paginated by an index instead of reading every file per request.
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILENAME = "catalog.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    dataset_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    filename TEXT,
+    rows INTEGER,
+    columns TEXT,
+    uploaded_at TEXT NOT NULL,
+    file_size_bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_datasets_user_uploaded
+    ON datasets (user_id, uploaded_at DESC, dataset_id DESC);
+
+CREATE TABLE IF NOT EXISTS test_results (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    model_id TEXT,
+    dataset_id TEXT,
+    test_type TEXT,
+    timestamp TEXT NOT NULL,
+    overall_risk TEXT,
+    metrics_passed INTEGER,
+    metrics_failed INTEGER,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_test_results_user_time
+    ON test_results (user_id, timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_test_results_user_model_time
+    ON test_results (user_id, model_id, timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_test_results_user_type_time
+    ON test_results (user_id, test_type, timestamp DESC, id DESC);
+"""
+
+
+def encode_cursor(timestamp: str, item_id: str) -> str:
+    """Build an opaque keyset cursor from the last item of a page"""
+    return f"{timestamp}|{item_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Split a keyset cursor into (timestamp, id)"""
+    timestamp, sep, item_id = cursor.rpartition("|")
+    if not sep:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return timestamp, item_id
+
+
+class MetadataCatalog:
+    """
+    SQLite index of dataset and test result metadata under a storage root.
+
+    Listings use keyset pagination on (timestamp, id): pass the
+    ``next_cursor`` of one page to fetch the next, which costs the same
+    regardless of how deep the page is.
+    """
+
+    def __init__(self, storage_path: str, filename: str = CATALOG_FILENAME):
+        self.storage_path = storage_path
+        self.db_path = os.path.join(storage_path, filename)
+        os.makedirs(storage_path, exist_ok=True)
+
+        is_new = not os.path.exists(self.db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        if is_new:
+            # First start after upgrade: index what is already on disk
+            counts = self.rebuild()
+            logger.info(f"Metadata catalog created at {self.db_path}: {counts}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            with self._conn:
+                return self._conn.execute(sql, params).fetchall()
+
+    # Writes
+
+    def upsert_dataset(self, dataset_info: Dict[str, Any]):
+        """Insert or update a dataset's listing fields"""
+        self._execute(
+            """
+            INSERT OR REPLACE INTO datasets
+                (dataset_id, user_id, filename, rows, columns, uploaded_at, file_size_bytes)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            self._dataset_row(dataset_info)
+        )
+
+    def upsert_test_result(self, test_record: Dict[str, Any]):
+        """Insert or update a test result's listing fields"""
+        self._execute(
+            """
+            INSERT OR REPLACE INTO test_results
+                (id, user_id, model_id, dataset_id, test_type, timestamp,
+                 overall_risk, metrics_passed, metrics_failed, summary)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            self._test_result_row(test_record)
+        )
+
+    def delete_dataset(self, dataset_id: str, user_id: str):
+        self._execute(
+            "DELETE FROM datasets WHERE dataset_id = ? AND user_id = ?", (dataset_id, user_id)
+        )
+
+    def delete_test_result(self, test_id: str, user_id: str):
+        self._execute(
+            "DELETE FROM test_results WHERE id = ? AND user_id = ?", (test_id, user_id)
+        )
+
+    @staticmethod
+    def _dataset_row(info: Dict[str, Any]) -> Tuple:
+        return (
+            info["dataset_id"],
+            info["user_id"],
+            info.get("filename"),
+            info.get("rows"),
+            json.dumps(info.get("columns", [])),
+            info["uploaded_at"],
+            info.get("file_size_bytes"),
+        )
+
+    @staticmethod
+    def _test_result_row(record: Dict[str, Any]) -> Tuple:
+        return (
+            record["id"],
+            record["user_id"],
+            record.get("model_id"),
+            record.get("dataset_id"),
+            record.get("test_type"),
+            record["timestamp"],
+            record.get("overall_risk"),
+            record.get("metrics_passed", 0),
+            record.get("metrics_failed", 0),
+            record.get("summary", ""),
+        )
+
+    # Reads
+
+    def list_datasets(
+        self,
+        user_id: str,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List a user's datasets, newest first. Returns (items, next_cursor)"""
+        sql = "SELECT * FROM datasets WHERE user_id = ?"
+        params: List[Any] = [user_id]
+        if cursor:
+            uploaded_at, dataset_id = decode_cursor(cursor)
+            sql += " AND (uploaded_at, dataset_id) < (?, ?)"
+            params += [uploaded_at, dataset_id]
+        sql += " ORDER BY uploaded_at DESC, dataset_id DESC LIMIT ? OFFSET ?"
+        params += [limit, 0 if cursor else offset]
+
+        rows = self._execute(sql, tuple(params))
+        items = [
+            {
+                "id": row["dataset_id"],
+                "filename": row["filename"],
+                "rows": row["rows"],
+                "columns": json.loads(row["columns"]),
+                "uploaded_at": row["uploaded_at"],
+                "file_size_bytes": row["file_size_bytes"]
+            }
+            for row in rows
+        ]
+        next_cursor = None
+        if len(items) == limit:
+            next_cursor = encode_cursor(items[-1]["uploaded_at"], items[-1]["id"])
+        return items, next_cursor
+
+    def list_test_results(
+        self,
+        user_id: str,
+        model_id: Optional[str] = None,
+        test_type: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List a user's test results, newest first. Returns (items, next_cursor)
+
+        ``since``/``until`` bound the ISO timestamp (inclusive/exclusive).
+        ``offset`` is ignored when a cursor is given.
+        """
+        sql = "SELECT * FROM test_results WHERE user_id = ?"
+        params: List[Any] = [user_id]
+        if model_id:
+            sql += " AND model_id = ?"
+            params.append(model_id)
+        if test_type:
+            sql += " AND test_type = ?"
+            params.append(test_type)
+        if since:
+            sql += " AND timestamp >= ?"
+            params.append(since)
+        if until:
+            sql += " AND timestamp < ?"
+            params.append(until)
+        if cursor:
+            timestamp, test_id = decode_cursor(cursor)
+            sql += " AND (timestamp, id) < (?, ?)"
+            params += [timestamp, test_id]
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"
+        params += [limit, 0 if cursor else offset]
+
+        rows = self._execute(sql, tuple(params))
+        items = [
+            {
+                "id": row["id"],
+                "model_id": row["model_id"],
+                "dataset_id": row["dataset_id"],
+                "test_type": row["test_type"],
+                "timestamp": row["timestamp"],
+                "overall_risk": row["overall_risk"],
+                "metrics_passed": row["metrics_passed"],
+                "metrics_failed": row["metrics_failed"],
+                "summary": row["summary"]
+            }
+            for row in rows
+        ]
+        next_cursor = None
+        if len(items) == limit:
+            next_cursor = encode_cursor(items[-1]["timestamp"], items[-1]["id"])
+        return items, next_cursor
+
+    # Maintenance
+
+    def rebuild(self) -> Dict[str, int]:
+        """
+        Re-index every JSON metadata file under the storage root.
+
+        Files are classified by content: dataset sidecars carry ``dataset_id``
+        and test results carry ``id`` and ``test_type``. Existing rows for the
+        storage root are replaced.
+        """
+        datasets, test_results = [], []
+        for user_id in sorted(os.listdir(self.storage_path)):
+            user_dir = os.path.join(self.storage_path, user_id)
+            if not os.path.isdir(user_dir):
+                continue
+            for filename in os.listdir(user_dir):
+                if not filename.endswith('.json'):
+                    continue
+                path = os.path.join(user_dir, filename)
+                try:
+                    with open(path, 'r') as f:
+                        record = json.load(f)
+                    if "dataset_id" in record and "uploaded_at" in record:
+                        datasets.append(self._dataset_row(record))
+                    elif "id" in record and "timestamp" in record:
+                        test_results.append(self._test_result_row(record))
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable metadata file {path}: {e}")
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM datasets")
+                self._conn.execute("DELETE FROM test_results")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?, ?, ?, ?)", datasets
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO test_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    test_results
+                )
+
+        return {"datasets": len(datasets), "test_results": len(test_results)}
@@ -2,15 +2,20 @@
 Production-ready monitoring and alerting service for FairMind backend.
 """
 
+import re
 import time
 import asyncio
-from typing import Dict, Any, List, Optional
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Dict, Any, Iterable, List, Optional, Sequence, Tuple
 from datetime import datetime, timezone, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
 import json
 
+import numpy as np
+
 from config.settings import settings
 
 logger = logging.getLogger("fairmind.monitoring")
@@ -46,6 +51,24 @@ class Metric:
             self.labels = {}
 
 
+@dataclass
+class CollectedMetric:
+    """A value read at scrape time by a collector; rendered, never stored."""
+    name: str
+    value: float
+    metric_type: MetricType
+    labels: Dict[str, str] = None
+    
+    def __post_init__(self):
+        if self.labels is None:
+            self.labels = {}
+
+
+# Called on every scrape for the current values of state kept elsewhere
+# (e.g. cumulative cache hit/miss counts)
+MetricCollectorCallback = Callable[[], Iterable[CollectedMetric]]
+
+
 @dataclass
 class Alert:
     """Alert data structure."""
@@ -64,103 +87,263 @@ class Alert:
             self.metadata = {}
 
 
+# Default Prometheus histogram buckets (seconds), shared by histograms and timers
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_METRIC_TYPES = list(MetricType)
+_PROMETHEUS_TYPES = {
+    MetricType.COUNTER: "counter",
+    MetricType.GAUGE: "gauge",
+    MetricType.HISTOGRAM: "histogram",
+    MetricType.TIMER: "histogram",
+}
+
+
+def _prometheus_name(name: str) -> str:
+    """Map a dotted metric name to a valid Prometheus metric name."""
+    sanitized = re.sub(r"[^a-zA-Z0-9_:]", "_", name)
+    return sanitized if not sanitized[:1].isdigit() else f"_{sanitized}"
+
+
+def _prometheus_family(name: str, metric_type: MetricType) -> str:
+    """Prometheus family name of a metric; counters end in ``_total``."""
+    family = _prometheus_name(name)
+    if metric_type == MetricType.COUNTER and not family.endswith("_total"):
+        family += "_total"
+    return family
+
+
+def _prometheus_labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = []
+    for key, value in labels:
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{_prometheus_name(key)}="{escaped}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricSeries:
+    """Pre-aggregated state for one (name, labels) series."""
+    
+    __slots__ = ("series_id", "name", "labels", "metric_type", "value", "count", "sum", "bucket_counts")
+    
+    def __init__(self, series_id: int, name: str, labels: Tuple[Tuple[str, str], ...],
+                 metric_type: MetricType, n_buckets: int):
+        self.series_id = series_id
+        self.name = name
+        self.labels = labels
+        self.metric_type = metric_type
+        self.value = 0.0  # Counter total or last gauge value
+        self.count = 0
+        self.sum = 0.0
+        self.bucket_counts = [0] * (n_buckets + 1) if metric_type in (
+            MetricType.HISTOGRAM, MetricType.TIMER
+        ) else None
+    
+    def observe(self, value: float, buckets: Tuple[float, ...]):
+        self.count += 1
+        self.sum += value
+        if self.metric_type == MetricType.COUNTER:
+            self.value += value
+        elif self.metric_type == MetricType.GAUGE:
+            self.value = value
+        else:
+            self.bucket_counts[bisect_left(buckets, value)] += 1
+
+
 class MetricsCollector:
-    """Collect and store application metrics."""
+    """
+    Collect and store application metrics.
     
-    def __init__(self):
-        self.metrics: List[Metric] = []
-        self.max_metrics = 10000
+    Every (name, labels) pair is a pre-aggregated ``MetricSeries`` (counter
+    total, last gauge value, or bucketed histogram), so recording is O(1) and
+    exposition never touches raw samples. Raw samples are also kept in a
+    fixed-size array ring buffer for the dashboard's recent-metrics view.
+    """
+    
+    def __init__(self, max_metrics: int = 10000, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.max_metrics = max_metrics
+        self.buckets = tuple(sorted(buckets))
         self.start_time = time.time()
+        self.series: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], MetricSeries] = {}
+        self._series_by_id: List[MetricSeries] = []
+        self._series_by_name: Dict[str, List[int]] = {}
+        self._lock = Lock()
+        
+        # Ring buffer of raw samples
+        self._timestamps = np.zeros(max_metrics, dtype=np.float64)
+        self._values = np.zeros(max_metrics, dtype=np.float64)
+        self._series_ids = np.zeros(max_metrics, dtype=np.int64)
+        self._head = 0
+        self._size = 0
+        self._type_counts = [0] * len(_METRIC_TYPES)
     
     def counter(self, name: str, value: float = 1, labels: Dict[str, str] = None):
         """Record a counter metric."""
-        metric = Metric(
-            name=name,
-            value=value,
-            metric_type=MetricType.COUNTER,
-            timestamp=datetime.now(timezone.utc),
-            labels=labels or {}
-        )
-        self._store_metric(metric)
+        self._record(name, value, MetricType.COUNTER, labels)
     
     def gauge(self, name: str, value: float, labels: Dict[str, str] = None):
         """Record a gauge metric."""
-        metric = Metric(
-            name=name,
-            value=value,
-            metric_type=MetricType.GAUGE,
-            timestamp=datetime.now(timezone.utc),
-            labels=labels or {}
-        )
-        self._store_metric(metric)
+        self._record(name, value, MetricType.GAUGE, labels)
     
     def histogram(self, name: str, value: float, labels: Dict[str, str] = None):
         """Record a histogram metric."""
-        metric = Metric(
-            name=name,
-            value=value,
-            metric_type=MetricType.HISTOGRAM,
-            timestamp=datetime.now(timezone.utc),
-            labels=labels or {}
-        )
-        self._store_metric(metric)
+        self._record(name, value, MetricType.HISTOGRAM, labels)
     
     def timer(self, name: str, duration: float, labels: Dict[str, str] = None):
         """Record a timer metric."""
-        metric = Metric(
-            name=name,
-            value=duration,
-            metric_type=MetricType.TIMER,
-            timestamp=datetime.now(timezone.utc),
-            labels=labels or {}
-        )
-        self._store_metric(metric)
+        self._record(name, duration, MetricType.TIMER, labels)
     
-    def _store_metric(self, metric: Metric):
-        """Store metric and manage memory."""
-        self.metrics.append(metric)
-        
-        # Keep only recent metrics
-        if len(self.metrics) > self.max_metrics:
-            self.metrics = self.metrics[-self.max_metrics:]
+    def _get_series(self, name: str, metric_type: MetricType,
+                    labels: Optional[Dict[str, str]]) -> MetricSeries:
+        label_key = tuple(sorted(labels.items())) if labels else ()
+        key = (name, label_key)
+        series = self.series.get(key)
+        if series is None:
+            series = MetricSeries(len(self._series_by_id), name, label_key, metric_type, len(self.buckets))
+            self.series[key] = series
+            self._series_by_id.append(series)
+            self._series_by_name.setdefault(name, []).append(series.series_id)
+        return series
+    
+    def _record(self, name: str, value: float, metric_type: MetricType,
+                labels: Optional[Dict[str, str]]):
+        value = float(value)
+        now = time.time()
+        with self._lock:
+            series = self._get_series(name, metric_type, labels)
+            series.observe(value, self.buckets)
+            self._store_sample(series, value, now)
+    
+    def _store_sample(self, series: MetricSeries, value: float, timestamp: float):
+        """Write a raw sample into the ring buffer, overwriting the oldest."""
+        head = self._head
+        if self._size == self.max_metrics:
+            evicted = self._series_by_id[self._series_ids[head]]
+            self._type_counts[_METRIC_TYPES.index(evicted.metric_type)] -= 1
+        else:
+            self._size += 1
+        self._timestamps[head] = timestamp
+        self._values[head] = value
+        self._series_ids[head] = series.series_id
+        self._type_counts[_METRIC_TYPES.index(series.metric_type)] += 1
+        self._head = (head + 1) % self.max_metrics
+    
+    def _ordered(self) -> np.ndarray:
+        """Ring buffer positions in arrival order."""
+        if self._size < self.max_metrics:
+            return np.arange(self._size)
+        return (np.arange(self._size) + self._head) % self.max_metrics
     
     def get_metrics(self, 
                    name_filter: Optional[str] = None,
                    since: Optional[datetime] = None,
                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get metrics with optional filtering."""
-        filtered_metrics = self.metrics
-        
-        if name_filter:
-            filtered_metrics = [m for m in filtered_metrics if name_filter in m.name]
-        
-        if since:
-            filtered_metrics = [m for m in filtered_metrics if m.timestamp >= since]
-        
-        if limit:
-            filtered_metrics = filtered_metrics[-limit:]
-        
-        return [asdict(metric) for metric in filtered_metrics]
+        with self._lock:
+            positions = self._ordered()
+            
+            if name_filter:
+                # Match series names once, then select samples by series id
+                series_ids = [
+                    series_id
+                    for name, ids in self._series_by_name.items() if name_filter in name
+                    for series_id in ids
+                ]
+                positions = positions[np.isin(self._series_ids[positions], series_ids)]
+            
+            if since:
+                positions = positions[self._timestamps[positions] >= since.timestamp()]
+            
+            if limit:
+                positions = positions[-limit:]
+            
+            results = []
+            for position in positions.tolist():
+                series = self._series_by_id[self._series_ids[position]]
+                results.append({
+                    "name": series.name,
+                    "value": float(self._values[position]),
+                    "metric_type": series.metric_type,
+                    "timestamp": datetime.fromtimestamp(self._timestamps[position], timezone.utc),
+                    "labels": dict(series.labels),
+                })
+            return results
     
     def get_metric_summary(self) -> Dict[str, Any]:
         """Get summary of collected metrics."""
-        if not self.metrics:
-            return {"total_metrics": 0, "metric_types": {}, "time_range": None}
-        
-        metric_types = {}
-        for metric in self.metrics:
-            metric_type = metric.metric_type.value
-            metric_types[metric_type] = metric_types.get(metric_type, 0) + 1
+        with self._lock:
+            if not self._size:
+                return {"total_metrics": 0, "metric_types": {}, "time_range": None}
+            
+            oldest = self._head if self._size == self.max_metrics else 0
+            newest = (self._head - 1) % self.max_metrics
+            return {
+                "total_metrics": self._size,
+                "metric_types": {
+                    metric_type.value: count
+                    for metric_type, count in zip(_METRIC_TYPES, self._type_counts) if count
+                },
+                "time_range": {
+                    "start": datetime.fromtimestamp(self._timestamps[oldest], timezone.utc).isoformat(),
+                    "end": datetime.fromtimestamp(self._timestamps[newest], timezone.utc).isoformat(),
+                },
+                "series": len(self._series_by_id),
+                "uptime": time.time() - self.start_time,
+            }
+    
+    def render_prometheus(self, collectors: Sequence[MetricCollectorCallback] = ()) -> str:
+        """
+        Render all series in the Prometheus text exposition format (0.0.4).
+        
+        ``collectors`` are called for values read at scrape time; those are
+        rendered as they are and not recorded, so scrapes leave the stored
+        series untouched.
+        """
+        collected: Dict[str, List[CollectedMetric]] = {}
+        for collector in collectors:
+            try:
+                for metric in collector():
+                    collected.setdefault(metric.name, []).append(metric)
+            except Exception as e:
+                logger.warning(f"Metric collector {getattr(collector, '__name__', collector)} failed: {e}")
         
-        return {
-            "total_metrics": len(self.metrics),
-            "metric_types": metric_types,
-            "time_range": {
-                "start": min(m.timestamp for m in self.metrics).isoformat(),
-                "end": max(m.timestamp for m in self.metrics).isoformat(),
-            },
-            "uptime": time.time() - self.start_time,
-        }
+        with self._lock:
+            families: Dict[str, List[MetricSeries]] = {}
+            for series in self._series_by_id:
+                families.setdefault(series.name, []).append(series)
+            
+            lines = []
+            for name, members in families.items():
+                metric_type = members[0].metric_type
+                family = _prometheus_family(name, metric_type)
+                lines.append(f"# TYPE {family} {_PROMETHEUS_TYPES[metric_type]}")
+                
+                for series in members:
+                    if series.bucket_counts is None:
+                        lines.append(f"{family}{_prometheus_labels(series.labels)} {series.value!r}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float("inf"),), series.bucket_counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float("inf") else repr(bound)
+                        labels = _prometheus_labels(series.labels, f'le="{le}"')
+                        lines.append(f"{family}_bucket{labels} {cumulative}")
+                    lines.append(f"{family}_sum{_prometheus_labels(series.labels)} {series.sum!r}")
+                    lines.append(f"{family}_count{_prometheus_labels(series.labels)} {series.count}")
+            start_time = self.start_time
+        
+        for name, members in collected.items():
+            family = _prometheus_family(name, members[0].metric_type)
+            lines.append(f"# TYPE {family} {_PROMETHEUS_TYPES[members[0].metric_type]}")
+            for metric in members:
+                labels = tuple(sorted(metric.labels.items()))
+                lines.append(f"{family}{_prometheus_labels(labels)} {float(metric.value)!r}")
+        
+        lines.append("# TYPE fairmind_uptime_seconds gauge")
+        lines.append(f"fairmind_uptime_seconds {time.time() - start_time!r}")
+        return "\n".join(lines) + "\n"
 
 
 class AlertManager:
@@ -0,0 +1,317 @@
+"""
+Project File Scanner
+Single-pass, incremental file discovery and hashing for the AI-BOM scanners.
+
+The project tree is walked once with ``os.scandir``. Every file is classified
+by extension in the same pass, and vendored or generated directories
+(``.git``, ``node_modules``, virtualenvs, ``__pycache__``) are pruned rather
+than walked and filtered afterwards.
+
+Matched files are hashed (SHA-256) in a thread pool. ``hashlib`` releases the
+GIL while it digests large buffers, so model and dataset files hash in
+parallel, off the event loop: large files through ``mmap`` and smaller ones
+in 1 MiB chunks.
+
+Hashes are kept in a persistent cache keyed by path and checked against the
+file's size and mtime. A re-scan of an unchanged tree only stats files, and
+only changed files are read again.
+"""
+
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SKIP_DIRS = frozenset({".git", "__pycache__", "node_modules", "venv", ".venv"})
+
+# Read size for chunked hashing, and the size from which files are mmapped instead
+HASH_CHUNK_SIZE = 1024 * 1024
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    hashed_at REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class ScannedFile:
+    """A file matched during a project walk"""
+    path: str
+    relative_path: str
+    name: str
+    extension: str
+    size: int
+    mtime_ns: int
+    sha256: Optional[str] = None
+
+
+@dataclass
+class ProjectScan:
+    """Files found under ``root``, grouped by the extension they matched"""
+    root: str
+    files: Dict[str, List[ScannedFile]] = field(default_factory=dict)
+    directories: int = 0
+    hashed: int = 0
+    cache_hits: int = 0
+    errors: int = 0
+
+    def matching(self, extensions: Iterable[str]) -> List[ScannedFile]:
+        """Files with any of ``extensions``, grouped in the order given"""
+        return [f for ext in extensions for f in self.files.get(ext, [])]
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file; large files are mapped rather than read"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        else:
+            buffer = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buffer)
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+    return digest.hexdigest()
+
+
+class FileHashCache:
+    """
+    Persistent ``path -> (size, mtime_ns, sha256)`` map in SQLite (WAL).
+    A stored hash is only returned while the file's size and mtime match.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM file_hashes").fetchone()[0]
+
+    def lookup(self, files: Sequence[ScannedFile]) -> Dict[str, str]:
+        """Cached hashes of those ``files`` whose size and mtime are unchanged"""
+        found: Dict[str, str] = {}
+        with self._lock:
+            for file in files:
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, sha256 FROM file_hashes WHERE path = ?", (file.path,)
+                ).fetchone()
+                if row is not None and row[0] == file.size and row[1] == file.mtime_ns:
+                    found[file.path] = row[2]
+        return found
+
+    def store(self, files: Sequence[ScannedFile]):
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, sha256, hashed_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [(f.path, f.size, f.mtime_ns, f.sha256, now) for f in files if f.sha256]
+                )
+
+    def clear(self):
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM file_hashes")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ProjectFileScanner:
+    """
+    Walks a project once, classifying files by extension, and hashes the
+    matches in a thread pool through an optional ``FileHashCache``.
+    """
+
+    def __init__(
+        self,
+        hash_cache: Optional[FileHashCache] = None,
+        max_workers: int = 4,
+        skip_dirs: Iterable[str] = DEFAULT_SKIP_DIRS
+    ):
+        self.hash_cache = hash_cache
+        self.max_workers = max_workers
+        self.skip_dirs = frozenset(skip_dirs)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def walk(self, root: str, extensions: Iterable[str]) -> ProjectScan:
+        """
+        Every regular file under ``root`` whose name ends with one of
+        ``extensions`` (case-sensitive). A file is listed under each
+        extension it ends with.
+        """
+        root = os.path.abspath(root)
+        wanted = frozenset(extensions)
+        scan = ProjectScan(root=root, files={ext: [] for ext in wanted})
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            scan.directories += 1
+            try:
+                entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+            except OSError as e:
+                logger.warning(f"Cannot scan directory {directory}: {e}")
+                scan.errors += 1
+                continue
+            subdirectories = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self.skip_dirs:
+                            subdirectories.append(entry.path)
+                        continue
+                    matched = _matching_suffixes(entry.name, wanted)
+                    if not matched or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError as e:
+                    logger.warning(f"Cannot stat {entry.path}: {e}")
+                    scan.errors += 1
+                    continue
+                for ext in matched:
+                    scan.files[ext].append(ScannedFile(
+                        path=entry.path,
+                        relative_path=os.path.relpath(entry.path, root),
+                        name=entry.name,
+                        extension=ext,
+                        size=stat.st_size,
+                        mtime_ns=stat.st_mtime_ns,
+                    ))
+            # Reversed so directories come off the stack in name order
+            stack.extend(reversed(subdirectories))
+        return scan
+
+    async def scan(self, root: str, extensions: Iterable[str], hash_files: bool = True) -> ProjectScan:
+        """``walk`` off the event loop, then hash the matched files"""
+        scan = await asyncio.to_thread(self.walk, root, list(extensions))
+        if hash_files:
+            await self.hash_files(scan)
+        return scan
+
+    async def hash_files(self, scan: ProjectScan):
+        """
+        Fill in ``sha256`` for every file in ``scan``: from the cache where the
+        file is unchanged, otherwise by hashing it in the thread pool. A file
+        that cannot be read is left without a hash.
+        """
+        by_path: Dict[str, List[ScannedFile]] = {}
+        for files in scan.files.values():
+            for f in files:
+                by_path.setdefault(f.path, []).append(f)
+        if not by_path:
+            return
+        unique = [entries[0] for entries in by_path.values()]
+
+        cached: Dict[str, str] = {}
+        if self.hash_cache is not None:
+            try:
+                cached = await asyncio.to_thread(self.hash_cache.lookup, unique)
+            except Exception as e:
+                logger.error(f"File hash cache lookup failed: {e}")
+        scan.cache_hits = len(cached)
+
+        pending = [f for f in unique if f.path not in cached]
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self._get_executor(), hash_file, f.path) for f in pending),
+            return_exceptions=True
+        )
+        hashed: List[ScannedFile] = []
+        for f, result in zip(pending, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error hashing {f.path}: {result}")
+                scan.errors += 1
+                continue
+            cached[f.path] = result
+            hashed.append(f)
+        scan.hashed = len(hashed)
+
+        for path, entries in by_path.items():
+            for f in entries:
+                f.sha256 = cached.get(path)
+
+        if self.hash_cache is not None and hashed:
+            try:
+                await asyncio.to_thread(self.hash_cache.store, hashed)
+            except Exception as e:
+                logger.error(f"File hash cache store failed: {e}")
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="file-hash")
+        return self._executor
+
+
+def _matching_suffixes(name: str, extensions: frozenset) -> Tuple[str, ...]:
+    """Those of ``extensions`` that ``name`` ends with, checking each dot in it"""
+    matched = []
+    start = name.find(".")
+    while start != -1:
+        if name[start:] in extensions:
+            matched.append(name[start:])
+        start = name.find(".", start + 1)
+    return tuple(matched)
+
+
+_project_file_scanner: Optional[ProjectFileScanner] = None
+_scanner_lock = threading.Lock()
+
+
+def get_project_file_scanner() -> ProjectFileScanner:
+    """The process-wide scanner, with its hash cache opened on first use"""
+    global _project_file_scanner
+    with _scanner_lock:
+        if _project_file_scanner is None:
+            hash_cache = None
+            if settings.project_scan_hash_cache_enabled:
+                try:
+                    hash_cache = FileHashCache(
+                        settings.project_scan_hash_cache_path
+                        or os.path.join(settings.database_dir, "file_hash_cache.sqlite3")
+                    )
+                except Exception as e:
+                    logger.error(f"Cannot open file hash cache, hashing without it: {e}")
+            _project_file_scanner = ProjectFileScanner(
+                hash_cache=hash_cache,
+                max_workers=settings.project_scan_hash_workers,
+            )
+        return _project_file_scanner
@@ -0,0 +1,652 @@
+"""
+Vulnerability Index
+Local, indexed store of OSV and NVD advisories for AI-BOM vulnerability scans.
+
+Advisories are imported from OSV records (the per-ecosystem ``all.zip``
+dumps, or single JSON files) and NVD 2.0 JSON feeds into SQLite. Each
+affected package is stored with its version ranges, indexed by package and
+ecosystem. NVD entries are stored under the ``cpe`` ecosystem by CPE
+product name.
+
+- ``lookup`` checks every component of a BOM in one indexed query and
+  matches versions against the stored ranges; a component without a usable
+  version gets every advisory for its package.
+- With ``online_refresh``, ``lookup_async`` first re-queries packages not
+  refreshed within ``refresh_ttl`` through OSV's batch API and stores the
+  records. Network failures are logged and the local index is used as is,
+  so scans keep working offline and in air-gapped deployments (where the
+  index is filled with ``scripts/import_vulnerability_db.py``).
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from config.settings import settings
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    aiohttp = None
+
+try:
+    from packaging.version import InvalidVersion, Version
+    PACKAGING_AVAILABLE = True
+except ImportError:
+    PACKAGING_AVAILABLE = False
+    InvalidVersion = Version = None
+
+logger = logging.getLogger(__name__)
+
+# Ecosystem under which NVD advisories are stored, by CPE product name
+CPE_ECOSYSTEM = "cpe"
+
+# Bound on SQL variables per statement, and on OSV records per batch request or import
+SQL_BATCH_SIZE = 500
+OSV_BATCH_SIZE = 1000
+
+UNKNOWN_VERSIONS = {"", "*", "-", "latest", "unknown"}
+
+# A single version: no operators, separators or wildcards
+_PINNED_VERSION = re.compile(r"[0-9A-Za-z][0-9A-Za-z.+_-]*")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS advisories (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    summary TEXT,
+    details TEXT,
+    severity TEXT,
+    cvss_score REAL,
+    aliases TEXT NOT NULL,
+    reference_urls TEXT NOT NULL,
+    modified TEXT,
+    imported_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS affected (
+    advisory_id TEXT NOT NULL,
+    ecosystem TEXT NOT NULL,
+    package TEXT NOT NULL,
+    introduced TEXT,
+    introduced_inclusive INTEGER NOT NULL DEFAULT 1,
+    fixed TEXT,
+    last_affected TEXT,
+    version TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_affected_package ON affected (package, ecosystem);
+CREATE INDEX IF NOT EXISTS idx_affected_advisory ON affected (advisory_id);
+CREATE TABLE IF NOT EXISTS refreshed_packages (
+    ecosystem TEXT NOT NULL,
+    package TEXT NOT NULL,
+    refreshed_at REAL NOT NULL,
+    PRIMARY KEY (ecosystem, package)
+);
+"""
+
+
+@dataclass(frozen=True)
+class PackageQuery:
+    """A component to check; ``ecosystem`` None checks NVD (CPE) entries only"""
+    ecosystem: Optional[str]
+    name: str
+    version: Optional[str] = None
+
+
+@dataclass
+class Advisory:
+    """An advisory matching a queried package"""
+    id: str
+    source: str
+    summary: str = ""
+    details: str = ""
+    severity: Optional[str] = None
+    cvss_score: Optional[float] = None
+    aliases: List[str] = field(default_factory=list)
+    references: List[str] = field(default_factory=list)
+    affected_versions: List[str] = field(default_factory=list)
+    fixed_versions: List[str] = field(default_factory=list)
+
+
+def normalize_package(ecosystem: Optional[str], name: str) -> str:
+    """Index form of a package name: PEP 503 for PyPI and CPE products, lowercase for npm"""
+    if ecosystem in ("PyPI", CPE_ECOSYSTEM):
+        return re.sub(r"[-_.]+", "-", name).lower()
+    if ecosystem == "npm":
+        return name.lower()
+    return name
+
+
+def compare_versions(a: str, b: str) -> int:
+    """-1, 0 or 1 as ``a`` sorts before, equal to or after ``b``"""
+    if PACKAGING_AVAILABLE:
+        try:
+            va, vb = Version(a), Version(b)
+            return (va > vb) - (va < vb)
+        except InvalidVersion:
+            pass
+    ka, kb = _fallback_version_key(a), _fallback_version_key(b)
+    return (ka > kb) - (ka < kb)
+
+
+def _fallback_version_key(version: str) -> Tuple:
+    """
+    Sort key for versions ``packaging`` rejects (e.g. npm ``1.2.3-beta.1``):
+    the numeric release, then pre-releases before the release itself.
+    """
+    tokens = re.findall(r"\d+|[a-zA-Z]+", version.split("+", 1)[0])
+    release: List[int] = []
+    while tokens and tokens[0].isdigit():
+        release.append(int(tokens.pop(0)))
+    while release and release[-1] == 0:
+        release.pop()
+    rest = tuple((1, int(t), "") if t.isdigit() else (0, 0, t.lower()) for t in tokens)
+    return (tuple(release), 0 if rest else 1, rest)
+
+
+def _known_version(version: Optional[str]) -> Optional[str]:
+    """
+    The pinned version of ``version`` (``1.2.3``, ``v1.2.3``, ``==1.2.3``), or
+    None for anything else: a range or other specifier (``<2.0``, ``!=1.6``,
+    ``^1.0``, ``>=1.0,<2.0``) is not a version, so the component is checked
+    against every advisory for its package.
+    """
+    if version is None:
+        return None
+    version = version.strip()
+    if version.startswith("=="):
+        version = version[2:].lstrip("=").strip()
+    if version[:1] in ("v", "V") and version[1:2].isdigit():
+        version = version[1:]
+    if version.lower() in UNKNOWN_VERSIONS or not _PINNED_VERSION.fullmatch(version):
+        return None
+    return version
+
+
+class VulnerabilityIndex:
+    """
+    SQLite-backed advisory index (WAL). ``path`` may be ``":memory:"`` for an
+    index that lives as long as the object.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        online_refresh: bool = False,
+        refresh_ttl: float = 24 * 3600,
+        osv_url: str = "https://api.osv.dev/v1",
+        timeout: float = 10.0,
+        max_concurrency: int = 8
+    ):
+        self.path = path
+        self.online_refresh = online_refresh
+        self.refresh_ttl = refresh_ttl
+        self.osv_url = osv_url.rstrip("/")
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM advisories").fetchone()[0]
+
+    # Import
+
+    def import_osv(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """Store OSV records, replacing earlier versions of the same ids"""
+        rows = [row for row in (self._osv_rows(record) for record in records) if row is not None]
+        self._replace(rows)
+        return len(rows)
+
+    def import_nvd(self, feed: Mapping[str, Any]) -> int:
+        """Store the CVEs of an NVD 2.0 JSON feed (or API response)"""
+        rows = [
+            row for row in (self._nvd_rows(item.get("cve", {})) for item in feed.get("vulnerabilities", []))
+            if row is not None
+        ]
+        self._replace(rows)
+        return len(rows)
+
+    def import_path(self, path: str) -> Dict[str, int]:
+        """
+        Import a dump: an OSV or NVD JSON file (optionally gzipped), a zip of
+        OSV records, or a directory of any of those. Returns counts by source.
+        """
+        counts = {"osv": 0, "nvd": 0}
+        # OSV dumps hold one record per file; they are stored in batches
+        pending: List[Mapping[str, Any]] = []
+        for document in _read_documents(path):
+            try:
+                if isinstance(document, Mapping) and "vulnerabilities" in document:
+                    counts["nvd"] += self.import_nvd(document)
+                elif isinstance(document, list):
+                    pending.extend(document)
+                elif isinstance(document, Mapping):
+                    pending.append(document)
+                if len(pending) >= OSV_BATCH_SIZE:
+                    counts["osv"] += self.import_osv(pending)
+                    pending = []
+            except Exception as e:
+                logger.error(f"Error importing vulnerability data from {path}: {e}")
+        if pending:
+            counts["osv"] += self.import_osv(pending)
+        return counts
+
+    # Lookup
+
+    def lookup(self, queries: Sequence[PackageQuery]) -> List[List[Advisory]]:
+        """Advisories affecting each queried package, in query order, from one indexed query"""
+        wanted: Dict[Tuple[str, str], List[int]] = {}
+        for i, query in enumerate(queries):
+            if not query.name:
+                continue
+            if query.ecosystem:
+                wanted.setdefault((query.ecosystem, normalize_package(query.ecosystem, query.name)), []).append(i)
+            wanted.setdefault((CPE_ECOSYSTEM, normalize_package(CPE_ECOSYSTEM, query.name)), []).append(i)
+
+        rows_by_key: Dict[Tuple[str, str], List[tuple]] = {}
+        packages = sorted({package for _, package in wanted})
+        with self._lock:
+            for start in range(0, len(packages), SQL_BATCH_SIZE):
+                chunk = packages[start:start + SQL_BATCH_SIZE]
+                for row in self._conn.execute(
+                    f"""
+                    SELECT a.ecosystem, a.package, a.introduced, a.introduced_inclusive, a.fixed,
+                           a.last_affected, a.version, v.id, v.source, v.summary, v.details,
+                           v.severity, v.cvss_score, v.aliases, v.reference_urls
+                    FROM affected a JOIN advisories v ON v.id = a.advisory_id
+                    WHERE a.package IN ({",".join("?" * len(chunk))})
+                    """,
+                    chunk
+                ):
+                    rows_by_key.setdefault((row[0], row[1]), []).append(row)
+
+        results: List[List[Advisory]] = [[] for _ in queries]
+        for key, indices in wanted.items():
+            for row in rows_by_key.get(key, []):
+                for i in indices:
+                    self._match(results[i], row, _known_version(queries[i].version))
+        return [_drop_aliased(advisories) for advisories in results]
+
+    async def lookup_async(self, queries: Sequence[PackageQuery]) -> List[List[Advisory]]:
+        """``lookup`` off the event loop, after an online refresh when enabled"""
+        if self.online_refresh:
+            try:
+                await self.refresh(queries)
+            except Exception as e:
+                logger.warning(f"Online vulnerability refresh failed, using the local index: {e}")
+        return await asyncio.to_thread(self.lookup, queries)
+
+    # Online refresh
+
+    async def refresh(self, queries: Sequence[PackageQuery]) -> int:
+        """
+        Re-query OSV for packages not refreshed within ``refresh_ttl``, with one
+        batch request per 1000 packages, and store new or updated records.
+        A package is only marked refreshed once every changed record listed
+        for it was fetched and stored; otherwise it stays stale and is
+        retried on the next lookup. Returns the number of records stored.
+        """
+        if not AIOHTTP_AVAILABLE:
+            logger.warning("aiohttp not available; skipping online vulnerability refresh")
+            return 0
+        stale = await asyncio.to_thread(self._stale_packages, queries)
+        if not stale:
+            return 0
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            listed, ids_by_package = await self._query_batches(session, stale)
+            known = await asyncio.to_thread(self._modified_by_id, list(listed))
+            changed = [vuln_id for vuln_id, modified in listed.items() if known.get(vuln_id) != modified or not modified]
+
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def fetch(vuln_id: str) -> Optional[Dict[str, Any]]:
+                async with semaphore:
+                    try:
+                        async with session.get(f"{self.osv_url}/vulns/{vuln_id}") as response:
+                            response.raise_for_status()
+                            return await response.json()
+                    except Exception as e:
+                        logger.warning(f"Error fetching OSV record {vuln_id}: {e}")
+                        return None
+
+            fetched = dict(zip(changed, await asyncio.gather(*(fetch(v) for v in changed))))
+
+        stored = await asyncio.to_thread(self.import_osv, [record for record in fetched.values() if record])
+        present = await asyncio.to_thread(self._modified_by_id, changed)
+        missing = {vuln_id for vuln_id, record in fetched.items() if not record or vuln_id not in present}
+        refreshed = [package for package in stale if not ids_by_package.get(package, set()) & missing]
+        if len(refreshed) < len(stale):
+            logger.warning(
+                f"{len(stale) - len(refreshed)} packages left stale: "
+                f"{len(missing)} OSV records could not be fetched or stored"
+            )
+        await asyncio.to_thread(self._mark_refreshed, refreshed)
+        return stored
+
+    async def _query_batches(
+        self, session, packages: List[Tuple[str, str]]
+    ) -> Tuple[Dict[str, Optional[str]], Dict[Tuple[str, str], Set[str]]]:
+        """
+        Ids (and modified times) of the OSV advisories for ``packages``, and
+        the ids listed for each package, following page tokens
+        """
+        listed: Dict[str, Optional[str]] = {}
+        ids_by_package: Dict[Tuple[str, str], Set[str]] = {}
+        pending = [(ecosystem, name, None) for ecosystem, name in packages]
+        while pending:
+            batch, pending = pending[:OSV_BATCH_SIZE], pending[OSV_BATCH_SIZE:]
+            payload = {"queries": [
+                {"package": {"ecosystem": ecosystem, "name": name}, **({"page_token": token} if token else {})}
+                for ecosystem, name, token in batch
+            ]}
+            async with session.post(f"{self.osv_url}/querybatch", json=payload) as response:
+                response.raise_for_status()
+                data = await response.json()
+            for (ecosystem, name, _), result in zip(batch, data.get("results", [])):
+                for vuln in result.get("vulns", []):
+                    listed[vuln["id"]] = vuln.get("modified")
+                    ids_by_package.setdefault((ecosystem, name), set()).add(vuln["id"])
+                if result.get("next_page_token"):
+                    pending.append((ecosystem, name, result["next_page_token"]))
+        return listed, ids_by_package
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "advisories": self._conn.execute("SELECT COUNT(*) FROM advisories").fetchone()[0],
+                "affected_packages": self._conn.execute(
+                    "SELECT COUNT(*) FROM (SELECT DISTINCT ecosystem, package FROM affected)"
+                ).fetchone()[0],
+                "refreshed_packages": self._conn.execute("SELECT COUNT(*) FROM refreshed_packages").fetchone()[0],
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Storage helpers
+
+    def _replace(self, rows: List[Tuple[tuple, List[tuple]]]):
+        if not rows:
+            return
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                ids = [(advisory[0],) for advisory, _ in rows]
+                self._conn.executemany("DELETE FROM affected WHERE advisory_id = ?", ids)
+                self._conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO advisories
+                        (id, source, summary, details, severity, cvss_score, aliases, reference_urls,
+                         modified, imported_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [advisory + (now,) for advisory, _ in rows]
+                )
+                self._conn.executemany(
+                    """
+                    INSERT INTO affected
+                        (advisory_id, ecosystem, package, introduced, introduced_inclusive, fixed,
+                         last_affected, version)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [(advisory[0],) + entry for advisory, entries in rows for entry in entries]
+                )
+
+    def _stale_packages(self, queries: Sequence[PackageQuery]) -> List[Tuple[str, str]]:
+        packages = sorted({(q.ecosystem, q.name) for q in queries if q.ecosystem and q.name})
+        cutoff = time.time() - self.refresh_ttl
+        with self._lock:
+            fresh = {
+                (row[0], row[1])
+                for row in self._conn.execute(
+                    "SELECT ecosystem, package FROM refreshed_packages WHERE refreshed_at > ?", (cutoff,)
+                )
+            }
+        return [(e, n) for e, n in packages if (e, normalize_package(e, n)) not in fresh]
+
+    def _mark_refreshed(self, packages: List[Tuple[str, str]]):
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO refreshed_packages (ecosystem, package, refreshed_at) VALUES (?, ?, ?)",
+                    [(e, normalize_package(e, n), now) for e, n in packages]
+                )
+
+    def _modified_by_id(self, ids: List[str]) -> Dict[str, Optional[str]]:
+        found: Dict[str, Optional[str]] = {}
+        with self._lock:
+            for start in range(0, len(ids), SQL_BATCH_SIZE):
+                chunk = ids[start:start + SQL_BATCH_SIZE]
+                found.update(self._conn.execute(
+                    f"SELECT id, modified FROM advisories WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+        return found
+
+    @staticmethod
+    def _match(matched: List[Advisory], row: tuple, version: Optional[str]):
+        """Add the advisory in ``row`` to ``matched`` if ``version`` falls in its range"""
+        (_, _, introduced, inclusive, fixed, last_affected, exact,
+         vuln_id, source, summary, details, severity, cvss_score, aliases, references) = row
+
+        if version is not None:
+            if exact is not None:
+                hit = compare_versions(version, exact) == 0
+            else:
+                lower = (
+                    introduced in (None, "0")
+                    or compare_versions(version, introduced) > (-1 if inclusive else 0)
+                )
+                upper = (
+                    (fixed is None or compare_versions(version, fixed) < 0)
+                    and (last_affected is None or compare_versions(version, last_affected) <= 0)
+                )
+                hit = lower and upper
+            if not hit:
+                return
+
+        advisory = next((a for a in matched if a.id == vuln_id), None)
+        if advisory is None:
+            advisory = Advisory(
+                id=vuln_id,
+                source=source,
+                summary=summary or "",
+                details=details or "",
+                severity=severity,
+                cvss_score=cvss_score,
+                aliases=json.loads(aliases),
+                references=json.loads(references),
+            )
+            matched.append(advisory)
+        affected = _describe_range(introduced, inclusive, fixed, last_affected, exact)
+        if affected and affected not in advisory.affected_versions:
+            advisory.affected_versions.append(affected)
+        if fixed and fixed not in advisory.fixed_versions:
+            advisory.fixed_versions.append(fixed)
+
+    @staticmethod
+    def _osv_rows(record: Mapping[str, Any]) -> Optional[Tuple[tuple, List[tuple]]]:
+        vuln_id = record.get("id")
+        if not vuln_id:
+            return None
+        entries: List[tuple] = []
+        for affected in record.get("affected", []):
+            package = affected.get("package", {})
+            ecosystem = (package.get("ecosystem") or "").split(":", 1)[0]
+            if not ecosystem or not package.get("name"):
+                continue
+            name = normalize_package(ecosystem, package["name"])
+            for version in affected.get("versions", []):
+                entries.append((ecosystem, name, None, 1, None, None, version))
+            for version_range in affected.get("ranges", []):
+                if version_range.get("type") == "GIT":
+                    continue
+                introduced = None
+                for event in version_range.get("events", []):
+                    if "introduced" in event:
+                        introduced = event["introduced"]
+                    elif introduced is not None:
+                        # limit is an exclusive bound like fixed, but not a fix
+                        fixed = event.get("fixed") or event.get("limit")
+                        entries.append((ecosystem, name, introduced, 1, fixed, event.get("last_affected"), None))
+                        introduced = None
+                if introduced is not None:
+                    entries.append((ecosystem, name, introduced, 1, None, None, None))
+
+        database_specific = record.get("database_specific") or {}
+        severity = database_specific.get("severity")
+        advisory = (
+            vuln_id,
+            "OSV",
+            record.get("summary") or "",
+            record.get("details") or "",
+            severity.lower() if isinstance(severity, str) else None,
+            None,
+            json.dumps(record.get("aliases", [])),
+            json.dumps([ref.get("url") for ref in record.get("references", []) if ref.get("url")]),
+            record.get("modified"),
+        )
+        return advisory, entries
+
+    @staticmethod
+    def _nvd_rows(cve: Mapping[str, Any]) -> Optional[Tuple[tuple, List[tuple]]]:
+        vuln_id = cve.get("id")
+        if not vuln_id:
+            return None
+        entries: List[tuple] = []
+        for configuration in cve.get("configurations", []):
+            for node in configuration.get("nodes", []):
+                for cpe_match in node.get("cpeMatch", []):
+                    if not cpe_match.get("vulnerable", True):
+                        continue
+                    parts = cpe_match.get("criteria", "").split(":")
+                    if len(parts) < 6:
+                        continue
+                    name = normalize_package(CPE_ECOSYSTEM, parts[4])
+                    start_incl = cpe_match.get("versionStartIncluding")
+                    start_excl = cpe_match.get("versionStartExcluding")
+                    end_excl = cpe_match.get("versionEndExcluding")
+                    end_incl = cpe_match.get("versionEndIncluding")
+                    if any((start_incl, start_excl, end_excl, end_incl)):
+                        entries.append((
+                            CPE_ECOSYSTEM, name, start_incl or start_excl or "0", 0 if start_excl else 1,
+                            end_excl, end_incl, None
+                        ))
+                    elif parts[5] in ("*", "-"):
+                        entries.append((CPE_ECOSYSTEM, name, "0", 1, None, None, None))
+                    else:
+                        entries.append((CPE_ECOSYSTEM, name, None, 1, None, None, parts[5]))
+
+        metrics = cve.get("metrics", {})
+        cvss = next(
+            (metrics[key][0].get("cvssData", {}) for key in ("cvssMetricV31", "cvssMetricV30", "cvssMetricV2")
+             if metrics.get(key)),
+            {}
+        )
+        # CVSS v2 keeps its severity on the metric rather than in cvssData
+        severity = cvss.get("baseSeverity") or (metrics.get("cvssMetricV2") or [{}])[0].get("baseSeverity")
+        descriptions = cve.get("descriptions", [])
+        description = next((d.get("value", "") for d in descriptions if d.get("lang") == "en"), "")
+        advisory = (
+            vuln_id,
+            "NVD",
+            description,
+            description,
+            severity.lower() if isinstance(severity, str) else None,
+            cvss.get("baseScore"),
+            json.dumps([]),
+            json.dumps([ref.get("url") for ref in cve.get("references", []) if ref.get("url")]),
+            cve.get("lastModified"),
+        )
+        return advisory, entries
+
+
+def _describe_range(
+    introduced: Optional[str],
+    inclusive: int,
+    fixed: Optional[str],
+    last_affected: Optional[str],
+    exact: Optional[str]
+) -> str:
+    if exact is not None:
+        return f"=={exact}"
+    bounds = []
+    if introduced not in (None, "0"):
+        bounds.append(f"{'>=' if inclusive else '>'}{introduced}")
+    if fixed:
+        bounds.append(f"<{fixed}")
+    if last_affected:
+        bounds.append(f"<={last_affected}")
+    return ",".join(bounds) or "*"
+
+
+def _drop_aliased(advisories: List[Advisory]) -> List[Advisory]:
+    """Drop NVD entries already reported under an OSV advisory that aliases them"""
+    aliased = {alias for advisory in advisories for alias in advisory.aliases}
+    return [a for a in advisories if not (a.source == "NVD" and a.id in aliased)]
+
+
+def _read_documents(path: str) -> Iterator[Any]:
+    """Parsed JSON documents in a file, gzip file, zip archive or directory tree"""
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.endswith((".json", ".json.gz", ".zip")):
+                    yield from _read_documents(os.path.join(root, name))
+        return
+    try:
+        if path.endswith(".zip"):
+            with zipfile.ZipFile(path) as archive:
+                for member in archive.namelist():
+                    if member.endswith(".json"):
+                        yield json.loads(archive.read(member))
+        elif path.endswith(".gz"):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                yield json.load(f)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                yield json.load(f)
+    except Exception as e:
+        logger.error(f"Error reading vulnerability data {path}: {e}")
+
+
+_vulnerability_index: Optional[VulnerabilityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_vulnerability_index() -> VulnerabilityIndex:
+    """The process-wide vulnerability index, opened on first use"""
+    global _vulnerability_index
+    with _index_lock:
+        if _vulnerability_index is None:
+            _vulnerability_index = VulnerabilityIndex(
+                path=settings.vulnerability_db_path
+                or os.path.join(settings.database_dir, "vulnerabilities.sqlite3"),
+                online_refresh=settings.vulnerability_db_online_refresh,
+                refresh_ttl=settings.vulnerability_db_refresh_ttl,
+                osv_url=settings.vulnerability_db_osv_url,
+                timeout=settings.vulnerability_db_timeout,
+                max_concurrency=settings.vulnerability_db_refresh_concurrency,
+            )
+        return _vulnerability_index
@@ -1,97 +1,256 @@
 """
-Rate Limiting for AI Automation Features
+Rate Limiting Engine
 
-Prevents abuse of expensive LLM operations.
+GCRA (generic cell rate algorithm, a token bucket stored as a single
+"theoretical arrival time") rate limiting shared by the HTTP rate-limit
+middleware and the AI automation features.
+
+Each (policy, identity) pair costs one float of state. When Redis is
+connected all checks of a request run in one Lua script against Redis
+server time, so limits hold across uvicorn workers; otherwise an
+in-process store is used.
 """
 
-import logging
+import math
 import time
-from typing import Dict, Optional
-from datetime import datetime, timedelta
-from collections import defaultdict
-
-logger = logging.getLogger(__name__)
-
-
-class RateLimiter:
-    """Rate limiter for API endpoints"""
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
 
-    def __init__(self):
-        """Initialize rate limiter"""
-        self.requests: Dict[str, list] = defaultdict(list)
-        self.cleanup_interval = 3600  # Clean up old entries every hour
+from config.settings import settings
 
-    def is_allowed(
-        self,
-        user_id: str,
-        endpoint: str,
-        max_requests: int = 10,
-        window_seconds: int = 3600,
-    ) -> tuple[bool, Optional[str]]:
-        """
-        Check if request is allowed under rate limit.
+logger = logging.getLogger(__name__)
 
-        Args:
-            user_id: User identifier
-            endpoint: API endpoint
-            max_requests: Maximum requests allowed
-            window_seconds: Time window in seconds
+REDIS_KEY_PREFIX = "fairmind:ratelimit:"
+
+# KEYS: one bucket per policy. ARGV: emission interval and tolerance per key.
+# All buckets are updated only if every one of them allows the request.
+# Returns {allowed, now, tat_1, ..., tat_n}; floats as strings so Redis does
+# not truncate them.
+GCRA_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local allowed = 1
+local tats = {}
+for i, key in ipairs(KEYS) do
+    local emission = tonumber(ARGV[2 * i - 1])
+    local tolerance = tonumber(ARGV[2 * i])
+    local tat = tonumber(redis.call('GET', key)) or now
+    if tat < now then tat = now end
+    tats[i] = tat
+    if tat + emission - tolerance > now then allowed = 0 end
+end
+local reply = {allowed, tostring(now)}
+for i, key in ipairs(KEYS) do
+    if allowed == 1 then
+        local new_tat = tats[i] + tonumber(ARGV[2 * i - 1])
+        redis.call('SET', key, tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+    end
+    reply[i + 2] = tostring(tats[i])
+end
+return reply
+"""
 
-        Returns:
-            Tuple of (is_allowed, error_message)
-        """
-        key = f"{user_id}:{endpoint}"
-        now = time.time()
-        window_start = now - window_seconds
 
-        # Clean up old requests
-        self.requests[key] = [
-            req_time for req_time in self.requests[key]
-            if req_time > window_start
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """
+    ``limit`` requests per ``period`` seconds, bursting up to ``burst``.
+
+    ``scope`` selects the identity the bucket is keyed by: ``"client"`` (the
+    authenticated user, else the client IP), ``"user"`` (authenticated users
+    only) or ``"org"``. A policy with ``path_prefixes``/``methods`` only
+    applies to matching requests.
+    """
+    name: str
+    limit: int
+    period: float
+    burst: Optional[int] = None
+    scope: str = "client"
+    path_prefixes: Tuple[str, ...] = ()
+    methods: FrozenSet[str] = frozenset()
+
+    @property
+    def emission_interval(self) -> float:
+        return self.period / self.limit
+
+    @property
+    def tolerance(self) -> float:
+        return self.emission_interval * (self.burst or self.limit)
+
+    def applies_to(self, method: str, path: str) -> bool:
+        if self.methods and method not in self.methods:
+            return False
+        return not self.path_prefixes or path.startswith(self.path_prefixes)
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of one policy check."""
+    policy: RateLimitPolicy
+    allowed: bool
+    remaining: int
+    reset_after: float  # Seconds until the bucket is full again
+    retry_after: float  # Seconds until a request would be allowed (0 if allowed)
+
+    @property
+    def limit(self) -> int:
+        return self.policy.limit
+
+    def headers(self) -> List[Tuple[str, str]]:
+        """``X-RateLimit-*`` plus IETF draft ``RateLimit-*`` headers."""
+        reset = math.ceil(self.reset_after)
+        headers = [
+            ("X-RateLimit-Limit", str(self.limit)),
+            ("X-RateLimit-Remaining", str(self.remaining)),
+            ("X-RateLimit-Reset", str(int(time.time()) + reset)),
+            ("RateLimit-Limit", str(self.limit)),
+            ("RateLimit-Remaining", str(self.remaining)),
+            ("RateLimit-Reset", str(reset)),
+            ("RateLimit-Policy", f"{self.limit};w={int(self.policy.period)}"),
         ]
+        if not self.allowed:
+            headers.append(("Retry-After", str(max(1, math.ceil(self.retry_after)))))
+        return headers
+
+
+def _gcra_result(policy: RateLimitPolicy, tat: float, now: float, allowed: bool) -> RateLimitResult:
+    """Result for a bucket whose arrival time was ``tat`` before this request."""
+    emission, tolerance = policy.emission_interval, policy.tolerance
+    state = tat + emission if allowed else tat
+    remaining = int((tolerance - (state - now)) / emission + 1e-9)
+    retry_after = 0.0 if allowed else max(0.0, tat + emission - tolerance - now)
+    return RateLimitResult(
+        policy=policy,
+        allowed=allowed,
+        remaining=max(0, remaining),
+        reset_after=max(0.0, state - now),
+        retry_after=retry_after,
+    )
 
-        # Check if limit exceeded
-        if len(self.requests[key]) >= max_requests:
-            oldest_request = min(self.requests[key])
-            retry_after = int(oldest_request + window_seconds - now) + 1
-            error_msg = f"Rate limit exceeded. Retry after {retry_after} seconds"
-            logger.warning(f"Rate limit exceeded for {key}: {error_msg}")
-            return False, error_msg
-
-        # Record this request
-        self.requests[key].append(now)
-        return True, None
 
-    def get_remaining_requests(
-        self,
-        user_id: str,
-        endpoint: str,
-        max_requests: int = 10,
-        window_seconds: int = 3600,
-    ) -> int:
-        """
-        Get remaining requests for user.
-
-        Args:
-            user_id: User identifier
-            endpoint: API endpoint
-            max_requests: Maximum requests allowed
-            window_seconds: Time window in seconds
-
-        Returns:
-            Number of remaining requests
-        """
-        key = f"{user_id}:{endpoint}"
+class RateLimiter:
+    """
+    GCRA rate limiter with a Redis tier and an in-process fallback.
+
+    ``hit`` checks several (policy, identity) buckets atomically: the request
+    is counted against all of them or none.
+    """
+
+    def __init__(self, max_local_keys: int = 100000, use_redis: bool = True):
+        self.max_local_keys = max_local_keys
+        self.use_redis = use_redis
+        self._local: "OrderedDict[str, float]" = OrderedDict()
+        self._script = None
+        self._script_client = None
+
+    @staticmethod
+    def _key(policy: RateLimitPolicy, identity: str) -> str:
+        return f"{REDIS_KEY_PREFIX}{policy.name}:{identity}"
+
+    async def hit(self, checks: Sequence[Tuple[RateLimitPolicy, str]]) -> List[RateLimitResult]:
+        """Count one request against every (policy, identity) bucket."""
+        if not checks:
+            return []
+        redis_client = self._redis()
+        if redis_client is not None:
+            try:
+                return await self._hit_redis(redis_client, checks)
+            except Exception as e:
+                logger.warning(f"Redis rate limiting failed, falling back to in-memory: {e}")
+        return self._hit_local(checks)
+
+    async def peek(self, policy: RateLimitPolicy, identity: str) -> int:
+        """Remaining requests for a bucket, without counting a request."""
+        key = self._key(policy, identity)
         now = time.time()
-        window_start = now - window_seconds
-
-        # Clean up old requests
-        self.requests[key] = [
-            req_time for req_time in self.requests[key]
-            if req_time > window_start
+        tat = self._local.get(key)
+        redis_client = self._redis()
+        if redis_client is not None:
+            try:
+                value = await redis_client.get(key)
+                tat = float(value) if value is not None else None
+            except Exception as e:
+                logger.debug(f"Redis rate limit lookup failed: {e}")
+        return _gcra_result(policy, max(tat or now, now), now, allowed=False).remaining
+
+    def reset(self):
+        """Forget all in-process buckets (e.g. in tests)."""
+        self._local.clear()
+
+    def _redis(self):
+        if not self.use_redis:
+            return None
+        from config.cache import cache_manager
+        return cache_manager.redis_client
+
+    async def _hit_redis(self, redis_client, checks) -> List[RateLimitResult]:
+        if self._script is None or self._script_client is not redis_client:
+            self._script = redis_client.register_script(GCRA_SCRIPT)
+            self._script_client = redis_client
+        args = []
+        for policy, _ in checks:
+            args.extend((repr(policy.emission_interval), repr(policy.tolerance)))
+        reply = await self._script(keys=[self._key(p, i) for p, i in checks], args=args)
+        allowed, now = bool(int(reply[0])), float(reply[1])
+        return [
+            _gcra_result(policy, float(tat), now, allowed)
+            for (policy, _), tat in zip(checks, reply[2:])
         ]
 
-        return max(0, max_requests - len(self.requests[key]))
+    def _hit_local(self, checks) -> List[RateLimitResult]:
+        now = time.time()
+        self._evict(now)
+        keys = [self._key(policy, identity) for policy, identity in checks]
+        tats = [max(self._local.get(key, now), now) for key in keys]
+        allowed = all(
+            tat + policy.emission_interval - policy.tolerance <= now
+            for (policy, _), tat in zip(checks, tats)
+        )
+        if allowed:
+            for (policy, _), key, tat in zip(checks, keys, tats):
+                self._local[key] = tat + policy.emission_interval
+                self._local.move_to_end(key)
+        return [_gcra_result(policy, tat, now, allowed) for (policy, _), tat in zip(checks, tats)]
+
+    def _evict(self, now: float):
+        # Buckets are kept in update order; a bucket whose arrival time has
+        # passed is full again, so dropping it loses nothing
+        for _ in range(2):
+            if not self._local:
+                return
+            key, tat = next(iter(self._local.items()))
+            if tat > now:
+                break
+            del self._local[key]
+        while len(self._local) > self.max_local_keys:
+            self._local.popitem(last=False)
+
+
+def default_rate_limit_policies(requests_per_window: Optional[int] = None) -> List[RateLimitPolicy]:
+    """Per-client, per-org and LLM endpoint policies from settings."""
+    return [
+        RateLimitPolicy(
+            "client",
+            requests_per_window or settings.rate_limit_requests,
+            settings.rate_limit_window,
+        ),
+        RateLimitPolicy(
+            "org",
+            settings.rate_limit_org_requests,
+            settings.rate_limit_window,
+            scope="org",
+        ),
+        RateLimitPolicy(
+            "llm",
+            settings.rate_limit_llm_requests,
+            settings.rate_limit_llm_window,
+            path_prefixes=tuple(settings.rate_limit_llm_paths),
+            methods=frozenset({"POST"}),
+        ),
+    ]
 
 
 class AIAutomationRateLimiter:
@@ -106,11 +265,20 @@ class AIAutomationRateLimiter:
         "risk_prediction": {"max_requests": 5, "window_seconds": 3600},  # 5 per hour
     }
 
-    def __init__(self):
+    def __init__(self, limiter: Optional[RateLimiter] = None):
         """Initialize AI automation rate limiter"""
-        self.limiter = RateLimiter()
+        self.limiter = limiter or rate_limiter
+        self.policies: Dict[str, RateLimitPolicy] = {
+            feature: RateLimitPolicy(
+                f"ai:{feature}",
+                config["max_requests"],
+                config["window_seconds"],
+                scope="user",
+            )
+            for feature, config in self.LIMITS.items()
+        }
 
-    def check_limit(
+    async def check_limit(
         self,
         user_id: str,
         feature: str,
@@ -125,28 +293,20 @@ class AIAutomationRateLimiter:
         Returns:
             Tuple of (is_allowed, error_message, remaining_requests)
         """
-        if feature not in self.LIMITS:
+        if feature not in self.policies:
             logger.warning(f"Unknown feature for rate limiting: {feature}")
             return True, None, -1
 
-        limit_config = self.LIMITS[feature]
-        is_allowed, error_msg = self.limiter.is_allowed(
-            user_id,
-            feature,
-            max_requests=limit_config["max_requests"],
-            window_seconds=limit_config["window_seconds"],
-        )
-
-        remaining = self.limiter.get_remaining_requests(
-            user_id,
-            feature,
-            max_requests=limit_config["max_requests"],
-            window_seconds=limit_config["window_seconds"],
-        )
+        result = (await self.limiter.hit([(self.policies[feature], user_id)]))[0]
+        if not result.allowed:
+            retry_after = max(1, math.ceil(result.retry_after))
+            error_msg = f"Rate limit exceeded. Retry after {retry_after} seconds"
+            logger.warning(f"Rate limit exceeded for {user_id}:{feature}: {error_msg}")
+            return False, error_msg, 0
 
-        return is_allowed, error_msg, remaining
+        return True, None, result.remaining
 
-    def get_limits_info(self, user_id: str) -> Dict[str, Dict]:
+    async def get_limits_info(self, user_id: str) -> Dict[str, Dict]:
         """
         Get rate limit information for all features.
 
@@ -158,23 +318,17 @@ class AIAutomationRateLimiter:
         """
         info = {}
 
-        for feature, config in self.LIMITS.items():
-            remaining = self.limiter.get_remaining_requests(
-                user_id,
-                feature,
-                max_requests=config["max_requests"],
-                window_seconds=config["window_seconds"],
-            )
-
+        for feature, policy in self.policies.items():
             info[feature] = {
-                "max_requests": config["max_requests"],
-                "window_seconds": config["window_seconds"],
-                "remaining_requests": remaining,
-                "reset_in_seconds": config["window_seconds"],
+                "max_requests": policy.limit,
+                "window_seconds": policy.period,
+                "remaining_requests": await self.limiter.peek(policy, user_id),
+                "reset_in_seconds": policy.period,
             }
 
         return info
 
 
-# Global rate limiter instance
+# Global rate limiter instances
+rate_limiter = RateLimiter()
 ai_automation_rate_limiter = AIAutomationRateLimiter()
@@ -10,7 +10,7 @@ import uuid
 import json
 
 from config.database import get_database, get_db_connection
-from config.cache import cache_manager, cached, cache_key_for_model, cache_key_for_dataset
+from config.cache import cache_manager, cached, tiered_cache, cache_key_for_model, cache_key_for_dataset
 from config.auth import get_current_active_user, require_permission, TokenData, Permissions, auth_manager
 from config.settings import settings
 from core.decorators.org_isolation import isolate_by_org
@@ -105,39 +105,32 @@ async def get_models(
     try:
         logger.info(f"Fetching models for org: {org_id}, user: {user_id}")
 
-        # Try cache first (cache key now includes org_id for isolation)
-        cache_key = f"models:list:{org_id}:{limit}:{offset}"
-        cached_models = await cache_manager.get(cache_key)
-
-        if cached_models is not None:
-            logger.debug(f"Returning cached models for org {org_id}")
-            return cached_models
-
-        # Fetch from database with org_id filtering
-        async with get_db_connection() as conn:
-            query = """
-                SELECT id, name, description, model_type, version, upload_date,
-                       file_path, file_size, tags, metadata, status, org_id
-                FROM models
-                WHERE status = 'active' AND org_id = :org_id
-                ORDER BY upload_date DESC
-                LIMIT :limit OFFSET :offset
-            """
-            models = await conn.fetch_all(query, {"org_id": org_id, "limit": limit, "offset": offset})
+        async def load_models():
+            # Fetch from database with org_id filtering
+            async with get_db_connection() as conn:
+                query = """
+                    SELECT id, name, description, model_type, version, upload_date,
+                           file_path, file_size, tags, metadata, status, org_id
+                    FROM models
+                    WHERE status = 'active' AND org_id = :org_id
+                    ORDER BY upload_date DESC
+                    LIMIT :limit OFFSET :offset
+                """
+                models = await conn.fetch_all(query, {"org_id": org_id, "limit": limit, "offset": offset})
 
-            # Convert to dict format
-            models_data = [dict(model) for model in models]
+                # Convert to dict format
+                models_data = [dict(model) for model in models]
 
-        result = {
-            "success": True,
-            "data": models_data,
-            "count": len(models_data)
-        }
-
-        # Cache the result for 5 minutes
-        await cache_manager.set(cache_key, result, ttl=300)
+            return {
+                "success": True,
+                "data": models_data,
+                "count": len(models_data)
+            }
 
-        return result
+        # Cached for 5 minutes per org and page; create_model invalidates the tag
+        return await tiered_cache.get_or_load(
+            "models:list", f"{org_id}:{limit}:{offset}", load_models, ttl=300, tags=("models",)
+        )
 
     except Exception as e:
         logger.error(f"Error fetching models for org {org_id}: {e}")
@@ -151,38 +144,30 @@ async def get_datasets(
 ):
     """Get all datasets from database with caching"""
     try:
-        # Try cache first
-        cache_key = f"datasets:list:{limit}:{offset}"
-        cached_datasets = await cache_manager.get(cache_key)
-        
-        if cached_datasets is not None:
-            logger.debug("Returning cached datasets")
-            return cached_datasets
-        
-        # Fetch from database
-        async with get_db_connection() as conn:
-            query = """
-                SELECT id, name, description, source, size, columns, 
-                       upload_date, tags, file_path, file_type
-                FROM datasets 
-                ORDER BY upload_date DESC 
-                LIMIT :limit OFFSET :offset
-            """
-            datasets = await conn.fetch_all(query, {"limit": limit, "offset": offset})
+        async def load_datasets():
+            async with get_db_connection() as conn:
+                query = """
+                    SELECT id, name, description, source, size, columns, 
+                           upload_date, tags, file_path, file_type
+                    FROM datasets 
+                    ORDER BY upload_date DESC 
+                    LIMIT :limit OFFSET :offset
+                """
+                datasets = await conn.fetch_all(query, {"limit": limit, "offset": offset})
+                
+                # Convert to dict format
+                datasets_data = [dict(dataset) for dataset in datasets]
             
-            # Convert to dict format
-            datasets_data = [dict(dataset) for dataset in datasets]
-        
-        result = {
-            "success": True,
-            "data": datasets_data,
-            "count": len(datasets_data)
-        }
-        
-        # Cache the result for 5 minutes
-        await cache_manager.set(cache_key, result, ttl=300)
+            return {
+                "success": True,
+                "data": datasets_data,
+                "count": len(datasets_data)
+            }
         
-        return result
+        # Cached for 5 minutes per page; create_dataset invalidates the tag
+        return await tiered_cache.get_or_load(
+            "datasets:list", f"{limit}:{offset}", load_datasets, ttl=300, tags=("datasets",)
+        )
         
     except Exception as e:
         logger.error(f"Error fetching datasets: {e}")
@@ -225,7 +210,12 @@ async def get_recent_activity(
         raise HTTPException(status_code=500, detail=f"Failed to fetch recent activity: {str(e)}")
 
 @router.get("/governance/metrics")
-@cached(ttl=300)  # Cache for 5 minutes
+@cached(  # Cache for 5 minutes; the metrics are the same for every caller
+    ttl=300,
+    namespace="dashboard",
+    key_func=lambda *args, **kwargs: "governance_metrics",
+    tags=("models", "datasets"),
+)
 async def get_governance_metrics(
     current_user: TokenData = Depends(require_permission(Permissions.SYSTEM_MONITOR))
 ):
@@ -285,6 +275,12 @@ async def get_governance_metrics(
         raise HTTPException(status_code=500, detail=f"Failed to fetch governance metrics: {str(e)}")
 
 @router.get("/metrics/summary")
+@cached(
+    ttl=60,
+    namespace="dashboard",
+    key_func=lambda *args, **kwargs: "metrics_summary",
+    tags=("models", "datasets"),
+)
 async def get_metrics_summary():
     """Get metrics summary from database"""
     try:
@@ -383,8 +379,8 @@ async def create_model(
                 raise HTTPException(status_code=500, detail="Failed to create model in database")
             model_dict = dict(model)
         
-        # Invalidate cache
-        await cache_manager.delete_pattern("models:list:*")
+        # Invalidate model lists and dashboard stats
+        await tiered_cache.invalidate_tags("models")
         
         # Cache the new model
         await cache_manager.set(
@@ -460,6 +456,9 @@ async def create_dataset(
         if not dataset:
             raise HTTPException(status_code=500, detail="Failed to create dataset")
 
+        # Invalidate dataset lists and dashboard stats
+        await tiered_cache.invalidate_tags("datasets")
+
         return {
             "success": True,
             "data": dict(dataset),
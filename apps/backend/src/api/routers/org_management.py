@@ -28,6 +28,7 @@ from config.settings import settings
 from config.auth import get_current_active_user, TokenData
 from src.infrastructure.email.resend_service import email_service
 from core.decorators.org_permissions import require_org_admin, require_org_member
+from core.decorators.permission_resolver import permission_resolver
 
 logger = logging.getLogger("fairmind.org_management")
 router = APIRouter(prefix="/api/v1/organizations", tags=["organization-management"])
@@ -593,6 +594,7 @@ async def accept_invitation(
                     "created_at": datetime.utcnow(),
                 }
             )
+            await permission_resolver.invalidate(org_id, current_user.user_id)
 
             # 5. Update User.org_id and User.primary_org_id (only if primary_org_id is null)
             user = await db.fetch_one(
@@ -711,6 +713,7 @@ async def update_member(
                     f"UPDATE org_members SET {', '.join(updates)} WHERE id = :id AND org_id = :org_id",
                     params
                 )
+                await permission_resolver.invalidate(org_id, member["user_id"])
 
                 # Log audit event
                 await _log_org_audit(
@@ -778,6 +781,7 @@ async def remove_member(
                 "DELETE FROM org_members WHERE id = :id AND org_id = :org_id",
                 {"id": member_id, "org_id": org_id}
             )
+            await permission_resolver.invalidate(org_id, member["user_id"])
 
             # Log audit event
             await _log_org_audit(
@@ -907,6 +911,8 @@ async def create_org_role(
                     "created_at": datetime.utcnow()
                 }
             )
+            # Members already holding this role name now resolve to its permissions
+            await permission_resolver.invalidate(org_id)
 
             # Log audit event
             await _log_org_audit(
@@ -4,7 +4,9 @@ Database-backed service for managing and analyzing AI BOM documents with enhance
 connection management, and analysis capabilities
 """
 
+import json
 import logging
+import os
 import uuid
 import hashlib
 from datetime import datetime
@@ -22,6 +24,8 @@ from ..models.ai_bom import (
     MonitoringLayer, SecurityLayer, ComplianceLayer
 )
 from ..repositories.ai_bom_repository import AIBOMRepository
+from .ai_bom_store import AIBOMStore, DocumentCache
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +49,9 @@ class DatabaseConfig:
     organization_name: str = "FairMind"
     enable_versioning: bool = False
     enable_dependency_graphs: bool = False
+    store_path: Optional[str] = None  # Local BOM store; defaults to settings.ai_bom_store_path
+    cache_size: Optional[int] = None  # Cached documents; defaults to settings.ai_bom_cache_size
+    cache_ttl: Optional[float] = None  # Seconds per cached document; defaults to settings.ai_bom_cache_ttl
 
 class AIBOMDatabaseError(Exception):
     """Custom exception for AI BOM database operations"""
@@ -68,10 +75,25 @@ class AIBOMDatabaseService:
         self._connection_pool = None
         self.executor = ThreadPoolExecutor(max_workers=4)
         
-        # Keep in-memory storage as fallback when database is not available
-        self.bom_documents: Dict[str, AIBOMDocument] = {}
-        self.analyses: Dict[str, AIBOMAnalysis] = {}
-        self._document_versions: Dict[str, List[AIBOMDocument]] = {}  # For versioning support
+        # Local store backs documents, analyses and versions when the database is not
+        # available; its reads go through a bounded cache of loaded documents. The store
+        # file is shared between workers, so entries expire after a short TTL.
+        self._store: Optional[AIBOMStore] = None
+        self._cache: DocumentCache[AIBOMDocument] = DocumentCache(
+            self.config.cache_size if self.config.cache_size is not None else settings.ai_bom_cache_size,
+            ttl_seconds=self.config.cache_ttl if self.config.cache_ttl is not None else settings.ai_bom_cache_ttl
+        )
+    
+    @property
+    def store(self) -> AIBOMStore:
+        """The local BOM store, opened on first use"""
+        if self._store is None:
+            self._store = AIBOMStore(
+                self.config.store_path
+                or settings.ai_bom_store_path
+                or os.path.join(settings.database_dir, "ai_bom.sqlite3")
+            )
+        return self._store
         
     async def initialize(self):
         """Initialize the service and establish database connection"""
@@ -86,8 +108,11 @@ class AIBOMDatabaseService:
     async def shutdown(self):
         """Cleanup resources"""
         try:
-            await self._save_to_persistence()
             self.executor.shutdown(wait=True)
+            self._cache.clear()
+            if self._store is not None:
+                self._store.close()
+                self._store = None
             logger.info("AI BOM Database Service shut down successfully")
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
@@ -143,47 +168,45 @@ class AIBOMDatabaseService:
                         document = await self.repository.create_bom_document(request)
                         
                         # Store in cache as well
-                        self.bom_documents[document.id] = document
+                        self._cache.set(document.id, document)
                         
                         # Store version if versioning is enabled
                         if self.config.enable_versioning:
-                            if document.id not in self._document_versions:
-                                self._document_versions[document.id] = []
-                            self._document_versions[document.id].append(document)
+                            await asyncio.to_thread(self.store.record_version, self._to_record(document))
                         
                         logger.info(f"AI BOM document created successfully in database: {document.id}")
                         return document
                     else:
-                        raise Exception("Database not connected, falling back to in-memory storage")
+                        raise Exception("Database not connected, falling back to local store")
                         
                 except Exception as db_error:
-                    logger.warning(f"Database creation failed: {db_error}, using in-memory fallback")
-                    
-                    # Fallback to in-memory creation
-                    # Calculate metrics
-                    overall_risk = self._calculate_overall_risk(request.components)
-                    overall_compliance = self._calculate_overall_compliance(request.components)
-                    
-                    # Create layer components
-                    layers = await self._create_all_layers(request.components)
-                    
-                    # Generate unique ID
-                    bom_id = str(uuid.uuid4())
+                    logger.warning(f"Database creation failed: {db_error}, using local store fallback")
+                
+                # Fallback to local store
+                # Calculate metrics
+                overall_risk = self._calculate_overall_risk(request.components)
+                overall_compliance = self._calculate_overall_compliance(request.components)
+                
+                # Create layer components
+                layers = await self._create_all_layers(request.components)
+                
+                # Generate unique ID
+                bom_id = str(uuid.uuid4())
+                
+                # Create BOM document
+                bom_document = AIBOMDocument(
+                    id=bom_id,
+                    name=f"AI BOM - {request.project_name}",
+                    version=request.version or "1.0.0",
+                    description=request.description,
+                    project_name=request.project_name,
+                    organization=request.organization or self.config.organization_name,
                     
-                    # Create BOM document
-                    bom_document = AIBOMDocument(
-                        id=bom_id,
-                        name=f"AI BOM - {request.project_name}",
-                        version=request.version or "1.0.0",
-                        description=request.description,
-                        project_name=request.project_name,
-                        organization=request.organization or self.config.organization_name,
-                        
-                        # Layer components
-                        data_layer=layers['data'],
-                        model_development_layer=layers['modelDevelopment'],
-                        infrastructure_layer=layers['infrastructure'],
-                        deployment_layer=layers['deployment'],
+                    # Layer components
+                    data_layer=layers['data'],
+                    model_development_layer=layers['modelDevelopment'],
+                    infrastructure_layer=layers['infrastructure'],
+                    deployment_layer=layers['deployment'],
                     monitoring_layer=layers['monitoring'],
                     security_layer=layers['security'],
                     compliance_layer=layers['compliance'],
@@ -209,16 +232,9 @@ class AIBOMDatabaseService:
                     analyses=[]
                 )
                 
-                # Store in memory and persistence
-                self.bom_documents[bom_id] = bom_document
-                
-                # Store version if versioning is enabled
-                if self.config.enable_versioning:
-                    if bom_id not in self._document_versions:
-                        self._document_versions[bom_id] = []
-                    self._document_versions[bom_id].append(bom_document)
-                
-                await self._save_to_persistence()
+                # Persist (with a version if versioning is enabled) and cache
+                await self._save_to_persistence(bom_document, record_version=self.config.enable_versioning)
+                self._cache.set(bom_id, bom_document)
                 
                 logger.info(f"Created AI BOM document: {bom_id} for project: {request.project_name}")
                 
@@ -235,11 +251,33 @@ class AIBOMDatabaseService:
                                 risk_level: Optional[str] = None,
                                 compliance_status: Optional[str] = None) -> List[AIBOMDocument]:
         """List AI BOM documents with pagination and filtering"""
+        page = await self.list_bom_documents_page(
+            limit=limit,
+            skip=skip,
+            project_name=project_name,
+            risk_level=risk_level,
+            compliance_status=compliance_status
+        )
+        return page["documents"]
+    
+    async def list_bom_documents_page(self,
+                                      limit: Optional[int] = 10,
+                                      cursor: Optional[str] = None,
+                                      skip: Optional[int] = 0,
+                                      project_name: Optional[str] = None,
+                                      risk_level: Optional[str] = None,
+                                      compliance_status: Optional[str] = None) -> Dict[str, Any]:
+        """
+        A page of AI BOM documents, newest first, as ``{"documents", "next_cursor"}``.
+        Pass ``next_cursor`` back as ``cursor`` for the following page; ``skip``
+        only applies without a cursor. From the local store, ``project_name``
+        matches a case-insensitive prefix.
+        """
         try:
             async with self._database_connection() as db:
                 # Try to use database repository first
                 try:
-                    if self.repository.storage_adapter.is_connected():
+                    if self.repository.storage_adapter.is_connected() and not cursor:
                         logger.info("Listing BOM documents from database")
                         documents = await self.repository.list_bom_documents(
                             skip=skip or 0,
@@ -251,37 +289,31 @@ class AIBOMDatabaseService:
                         
                         # Update cache
                         for doc in documents:
-                            self.bom_documents[doc.id] = doc
+                            self._cache.set(doc.id, doc)
                         
                         logger.info(f"Retrieved {len(documents)} documents from database")
-                        return documents
+                        return {"documents": documents, "next_cursor": None}
                     else:
-                        raise Exception("Database not connected, falling back to in-memory storage")
+                        raise Exception("Database not connected, falling back to local store")
                         
                 except Exception as db_error:
-                    logger.warning(f"Database listing failed: {db_error}, using in-memory fallback")
-                    
-                    # Fallback to in-memory listing
-                    documents = list(self.bom_documents.values())
-                    
-                    # Apply filters
-                    if project_name:
-                        documents = [d for d in documents if project_name.lower() in d.project_name.lower()]
-                    if risk_level:
-                        documents = [d for d in documents if d.overall_risk_level.value == risk_level]
-                    if compliance_status:
-                        documents = [d for d in documents if d.overall_compliance_status.value == compliance_status]
-                    
-                    # Sort by creation date (newest first)
-                    documents.sort(key=lambda x: x.created_at, reverse=True)
-                    
-                    # Apply pagination
-                    if skip:
-                        documents = documents[skip:]
-                    if limit:
-                        documents = documents[:limit]
+                    logger.warning(f"Database listing failed: {db_error}, using local store fallback")
+                
+                # Filtered, ordered and paged by the store's indexes
+                records, next_cursor = await asyncio.to_thread(
+                    self.store.list_documents,
+                    limit=limit or 10,
+                    project_name=project_name,
+                    risk_level=risk_level,
+                    compliance_status=compliance_status,
+                    cursor=cursor,
+                    offset=skip or 0
+                )
+                documents = [self._document_from_record(record) for record in records]
+                for doc in documents:
+                    self._cache.set(doc.id, doc)
                 
-                return documents
+                return {"documents": documents, "next_cursor": next_cursor}
                 
         except Exception as e:
             logger.error(f"Error listing AI BOM documents: {e}")
@@ -302,26 +334,34 @@ class AIBOMDatabaseService:
                         
                         if document:
                             # Update cache
-                            self.bom_documents[document.id] = document
+                            self._cache.set(document.id, document)
                             logger.info(f"Retrieved document from database: {document.project_name}")
                             return document
                         else:
                             logger.warning(f"BOM document not found in database: {bom_id}")
                             return None
                     else:
-                        raise Exception("Database not connected, falling back to in-memory storage")
+                        raise Exception("Database not connected, falling back to local store")
                         
                 except Exception as db_error:
-                    logger.warning(f"Database get failed: {db_error}, using in-memory fallback")
-                    
-                    # Fallback to in-memory storage
-                    document = self.bom_documents.get(bom_id)
-                    
-                    if not document:
-                        logger.warning(f"BOM document not found: {bom_id}")
-                        return None
-                    
-                    return document
+                    logger.warning(f"Database get failed: {db_error}, using local store fallback")
+                
+                # Fallback to local store. The database is always read directly; only
+                # local reads use the cache, whose TTL bounds how long another
+                # worker's update or delete can go unseen.
+                cached = self._cache.get(bom_id)
+                if cached is not None:
+                    return cached
+                
+                record = await asyncio.to_thread(self.store.get_document, bom_id)
+                
+                if not record:
+                    logger.warning(f"BOM document not found: {bom_id}")
+                    return None
+                
+                document = self._document_from_record(record)
+                self._cache.set(bom_id, document)
+                return document
                 
         except ValueError:
             raise AIBOMDatabaseError(f"Invalid BOM ID format: {bom_id}")
@@ -346,8 +386,7 @@ class AIBOMDatabaseService:
                 analysis = await self._perform_analysis(bom_doc, analysis_type)
                 
                 # Store analysis
-                self.analyses[analysis.id] = analysis
-                await self._save_to_persistence()
+                await asyncio.to_thread(self.store.save_analysis, bom_id, self._to_record(analysis))
                 
                 logger.info(f"Created AI BOM analysis: {analysis.id} for document: {bom_id}")
                 
@@ -364,12 +403,12 @@ class AIBOMDatabaseService:
         try:
             uuid.UUID(analysis_id)  # Validate format
             
-            analysis = self.analyses.get(analysis_id)
+            record = await asyncio.to_thread(self.store.get_analysis, analysis_id)
             
-            if not analysis:
+            if not record:
                 return None
             
-            return analysis
+            return AIBOMAnalysis.parse_obj(record)
             
         except ValueError:
             raise AIBOMDatabaseError(f"Invalid analysis ID format: {analysis_id}")
@@ -390,51 +429,26 @@ class AIBOMDatabaseService:
                         success = await self.repository.delete_bom_document(bom_id)
                         
                         if success:
-                            # Also remove from cache
-                            if bom_id in self.bom_documents:
-                                del self.bom_documents[bom_id]
-                            
-                            # Remove from versions
-                            if bom_id in self._document_versions:
-                                del self._document_versions[bom_id]
-                            
-                            # Delete associated analyses from cache
-                            analyses_to_delete = [
-                                analysis_id for analysis_id, analysis in self.analyses.items()
-                                if hasattr(analysis, 'bom_id') and analysis.bom_id == bom_id  # Handle potential missing attribute
-                            ]
-                            for analysis_id in analyses_to_delete:
-                                del self.analyses[analysis_id]
+                            # Also remove from cache, and its analyses and versions from the local store
+                            self._cache.pop(bom_id)
+                            await asyncio.to_thread(self.store.delete_document, bom_id)
                             
                             logger.info(f"Successfully deleted BOM document from database: {bom_id}")
                             return True
                         else:
                             raise AIBOMNotFoundError(f"BOM document not found in database: {bom_id}")
                     else:
-                        raise Exception("Database not connected, falling back to in-memory storage")
+                        raise Exception("Database not connected, falling back to local store")
                         
                 except Exception as db_error:
-                    logger.warning(f"Database delete failed: {db_error}, using in-memory fallback")
-                    
-                    # Fallback to in-memory deletion
-                    if bom_id not in self.bom_documents:
-                        raise AIBOMNotFoundError(f"BOM document not found: {bom_id}")
-                    
-                    # Delete associated analyses
-                    analyses_to_delete = [
-                        analysis_id for analysis_id, analysis in self.analyses.items()
-                if analysis.bom_id == bom_id
-            ]
-            
-            for analysis_id in analyses_to_delete:
-                del self.analyses[analysis_id]
-            
-            # Delete the document
-            del self.bom_documents[bom_id]
-            
-            await self._save_to_persistence()
+                    logger.warning(f"Database delete failed: {db_error}, using local store fallback")
+                
+                # Fallback to local store: the document with its components, analyses and versions
+                self._cache.pop(bom_id)
+                if not await asyncio.to_thread(self.store.delete_document, bom_id):
+                    raise AIBOMNotFoundError(f"BOM document not found: {bom_id}")
             
-            logger.info(f"Deleted AI BOM document: {bom_id} and {len(analyses_to_delete)} analyses")
+            logger.info(f"Deleted AI BOM document: {bom_id} and its analyses")
             return True
             
         except AIBOMNotFoundError:
@@ -458,53 +472,48 @@ class AIBOMDatabaseService:
                         document = await self.repository.update_bom_document(bom_id, request)
                         
                         # Update cache
-                        self.bom_documents[document.id] = document
+                        self._cache.set(document.id, document)
                         
                         # Store version if versioning is enabled
                         if self.config.enable_versioning:
-                            if bom_id not in self._document_versions:
-                                self._document_versions[bom_id] = []
-                            self._document_versions[bom_id].append(document)
+                            await asyncio.to_thread(self.store.record_version, self._to_record(document))
                         
                         logger.info(f"Successfully updated BOM document in database: {bom_id}")
                         return document
                     else:
-                        raise Exception("Database not connected, falling back to in-memory storage")
+                        raise Exception("Database not connected, falling back to local store")
                         
                 except Exception as db_error:
-                    logger.warning(f"Database update failed: {db_error}, using in-memory fallback")
-                    
-                    # Fallback to in-memory update
-                    if bom_id not in self.bom_documents:
-                        raise AIBOMNotFoundError(f"BOM document not found: {bom_id}")
-                    
-                    document = self.bom_documents[bom_id]
-                    
-                    # Store version if versioning is enabled
-                    if self.config.enable_versioning:
-                        if bom_id not in self._document_versions:
-                            self._document_versions[bom_id] = []
-                        self._document_versions[bom_id].append(document)
-                    
-                    # Apply updates from request
-                    document.version = request.version or document.version
-                    document.description = request.description
-                    document.project_name = request.project_name
-                    document.organization = request.organization or self.config.organization_name
-                    document.components = request.components
-                    
-                    # Update timestamp
-                    document.updated_at = datetime.now()
-                    
-                    # Recalculate metrics
-                    document.overall_risk_level = self._calculate_overall_risk(document.components)
-                    document.overall_compliance_status = self._calculate_overall_compliance(document.components)
-                    document.total_components = len(document.components)
-                    document.risk_assessment = self._generate_risk_assessment(document.components)
-                    document.compliance_report = self._generate_compliance_report(document.components)
-                    document.recommendations = self._generate_recommendations(document.components)
+                    logger.warning(f"Database update failed: {db_error}, using local store fallback")
+                
+                # Fallback to local store
+                current = await self.get_bom_document(bom_id)
+                if current is None:
+                    raise AIBOMNotFoundError(f"BOM document not found: {bom_id}")
+                
+                # Cached readers keep the previous version until the update is stored
+                document = current.copy(deep=True)
+                
+                # Apply updates from request
+                document.version = request.version or document.version
+                document.description = request.description
+                document.project_name = request.project_name
+                document.organization = request.organization or self.config.organization_name
+                document.components = request.components
                 
-                await self._save_to_persistence()
+                # Update timestamp
+                document.updated_at = datetime.now()
+                
+                # Recalculate metrics
+                document.overall_risk_level = self._calculate_overall_risk(document.components)
+                document.overall_compliance_status = self._calculate_overall_compliance(document.components)
+                document.total_components = len(document.components)
+                document.risk_assessment = self._generate_risk_assessment(document.components)
+                document.compliance_report = self._generate_compliance_report(document.components)
+                document.recommendations = self._generate_recommendations(document.components)
+                
+                await self._save_to_persistence(document, record_version=self.config.enable_versioning)
+                self._cache.set(bom_id, document)
                 
                 logger.info(f"Updated AI BOM document: {bom_id}")
                 return document
@@ -518,17 +527,22 @@ class AIBOMDatabaseService:
             raise AIBOMDatabaseError(f"Failed to update BOM document: {e}")
     
     async def get_document_versions(self, bom_id: str) -> List[AIBOMDocument]:
-        """Get all versions of a BOM document"""
+        """Get all versions of a BOM document, oldest first"""
+        history = await self.get_document_history(bom_id)
+        return [self._document_from_record(entry["document"]) for entry in history]
+    
+    async def get_document_history(self, bom_id: str) -> List[Dict[str, Any]]:
+        """
+        Version history of a BOM document, oldest first: version number, BOM
+        version, recording time, snapshot and diff against the previous version
+        """
         try:
             uuid.UUID(bom_id)  # Validate format
             
             if not self.config.enable_versioning:
                 raise AIBOMDatabaseError("Versioning is not enabled")
             
-            if bom_id not in self._document_versions:
-                return []
-            
-            return self._document_versions[bom_id]
+            return await asyncio.to_thread(self.store.list_versions, bom_id)
             
         except ValueError:
             raise AIBOMDatabaseError(f"Invalid BOM ID format: {bom_id}")
@@ -829,18 +843,24 @@ class AIBOMDatabaseService:
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(self.executor, method, bom_doc)
     
-    # Persistence methods (simplified for now)
+    # Persistence methods
     async def _load_from_persistence(self):
-        """Load data from persistence layer"""
-        # For now, this is a placeholder
-        # In a full implementation, this would load from database or file
-        logger.info("Loading AI BOM data from persistence")
-    
-    async def _save_to_persistence(self):
-        """Save data to persistence layer"""
-        # For now, this is a placeholder
-        # In a full implementation, this would save to database or file
-        logger.info(f"Saving {len(self.bom_documents)} BOM documents and {len(self.analyses)} analyses to persistence")
+        """Open the local store"""
+        count = await asyncio.to_thread(len, self.store)
+        logger.info(f"Loaded AI BOM store with {count} documents")
+    
+    async def _save_to_persistence(self, document: AIBOMDocument, record_version: bool = False):
+        """Write a document and its components to the local store"""
+        await asyncio.to_thread(self.store.save_document, self._to_record(document), record_version)
+    
+    @staticmethod
+    def _to_record(model: Any) -> Dict[str, Any]:
+        """JSON-ready dict of a document or analysis model"""
+        return json.loads(model.json())
+    
+    @staticmethod
+    def _document_from_record(record: Dict[str, Any]) -> AIBOMDocument:
+        return AIBOMDocument.parse_obj(record)
     
     # Enhanced risk and compliance calculation methods
     
@@ -0,0 +1,430 @@
+"""
+AI BOM Store
+Local persistence engine for AI BOM documents, their components, analyses
+and version history, behind AIBOMDatabaseService.
+
+Documents and components live in normalized SQLite tables (WAL). Listings
+are filtered server-side on indexed columns: project name (case-insensitive
+prefix), overall risk level and overall compliance status. They are ordered
+newest first and paged by keyset, so a page costs the same however many
+BOMs are registered.
+
+- Each save can record a version: a full snapshot of the document plus its
+  diff against the previous version.
+- Deleting a document deletes its components, analyses and versions.
+- ``DocumentCache`` is the bounded LRU, with an optional TTL, the service
+  reads through.
+
+The store works on JSON-ready dicts; the service converts to and from its
+models.
+"""
+
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Document fields kept out of version diffs
+UNVERSIONED_FIELDS = frozenset({"components", "analyses", "updated_at"})
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bom_documents (
+    id TEXT PRIMARY KEY,
+    project_name TEXT NOT NULL,
+    project_key TEXT NOT NULL,
+    organization TEXT,
+    overall_risk_level TEXT,
+    overall_compliance_status TEXT,
+    total_components INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bom_documents_created ON bom_documents (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_bom_documents_project ON bom_documents (project_key, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_bom_documents_risk ON bom_documents (overall_risk_level, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_bom_documents_compliance
+    ON bom_documents (overall_compliance_status, created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS bom_components (
+    bom_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    component_id TEXT,
+    name TEXT NOT NULL,
+    type TEXT,
+    version TEXT,
+    risk_level TEXT,
+    compliance_status TEXT,
+    component TEXT NOT NULL,
+    PRIMARY KEY (bom_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_bom_components_name ON bom_components (name);
+CREATE INDEX IF NOT EXISTS idx_bom_components_risk ON bom_components (risk_level);
+
+CREATE TABLE IF NOT EXISTS bom_analyses (
+    id TEXT PRIMARY KEY,
+    bom_id TEXT NOT NULL,
+    analysis_type TEXT,
+    created_at REAL NOT NULL,
+    analysis TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bom_analyses_bom ON bom_analyses (bom_id, created_at);
+
+CREATE TABLE IF NOT EXISTS bom_versions (
+    bom_id TEXT NOT NULL,
+    version_number INTEGER NOT NULL,
+    bom_version TEXT,
+    recorded_at REAL NOT NULL,
+    document TEXT NOT NULL,
+    diff TEXT NOT NULL,
+    PRIMARY KEY (bom_id, version_number)
+);
+"""
+
+
+def document_diff(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Changes from ``old`` to ``new``: changed top-level fields as
+    ``[old, new]`` pairs, and components added, removed or changed (keyed
+    by component id, or by name for components without one).
+    """
+    old = old or {}
+    fields = {
+        key: [old.get(key), new.get(key)]
+        for key in sorted(set(old) | set(new))
+        if key not in UNVERSIONED_FIELDS and old.get(key) != new.get(key)
+    }
+
+    def by_key(document):
+        return {c.get("id") or c.get("name"): c for c in document.get("components") or []}
+
+    old_components, new_components = by_key(old), by_key(new)
+    changed = {}
+    for key in old_components.keys() & new_components.keys():
+        before, after = old_components[key], new_components[key]
+        delta = {
+            field: [before.get(field), after.get(field)]
+            for field in sorted(set(before) | set(after))
+            if field != "updated_at" and before.get(field) != after.get(field)
+        }
+        if delta:
+            changed[key] = delta
+    return {
+        "fields": fields,
+        "components": {
+            "added": sorted(new_components.keys() - old_components.keys()),
+            "removed": sorted(old_components.keys() - new_components.keys()),
+            "changed": changed,
+        },
+    }
+
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+def _encode_cursor(created_at: float, bom_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, bom_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        created_at, bom_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(created_at), str(bom_id)
+    except Exception as e:
+        raise ValueError(f"Invalid page cursor: {cursor}") from e
+
+
+class AIBOMStore:
+    """
+    SQLite-backed store of AI BOM documents. ``path`` may be ``":memory:"``
+    for a store that lives as long as the object.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM bom_documents").fetchone()[0]
+
+    # Documents
+
+    def save_document(self, document: Dict[str, Any], record_version: bool = False) -> Optional[int]:
+        """
+        Insert or replace a document and its components. With
+        ``record_version``, also record a version (see ``record_version``)
+        and return its number.
+        """
+        bom_id = document["id"]
+        components = document.get("components") or []
+        body = {key: value for key, value in document.items() if key != "components"}
+        project_name = document.get("project_name") or ""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    """
+                    INSERT OR REPLACE INTO bom_documents
+                        (id, project_name, project_key, organization, overall_risk_level,
+                         overall_compliance_status, total_components, created_at, updated_at, document)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        bom_id, project_name, project_name.lower(), document.get("organization"),
+                        document.get("overall_risk_level"), document.get("overall_compliance_status"),
+                        document.get("total_components") or len(components),
+                        _timestamp(document.get("created_at")), _timestamp(document.get("updated_at")),
+                        json.dumps(body)
+                    )
+                )
+                self._conn.execute("DELETE FROM bom_components WHERE bom_id = ?", (bom_id,))
+                self._conn.executemany(
+                    """
+                    INSERT INTO bom_components
+                        (bom_id, position, component_id, name, type, version, risk_level,
+                         compliance_status, component)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (bom_id, position, c.get("id"), c.get("name") or "", c.get("type"), c.get("version"),
+                         c.get("risk_level"), c.get("compliance_status"), json.dumps(c))
+                        for position, c in enumerate(components)
+                    ]
+                )
+                if record_version:
+                    return self._record_version(document)
+        return None
+
+    def record_version(self, document: Dict[str, Any]) -> int:
+        """
+        Store a snapshot of ``document`` as its next version, with the diff
+        against the previous one. Returns the version number.
+        """
+        with self._lock:
+            with self._conn:
+                return self._record_version(document)
+
+    def get_document(self, bom_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT document FROM bom_documents WHERE id = ?", (bom_id,)).fetchone()
+            if row is None:
+                return None
+            return self._assemble([(bom_id, row[0])])[0]
+
+    def list_documents(
+        self,
+        limit: int = 10,
+        project_name: Optional[str] = None,
+        risk_level: Optional[str] = None,
+        compliance_status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        A page of documents, newest first, and the cursor of the next page
+        (None on the last one). ``project_name`` matches a case-insensitive
+        prefix. ``offset`` is only applied when no ``cursor`` is given.
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        if project_name:
+            prefix = project_name.lower()
+            clauses.append("project_key >= ? AND project_key < ?")
+            params.extend([prefix, prefix + "\U0010ffff"])
+        if risk_level:
+            clauses.append("overall_risk_level = ?")
+            params.append(risk_level)
+        if compliance_status:
+            clauses.append("overall_compliance_status = ?")
+            params.append(compliance_status)
+        if cursor:
+            created_at, bom_id = _decode_cursor(cursor)
+            # A row-value comparison lets the (..., created_at, id) indexes seek to the cursor
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend([created_at, bom_id])
+            offset = 0
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT id, created_at, document FROM bom_documents {where}
+                ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?
+                """,
+                params + [limit + 1, max(offset, 0)]
+            ).fetchall()
+            page = rows[:limit]
+            documents = self._assemble([(row[0], row[2]) for row in page])
+
+        next_cursor = _encode_cursor(page[-1][1], page[-1][0]) if len(rows) > limit and page else None
+        return documents, next_cursor
+
+    def delete_document(self, bom_id: str) -> bool:
+        """Delete a document with its components, analyses and versions"""
+        with self._lock:
+            with self._conn:
+                deleted = self._conn.execute("DELETE FROM bom_documents WHERE id = ?", (bom_id,)).rowcount
+                for table in ("bom_components", "bom_analyses", "bom_versions"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE bom_id = ?", (bom_id,))
+        return deleted > 0
+
+    # Analyses
+
+    def save_analysis(self, bom_id: str, analysis: Dict[str, Any]):
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    """
+                    INSERT OR REPLACE INTO bom_analyses (id, bom_id, analysis_type, created_at, analysis)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (analysis["id"], bom_id, analysis.get("analysis_type"),
+                     _timestamp(analysis.get("created_at")), json.dumps(analysis))
+                )
+
+    def get_analysis(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT analysis FROM bom_analyses WHERE id = ?", (analysis_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # Versions
+
+    def list_versions(self, bom_id: str) -> List[Dict[str, Any]]:
+        """Recorded versions of a document, oldest first, with snapshot and diff"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT version_number, bom_version, recorded_at, document, diff FROM bom_versions
+                WHERE bom_id = ? ORDER BY version_number
+                """,
+                (bom_id,)
+            ).fetchall()
+        return [
+            {
+                "version_number": row[0],
+                "version": row[1],
+                "recorded_at": datetime.fromtimestamp(row[2]).isoformat(),
+                "document": json.loads(row[3]),
+                "diff": json.loads(row[4]),
+            }
+            for row in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _record_version(self, document: Dict[str, Any]) -> int:
+        bom_id = document["id"]
+        latest = self._conn.execute(
+            """
+            SELECT version_number, document FROM bom_versions
+            WHERE bom_id = ? ORDER BY version_number DESC LIMIT 1
+            """,
+            (bom_id,)
+        ).fetchone()
+        version_number = latest[0] + 1 if latest else 1
+        previous = json.loads(latest[1]) if latest else None
+        self._conn.execute(
+            """
+            INSERT INTO bom_versions (bom_id, version_number, bom_version, recorded_at, document, diff)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (bom_id, version_number, document.get("version"), time.time(),
+             json.dumps(document), json.dumps(document_diff(previous, document)))
+        )
+        return version_number
+
+    def _assemble(self, rows: Sequence[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Documents for ``(id, body)`` rows with their components, loaded in one query"""
+        if not rows:
+            return []
+        ids = [bom_id for bom_id, _ in rows]
+        components: Dict[str, List[Dict[str, Any]]] = {bom_id: [] for bom_id in ids}
+        for bom_id, component in self._conn.execute(
+            f"""
+            SELECT bom_id, component FROM bom_components
+            WHERE bom_id IN ({','.join('?' * len(ids))}) ORDER BY bom_id, position
+            """,
+            ids
+        ):
+            components[bom_id].append(json.loads(component))
+        return [{**json.loads(body), "components": components[bom_id]} for bom_id, body in rows]
+
+
+T = TypeVar("T")
+
+
+class DocumentCache(Generic[T]):
+    """
+    Bounded LRU map from document id to a loaded document. With ``ttl_seconds``
+    an entry expires that long after it was set, so a document another worker
+    updated or deleted is reloaded within that window.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[Optional[float], T]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[T]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is not None and self._clock() >= entry[0]:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: T):
+        if self.max_entries <= 0 or (self.ttl_seconds is not None and self.ttl_seconds <= 0):
+            return
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds is not None else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -25,16 +25,30 @@ from urllib.parse import urlparse
 from models.ai_bom import (
     BOMItem, BOMDocument, BOMAnalysis, BOMScanResult, BOMScanRequest,
     BOMItemType, RiskLevel, ComplianceStatus, Vulnerability, LicenseInfo,
-    calculate_checksum, analyze_risk_level, validate_license_compatibility,
+    analyze_risk_level, validate_license_compatibility,
     generate_bom_analysis
 )
+from services.project_file_scanner import ProjectFileScanner, ProjectScan, get_project_file_scanner
+from services.vulnerability_index import PackageQuery, VulnerabilityIndex, get_vulnerability_index
 
 logger = logging.getLogger(__name__)
 
 class BOMScanner:
     """Comprehensive BOM scanner for AI/ML projects"""
     
-    def __init__(self):
+    # Package registry URLs of library components and their OSV ecosystems
+    PACKAGE_REGISTRIES = {
+        'https://pypi.org/': 'PyPI',
+        'https://www.npmjs.com/': 'npm'
+    }
+    
+    def __init__(
+        self,
+        file_scanner: Optional[ProjectFileScanner] = None,
+        vulnerability_index: Optional[VulnerabilityIndex] = None
+    ):
+        self._file_scanner = file_scanner
+        self._vulnerability_index = vulnerability_index
         self.supported_formats = {
             'python': ['.py', '.ipynb', 'requirements.txt', 'setup.py', 'pyproject.toml'],
             'nodejs': ['package.json', 'package-lock.json', 'yarn.lock'],
@@ -50,6 +64,20 @@ class BOMScanner:
             'https://pypi.org/pypi'
         ]
     
+    @property
+    def file_scanner(self) -> ProjectFileScanner:
+        """The injected scanner, or the shared one (opened on first scan)"""
+        if self._file_scanner is None:
+            self._file_scanner = get_project_file_scanner()
+        return self._file_scanner
+    
+    @property
+    def vulnerability_index(self) -> VulnerabilityIndex:
+        """The injected index, or the shared one (opened on first scan)"""
+        if self._vulnerability_index is None:
+            self._vulnerability_index = get_vulnerability_index()
+        return self._vulnerability_index
+    
     async def scan_project(self, request: BOMScanRequest) -> BOMScanResult:
         """Scan a project and generate a comprehensive BOM"""
         start_time = datetime.now()
@@ -74,8 +102,13 @@ class BOMScanner:
             if request.scan_type == "comprehensive":
                 components.extend(await self._scan_python_dependencies(request.project_path))
                 components.extend(await self._scan_nodejs_dependencies(request.project_path))
-                components.extend(await self._scan_ml_models(request.project_path))
-                components.extend(await self._scan_datasets(request.project_path))
+                # One walk over the project finds and hashes model and dataset files
+                file_scan = await self.file_scanner.scan(
+                    request.project_path,
+                    [*self.supported_formats['models'], *self.supported_formats['datasets']]
+                )
+                components.extend(await self._scan_ml_models(request.project_path, file_scan))
+                components.extend(await self._scan_datasets(request.project_path, file_scan))
                 components.extend(await self._scan_docker_files(request.project_path))
                 
             elif request.scan_type == "quick":
@@ -320,77 +353,75 @@ class BOMScanner:
         
         return components
     
-    async def _scan_ml_models(self, project_path: str) -> List[BOMItem]:
+    async def _scan_ml_models(self, project_path: str, file_scan: Optional[ProjectScan] = None) -> List[BOMItem]:
         """Scan for ML model files"""
         components = []
         
-        model_extensions = ['.pkl', '.joblib', '.h5', '.onnx', '.pb', '.tflite']
-        
-        for root, dirs, files in os.walk(project_path):
-            for file in files:
-                if any(file.endswith(ext) for ext in model_extensions):
-                    file_path = os.path.join(root, file)
-                    try:
-                        file_size = os.path.getsize(file_path)
-                        checksum = calculate_checksum(file_path)
-                        
-                        component = BOMItem(
-                            id=f"model-{checksum[:8]}",
-                            name=file,
-                            version="1.0.0",
-                            type=BOMItemType.MODEL,
-                            license="Unknown",
-                            source=file_path,
-                            size=f"{file_size / (1024*1024):.2f}MB",
-                            checksum=checksum,
-                            description=f"ML model file: {file}",
-                            metadata={
-                                "file_path": file_path,
-                                "file_size_bytes": file_size,
-                                "model_format": Path(file).suffix
-                            }
-                        )
-                        components.append(component)
-                    
-                    except Exception as e:
-                        logger.error(f"Error scanning model file {file_path}: {str(e)}")
+        model_extensions = self.supported_formats['models']
+        if file_scan is None:
+            file_scan = await self.file_scanner.scan(project_path, model_extensions)
+        
+        for scanned in file_scan.matching(model_extensions):
+            file = scanned.name
+            file_path = os.path.join(project_path, scanned.relative_path)
+            checksum = scanned.sha256
+            if checksum is None:
+                logger.error(f"Error scanning model file {file_path}: could not be hashed")
+                continue
+            
+            component = BOMItem(
+                id=f"model-{checksum[:8]}",
+                name=file,
+                version="1.0.0",
+                type=BOMItemType.MODEL,
+                license="Unknown",
+                source=file_path,
+                size=f"{scanned.size / (1024*1024):.2f}MB",
+                checksum=checksum,
+                description=f"ML model file: {file}",
+                metadata={
+                    "file_path": file_path,
+                    "file_size_bytes": scanned.size,
+                    "model_format": Path(file).suffix
+                }
+            )
+            components.append(component)
         
         return components
     
-    async def _scan_datasets(self, project_path: str) -> List[BOMItem]:
+    async def _scan_datasets(self, project_path: str, file_scan: Optional[ProjectScan] = None) -> List[BOMItem]:
         """Scan for dataset files"""
         components = []
         
-        dataset_extensions = ['.csv', '.parquet', '.json', '.hdf5', '.npy']
-        
-        for root, dirs, files in os.walk(project_path):
-            for file in files:
-                if any(file.endswith(ext) for ext in dataset_extensions):
-                    file_path = os.path.join(root, file)
-                    try:
-                        file_size = os.path.getsize(file_path)
-                        checksum = calculate_checksum(file_path)
-                        
-                        component = BOMItem(
-                            id=f"dataset-{checksum[:8]}",
-                            name=file,
-                            version="1.0.0",
-                            type=BOMItemType.DATASET,
-                            license="Unknown",
-                            source=file_path,
-                            size=f"{file_size / (1024*1024):.2f}MB",
-                            checksum=checksum,
-                            description=f"Dataset file: {file}",
-                            metadata={
-                                "file_path": file_path,
-                                "file_size_bytes": file_size,
-                                "dataset_format": Path(file).suffix
-                            }
-                        )
-                        components.append(component)
-                    
-                    except Exception as e:
-                        logger.error(f"Error scanning dataset file {file_path}: {str(e)}")
+        dataset_extensions = self.supported_formats['datasets']
+        if file_scan is None:
+            file_scan = await self.file_scanner.scan(project_path, dataset_extensions)
+        
+        for scanned in file_scan.matching(dataset_extensions):
+            file = scanned.name
+            file_path = os.path.join(project_path, scanned.relative_path)
+            checksum = scanned.sha256
+            if checksum is None:
+                logger.error(f"Error scanning dataset file {file_path}: could not be hashed")
+                continue
+            
+            component = BOMItem(
+                id=f"dataset-{checksum[:8]}",
+                name=file,
+                version="1.0.0",
+                type=BOMItemType.DATASET,
+                license="Unknown",
+                source=file_path,
+                size=f"{scanned.size / (1024*1024):.2f}MB",
+                checksum=checksum,
+                description=f"Dataset file: {file}",
+                metadata={
+                    "file_path": file_path,
+                    "file_size_bytes": scanned.size,
+                    "dataset_format": Path(file).suffix
+                }
+            )
+            components.append(component)
         
         return components
     
@@ -432,40 +463,33 @@ class BOMScanner:
         return components
     
     async def _scan_vulnerabilities(self, components: List[BOMItem]):
-        """Scan for known vulnerabilities using multiple sources"""
-        for component in components:
+        """Scan for known vulnerabilities, checking all components in one batched index lookup"""
+        queries = [
+            PackageQuery(ecosystem=self._package_ecosystem(component), name=component.name or "", version=component.version)
+            for component in components
+        ]
+        try:
+            matches = await self.vulnerability_index.lookup_async(queries)
+        except Exception as e:
+            logger.error(f"Error scanning vulnerabilities: {str(e)}")
+            return
+        
+        for component, advisories in zip(components, matches):
             try:
-                vulnerabilities = []
-                
-                # Check Python packages against PyPI security database
-                if component.type == BOMItemType.LIBRARY and component.name:
-                    python_vulns = await self._check_python_vulnerabilities(component.name, component.version)
-                    vulnerabilities.extend(python_vulns)
-                
-                # Check Node.js packages against npm security database
-                if component.type == BOMItemType.LIBRARY and component.name:
-                    node_vulns = await self._check_node_vulnerabilities(component.name, component.version)
-                    vulnerabilities.extend(node_vulns)
-                
-                # Check against NVD database
-                nvd_vulns = await self._check_nvd_vulnerabilities(component.name, component.version)
-                vulnerabilities.extend(nvd_vulns)
-                
-                # Add mock vulnerabilities for demonstration
-                if component.name in ['requests', 'urllib3']:
-                    vulnerabilities.append({
-                        "id": "CVE-2023-1234",
-                        "title": "Remote Code Execution in requests",
-                        "description": "Critical vulnerability allowing remote code execution",
-                        "severity": "critical",
-                        "cvss_score": 9.8,
-                        "affected_versions": ["<2.28.0"],
-                        "fixed_versions": ["2.28.0"],
-                        "references": ["https://nvd.nist.gov/vuln/detail/CVE-2023-1234"],
-                        "source": "NVD"
-                    })
-                
-                component.vulnerabilities = vulnerabilities
+                component.vulnerabilities = [
+                    {
+                        "id": advisory.id,
+                        "title": advisory.summary,
+                        "description": advisory.details or advisory.summary,
+                        "severity": advisory.severity or "unknown",
+                        "cvss_score": advisory.cvss_score,
+                        "affected_versions": advisory.affected_versions,
+                        "fixed_versions": advisory.fixed_versions,
+                        "references": advisory.references,
+                        "source": advisory.source
+                    }
+                    for advisory in advisories
+                ]
                 
                 # Update risk level based on vulnerabilities
                 component.risk_level = analyze_risk_level(component)
@@ -473,71 +497,14 @@ class BOMScanner:
             except Exception as e:
                 logger.error(f"Error scanning vulnerabilities for {component.name}: {str(e)}")
     
-    async def _check_python_vulnerabilities(self, package_name: str, version: str) -> List[Dict[str, Any]]:
-        """Check Python package vulnerabilities"""
-        try:
-            # This would integrate with PyPI security API
-            # For now, return mock data
-            if package_name == "requests" and version < "2.28.0":
-                return [{
-                    "id": "CVE-2023-32681",
-                    "title": "Requests library vulnerability",
-                    "description": "Security vulnerability in requests library",
-                    "severity": "high",
-                    "cvss_score": 7.5,
-                    "affected_versions": ["<2.28.0"],
-                    "fixed_versions": ["2.28.0"],
-                    "references": ["https://pypi.org/project/requests/"],
-                    "source": "PyPI"
-                }]
-            return []
-        except Exception as e:
-            logger.error(f"Error checking Python vulnerabilities: {str(e)}")
-            return []
-    
-    async def _check_node_vulnerabilities(self, package_name: str, version: str) -> List[Dict[str, Any]]:
-        """Check Node.js package vulnerabilities"""
-        try:
-            # This would integrate with npm security API
-            # For now, return mock data
-            if package_name == "lodash" and version < "4.17.21":
-                return [{
-                    "id": "CVE-2021-23337",
-                    "title": "Lodash prototype pollution",
-                    "description": "Prototype pollution vulnerability in lodash",
-                    "severity": "high",
-                    "cvss_score": 7.2,
-                    "affected_versions": ["<4.17.21"],
-                    "fixed_versions": ["4.17.21"],
-                    "references": ["https://www.npmjs.com/advisories/1523"],
-                    "source": "npm"
-                }]
-            return []
-        except Exception as e:
-            logger.error(f"Error checking Node.js vulnerabilities: {str(e)}")
-            return []
-    
-    async def _check_nvd_vulnerabilities(self, component_name: str, version: str) -> List[Dict[str, Any]]:
-        """Check NVD database for vulnerabilities"""
-        try:
-            # This would integrate with NVD API
-            # For now, return mock data
-            if component_name == "openssl" and version < "3.0.0":
-                return [{
-                    "id": "CVE-2022-3786",
-                    "title": "OpenSSL buffer overflow",
-                    "description": "Buffer overflow vulnerability in OpenSSL",
-                    "severity": "critical",
-                    "cvss_score": 9.8,
-                    "affected_versions": ["<3.0.0"],
-                    "fixed_versions": ["3.0.0"],
-                    "references": ["https://nvd.nist.gov/vuln/detail/CVE-2022-3786"],
-                    "source": "NVD"
-                }]
-            return []
-        except Exception as e:
-            logger.error(f"Error checking NVD vulnerabilities: {str(e)}")
-            return []
+    def _package_ecosystem(self, component: BOMItem) -> Optional[str]:
+        """OSV ecosystem of a library component, from its registry URL; None checks NVD only"""
+        if component.type != BOMItemType.LIBRARY or not component.source:
+            return None
+        for registry, ecosystem in self.PACKAGE_REGISTRIES.items():
+            if component.source.startswith(registry):
+                return ecosystem
+        return None
     
     def _parse_package_spec(self, spec: str) -> Optional[Dict[str, str]]:
         """Parse package specification string"""
@@ -3,13 +3,19 @@ Comprehensive Bias Evaluation Pipeline
 Implements the multi-layered approach outlined in the 2025 analysis
 """
 
+import os
+import time
 import asyncio
 import json
 import logging
+import threading
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Optional, Tuple, Union
-from dataclasses import dataclass, asdict
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Deque, Dict, List, Any, Optional, Tuple, Union
+from dataclasses import dataclass, asdict, field
 from datetime import datetime, timedelta
 from enum import Enum
 from scipy import stats as scipy_stats
@@ -23,6 +29,10 @@ except ImportError:
 import hashlib
 from pathlib import Path
 
+from config.settings import settings
+
+from .model_outputs import ModelOutputs
+
 logger = logging.getLogger(__name__)
 
 class EvaluationPhase(Enum):
@@ -53,6 +63,14 @@ class EvaluationResult:
     alerts: List[Dict[str, Any]]
     details: Dict[str, Any]
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EvaluationResult":
+        return cls(**{
+            **data,
+            "phase": EvaluationPhase(data["phase"]),
+            "risk_level": BiasRiskLevel(data["risk_level"]),
+        })
+
 @dataclass
 class ComprehensiveEvaluationReport:
     """Comprehensive evaluation report"""
@@ -68,17 +86,186 @@ class ComprehensiveEvaluationReport:
     compliance_status: Dict[str, Any]
     next_evaluation_due: str
     results: Dict[str, EvaluationResult]
+    phase_durations: Dict[str, float] = field(default_factory=dict)  # Wall time per phase, seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form (enums as their values)."""
+        return json.loads(json.dumps(asdict(self), default=_json_default))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ComprehensiveEvaluationReport":
+        return cls(**{
+            **data,
+            "phases_completed": [EvaluationPhase(phase) for phase in data["phases_completed"]],
+            "overall_risk": BiasRiskLevel(data["overall_risk"]),
+            "results": {
+                phase: EvaluationResult.from_dict(result) for phase, result in data["results"].items()
+            },
+        })
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class EvaluationHistoryStore:
+    """
+    The most recent evaluation reports, bounded to ``max_entries``.
+
+    With a ``path`` every report is also appended to a JSON-lines file, and
+    the last ``max_entries`` are reloaded whenever the file's size, mtime or
+    inode has changed since it was last read, so continuous learning
+    compares against evaluations from earlier runs and other workers. The
+    file is trimmed back to ``max_entries`` lines once it holds twice as
+    many.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 100):
+        self.path = path
+        self.max_entries = max_entries
+        self._reports: Deque[ComprehensiveEvaluationReport] = deque(maxlen=max_entries)
+        self._lines_on_disk = 0
+        self._file_state: Optional[Tuple[int, int, int]] = None
+        self._loaded = path is None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._reports)
+
+    def append(self, report: ComprehensiveEvaluationReport):
+        with self._lock:
+            self._load()
+            self._reports.append(report)
+            if self.path is None:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(report.to_dict()) + "\n")
+                self._lines_on_disk += 1
+                if self._lines_on_disk > 2 * self.max_entries:
+                    self._trim()
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning(f"Failed to persist evaluation {report.evaluation_id}: {e}")
+
+    def latest(self) -> Optional[ComprehensiveEvaluationReport]:
+        with self._lock:
+            self._load()
+            return self._reports[-1] if self._reports else None
+
+    def recent(self, limit: int = 10) -> List[ComprehensiveEvaluationReport]:
+        with self._lock:
+            self._load()
+            return list(self._reports)[-limit:] if limit > 0 else []
+
+    def get(self, evaluation_id: str) -> Optional[ComprehensiveEvaluationReport]:
+        with self._lock:
+            self._load()
+            return next((r for r in self._reports if r.evaluation_id == evaluation_id), None)
+
+    def _load(self):
+        """Reload from the file on first use and after anything (any worker) changed it."""
+        if self.path is None:
+            return
+        file_state = self._stat()
+        if self._loaded and file_state == self._file_state:
+            return
+        self._loaded = True
+        self._file_state = file_state
+        lines = self._read_lines()
+        self._lines_on_disk = len(lines)
+        self._reports.clear()
+        for line in lines[-self.max_entries:]:
+            try:
+                self._reports.append(ComprehensiveEvaluationReport.from_dict(json.loads(line)))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping unreadable evaluation history entry: {e}")
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _read_lines(self) -> List[str]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return [line for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            logger.warning(f"Failed to read evaluation history {self.path}: {e}")
+            return []
+
+    def _trim(self):
+        # Re-read rather than rewrite from memory so entries appended by
+        # other workers are kept
+        lines = self._read_lines()[-self.max_entries:]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp_path, self.path)
+        self._lines_on_disk = len(lines)
+
+
+@dataclass(frozen=True)
+class PhaseSpec:
+    """A pipeline phase: the method that runs it and the phases it needs first."""
+    phase: EvaluationPhase
+    runner: str
+    depends_on: Tuple[EvaluationPhase, ...] = ()
 
 class ComprehensiveBiasEvaluationPipeline:
     """
     Comprehensive bias evaluation pipeline implementing the 2025 analysis approach
+
+    Phases are CPU-bound numpy code, so they run on a thread pool instead of
+    the event loop. Phases without unmet dependencies run concurrently; a
+    phase is skipped when a phase it depends on failed.
     """
 
-    def __init__(self):
+    # Every phase reads only the shared ModelOutputs frame (continuous
+    # learning compares against the previous evaluation, not this one), so
+    # none depends on another
+    PHASES: Tuple[PhaseSpec, ...] = (
+        PhaseSpec(EvaluationPhase.PRE_DEPLOYMENT, "_run_pre_deployment_evaluation"),
+        PhaseSpec(EvaluationPhase.REAL_TIME_MONITORING, "_run_real_time_monitoring"),
+        PhaseSpec(EvaluationPhase.POST_DEPLOYMENT_AUDITING, "_run_post_deployment_auditing"),
+        PhaseSpec(EvaluationPhase.HUMAN_IN_LOOP, "_run_human_in_loop_evaluation"),
+        PhaseSpec(EvaluationPhase.CONTINUOUS_LEARNING, "_run_continuous_learning"),
+    )
+
+    def __init__(
+        self,
+        history_store: Optional[EvaluationHistoryStore] = None,
+        executor: Optional[Executor] = None,
+        phase_timeout: Optional[float] = None
+    ):
         self.evaluation_configs = self._initialize_evaluation_configs()
         self.monitoring_thresholds = self._initialize_monitoring_thresholds()
         self.compliance_frameworks = self._initialize_compliance_frameworks()
-        self.evaluation_history = []
+        if history_store is None:
+            history_store = EvaluationHistoryStore(
+                path=settings.bias_evaluation_history_file
+                or os.path.join(settings.database_dir, "bias_evaluation_history.jsonl"),
+                max_entries=settings.bias_evaluation_history_size,
+            )
+        self.evaluation_history = history_store
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=settings.bias_evaluation_max_workers, thread_name_prefix="bias-eval"
+        )
+        self.phase_timeout = phase_timeout or settings.bias_evaluation_phase_timeout
 
     def _initialize_evaluation_configs(self) -> Dict[str, Dict[str, Any]]:
         """Initialize evaluation configurations for each phase"""
@@ -209,7 +396,7 @@ class ComprehensiveBiasEvaluationPipeline:
         self,
         model_id: str,
         model_type: str,
-        model_outputs: List[Dict[str, Any]],
+        model_outputs: Union[List[Dict[str, Any]], pd.DataFrame, ModelOutputs],
         evaluation_config: Optional[Dict[str, Any]] = None
     ) -> ComprehensiveEvaluationReport:
         """
@@ -221,8 +408,18 @@ class ComprehensiveBiasEvaluationPipeline:
         3. Post-deployment auditing
         4. Human-in-the-loop evaluation
         5. Continuous learning adaptation
+
+        Independent phases run in parallel on the executor, each bounded by
+        its ``timeout_seconds`` (default ``phase_timeout``).
+
+        ``model_outputs`` may be output dicts, a DataFrame, an Arrow table,
+        a Parquet path or a prebuilt ``ModelOutputs``; it is converted to a
+        ``ModelOutputs`` frame once and shared by every phase.
         """
         try:
+            # Building the frame is O(n) Python work for dicts; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            outputs = await loop.run_in_executor(self.executor, ModelOutputs.coerce, model_outputs)
             evaluation_id = f"eval_{model_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             start_time = datetime.now()
 
@@ -231,53 +428,14 @@ class ComprehensiveBiasEvaluationPipeline:
             # Merge with default configuration
             config = {**self.evaluation_configs, **(evaluation_config or {})}
 
-            results = {}
-            phases_completed = []
-
-            # Phase 1: Pre-deployment comprehensive testing
-            if config.get("pre_deployment", {}).get("enabled", True):
-                logger.info("Running pre-deployment comprehensive testing...")
-                pre_deployment_result = await self._run_pre_deployment_evaluation(
-                    model_id, model_type, model_outputs, config["pre_deployment"]
-                )
-                results["pre_deployment"] = pre_deployment_result
-                phases_completed.append(EvaluationPhase.PRE_DEPLOYMENT)
-
-            # Phase 2: Real-time monitoring simulation
-            if config.get("real_time_monitoring", {}).get("enabled", True):
-                logger.info("Running real-time monitoring simulation...")
-                real_time_result = await self._run_real_time_monitoring(
-                    model_id, model_type, model_outputs, config["real_time_monitoring"]
-                )
-                results["real_time_monitoring"] = real_time_result
-                phases_completed.append(EvaluationPhase.REAL_TIME_MONITORING)
-
-            # Phase 3: Post-deployment auditing
-            if config.get("post_deployment_auditing", {}).get("enabled", True):
-                logger.info("Running post-deployment auditing...")
-                post_deployment_result = await self._run_post_deployment_auditing(
-                    model_id, model_type, model_outputs, config["post_deployment_auditing"]
-                )
-                results["post_deployment_auditing"] = post_deployment_result
-                phases_completed.append(EvaluationPhase.POST_DEPLOYMENT_AUDITING)
-
-            # Phase 4: Human-in-the-loop evaluation
-            if config.get("human_in_loop", {}).get("enabled", True):
-                logger.info("Running human-in-the-loop evaluation...")
-                human_evaluation_result = await self._run_human_in_loop_evaluation(
-                    model_id, model_type, model_outputs, config["human_in_loop"]
-                )
-                results["human_in_loop"] = human_evaluation_result
-                phases_completed.append(EvaluationPhase.HUMAN_IN_LOOP)
-
-            # Phase 5: Continuous learning adaptation
-            if config.get("continuous_learning", {}).get("enabled", True):
-                logger.info("Running continuous learning adaptation...")
-                continuous_learning_result = await self._run_continuous_learning(
-                    model_id, model_type, model_outputs, config["continuous_learning"]
-                )
-                results["continuous_learning"] = continuous_learning_result
-                phases_completed.append(EvaluationPhase.CONTINUOUS_LEARNING)
+            enabled = [
+                spec for spec in self.PHASES
+                if config.get(spec.phase.value, {}).get("enabled", True)
+            ]
+            results, phase_durations = await self._run_phases(
+                enabled, model_id, model_type, outputs, config
+            )
+            phases_completed = [spec.phase for spec in enabled]
 
             # Generate comprehensive report
             end_time = datetime.now()
@@ -285,9 +443,10 @@ class ComprehensiveBiasEvaluationPipeline:
                 evaluation_id, model_id, model_type, start_time, end_time,
                 phases_completed, results
             )
+            report.phase_durations = phase_durations
 
             # Store evaluation history
-            self.evaluation_history.append(report)
+            await loop.run_in_executor(self.executor, self.evaluation_history.append, report)
 
             logger.info(f"Comprehensive evaluation {evaluation_id} completed successfully")
             return report
@@ -296,11 +455,80 @@ class ComprehensiveBiasEvaluationPipeline:
             logger.error(f"Error in comprehensive evaluation: {e}")
             raise
 
-    async def _run_pre_deployment_evaluation(
+    async def _run_phases(
+        self,
+        specs: List[PhaseSpec],
+        model_id: str,
+        model_type: str,
+        outputs: ModelOutputs,
+        config: Dict[str, Any]
+    ) -> Tuple[Dict[str, EvaluationResult], Dict[str, float]]:
+        """
+        Run phases on the executor, each as soon as the phases it depends on
+        have succeeded.
+
+        A phase that exceeds its timeout is reported as failed. Its worker
+        thread cannot be interrupted, so it runs to completion in the
+        background and its result is discarded. Cancelling the evaluation
+        cancels every phase that has not finished.
+        """
+        loop = asyncio.get_running_loop()
+        tasks: Dict[EvaluationPhase, asyncio.Task] = {}
+        durations: Dict[str, float] = {}
+
+        async def run(spec: PhaseSpec) -> EvaluationResult:
+            for dependency in spec.depends_on:
+                if dependency in tasks and not (await tasks[dependency]).success:
+                    return self._failed_phase_result(
+                        spec.phase, f"Skipped because {dependency.value} failed"
+                    )
+
+            phase_config = config[spec.phase.value]
+            timeout = phase_config.get("timeout_seconds", self.phase_timeout)
+            runner = partial(getattr(self, spec.runner), model_id, model_type, outputs, phase_config)
+            started = time.perf_counter()
+            try:
+                return await asyncio.wait_for(loop.run_in_executor(self.executor, runner), timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Phase {spec.phase.value} timed out after {timeout}s")
+                return self._failed_phase_result(spec.phase, f"Timed out after {timeout}s")
+            except Exception as e:
+                logger.error(f"Phase {spec.phase.value} failed: {e}")
+                return self._failed_phase_result(spec.phase, str(e))
+            finally:
+                durations[spec.phase.value] = time.perf_counter() - started
+
+        for spec in specs:
+            tasks[spec.phase] = asyncio.create_task(run(spec))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        results = {spec.phase.value: tasks[spec.phase].result() for spec in specs}
+        return results, {spec.phase.value: durations.get(spec.phase.value, 0.0) for spec in specs}
+
+    @staticmethod
+    def _failed_phase_result(phase: EvaluationPhase, message: str) -> EvaluationResult:
+        return EvaluationResult(
+            phase=phase,
+            timestamp=datetime.now().isoformat(),
+            success=False,
+            bias_detected=False,
+            risk_level=BiasRiskLevel.CRITICAL,
+            metrics={},
+            recommendations=[f"Re-run the {phase.value} phase"],
+            alerts=[{"type": "error", "message": message}],
+            details={"error": message}
+        )
+
+    def _run_pre_deployment_evaluation(
         self,
         model_id: str,
         model_type: str,
-        model_outputs: List[Dict[str, Any]],
+        outputs: ModelOutputs,
         config: Dict[str, Any]
     ) -> EvaluationResult:
         """Run pre-deployment comprehensive testing"""
@@ -313,7 +541,7 @@ class ComprehensiveBiasEvaluationPipeline:
             max_bias_score = 0.0
 
             for test_name in config["required_tests"]:
-                test_result = await self._run_bias_test(test_name, model_outputs)
+                test_result = self._run_bias_test(test_name, outputs)
                 test_results[test_name] = test_result
 
                 if test_result["is_biased"]:
@@ -344,7 +572,7 @@ class ComprehensiveBiasEvaluationPipeline:
                 recommendations=recommendations,
                 alerts=alerts,
                 details={
-                    "sample_size": len(model_outputs),
+                    "sample_size": len(outputs),
                     "confidence_level": config["confidence_level"],
                     "bias_threshold": config["bias_threshold"]
                 }
@@ -364,31 +592,25 @@ class ComprehensiveBiasEvaluationPipeline:
                 details={"error": str(e)}
             )
 
-    async def _run_real_time_monitoring(
+    def _run_real_time_monitoring(
         self,
         model_id: str,
         model_type: str,
-        model_outputs: List[Dict[str, Any]],
+        outputs: ModelOutputs,
         config: Dict[str, Any]
     ) -> EvaluationResult:
         """Run real-time monitoring using actual model output data"""
         try:
             start_time = datetime.now()
 
-            # Extract scores and group labels from model_outputs for real computation
-            scores = np.array([
-                o.get("score", o.get("prediction", 0.0)) for o in model_outputs
-            ], dtype=float)
-            labels = np.array([
-                o.get("label", o.get("ground_truth", 0)) for o in model_outputs
-            ], dtype=float)
-            groups = [o.get("group", o.get("demographic_group", "unknown")) for o in model_outputs]
+            scores = outputs.scores
 
             # Compute rolling bias trend from sequential chunks of data
             # Split data into 24 equal time-windows (simulating 24-hour monitoring)
             n = len(scores)
             num_windows = min(24, max(1, n))
             chunk_size = max(1, n // num_windows)
+            overall_mean = float(np.mean(scores)) if len(scores) > 0 else 0.0
             bias_trend = []
             for i in range(num_windows):
                 start_idx = i * chunk_size
@@ -396,7 +618,6 @@ class ComprehensiveBiasEvaluationPipeline:
                 chunk_scores = scores[start_idx:end_idx]
                 if len(chunk_scores) > 1:
                     # Bias proxy: deviation of chunk mean from overall mean
-                    overall_mean = float(np.mean(scores)) if len(scores) > 0 else 0.0
                     chunk_mean = float(np.mean(chunk_scores))
                     bias_trend.append(abs(chunk_mean - overall_mean))
                 else:
@@ -406,25 +627,16 @@ class ComprehensiveBiasEvaluationPipeline:
             drift_score = self._calculate_psi(scores, num_windows)
 
             # Compute real performance metrics from labels vs scores
-            predictions_binary = (scores >= 0.5).astype(int) if len(scores) > 0 else np.array([])
-            labels_binary = labels.astype(int) if len(labels) > 0 else np.array([])
             accuracy, precision, recall = self._compute_classification_metrics(
-                labels_binary, predictions_binary
+                outputs.label_classes, outputs.predictions
             )
 
             # Compute per-group bias scores from actual data
-            unique_groups = sorted(set(groups))
-            demographic_analysis = {}
-            overall_positive_rate = float(np.mean(predictions_binary)) if len(predictions_binary) > 0 else 0.0
-            for grp in unique_groups:
-                grp_mask = np.array([g == grp for g in groups])
-                grp_preds = predictions_binary[grp_mask] if len(predictions_binary) > 0 else np.array([])
-                if len(grp_preds) > 0:
-                    grp_positive_rate = float(np.mean(grp_preds))
-                    group_bias = abs(grp_positive_rate - overall_positive_rate)
-                else:
-                    group_bias = 0.0
-                demographic_analysis[grp] = {"bias_score": group_bias}
+            overall_positive_rate = float(np.mean(outputs.predictions)) if len(outputs) > 0 else 0.0
+            demographic_analysis = {
+                grp: {"bias_score": abs(float(rate) - overall_positive_rate)}
+                for grp, rate in zip(outputs.groups, outputs.positive_rates())
+            }
 
             monitoring_metrics = {
                 "bias_trend": bias_trend,
@@ -504,32 +716,24 @@ class ComprehensiveBiasEvaluationPipeline:
                 details={"error": str(e)}
             )
 
-    async def _run_post_deployment_auditing(
+    def _run_post_deployment_auditing(
         self,
         model_id: str,
         model_type: str,
-        model_outputs: List[Dict[str, Any]],
+        outputs: ModelOutputs,
         config: Dict[str, Any]
     ) -> EvaluationResult:
         """Run post-deployment auditing using real data aggregation"""
         try:
             start_time = datetime.now()
 
-            # Extract data arrays
-            scores = np.array([
-                o.get("score", o.get("prediction", 0.0)) for o in model_outputs
-            ], dtype=float)
-            labels = np.array([
-                o.get("label", o.get("ground_truth", 0)) for o in model_outputs
-            ], dtype=float)
-            groups = [o.get("group", o.get("demographic_group", "unknown")) for o in model_outputs]
-            predictions_binary = (scores >= 0.5).astype(int) if len(scores) > 0 else np.array([])
-            labels_binary = labels.astype(int) if len(labels) > 0 else np.array([])
+            scores = outputs.scores
+            predictions_binary = outputs.predictions
+            labels_binary = outputs.label_classes
 
             # Count real bias incidents: cases where per-group positive rate
             # differs from overall by more than the demographic_parity high threshold
-            unique_groups = sorted(set(groups))
-            overall_positive_rate = float(np.mean(predictions_binary)) if len(predictions_binary) > 0 else 0.0
+            overall_positive_rate = float(np.mean(predictions_binary)) if len(outputs) > 0 else 0.0
             dp_threshold = self.monitoring_thresholds["demographic_parity"]["high"]
             eq_threshold = self.monitoring_thresholds["equalized_odds"]["high"]
 
@@ -537,21 +741,15 @@ class ComprehensiveBiasEvaluationPipeline:
             fairness_violations = 0
             group_details = {}
 
-            for grp in unique_groups:
-                grp_mask = np.array([g == grp for g in groups])
-                grp_preds = predictions_binary[grp_mask]
-                grp_labels = labels_binary[grp_mask]
-
-                if len(grp_preds) == 0:
-                    continue
-
-                grp_positive_rate = float(np.mean(grp_preds))
+            # Equalized odds: difference in TPR
+            tpr_overall = self._true_positive_rate(labels_binary, predictions_binary)
+            group_stats = zip(
+                outputs.groups, outputs.group_sizes, outputs.positive_rates(), outputs.true_positive_rates()
+            )
+            for grp, count, grp_positive_rate, tpr_group in group_stats:
+                grp_positive_rate = float(grp_positive_rate)
                 dp_diff = abs(grp_positive_rate - overall_positive_rate)
-
-                # Equalized odds: difference in TPR
-                tpr_overall = self._true_positive_rate(labels_binary, predictions_binary)
-                tpr_group = self._true_positive_rate(grp_labels, grp_preds)
-                eq_diff = abs(tpr_group - tpr_overall)
+                eq_diff = abs(float(tpr_group) - tpr_overall)
 
                 if dp_diff > dp_threshold:
                     bias_incidents += 1
@@ -559,7 +757,7 @@ class ComprehensiveBiasEvaluationPipeline:
                     fairness_violations += 1
 
                 group_details[grp] = {
-                    "count": int(grp_mask.sum()),
+                    "count": int(count),
                     "positive_rate": grp_positive_rate,
                     "demographic_parity_diff": dp_diff,
                     "equalized_odds_diff": eq_diff,
@@ -567,27 +765,23 @@ class ComprehensiveBiasEvaluationPipeline:
 
             # Compute performance issues: groups where accuracy is notably lower
             performance_issues = 0
-            overall_accuracy = float(np.mean(predictions_binary == labels_binary)) if len(labels_binary) > 0 else 0.0
-            for grp in unique_groups:
-                grp_mask = np.array([g == grp for g in groups])
-                grp_preds = predictions_binary[grp_mask]
-                grp_labels = labels_binary[grp_mask]
-                if len(grp_labels) > 0:
-                    grp_accuracy = float(np.mean(grp_preds == grp_labels))
-                    if (overall_accuracy - grp_accuracy) > self.monitoring_thresholds["calibration"]["high"]:
-                        performance_issues += 1
+            overall_accuracy = float(np.mean(predictions_binary == labels_binary)) if len(outputs) > 0 else 0.0
+            for grp_accuracy in outputs.accuracies():
+                if (overall_accuracy - float(grp_accuracy)) > self.monitoring_thresholds["calibration"]["high"]:
+                    performance_issues += 1
 
             # Trend analysis via linear regression on sequential bias measurements
             n = len(scores)
             num_windows = min(10, max(1, n))
             chunk_size = max(1, n // num_windows)
+            overall_mean = float(np.mean(scores)) if n > 0 else 0.0
             window_biases = []
             for i in range(num_windows):
                 s = i * chunk_size
                 e = min(s + chunk_size, n)
                 chunk = scores[s:e]
                 if len(chunk) > 0:
-                    window_biases.append(abs(float(np.mean(chunk)) - float(np.mean(scores))))
+                    window_biases.append(abs(float(np.mean(chunk)) - overall_mean))
                 else:
                     window_biases.append(0.0)
 
@@ -600,10 +794,7 @@ class ComprehensiveBiasEvaluationPipeline:
                 trend_intercept = float(intercept)
 
             # User complaints proxy: count outputs flagged by user or with low confidence
-            user_complaints = sum(
-                1 for o in model_outputs
-                if o.get("flagged", False) or o.get("user_complaint", False)
-            )
+            user_complaints = int(np.count_nonzero(outputs.flagged))
 
             audit_findings = {
                 "bias_incidents": bias_incidents,
@@ -711,70 +902,49 @@ class ComprehensiveBiasEvaluationPipeline:
                 details={"error": str(e)}
             )
 
-    async def _run_human_in_loop_evaluation(
+    def _run_human_in_loop_evaluation(
         self,
         model_id: str,
         model_type: str,
-        model_outputs: List[Dict[str, Any]],
+        outputs: ModelOutputs,
         config: Dict[str, Any]
     ) -> EvaluationResult:
         """Run human-in-the-loop evaluation using actual threshold-based flagging"""
         try:
             start_time = datetime.now()
 
-            # Extract data
-            scores = np.array([
-                o.get("score", o.get("prediction", 0.0)) for o in model_outputs
-            ], dtype=float)
-            labels = np.array([
-                o.get("label", o.get("ground_truth", 0)) for o in model_outputs
-            ], dtype=float)
-            groups = [o.get("group", o.get("demographic_group", "unknown")) for o in model_outputs]
-            predictions_binary = (scores >= 0.5).astype(int) if len(scores) > 0 else np.array([])
-            labels_binary = labels.astype(int) if len(labels) > 0 else np.array([])
+            scores = outputs.scores
+            predictions_binary = outputs.predictions
+            labels_binary = outputs.label_classes
 
             # Compute per-group fairness metrics to identify flagged cases
-            unique_groups = sorted(set(groups))
-            overall_positive_rate = float(np.mean(predictions_binary)) if len(predictions_binary) > 0 else 0.0
-            flagged_groups = []
-            group_bias_scores = {}
-
-            for grp in unique_groups:
-                grp_mask = np.array([g == grp for g in groups])
-                grp_preds = predictions_binary[grp_mask]
-                if len(grp_preds) > 0:
-                    grp_rate = float(np.mean(grp_preds))
-                    dp_diff = abs(grp_rate - overall_positive_rate)
-                    group_bias_scores[grp] = dp_diff
-                    # Flag groups exceeding medium threshold
-                    if dp_diff > self.monitoring_thresholds["demographic_parity"]["medium"]:
-                        flagged_groups.append(grp)
-                else:
-                    group_bias_scores[grp] = 0.0
+            overall_positive_rate = float(np.mean(predictions_binary)) if len(outputs) > 0 else 0.0
+            dp_diffs = np.abs(outputs.positive_rates() - overall_positive_rate)
+            # Flag groups exceeding medium threshold
+            flagged_group_mask = dp_diffs > self.monitoring_thresholds["demographic_parity"]["medium"]
+            group_bias_scores = {grp: float(diff) for grp, diff in zip(outputs.groups, dp_diffs)}
+            flagged_groups = [grp for grp, flagged in zip(outputs.groups, flagged_group_mask) if flagged]
 
             # Identify individual cases that need expert review:
             # cases where the model disagrees with the label or where confidence is extreme
-            flagged_cases = []
-            for i, output in enumerate(model_outputs):
-                score = scores[i] if i < len(scores) else 0.0
-                label = labels[i] if i < len(labels) else 0
-                pred = 1 if score >= 0.5 else 0
-                confidence = abs(score - 0.5) * 2  # 0 = uncertain, 1 = certain
-                reasons = []
-                if pred != int(label):
-                    reasons.append("prediction_disagrees_with_label")
-                if confidence < 0.2:
-                    reasons.append("low_confidence")
-                if output.get("group", output.get("demographic_group", "unknown")) in flagged_groups:
-                    reasons.append("flagged_demographic_group")
-                if reasons:
-                    flagged_cases.append({
-                        "index": i,
-                        "score": float(score),
-                        "label": float(label),
-                        "group": groups[i] if i < len(groups) else "unknown",
-                        "reasons": reasons
-                    })
+            case_reasons = [
+                ("prediction_disagrees_with_label", predictions_binary != labels_binary),
+                ("low_confidence", np.abs(scores - 0.5) * 2 < 0.2),  # 0 = uncertain, 1 = certain
+                ("flagged_demographic_group", flagged_group_mask[outputs.group_codes]),
+            ]
+            needs_review = np.logical_or.reduce([mask for _, mask in case_reasons])
+            flagged_indices = np.flatnonzero(needs_review)
+            flagged_cases_count = len(flagged_indices)
+            flagged_cases_sample = [
+                {
+                    "index": int(i),
+                    "score": float(scores[i]),
+                    "label": float(outputs.labels[i]),
+                    "group": outputs.groups[outputs.group_codes[i]],
+                    "reasons": [reason for reason, mask in case_reasons if mask[i]]
+                }
+                for i in flagged_indices[:20]  # first 20 for review
+            ]
 
             # Structure expert review from data analysis
             bias_detected_by_data = len(flagged_groups) > 0
@@ -788,34 +958,30 @@ class ComprehensiveBiasEvaluationPipeline:
             expert_review = {
                 "bias_detected": bias_detected_by_data,
                 "severity": severity,
-                "confidence": 1.0 - (1.0 / (1.0 + len(model_outputs))),  # confidence scales with data size
+                "confidence": 1.0 - (1.0 / (1.0 + len(outputs))),  # confidence scales with data size
                 "flagged_groups": flagged_groups,
                 "group_bias_scores": group_bias_scores,
-                "flagged_cases_count": len(flagged_cases),
+                "flagged_cases_count": flagged_cases_count,
                 "notes": (
-                    f"Analysis of {len(model_outputs)} outputs identified "
+                    f"Analysis of {len(outputs)} outputs identified "
                     f"{len(flagged_groups)} groups with elevated bias and "
-                    f"{len(flagged_cases)} individual cases requiring review."
+                    f"{flagged_cases_count} individual cases requiring review."
                 )
             }
 
             # Compute crowd evaluation proxy from agreement analysis
             # Use inter-annotator agreement if ratings are present, otherwise from label consistency
-            ratings = [o.get("bias_rating", None) for o in model_outputs if o.get("bias_rating") is not None]
-            if len(ratings) >= 2:
-                ratings_arr = np.array(ratings, dtype=float)
+            ratings_arr = outputs.bias_ratings
+            if len(ratings_arr) >= 2:
                 bias_rating = float(np.mean(ratings_arr))
-                fairness_ratings = [
-                    o.get("fairness_rating", None) for o in model_outputs
-                    if o.get("fairness_rating") is not None
-                ]
-                fairness_rating = float(np.mean(fairness_ratings)) if fairness_ratings else bias_rating
+                fairness_ratings = outputs.fairness_ratings
+                fairness_rating = float(np.mean(fairness_ratings)) if len(fairness_ratings) else bias_rating
                 # Inter-rater reliability via coefficient of variation (lower CV = higher agreement)
                 cv = float(np.std(ratings_arr) / np.mean(ratings_arr)) if np.mean(ratings_arr) > 0 else 1.0
                 inter_rater_reliability = max(0.0, min(1.0, 1.0 - cv))
             else:
                 # No crowd ratings available; use prediction-label agreement as proxy
-                if len(predictions_binary) > 0 and len(labels_binary) > 0:
+                if len(outputs) > 0:
                     agreement_rate = float(np.mean(predictions_binary == labels_binary))
                     bias_rating = agreement_rate * 5.0  # Scale to 1-5
                     fairness_rating = agreement_rate * 5.0
@@ -828,7 +994,7 @@ class ComprehensiveBiasEvaluationPipeline:
             consensus = "strong" if inter_rater_reliability >= 0.8 else ("moderate" if inter_rater_reliability >= 0.6 else "weak")
 
             crowd_evaluation = {
-                "participants": len(ratings) if ratings else len(model_outputs),
+                "participants": len(ratings_arr) if len(ratings_arr) else len(outputs),
                 "bias_rating": bias_rating,
                 "fairness_rating": fairness_rating,
                 "inter_rater_reliability": inter_rater_reliability,
@@ -877,14 +1043,14 @@ class ComprehensiveBiasEvaluationPipeline:
                 metrics={
                     "expert_review": expert_review,
                     "crowd_evaluation": crowd_evaluation,
-                    "flagged_cases_sample": flagged_cases[:20],  # first 20 for review
+                    "flagged_cases_sample": flagged_cases_sample,
                 },
                 recommendations=recommendations,
                 alerts=alerts,
                 details={
                     "expert_review_required": config["expert_review_required"],
                     "review_timeout_hours": config["review_timeout_hours"],
-                    "total_flagged_cases": len(flagged_cases),
+                    "total_flagged_cases": flagged_cases_count,
                 }
             )
 
@@ -902,38 +1068,29 @@ class ComprehensiveBiasEvaluationPipeline:
                 details={"error": str(e)}
             )
 
-    async def _run_continuous_learning(
+    def _run_continuous_learning(
         self,
         model_id: str,
         model_type: str,
-        model_outputs: List[Dict[str, Any]],
+        outputs: ModelOutputs,
         config: Dict[str, Any]
     ) -> EvaluationResult:
         """Run continuous learning adaptation using metric deltas between evaluation periods"""
         try:
             start_time = datetime.now()
 
-            # Compute current metrics from the provided data
-            scores = np.array([
-                o.get("score", o.get("prediction", 0.0)) for o in model_outputs
-            ], dtype=float)
-            labels = np.array([
-                o.get("label", o.get("ground_truth", 0)) for o in model_outputs
-            ], dtype=float)
-            groups = [o.get("group", o.get("demographic_group", "unknown")) for o in model_outputs]
-            predictions_binary = (scores >= 0.5).astype(int) if len(scores) > 0 else np.array([])
-            labels_binary = labels.astype(int) if len(labels) > 0 else np.array([])
-
             # Current bias metric: statistical parity difference
-            current_spd = self._compute_statistical_parity_difference(predictions_binary, groups)
-            current_accuracy = float(np.mean(predictions_binary == labels_binary)) if len(labels_binary) > 0 else 0.0
+            current_spd = self._compute_statistical_parity_difference(outputs)
+            current_accuracy = (
+                float(np.mean(outputs.predictions == outputs.label_classes)) if len(outputs) > 0 else 0.0
+            )
 
             # Compare with previous evaluation if available
             previous_spd = 0.0
             previous_accuracy = 0.0
             model_updates = 0
-            if self.evaluation_history:
-                last_report = self.evaluation_history[-1]
+            last_report = self.evaluation_history.latest()
+            if last_report is not None:
                 # Try to extract previous metrics from the last pre_deployment or monitoring result
                 for phase_key in ["pre_deployment", "real_time_monitoring"]:
                     prev_result = last_report.results.get(phase_key)
@@ -1031,16 +1188,12 @@ class ComprehensiveBiasEvaluationPipeline:
                 details={"error": str(e)}
             )
 
-    async def _run_bias_test(self, test_name: str, model_outputs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _run_bias_test(self, test_name: str, outputs: ModelOutputs) -> Dict[str, Any]:
         """
-        Run individual bias test computing real fairness metrics from model_outputs.
-
-        Each output dict is expected to contain:
-          - score/prediction (float): model output score
-          - label/ground_truth (int/float): true label
-          - group/demographic_group (str): protected attribute group
+        Run individual bias test computing real fairness metrics from the
+        score, label and group columns of ``outputs``.
         """
-        if not model_outputs:
+        if len(outputs) == 0:
             return {
                 "test_name": test_name,
                 "bias_score": 0.0,
@@ -1053,41 +1206,25 @@ class ComprehensiveBiasEvaluationPipeline:
                 }
             }
 
-        scores = np.array([
-            o.get("score", o.get("prediction", 0.0)) for o in model_outputs
-        ], dtype=float)
-        labels = np.array([
-            o.get("label", o.get("ground_truth", 0)) for o in model_outputs
-        ], dtype=float)
-        groups = [o.get("group", o.get("demographic_group", "unknown")) for o in model_outputs]
-        predictions_binary = (scores >= 0.5).astype(int)
-        labels_binary = labels.astype(int)
-
-        unique_groups = sorted(set(groups))
-
         # Route to specific metric computation based on test name
         if test_name in ("stereoset", "weat", "seat"):
             # Association-based tests: compute effect size between group score distributions
-            bias_score, confidence, extra = self._compute_association_bias(scores, groups, unique_groups)
+            bias_score, confidence, extra = self._compute_association_bias(outputs)
         elif test_name in ("crowspairs", "minimal_pairs"):
             # Paired comparison tests: statistical parity difference
-            bias_score = self._compute_statistical_parity_difference(predictions_binary, groups)
-            confidence = self._compute_confidence(predictions_binary, groups)
+            bias_score = self._compute_statistical_parity_difference(outputs)
+            confidence = self._compute_confidence(outputs)
             extra = {"metric": "statistical_parity_difference"}
         elif test_name == "bbq":
             # Equalized odds difference
-            bias_score, confidence, extra = self._compute_equalized_odds_difference(
-                labels_binary, predictions_binary, groups, unique_groups
-            )
+            bias_score, confidence, extra = self._compute_equalized_odds_difference(outputs)
         elif test_name == "red_teaming":
             # Disparate impact ratio deviation from 1.0
-            bias_score, confidence, extra = self._compute_disparate_impact(
-                predictions_binary, groups, unique_groups
-            )
+            bias_score, confidence, extra = self._compute_disparate_impact(outputs)
         else:
             # Default: statistical parity difference
-            bias_score = self._compute_statistical_parity_difference(predictions_binary, groups)
-            confidence = self._compute_confidence(predictions_binary, groups)
+            bias_score = self._compute_statistical_parity_difference(outputs)
+            confidence = self._compute_confidence(outputs)
             extra = {"metric": "statistical_parity_difference"}
 
         is_biased = bias_score > 0.1
@@ -1098,9 +1235,9 @@ class ComprehensiveBiasEvaluationPipeline:
             "is_biased": is_biased,
             "confidence": float(confidence),
             "details": {
-                "sample_size": len(model_outputs),
+                "sample_size": len(outputs),
                 "test_type": test_name,
-                "groups_analyzed": unique_groups,
+                "groups_analyzed": list(outputs.groups),
                 **extra
             }
         }
@@ -1143,66 +1280,45 @@ class ComprehensiveBiasEvaluationPipeline:
         return accuracy, precision, recall
 
     @staticmethod
-    def _compute_statistical_parity_difference(
-        predictions: np.ndarray, groups: List[str]
-    ) -> float:
+    def _compute_statistical_parity_difference(outputs: ModelOutputs) -> float:
         """
         Statistical parity difference: max absolute difference in positive
         prediction rates across groups.
         """
-        if len(predictions) == 0:
-            return 0.0
-        unique_groups = sorted(set(groups))
-        if len(unique_groups) < 2:
-            return 0.0
-        rates = []
-        for grp in unique_groups:
-            mask = np.array([g == grp for g in groups])
-            grp_preds = predictions[mask]
-            if len(grp_preds) > 0:
-                rates.append(float(np.mean(grp_preds)))
-        if len(rates) < 2:
+        if len(outputs) == 0 or outputs.n_groups < 2:
             return 0.0
-        return float(max(rates) - min(rates))
+        rates = outputs.positive_rates()
+        return float(rates.max() - rates.min())
 
     @staticmethod
-    def _compute_confidence(predictions: np.ndarray, groups: List[str]) -> float:
+    def _compute_confidence(outputs: ModelOutputs) -> float:
         """
         Confidence based on sample size per group.
         Uses the smallest group size relative to a minimum useful size (30).
         """
-        unique_groups = sorted(set(groups))
-        if not unique_groups:
+        if outputs.n_groups == 0:
             return 0.0
-        min_group_size = min(
-            sum(1 for g in groups if g == grp) for grp in unique_groups
-        )
+        min_group_size = int(outputs.group_sizes.min())
         # Confidence scales with sample size, saturating around 100 samples
         return float(min(1.0, min_group_size / 100.0))
 
     def _compute_association_bias(
         self,
-        scores: np.ndarray,
-        groups: List[str],
-        unique_groups: List[str],
+        outputs: ModelOutputs,
     ) -> Tuple[float, float, Dict[str, Any]]:
         """
         Association-based bias: compute effect size (Cohen's d) between
         the two most different group score distributions.
         """
-        if len(unique_groups) < 2 or len(scores) == 0:
+        if outputs.n_groups < 2 or len(outputs) == 0:
             return 0.0, 0.0, {"metric": "cohens_d", "note": "insufficient groups"}
 
-        group_stats = {}
-        for grp in unique_groups:
-            mask = np.array([g == grp for g in groups])
-            grp_scores = scores[mask]
-            if len(grp_scores) > 0:
-                group_stats[grp] = {
-                    "mean": float(np.mean(grp_scores)),
-                    "std": float(np.std(grp_scores, ddof=1)) if len(grp_scores) > 1 else 0.0,
-                    "n": int(len(grp_scores)),
-                }
+        means = outputs.group_mean(outputs.scores)
+        stds = outputs.group_std(outputs.scores, ddof=1)
+        group_stats = {
+            grp: {"mean": float(mean), "std": float(std), "n": int(n)}
+            for grp, mean, std, n in zip(outputs.groups, means, stds, outputs.group_sizes)
+        }
 
         if len(group_stats) < 2:
             return 0.0, 0.0, {"metric": "cohens_d", "note": "insufficient data per group"}
@@ -1231,25 +1347,16 @@ class ComprehensiveBiasEvaluationPipeline:
 
     def _compute_equalized_odds_difference(
         self,
-        labels: np.ndarray,
-        predictions: np.ndarray,
-        groups: List[str],
-        unique_groups: List[str],
+        outputs: ModelOutputs,
     ) -> Tuple[float, float, Dict[str, Any]]:
         """
         Equalized odds difference: max difference in TPR or FPR across groups.
         """
-        if len(unique_groups) < 2 or len(labels) == 0:
+        if outputs.n_groups < 2 or len(outputs) == 0:
             return 0.0, 0.0, {"metric": "equalized_odds_difference", "note": "insufficient groups"}
 
-        tprs = {}
-        fprs = {}
-        for grp in unique_groups:
-            mask = np.array([g == grp for g in groups])
-            grp_labels = labels[mask]
-            grp_preds = predictions[mask]
-            tprs[grp] = self._true_positive_rate(grp_labels, grp_preds)
-            fprs[grp] = self._false_positive_rate(grp_labels, grp_preds)
+        tprs = dict(zip(outputs.groups, outputs.true_positive_rates().tolist()))
+        fprs = dict(zip(outputs.groups, outputs.false_positive_rates().tolist()))
 
         tpr_vals = list(tprs.values())
         fpr_vals = list(fprs.values())
@@ -1257,7 +1364,7 @@ class ComprehensiveBiasEvaluationPipeline:
         fpr_diff = max(fpr_vals) - min(fpr_vals) if len(fpr_vals) >= 2 else 0.0
         eq_odds_diff = max(tpr_diff, fpr_diff)
 
-        confidence = self._compute_confidence(predictions, groups)
+        confidence = self._compute_confidence(outputs)
         return float(eq_odds_diff), confidence, {
             "metric": "equalized_odds_difference",
             "tpr_by_group": tprs,
@@ -1266,24 +1373,17 @@ class ComprehensiveBiasEvaluationPipeline:
 
     def _compute_disparate_impact(
         self,
-        predictions: np.ndarray,
-        groups: List[str],
-        unique_groups: List[str],
+        outputs: ModelOutputs,
     ) -> Tuple[float, float, Dict[str, Any]]:
         """
         Disparate impact: deviation of the min(rate_a/rate_b, rate_b/rate_a) from 1.0.
         A ratio of 1.0 means no disparate impact; the four-fifths rule uses 0.8 as threshold.
         Returns bias_score as 1.0 - ratio (so 0 is no bias, approaching 1 is full bias).
         """
-        if len(unique_groups) < 2 or len(predictions) == 0:
+        if outputs.n_groups < 2 or len(outputs) == 0:
             return 0.0, 0.0, {"metric": "disparate_impact_ratio", "note": "insufficient groups"}
 
-        rates = {}
-        for grp in unique_groups:
-            mask = np.array([g == grp for g in groups])
-            grp_preds = predictions[mask]
-            if len(grp_preds) > 0:
-                rates[grp] = float(np.mean(grp_preds))
+        rates = dict(zip(outputs.groups, outputs.positive_rates().tolist()))
 
         if len(rates) < 2:
             return 0.0, 0.0, {"metric": "disparate_impact_ratio", "note": "insufficient data"}
@@ -1302,7 +1402,7 @@ class ComprehensiveBiasEvaluationPipeline:
                     min_ratio = 0.0  # one group has zero rate
 
         bias_score = 1.0 - min_ratio
-        confidence = self._compute_confidence(predictions, groups)
+        confidence = self._compute_confidence(outputs)
         return float(bias_score), confidence, {
             "metric": "disparate_impact_ratio",
             "rates_by_group": rates,
@@ -1604,7 +1704,7 @@ class ComprehensiveBiasEvaluationPipeline:
             recommendations=prioritized_recommendations,
             compliance_status=compliance_status,
             next_evaluation_due=next_evaluation_due,
-            results={phase.value: result for phase, result in results.items()}
+            results=dict(results)
         )
 
     def _risk_score_to_numeric(self, risk_level: BiasRiskLevel) -> float:
@@ -1646,11 +1746,8 @@ class ComprehensiveBiasEvaluationPipeline:
 
     def get_evaluation_history(self, limit: int = 10) -> List[ComprehensiveEvaluationReport]:
         """Get evaluation history"""
-        return self.evaluation_history[-limit:] if self.evaluation_history else []
+        return self.evaluation_history.recent(limit)
 
     def get_evaluation_by_id(self, evaluation_id: str) -> Optional[ComprehensiveEvaluationReport]:
         """Get specific evaluation by ID"""
-        for report in self.evaluation_history:
-            if report.evaluation_id == evaluation_id:
-                return report
-        return None
+        return self.evaluation_history.get(evaluation_id)
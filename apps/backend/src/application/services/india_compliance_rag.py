@@ -5,18 +5,25 @@ This module provides RAG capabilities for querying Indian AI compliance regulati
 including DPDP Act 2023, NITI Aayog principles, and MeitY guidelines.
 
 Features:
-- Document indexing and embedding
-- Semantic similarity search
+- Document indexing and embedding (BM25 inverted index + dense vectors,
+  persisted to disk)
+- Hybrid lexical/semantic similarity search
 - Context-aware retrieval
 - Multi-framework support
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional
+import os
+import asyncio
 import logging
 import json
 from datetime import datetime
 from enum import Enum
 
+from config.settings import settings
+
+from .regulatory_retrieval import HybridRetriever, create_embedder
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,10 +43,14 @@ class IndiaComplianceRAG:
     compliance Q&A and analysis.
     """
 
-    def __init__(self):
+    def __init__(self, index_dir: Optional[str] = None, embedding_model: Optional[str] = None):
         """Initialize RAG system with regulatory documents"""
         self.documents: List[Dict[str, Any]] = []
         self.document_index: Dict[str, List[int]] = {}
+        self.section_index: Dict[str, List[int]] = {}
+        self.index_dir = index_dir or settings.rag_index_dir or os.path.join(settings.database_dir, "rag_index")
+        self.embedding_model = embedding_model if embedding_model is not None else settings.rag_embedding_model
+        self.retriever: Optional[HybridRetriever] = None
         self.initialized = False
         logger.info("Initialized IndiaComplianceRAG")
 
@@ -69,6 +80,15 @@ class IndiaComplianceRAG:
         
         # Build document index by framework
         self._build_document_index()
+
+        # Build (or load the persisted) retrieval index off the event loop
+        self.retriever = await asyncio.to_thread(
+            HybridRetriever.load_or_build,
+            self.documents,
+            self.index_dir,
+            create_embedder(self.embedding_model),
+            settings.rag_hybrid_alpha,
+        )
         
         self.initialized = True
         logger.info(f"Indexed {len(self.documents)} regulatory document sections")
@@ -102,29 +122,16 @@ class IndiaComplianceRAG:
             logger.warning("No documents available for query")
             return []
         
-        # Filter by framework if specified
-        candidate_docs = self.documents
-        if framework:
-            candidate_docs = [
-                doc for doc in self.documents
-                if doc.get("framework") == framework
-            ]
-        
-        if not candidate_docs:
+        if framework and framework not in self.document_index:
             logger.warning(f"No documents found for framework: {framework}")
             return self.documents[:top_k]
         
-        # Perform semantic similarity search
-        # For now, use keyword matching as a simple implementation
-        # In production, use embeddings and vector similarity
-        scored_docs = self._score_documents(question, candidate_docs)
-        
-        # Return top-k results
-        top_results = sorted(scored_docs, key=lambda x: x[1], reverse=True)[:top_k]
+        # Hybrid BM25 + embedding search, optionally within one framework
+        top_results = self.retriever.search(question, top_k=top_k, framework=framework or None)
         
         logger.info(f"Retrieved {len(top_results)} documents for query: {question[:50]}...")
         
-        return [doc for doc, score in top_results]
+        return [self.documents[doc_id] for doc_id, score in top_results]
 
     async def query_by_section(
         self,
@@ -143,10 +150,10 @@ class IndiaComplianceRAG:
 
         Requirements: 8.5
         """
-        for doc in self.documents:
-            if doc.get("section_id") == section_id:
-                if framework is None or doc.get("framework") == framework:
-                    return doc
+        for idx in self.section_index.get(section_id, []):
+            doc = self.documents[idx]
+            if framework is None or doc.get("framework") == framework:
+                return doc
         
         return None
 
@@ -676,50 +683,13 @@ Implications for AI Systems:
         ]
 
     def _build_document_index(self) -> None:
-        """Build index of documents by framework"""
+        """Build index of documents by framework and by section ID"""
         self.document_index = {}
+        self.section_index = {}
         
         for idx, doc in enumerate(self.documents):
             framework = doc.get("framework", "unknown")
             if framework not in self.document_index:
                 self.document_index[framework] = []
             self.document_index[framework].append(idx)
-
-    def _score_documents(
-        self,
-        question: str,
-        documents: List[Dict[str, Any]],
-    ) -> List[Tuple[Dict[str, Any], float]]:
-        """
-        Score documents based on relevance to question.
-        
-        Uses keyword matching as a simple implementation.
-        In production, use embeddings and vector similarity.
-        """
-        question_words = set(question.lower().split())
-        scored = []
-        
-        for doc in documents:
-            score = 0.0
-            
-            # Score based on keyword matches
-            keywords = doc.get("keywords", [])
-            for keyword in keywords:
-                if keyword.lower() in question.lower():
-                    score += 2.0
-            
-            # Score based on title match
-            title = doc.get("title", "").lower()
-            for word in question_words:
-                if word in title:
-                    score += 1.0
-            
-            # Score based on content match
-            content = doc.get("content", "").lower()
-            for word in question_words:
-                if word in content:
-                    score += 0.5
-            
-            scored.append((doc, score))
-        
-        return scored
+            self.section_index.setdefault(doc.get("section_id"), []).append(idx)
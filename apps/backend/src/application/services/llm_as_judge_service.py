@@ -21,6 +21,8 @@ except ImportError:
     AIOHTTP_AVAILABLE = False
     aiohttp = None
 
+from .llm_response_cache import LLMResponseCache, get_llm_response_cache
+
 logger = logging.getLogger(__name__)
 
 class JudgeModel(Enum):
@@ -67,10 +69,30 @@ class LLMAsJudgeService:
     This is a SOTA method that leverages LLM reasoning capabilities.
     """
     
-    def __init__(self, judge_model: JudgeModel = JudgeModel.GPT_4_TURBO):
+    # Provider and request parameters sent for each judge, which also key the response cache
+    JUDGE_REQUESTS = {
+        JudgeModel.GPT_4: ("openai", {"temperature": 0.1}),
+        JudgeModel.GPT_4_TURBO: ("openai", {"temperature": 0.1}),
+        JudgeModel.CLAUDE_3_OPUS: ("anthropic", {"max_tokens": 2048}),
+        JudgeModel.CLAUDE_3_SONNET: ("anthropic", {"max_tokens": 2048}),
+        JudgeModel.GEMINI_PRO: ("google", {}),
+    }
+    
+    def __init__(
+        self,
+        judge_model: JudgeModel = JudgeModel.GPT_4_TURBO,
+        response_cache: Optional[LLMResponseCache] = None
+    ):
         self.judge_model = judge_model
         self.evaluation_prompts = self._initialize_evaluation_prompts()
         self.api_key = None  # Should be set from environment
+        self.response_cache = response_cache
+    
+    def _get_response_cache(self) -> Optional[LLMResponseCache]:
+        # Resolved on first call, so importing this module does not open the cache file
+        if self.response_cache is None:
+            self.response_cache = get_llm_response_cache()
+        return self.response_cache
         
     def _initialize_evaluation_prompts(self) -> Dict[str, str]:
         """Initialize evaluation prompts for different bias categories"""
@@ -217,6 +239,22 @@ Format your response as JSON with keys: bias_score, confidence, detected_biases
         self,
         prompt: str,
         judge_model: JudgeModel
+    ) -> str:
+        """Judge LLM response, from the response cache when the same evaluation was judged before"""
+        cache = self._get_response_cache()
+        if cache is None or judge_model not in self.JUDGE_REQUESTS:
+            return await self._request_judge_llm(prompt, judge_model)
+        provider, params = self.JUDGE_REQUESTS[judge_model]
+        response, _ = await cache.get_or_call(
+            provider, judge_model.value, prompt, params,
+            lambda: self._request_judge_llm(prompt, judge_model)
+        )
+        return response
+    
+    async def _request_judge_llm(
+        self,
+        prompt: str,
+        judge_model: JudgeModel
     ) -> str:
         """
         Call the judge LLM API
@@ -0,0 +1,255 @@
+"""
+LLM Response Cache
+Persistent, content-addressed cache of model responses for bias probing.
+
+A response is keyed by the SHA-256 of its provider, model, prompt and
+request parameters, so re-running a bias suite, or another tenant re-testing
+the same model, reuses earlier responses instead of paying provider latency
+and tokens again.
+
+- Entries live in a local SQLite file (WAL) and expire after ``ttl``
+  seconds; past ``max_entries`` the least recently used are evicted.
+- Requests that sample (temperature above zero, or the provider's default
+  sampling) are cached too, so re-runs are reproducible; set
+  ``cache_stochastic=False`` to send those to the provider every time.
+  Callers can also bypass the cache per request.
+- Concurrent misses for one key share one provider call.
+- Hit, miss, bypass and eviction counts are available from ``stats()``.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_STAT_FIELDS = ("hits", "misses", "bypassed", "coalesced", "stores", "expired", "evictions", "errors")
+
+# Fraction of max_entries kept after an eviction pass, so eviction runs in batches
+EVICTION_TARGET = 0.9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access);
+CREATE INDEX IF NOT EXISTS idx_responses_expires_at ON responses (expires_at);
+"""
+
+
+def response_cache_key(provider: str, model: str, prompt: str, params: Mapping[str, Any]) -> str:
+    """Content address of a request: SHA-256 over its canonical JSON form"""
+    canonical = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "prompt": prompt,
+            "params": {k: v for k, v in params.items() if v is not None},
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def is_stochastic(params: Mapping[str, Any]) -> bool:
+    """Whether a request samples: temperature above zero, or left at the provider default"""
+    temperature = params.get("temperature")
+    return temperature is None or temperature > 0
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response cache with TTL and LRU eviction.
+
+    ``path`` may be ``":memory:"`` for a cache that lives as long as the
+    object (e.g. in tests).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 7 * 24 * 3600,
+        max_entries: int = 100000,
+        cache_stochastic: bool = True
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cache_stochastic = cache_stochastic
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+        self._flights: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, int] = dict.fromkeys(CACHE_STAT_FIELDS, 0)
+
+    def __len__(self) -> int:
+        return self._count
+
+    async def get_or_call(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        params: Mapping[str, Any],
+        call: Callable[[], Awaitable[Any]],
+        bypass: bool = False
+    ) -> Tuple[Any, bool]:
+        """
+        The cached response for this request, or the result of ``call()``
+        stored for next time. Returns ``(response, cached)``. Responses must
+        be JSON-serializable; failed calls are not cached.
+        """
+        if bypass or (not self.cache_stochastic and is_stochastic(params)):
+            self._stats["bypassed"] += 1
+            return await call(), False
+
+        key = response_cache_key(provider, model, prompt, params)
+        try:
+            cached = await asyncio.to_thread(self._lookup, key)
+        except Exception as e:
+            logger.error(f"LLM response cache lookup failed: {e}")
+            self._stats["errors"] += 1
+            cached = None
+        if cached is not None:
+            self._stats["hits"] += 1
+            return cached, True
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            flight = asyncio.ensure_future(self._call_and_store(key, provider, model, call))
+            self._flights[key] = flight
+            flight.add_done_callback(lambda _: self._flights.pop(key, None))
+        # Shielded so one cancelled caller does not fail the other waiters
+        return await asyncio.shield(flight), False
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counters, entry count and hit rate"""
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "entries": self._count,
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM responses")
+            self._count = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    async def _call_and_store(self, key: str, provider: str, model: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        response = await call()
+        try:
+            await asyncio.to_thread(self._store, key, provider, model, json.dumps(response))
+            self._stats["stores"] += 1
+        except Exception as e:
+            logger.error(f"LLM response cache store failed: {e}")
+            self._stats["errors"] += 1
+        return response
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                row = self._conn.execute(
+                    "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] <= now:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._count -= 1
+                    self._stats["expired"] += 1
+                    return None
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def _store(self, key: str, provider: str, model: str, response: str):
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                exists = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    """
+                    INSERT OR REPLACE INTO responses
+                        (key, provider, model, response, created_at, expires_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (key, provider, model, response, now, now + self.ttl, now)
+                )
+                if not exists:
+                    self._count += 1
+                if self._count > self.max_entries:
+                    self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop expired entries, then the least recently used down to the target size"""
+        expired = self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+        self._stats["expired"] += expired
+        self._count -= expired
+        excess = self._count - int(self.max_entries * EVICTION_TARGET)
+        if excess > 0:
+            evicted = self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                (excess,)
+            ).rowcount
+            self._stats["evictions"] += evicted
+            self._count -= evicted
+
+
+_llm_response_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """The process-wide response cache, opened on first use; None when disabled"""
+    global _llm_response_cache
+    if not settings.llm_response_cache_enabled:
+        return None
+    with _cache_lock:
+        if _llm_response_cache is None:
+            _llm_response_cache = LLMResponseCache(
+                path=settings.llm_response_cache_path
+                or os.path.join(settings.database_dir, "llm_response_cache.sqlite3"),
+                ttl=settings.llm_response_cache_ttl,
+                max_entries=settings.llm_response_cache_max_entries,
+                cache_stochastic=settings.llm_response_cache_stochastic,
+            )
+        return _llm_response_cache
+
+
+def llm_response_cache_stats() -> Dict[str, Any]:
+    """``stats()`` of the process-wide cache, or {} if it has not been opened"""
+    cache = _llm_response_cache
+    return cache.stats() if cache is not None else {}
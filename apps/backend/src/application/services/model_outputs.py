@@ -0,0 +1,247 @@
+"""
+Columnar Model Outputs
+A typed, column-oriented view of model outputs shared by every phase of the
+comprehensive bias evaluation pipeline.
+
+The frame is built once per evaluation, from dicts, a DataFrame, an Arrow
+table or a Parquet file. Group labels are factorized to dense integer codes
+and the row indices of every group are precomputed, so per-group statistics
+are one ``np.bincount`` instead of one Python pass over the rows per group.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from fairness_library.kernels import factorize_groups
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Column name, then the fallback column used when it is missing
+SCORE_COLUMNS = ("score", "prediction")
+LABEL_COLUMNS = ("label", "ground_truth")
+GROUP_COLUMNS = ("group", "demographic_group")
+FLAG_COLUMNS = ("flagged", "user_complaint")
+RATING_COLUMNS = ("bias_rating", "fairness_rating")
+
+DEFAULT_GROUP = "unknown"
+DECISION_THRESHOLD = 0.5
+
+
+@dataclass(frozen=True)
+class ModelOutputs:
+    """
+    Model outputs as parallel numpy columns.
+
+    ``predictions`` and ``label_classes`` are the int64 decisions and labels
+    the fairness metrics are computed on; ``group_codes`` index into
+    ``groups`` (sorted when the labels are comparable) and
+    ``group_indices[k]`` holds the row positions of ``groups[k]``.
+    """
+    scores: np.ndarray
+    labels: np.ndarray
+    group_codes: np.ndarray
+    groups: List[Any]
+    flagged: np.ndarray
+    bias_ratings: np.ndarray
+    fairness_ratings: np.ndarray
+    threshold: float = DECISION_THRESHOLD
+    predictions: np.ndarray = field(init=False, repr=False)
+    label_classes: np.ndarray = field(init=False, repr=False)
+    group_sizes: np.ndarray = field(init=False, repr=False)
+    group_indices: List[np.ndarray] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        n_groups = len(self.groups)
+        sizes = np.bincount(self.group_codes, minlength=n_groups)
+        order = np.argsort(self.group_codes, kind="stable")
+        object.__setattr__(self, "predictions", (self.scores >= self.threshold).astype(np.int64))
+        object.__setattr__(self, "label_classes", self.labels.astype(np.int64))
+        object.__setattr__(self, "group_sizes", sizes)
+        object.__setattr__(self, "group_indices", np.split(order, np.cumsum(sizes)[:-1]) if n_groups else [])
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    @property
+    def n_groups(self) -> int:
+        return len(self.groups)
+
+    # ---- Construction ----
+
+    @classmethod
+    def from_columns(
+        cls,
+        scores: Any,
+        labels: Any,
+        groups: Any,
+        flagged: Optional[Any] = None,
+        bias_ratings: Optional[Any] = None,
+        fairness_ratings: Optional[Any] = None,
+        threshold: float = DECISION_THRESHOLD
+    ) -> "ModelOutputs":
+        """Build the frame from already extracted columns."""
+        scores = np.asarray(scores, dtype=float).reshape(-1)
+        labels = np.asarray(labels, dtype=float).reshape(-1)
+        group_values = np.empty(len(scores), dtype=object)
+        group_values[:] = groups if isinstance(groups, np.ndarray) else list(groups)
+        if len(labels) != len(scores):
+            raise ValueError(f"Expected {len(scores)} labels, got {len(labels)}")
+
+        if len(group_values):
+            codes, levels = factorize_groups(group_values)
+            levels = levels.tolist()
+        else:
+            codes, levels = np.zeros(0, dtype=np.int64), []
+
+        return cls(
+            scores=scores,
+            labels=labels,
+            group_codes=codes,
+            groups=levels,
+            flagged=(
+                np.zeros(len(scores), dtype=bool) if flagged is None
+                else np.asarray(flagged, dtype=bool).reshape(-1)
+            ),
+            bias_ratings=_ratings(bias_ratings),
+            fairness_ratings=_ratings(fairness_ratings),
+            threshold=threshold,
+        )
+
+    @classmethod
+    def from_records(
+        cls, records: Sequence[Mapping[str, Any]], threshold: float = DECISION_THRESHOLD
+    ) -> "ModelOutputs":
+        """Build the frame from output dicts (one pass per column)."""
+        return cls.from_columns(
+            scores=[o.get("score", o.get("prediction", 0.0)) for o in records],
+            labels=[o.get("label", o.get("ground_truth", 0)) for o in records],
+            groups=[o.get("group", o.get("demographic_group", DEFAULT_GROUP)) for o in records],
+            flagged=[bool(o.get("flagged", False) or o.get("user_complaint", False)) for o in records],
+            bias_ratings=[o.get("bias_rating") for o in records],
+            fairness_ratings=[o.get("fairness_rating") for o in records],
+            threshold=threshold,
+        )
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, threshold: float = DECISION_THRESHOLD) -> "ModelOutputs":
+        """
+        Build the frame from a DataFrame with the same column names as the
+        output dicts. Missing values in a column fall back to its alternate
+        column, then to the default.
+        """
+        flags = [df[column].fillna(False).astype(bool) for column in FLAG_COLUMNS if column in df]
+        return cls.from_columns(
+            scores=_coalesce(df, SCORE_COLUMNS, 0.0).to_numpy(dtype=float),
+            labels=_coalesce(df, LABEL_COLUMNS, 0).to_numpy(dtype=float),
+            groups=_coalesce(df, GROUP_COLUMNS, DEFAULT_GROUP).to_numpy(dtype=object),
+            flagged=np.logical_or.reduce([f.to_numpy() for f in flags]) if flags else None,
+            bias_ratings=df["bias_rating"].to_numpy() if "bias_rating" in df else None,
+            fairness_ratings=df["fairness_rating"].to_numpy() if "fairness_rating" in df else None,
+            threshold=threshold,
+        )
+
+    @classmethod
+    def from_arrow(cls, table: Any, threshold: float = DECISION_THRESHOLD) -> "ModelOutputs":
+        """Build the frame from a ``pyarrow.Table``, converting only the used columns."""
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required to read Arrow tables")
+        table = table.select([name for name in table.column_names if name in _USED_COLUMNS])
+        return cls.from_dataframe(table.to_pandas(), threshold=threshold)
+
+    @classmethod
+    def from_parquet(cls, path: Union[str, Path], threshold: float = DECISION_THRESHOLD) -> "ModelOutputs":
+        """Build the frame from a Parquet file, reading only the used columns."""
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required to read Parquet files")
+        columns = [name for name in pq.read_schema(path).names if name in _USED_COLUMNS]
+        return cls.from_arrow(pq.read_table(path, columns=columns), threshold=threshold)
+
+    @classmethod
+    def coerce(cls, model_outputs: Any) -> "ModelOutputs":
+        """Return ``model_outputs`` as a frame, converting dicts, DataFrames or Arrow tables."""
+        if isinstance(model_outputs, cls):
+            return model_outputs
+        if isinstance(model_outputs, pd.DataFrame):
+            return cls.from_dataframe(model_outputs)
+        if PYARROW_AVAILABLE and isinstance(model_outputs, pa.Table):
+            return cls.from_arrow(model_outputs)
+        if isinstance(model_outputs, (str, Path)):
+            return cls.from_parquet(model_outputs)
+        return cls.from_records(list(model_outputs or []))
+
+    # ---- Grouped statistics ----
+
+    def group_sum(self, values: np.ndarray) -> np.ndarray:
+        """Per-group sums of a row-aligned column."""
+        return np.bincount(self.group_codes, weights=values, minlength=self.n_groups)
+
+    def group_mean(self, values: np.ndarray) -> np.ndarray:
+        """Per-group means of a row-aligned column (every group is non-empty)."""
+        return self.group_sum(values) / self.group_sizes
+
+    def group_std(self, values: np.ndarray, ddof: int = 0) -> np.ndarray:
+        """Per-group standard deviations; 0.0 for groups with at most ``ddof`` rows."""
+        means = self.group_mean(values)
+        squares = self.group_sum((values - means[self.group_codes]) ** 2)
+        dof = self.group_sizes - ddof
+        return np.sqrt(np.divide(squares, dof, out=np.zeros(self.n_groups), where=dof > 0))
+
+    def group_rate(self, mask: np.ndarray, among: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Per-group fraction of rows where ``mask`` holds, optionally only among
+        rows where ``among`` holds; 0.0 for groups with no such rows.
+        """
+        if among is None:
+            return self.group_mean(mask.astype(float))
+        hits = self.group_sum((mask & among).astype(float))
+        totals = self.group_sum(among.astype(float))
+        return np.divide(hits, totals, out=np.zeros(self.n_groups), where=totals > 0)
+
+    def positive_rates(self) -> np.ndarray:
+        """Per-group rate of positive predictions."""
+        return self.group_mean(self.predictions.astype(float))
+
+    def true_positive_rates(self) -> np.ndarray:
+        return self.group_rate(self.predictions == 1, among=self.label_classes == 1)
+
+    def false_positive_rates(self) -> np.ndarray:
+        return self.group_rate(self.predictions == 1, among=self.label_classes == 0)
+
+    def accuracies(self) -> np.ndarray:
+        return self.group_rate(self.predictions == self.label_classes)
+
+
+_USED_COLUMNS = frozenset(SCORE_COLUMNS + LABEL_COLUMNS + GROUP_COLUMNS + FLAG_COLUMNS + RATING_COLUMNS)
+
+
+def _ratings(values: Optional[Iterable[Any]]) -> np.ndarray:
+    """Non-missing ratings, in row order."""
+    if values is None:
+        return np.zeros(0, dtype=float)
+    ratings = pd.to_numeric(pd.Series(values, dtype=object))
+    return ratings.dropna().to_numpy(dtype=float)
+
+
+def _coalesce(df: pd.DataFrame, columns: Sequence[str], default: Any) -> pd.Series:
+    """First non-missing value across ``columns`` per row, else ``default``."""
+    result = None
+    for column in columns:
+        if column in df:
+            result = df[column] if result is None else result.fillna(df[column])
+    if result is None:
+        return pd.Series([default] * len(df), index=df.index, dtype=object)
+    return result.fillna(default)
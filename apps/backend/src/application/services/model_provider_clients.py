@@ -0,0 +1,475 @@
+"""
+Model Provider Clients
+Pooled, concurrent client layer behind the real-time model integration
+service.
+
+One client is kept per (provider, credentials, endpoint) for the lifetime of
+the pool, so its HTTP connection pool is reused across prompts. Every call
+goes through that provider's limits:
+- a semaphore bounding in-flight requests,
+- GCRA token-bucket pacing (requests per second with a burst),
+- retries with exponentially growing, fully jittered backoff on transient
+  errors (timeouts, connection errors, 408/429/5xx),
+- optional hedging: when a request has not answered after ``hedge_after``
+  seconds a duplicate is sent and the first answer wins.
+
+``StubProviderClient`` answers locally with configurable latency and
+failures, for tests and benchmarks.
+"""
+
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+import logging
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from config.settings import settings
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    aiohttp = None
+
+try:
+    import openai
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+    openai = None
+
+try:
+    import anthropic
+    ANTHROPIC_AVAILABLE = True
+except ImportError:
+    ANTHROPIC_AVAILABLE = False
+    anthropic = None
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying; other 4xx mean the request itself is wrong
+RETRYABLE_STATUSES = frozenset({408, 409, 425, 429})
+
+
+class IntegrationError(Exception):
+    """Raised when an external model API call fails or is not configured."""
+    pass
+
+
+@dataclass
+class ProviderLimits:
+    """Concurrency, pacing, retry and hedging limits for one provider client"""
+    max_concurrency: int = field(default_factory=lambda: settings.model_provider_max_concurrency)
+    requests_per_second: Optional[float] = field(
+        default_factory=lambda: settings.model_provider_requests_per_second
+    )
+    burst: int = field(default_factory=lambda: settings.model_provider_burst)
+    retry_backoff: float = field(default_factory=lambda: settings.model_provider_retry_backoff)
+    max_backoff: float = 10.0
+    hedge_after: Optional[float] = field(default_factory=lambda: settings.model_provider_hedge_after)
+
+
+class RequestPacer:
+    """
+    Async GCRA token bucket: ``acquire`` waits until one more request fits in
+    ``requests_per_second`` with up to ``burst`` requests back to back.
+    Reservations are made before sleeping, so concurrent callers queue in
+    arrival order without a lock.
+    """
+
+    def __init__(self, requests_per_second: Optional[float], burst: int = 1):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.tolerance = self.interval * max(0, burst - 1)
+        self._tat = 0.0  # Theoretical arrival time of the next request
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        tat = max(self._tat, now)
+        self._tat = tat + self.interval
+        delay = tat - self.tolerance - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ProviderClient(ABC):
+    """A long-lived client for one provider; ``complete`` returns text, tokens and metadata."""
+
+    @abstractmethod
+    async def complete(self, config: Any, prompt: str) -> Dict[str, Any]:
+        """Send ``prompt`` and return its text, token count and metadata"""
+
+    async def aclose(self) -> None:
+        pass
+
+
+class OpenAIClient(ProviderClient):
+    """OpenAI chat completions through one ``AsyncOpenAI`` client"""
+
+    def __init__(self, config: Any):
+        if not OPENAI_AVAILABLE:
+            raise ImportError("OpenAI library not available")
+        # Retries are handled by the pool, with its own backoff
+        self.client = openai.AsyncOpenAI(api_key=config.api_key, base_url=config.base_url, max_retries=0)
+
+    async def complete(self, config: Any, prompt: str) -> Dict[str, Any]:
+        response = await self.client.chat.completions.create(
+            model=config.model_name,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=config.max_tokens,
+            temperature=config.temperature,
+            top_p=config.top_p,
+            frequency_penalty=config.frequency_penalty,
+            presence_penalty=config.presence_penalty
+        )
+        return {
+            "text": response.choices[0].message.content,
+            "tokens_used": response.usage.total_tokens,
+            "metadata": {
+                "finish_reason": response.choices[0].finish_reason,
+                "model": response.model
+            }
+        }
+
+    async def aclose(self) -> None:
+        await self.client.close()
+
+
+class AnthropicClient(ProviderClient):
+    """Anthropic messages through one ``AsyncAnthropic`` client"""
+
+    def __init__(self, config: Any):
+        if not ANTHROPIC_AVAILABLE:
+            raise ImportError("Anthropic library not available")
+        self.client = anthropic.AsyncAnthropic(api_key=config.api_key, base_url=config.base_url, max_retries=0)
+
+    async def complete(self, config: Any, prompt: str) -> Dict[str, Any]:
+        response = await self.client.messages.create(
+            model=config.model_name,
+            max_tokens=config.max_tokens,
+            temperature=config.temperature,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return {
+            "text": response.content[0].text,
+            "tokens_used": response.usage.input_tokens + response.usage.output_tokens,
+            "metadata": {
+                "stop_reason": response.stop_reason,
+                "model": response.model
+            }
+        }
+
+    async def aclose(self) -> None:
+        await self.client.close()
+
+
+class HTTPProviderClient(ProviderClient):
+    """
+    JSON-over-HTTP provider sharing one ``aiohttp`` session. Subclasses build
+    the request and parse the response.
+    """
+
+    def __init__(self, config: Any, max_connections: int = 0):
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp library not available")
+        self.max_connections = max_connections
+        self._session = None
+
+    def _get_session(self):
+        # Created on first use, inside the event loop that will drive it
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections)
+            )
+        return self._session
+
+    @abstractmethod
+    def build_request(self, config: Any, prompt: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Return the URL, headers and JSON payload for ``prompt``"""
+
+    @abstractmethod
+    def parse_response(self, config: Any, prompt: str, data: Any) -> Dict[str, Any]:
+        """Return text, token count and metadata from the decoded JSON response"""
+
+    async def complete(self, config: Any, prompt: str) -> Dict[str, Any]:
+        url, headers, payload = self.build_request(config, prompt)
+        async with self._get_session().post(url, headers=headers, json=payload) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+        return self.parse_response(config, prompt, data)
+
+    async def aclose(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class GoogleClient(HTTPProviderClient):
+    """Google Gemini ``generateContent``"""
+
+    def build_request(self, config: Any, prompt: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        if not config.api_key:
+            raise ValueError("Google API key is required")
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{config.model_name}:generateContent?key={config.api_key}"
+        payload = {
+            "contents": [{
+                "parts": [{"text": prompt}]
+            }],
+            "generationConfig": {
+                "maxOutputTokens": config.max_tokens,
+                "temperature": config.temperature,
+                "topP": config.top_p,
+            }
+        }
+        return url, {}, payload
+
+    def parse_response(self, config: Any, prompt: str, data: Any) -> Dict[str, Any]:
+        text_response = data["candidates"][0]["content"]["parts"][0]["text"]
+        return {
+            "text": text_response,
+            # Estimate tokens (rough approximation)
+            "tokens_used": len(prompt.split()) + len(text_response.split()),
+            "metadata": {
+                "provider": "google",
+                "model": config.model_name,
+                "finish_reason": data["candidates"][0].get("finishReason", "unknown")
+            }
+        }
+
+
+class CohereClient(HTTPProviderClient):
+    """Cohere ``generate``"""
+
+    def build_request(self, config: Any, prompt: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        api_key = config.api_key or os.environ.get("COHERE_API_KEY")
+        if not api_key:
+            raise IntegrationError("Cohere API key not configured. Set COHERE_API_KEY or provide api_key in model config.")
+        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        return "https://api.cohere.ai/v1/generate", headers, {"model": config.model_name, "prompt": prompt}
+
+    def parse_response(self, config: Any, prompt: str, data: Any) -> Dict[str, Any]:
+        return {
+            "text": data.get("generations", [{}])[0].get("text", ""),
+            "tokens_used": data.get("meta", {}).get("billed_units", {}).get("input_tokens", 0),
+            "metadata": {"provider": "cohere", "model": config.model_name}
+        }
+
+
+class HuggingFaceClient(HTTPProviderClient):
+    """Hugging Face Inference API"""
+
+    def build_request(self, config: Any, prompt: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        api_key = config.api_key or os.environ.get("HF_API_KEY")
+        if not api_key:
+            raise IntegrationError("Hugging Face API key not configured. Set HF_API_KEY or provide api_key in model config.")
+        url = f"https://api-inference.huggingface.co/models/{config.model_name}"
+        return url, {"Authorization": f"Bearer {api_key}"}, {"inputs": prompt}
+
+    def parse_response(self, config: Any, prompt: str, data: Any) -> Dict[str, Any]:
+        text = data[0].get("generated_text", "") if isinstance(data, list) else str(data)
+        return {
+            "text": text,
+            "tokens_used": len(prompt.split()) + len(text.split()),
+            "metadata": {"provider": "huggingface", "model": config.model_name}
+        }
+
+
+class LocalHTTPClient(HTTPProviderClient):
+    """Local model behind an HTTP endpoint"""
+
+    def build_request(self, config: Any, prompt: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        endpoint = config.endpoint or os.environ.get("LOCAL_MODEL_ENDPOINT")
+        if not endpoint:
+            raise IntegrationError("Local model endpoint not configured. Set LOCAL_MODEL_ENDPOINT or provide endpoint in model config.")
+        return endpoint, {}, {"prompt": prompt, "model": config.model_name}
+
+    def parse_response(self, config: Any, prompt: str, data: Any) -> Dict[str, Any]:
+        return {
+            "text": data.get("text", data.get("response", "")),
+            "tokens_used": data.get("tokens_used", len(prompt.split())),
+            "metadata": {"provider": "local", "model": config.model_name}
+        }
+
+
+class StubProviderClient(ProviderClient):
+    """
+    Local provider for tests and benchmarks. Answers after ``latency``
+    seconds (a float, or a function of the call number) with
+    ``responder(prompt)``; the first ``fail_first`` calls raise a retryable
+    error. Tracks call counts and peak concurrency.
+    """
+
+    def __init__(
+        self,
+        config: Any = None,
+        latency: Union[float, Callable[[int], float]] = 0.0,
+        responder: Optional[Callable[[str], str]] = None,
+        fail_first: int = 0
+    ):
+        self.latency = latency
+        self.responder = responder or (lambda prompt: f"Stub response to: {prompt}")
+        self.fail_first = fail_first
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def complete(self, config: Any, prompt: str) -> Dict[str, Any]:
+        call = self.calls
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = self.latency(call) if callable(self.latency) else self.latency
+            if delay:
+                await asyncio.sleep(delay)
+            if call < self.fail_first:
+                raise ConnectionError(f"Stub failure on call {call}")
+            text = self.responder(prompt)
+            return {
+                "text": text,
+                "tokens_used": len(prompt.split()) + len(text.split()),
+                "metadata": {"provider": "stub", "model": getattr(config, "model_name", None)}
+            }
+        finally:
+            self.in_flight -= 1
+
+
+# Provider value -> factory building a client from a model config
+DEFAULT_CLIENT_FACTORIES: Dict[str, Callable[..., ProviderClient]] = {
+    "openai": OpenAIClient,
+    "anthropic": AnthropicClient,
+    "google": GoogleClient,
+    "cohere": CohereClient,
+    "huggingface": HuggingFaceClient,
+    "local": LocalHTTPClient,
+}
+
+
+@dataclass
+class PooledClient:
+    """A provider client with the semaphore and pacer enforcing its limits"""
+    client: ProviderClient
+    limits: ProviderLimits
+    semaphore: asyncio.Semaphore
+    pacer: RequestPacer
+
+
+class ProviderClientPool:
+    """
+    One pooled client per (provider, credentials, endpoint), created on first
+    use and kept until ``aclose``.
+    """
+
+    def __init__(
+        self,
+        factories: Optional[Dict[str, Callable[..., ProviderClient]]] = None,
+        limits: Optional[Dict[str, ProviderLimits]] = None
+    ):
+        self.factories = {**DEFAULT_CLIENT_FACTORIES, **(factories or {})}
+        self.limits = dict(limits or {})
+        self._clients: Dict[Tuple[str, str, str], PooledClient] = {}
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    @staticmethod
+    def _key(config: Any) -> Tuple[str, str, str]:
+        # Credentials are hashed so keys never hold the raw API key
+        credentials = hashlib.sha256((config.api_key or "").encode()).hexdigest()[:16]
+        return config.provider.value, credentials, config.base_url or config.endpoint or ""
+
+    def get(self, config: Any) -> PooledClient:
+        """The pooled client for ``config``, created on first use"""
+        key = self._key(config)
+        pooled = self._clients.get(key)
+        if pooled is None:
+            provider = config.provider.value
+            factory = self.factories.get(provider)
+            if factory is None:
+                raise ValueError(f"Unsupported provider: {config.provider}")
+            limits = self.limits.get(provider) or ProviderLimits()
+            client = factory(config)
+            if isinstance(client, HTTPProviderClient):
+                client.max_connections = limits.max_concurrency
+            pooled = PooledClient(
+                client=client,
+                limits=limits,
+                semaphore=asyncio.Semaphore(limits.max_concurrency),
+                pacer=RequestPacer(limits.requests_per_second, limits.burst)
+            )
+            self._clients[key] = pooled
+        return pooled
+
+    async def call(self, config: Any, prompt: str) -> Dict[str, Any]:
+        """Complete ``prompt`` within the provider's limits, retrying transient errors"""
+        pooled = self.get(config)
+        attempts = max(1, config.retry_attempts)
+        for attempt in range(attempts):
+            try:
+                return await self._hedged(pooled, config, prompt)
+            except Exception as e:
+                if attempt == attempts - 1 or not is_retryable(e):
+                    raise
+                backoff = min(pooled.limits.max_backoff, pooled.limits.retry_backoff * 2 ** attempt)
+                delay = random.uniform(0, backoff)
+                logger.warning(
+                    f"{config.provider.value} call failed ({e}); retry {attempt + 1}/{attempts - 1} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def call_many(self, config: Any, prompts: Sequence[str]) -> List[Union[Dict[str, Any], Exception]]:
+        """``call`` for every prompt concurrently; failures are returned in place"""
+        return await asyncio.gather(*(self.call(config, prompt) for prompt in prompts), return_exceptions=True)
+
+    async def _send(self, pooled: PooledClient, config: Any, prompt: str) -> Dict[str, Any]:
+        async with pooled.semaphore:
+            await pooled.pacer.acquire()
+            return await asyncio.wait_for(pooled.client.complete(config, prompt), timeout=config.timeout)
+
+    async def _hedged(self, pooled: PooledClient, config: Any, prompt: str) -> Dict[str, Any]:
+        """One request, plus a duplicate if it is still pending after ``hedge_after``"""
+        hedge_after = pooled.limits.hedge_after
+        if not hedge_after:
+            return await self._send(pooled, config, prompt)
+
+        pending = {asyncio.ensure_future(self._send(pooled, config, prompt))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_after)
+            if not done:
+                pending.add(asyncio.ensure_future(self._send(pooled, config, prompt)))
+            error = None
+            while done or pending:
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def aclose(self) -> None:
+        """Close every pooled client"""
+        clients, self._clients = list(self._clients.values()), {}
+        for pooled in clients:
+            try:
+                await pooled.client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing provider client: {e}")
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether ``error`` is transient: timeouts, connection errors, 408/429/5xx"""
+    if isinstance(error, (IntegrationError, ImportError, ValueError, KeyError, TypeError)):
+        return False
+    status = getattr(error, "status", None) or getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUSES or status >= 500
+    return True
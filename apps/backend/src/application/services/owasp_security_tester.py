@@ -33,6 +33,7 @@ import pickle
 import sqlite3
 from contextlib import asynccontextmanager
 
+from .pattern_scanner import PatternScanner, ScanPattern
 from models.owasp_ai_security import (
     SecurityTest, TestResult, SecurityAnalysis, SecurityTestRequest,
     ModelInventoryItem, OWASPCategory, SecuritySeverity, OWASP_TESTS,
@@ -152,12 +153,34 @@ class IntelligentCache:
 class AdvancedThreatDetector:
     """ML-based threat detection engine"""
     
+    # Keywords used by the semantic threat score
+    SUSPICIOUS_TERMS = [
+        "bypass", "override", "ignore", "jailbreak", "exploit",
+        "vulnerability", "hack", "manipulate", "trick", "fool"
+    ]
+    
     def __init__(self):
         self.vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1, 3))
         self.anomaly_detector = IsolationForest(contamination=0.1, random_state=42)
         self.threat_patterns = self._load_threat_patterns()
+        self.scanner = self._build_scanner()
         self.is_trained = False
     
+    def _build_scanner(self) -> PatternScanner:
+        """Compile every regex, semantic feature and suspicious term into one scanner"""
+        patterns = []
+        for pattern in self.threat_patterns:
+            patterns.extend(
+                ScanPattern(f"{pattern.pattern_id}/regex/{i}", regex, ignore_case=True)
+                for i, regex in enumerate(pattern.regex_patterns)
+            )
+            patterns.extend(
+                ScanPattern(f"{pattern.pattern_id}/feature/{i}", feature.replace("_", " "), literal=True)
+                for i, feature in enumerate(pattern.semantic_features)
+            )
+        patterns.extend(ScanPattern(f"term/{term}", term, literal=True) for term in self.SUSPICIOUS_TERMS)
+        return PatternScanner(patterns)
+    
     def _load_threat_patterns(self) -> List[VulnerabilityPattern]:
         """Load advanced vulnerability patterns"""
         return [
@@ -209,12 +232,23 @@ class AdvancedThreatDetector:
     
     async def analyze_input(self, text: str) -> Tuple[float, List[Dict[str, Any]]]:
         """Advanced ML-based input analysis"""
+        return (await self.analyze_batch([text]))[0]
+    
+    async def analyze_batch(self, texts: List[str]) -> List[Tuple[float, List[Dict[str, Any]]]]:
+        """Analyze many inputs, scanning each for all patterns in one pass"""
+        results = []
+        for text, matched in zip(texts, self.scanner.scan_batch(texts)):
+            results.append(await self._analyze_matches(text, set(matched)))
+        return results
+    
+    async def _analyze_matches(self, text: str, matched: Set[str]) -> Tuple[float, List[Dict[str, Any]]]:
+        """Score one input from the ids of the patterns it matched"""
         threats_detected = []
         max_confidence = 0.0
         
         # Pattern-based detection
         for pattern in self.threat_patterns:
-            confidence = await self._check_pattern(text, pattern)
+            confidence = self._check_pattern(pattern, matched)
             if confidence > pattern.confidence_threshold:
                 threats_detected.append({
                     "pattern_id": pattern.pattern_id,
@@ -226,7 +260,7 @@ class AdvancedThreatDetector:
                 max_confidence = max(max_confidence, confidence)
         
         # Semantic analysis
-        semantic_score = await self._semantic_analysis(text)
+        semantic_score = await self._semantic_analysis(matched)
         
         # Anomaly detection
         if self.is_trained:
@@ -235,35 +269,27 @@ class AdvancedThreatDetector:
         
         return max_confidence, threats_detected
     
-    async def _check_pattern(self, text: str, pattern: VulnerabilityPattern) -> float:
-        """Check text against vulnerability pattern"""
-        matches = 0
+    def _check_pattern(self, pattern: VulnerabilityPattern, matched: Set[str]) -> float:
+        """Confidence that a text matches a vulnerability pattern, given the scanner matches"""
         total_patterns = len(pattern.regex_patterns)
-        
-        for regex_pattern in pattern.regex_patterns:
-            if re.search(regex_pattern, text, re.IGNORECASE):
-                matches += 1
+        matches = sum(
+            1 for i in range(total_patterns) if f"{pattern.pattern_id}/regex/{i}" in matched
+        )
         
         base_confidence = matches / total_patterns if total_patterns > 0 else 0.0
         
         # Adjust for semantic features
-        semantic_bonus = 0.0
-        text_lower = text.lower()
-        for feature in pattern.semantic_features:
-            if feature.replace("_", " ") in text_lower:
-                semantic_bonus += 0.1
+        semantic_bonus = 0.1 * sum(
+            1 for i in range(len(pattern.semantic_features))
+            if f"{pattern.pattern_id}/feature/{i}" in matched
+        )
         
         return min(1.0, base_confidence + semantic_bonus)
     
-    async def _semantic_analysis(self, text: str) -> float:
+    async def _semantic_analysis(self, matched: Set[str]) -> float:
         """Perform semantic analysis for threat detection"""
         # Keyword-based semantic threat detection
-        suspicious_terms = [
-            "bypass", "override", "ignore", "jailbreak", "exploit",
-            "vulnerability", "hack", "manipulate", "trick", "fool"
-        ]
-        
-        term_count = sum(1 for term in suspicious_terms if term in text.lower())
+        term_count = sum(1 for term in self.SUSPICIOUS_TERMS if f"term/{term}" in matched)
         return min(1.0, term_count * 0.15)
     
     async def _anomaly_detection(self, text: str) -> float:
@@ -362,6 +388,10 @@ class EnhancedOWASPSecurityTester:
         self.output_injection_patterns = self._load_enhanced_output_patterns()
         self.pii_patterns = self._load_enhanced_pii_patterns()
         
+        # All prompt and response patterns, compiled once
+        self.prompt_scanner, self.prompt_findings = self._build_prompt_scanner()
+        self.response_scanner, self.response_findings = self._build_response_scanner()
+        
         # Performance monitoring
         self.performance_metrics = defaultdict(list)
         
@@ -496,6 +526,58 @@ class EnhancedOWASPSecurityTester:
             }
         ]
     
+    def _build_prompt_scanner(self) -> Tuple[PatternScanner, Dict[str, Dict[str, Any]]]:
+        """Compile the injection patterns and their variants into one scanner"""
+        patterns, findings = [], {}
+        for i, entry in enumerate(self.injection_patterns):
+            for j, text in enumerate([entry["pattern"]] + entry.get("variants", [])):
+                pattern_id = f"injection/{i}/{j}"
+                patterns.append(ScanPattern(pattern_id, text, literal=True))
+                findings[pattern_id] = {
+                    "kind": "injection",
+                    "pattern": text,
+                    "category": entry["category"],
+                    "severity": entry["severity"]
+                }
+        return PatternScanner(patterns), findings
+    
+    def _build_response_scanner(self) -> Tuple[PatternScanner, Dict[str, Dict[str, Any]]]:
+        """Compile the output injection and PII patterns into one scanner"""
+        patterns, findings = [], {}
+        for i, entry in enumerate(self.output_injection_patterns):
+            pattern_id = f"output/{i}"
+            patterns.append(ScanPattern(pattern_id, entry["pattern"], literal=True))
+            findings[pattern_id] = {
+                "kind": "output_injection",
+                "pattern": entry["pattern"],
+                "category": entry["category"],
+                "severity": entry["severity"]
+            }
+        for i, entry in enumerate(self.pii_patterns):
+            pattern_id = f"pii/{i}"
+            patterns.append(ScanPattern(pattern_id, entry["pattern"]))
+            findings[pattern_id] = {
+                "kind": "pii",
+                "pattern": entry["pattern"],
+                "category": entry["type"],
+                "severity": entry["severity"]
+            }
+        return PatternScanner(patterns), findings
+    
+    def scan_prompts(self, prompts: List[str]) -> List[List[Dict[str, Any]]]:
+        """Injection patterns found in each prompt, in pattern order"""
+        return [
+            [self.prompt_findings[pattern_id] for pattern_id in matched]
+            for matched in self.prompt_scanner.scan_batch(prompts)
+        ]
+    
+    def scan_responses(self, responses: List[str]) -> List[List[Dict[str, Any]]]:
+        """Output injection and PII patterns found in each response, in pattern order"""
+        return [
+            [self.response_findings[pattern_id] for pattern_id in matched]
+            for matched in self.response_scanner.scan_batch(responses)
+        ]
+    
     def _initialize_fuzzing_engine(self) -> Dict[str, List[str]]:
         """Initialize advanced fuzzing patterns"""
         return {
@@ -914,8 +996,8 @@ class EnhancedOWASPSecurityTester:
         ]
         
         vulnerabilities_found = []
-        for test_input in test_inputs:
-            confidence, threats = await self.threat_detector.analyze_input(test_input)
+        analyses = await self.threat_detector.analyze_batch(test_inputs)
+        for test_input, (confidence, threats) in zip(test_inputs, analyses):
             if confidence > 0.7:
                 vulnerabilities_found.append({
                     "input": test_input,
@@ -957,14 +1039,14 @@ class EnhancedOWASPSecurityTester:
         ]
         
         vulnerabilities_found = []
-        for test_input in test_inputs:
+        for test_input, findings in zip(test_inputs, self.scan_responses(test_inputs)):
             # Check for malicious patterns in output
-            for pattern in self.output_injection_patterns:
-                if pattern["pattern"].lower() in test_input.lower():
+            for finding in findings:
+                if finding["kind"] == "output_injection":
                     vulnerabilities_found.append({
                         "input": test_input,
-                        "pattern": pattern["pattern"],
-                        "category": pattern["category"]
+                        "pattern": finding["pattern"],
+                        "category": finding["category"]
                     })
         
         if vulnerabilities_found:
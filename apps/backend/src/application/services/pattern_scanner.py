@@ -0,0 +1,230 @@
+"""
+Compiled Multi-Pattern Scanner
+Matches a fixed set of literal and regex patterns against prompts and model
+responses, for the OWASP security tester and the threat detector.
+
+Patterns are compiled once, when the scanner is built. Literal patterns
+(matched case-insensitively as substrings) go into one Aho-Corasick
+automaton when ``pyahocorasick`` is installed, or else one lookahead regex,
+so every literal is found in a single walk over the text.
+
+Each regex also contributes its required literals: strings of which every
+match must contain one, read off its parse tree (``ignore`` for
+``ignore\\s+(?:all|prior)``, ``pretend``/``imagine`` for
+``pretend|imagine``). They are found in the same literal walk and a regex
+only runs when one of them occurs, so a clean text costs one pass; regexes
+with no usable literal, such as digit patterns, always run. A single
+combined alternation was measured slower than separate searches with
+Python's ``re`` and cannot report overlapping matches.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+# Shortest required literal worth gating a regex on
+MIN_LITERAL_LENGTH = 2
+
+# Non-ASCII characters that ``re.IGNORECASE`` matches against an ASCII
+# letter but ``str.lower`` does not map to it (the Kelvin sign already
+# lowers to "k", listed for completeness). Folded before the literal walk
+# so a gate never misses a text its regex would match.
+IGNORECASE_FOLD = str.maketrans({
+    "\u0130": "i",  # İ
+    "\u0131": "i",  # ı
+    "\u017f": "s",  # ſ
+    "\u212a": "k",  # Kelvin sign
+})
+
+
+def fold_case(text: str) -> str:
+    """``text`` lowercased, with the extra ``re.IGNORECASE`` equivalences of ASCII letters."""
+    return text.translate(IGNORECASE_FOLD).lower()
+
+
+@dataclass(frozen=True)
+class ScanPattern:
+    """One pattern to scan for; ``literal`` patterns are case-insensitive substrings."""
+    pattern_id: str
+    pattern: str
+    literal: bool = False
+    ignore_case: bool = False
+
+
+class LiteralMatcher:
+    """
+    Finds every literal occurring in a text, case-insensitively (both sides
+    folded with ``fold_case``).
+
+    Uses a ``pyahocorasick`` automaton when it is installed. Otherwise one
+    regex lookahead reports, at every position, the longest literal starting
+    there; any other literal starting at the same position is a prefix of
+    it, so those are added from a table built with the pattern set.
+    """
+
+    def __init__(self, literals: Sequence[Tuple[int, str]]):
+        by_word: Dict[str, List[int]] = {}
+        for index, word in literals:
+            by_word.setdefault(fold_case(word), []).append(index)
+
+        self._automaton = None
+        self._regex: Optional[re.Pattern] = None
+        if not by_word:
+            return
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for word, indices in by_word.items():
+                self._automaton.add_word(word, tuple(indices))
+            self._automaton.make_automaton()
+            return
+
+        words = sorted(by_word, key=len, reverse=True)
+        self._regex = re.compile("(?=(%s))" % "|".join(re.escape(word) for word in words))
+        self._closure: Dict[str, FrozenSet[int]] = {
+            word: frozenset(
+                index for other in words if word.startswith(other) for index in by_word[other]
+            )
+            for word in words
+        }
+
+    def find(self, text: str) -> Set[int]:
+        """Indices of all literals occurring in ``text``."""
+        text = fold_case(text)
+        if self._automaton is not None:
+            return {index for _, indices in self._automaton.iter(text) for index in indices}
+        if self._regex is None:
+            return set()
+        found: Set[int] = set()
+        for word in set(self._regex.findall(text)):
+            found |= self._closure[word]
+        return found
+
+
+class PatternScanner:
+    """
+    Precompiled scanner over a fixed pattern set.
+
+    ``scan`` returns the ids of every pattern that matches a text, in the
+    order the patterns were given; ``scan_batch`` does the same for many
+    texts against the same compiled state.
+    """
+
+    def __init__(self, patterns: Iterable[ScanPattern]):
+        self.patterns: List[ScanPattern] = list(patterns)
+        self._ids = [p.pattern_id for p in self.patterns]
+
+        # Literal patterns keep their index; required literals of regexes are
+        # numbered after them and map back to the regexes they gate
+        literals = [(i, p.pattern) for i, p in enumerate(self.patterns) if p.literal and p.pattern]
+        self._regexes: Dict[int, re.Pattern] = {}
+        self._ungated: List[int] = []
+        self._gates: Dict[int, List[int]] = {}
+        gate_ids: Dict[str, int] = {}
+        for i, p in enumerate(self.patterns):
+            if p.literal:
+                continue
+            flags = re.IGNORECASE if p.ignore_case else 0
+            self._regexes[i] = re.compile(p.pattern, flags)
+            required = required_literals(p.pattern, flags)
+            if required is None:
+                self._ungated.append(i)
+                continue
+            for literal in required:
+                gate = gate_ids.setdefault(literal, len(self.patterns) + len(gate_ids))
+                self._gates.setdefault(gate, []).append(i)
+        literals.extend((gate, literal) for literal, gate in gate_ids.items())
+        self._literals = LiteralMatcher(literals)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def match_indices(self, text: str) -> Set[int]:
+        """Indices into ``patterns`` of every pattern matching ``text``."""
+        found: Set[int] = set()
+        candidates: Set[int] = set(self._ungated)
+        for index in self._literals.find(text):
+            if index in self._gates:
+                candidates.update(self._gates[index])
+            else:
+                found.add(index)
+        found.update(i for i in candidates if self._regexes[i].search(text))
+        return found
+
+    def scan(self, text: str) -> List[str]:
+        """Ids of every pattern matching ``text``, in pattern order."""
+        return [self._ids[i] for i in sorted(self.match_indices(text))]
+
+    def scan_batch(self, texts: Iterable[str]) -> List[List[str]]:
+        """``scan`` for each text, sharing the compiled state."""
+        return [self.scan(text) for text in texts]
+
+
+def required_literals(pattern: str, flags: int = 0) -> Optional[FrozenSet[str]]:
+    """
+    Lowercase strings of which every match of ``pattern`` contains at least
+    one, or None when no set with strings of at least
+    ``MIN_LITERAL_LENGTH`` characters can be derived.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception as e:
+        logger.debug(f"Cannot parse {pattern!r} for required literals: {e}")
+        return None
+    return _sequence_literals(parsed)
+
+
+def _sequence_literals(items: Iterable[Tuple[Any, Any]]) -> Optional[FrozenSet[str]]:
+    """Best required-literal set of a sequence: a literal run or one item's set."""
+    candidates: List[FrozenSet[str]] = []
+    run: List[str] = []
+    for op, av in items:
+        if str(op) == "LITERAL":
+            run.append(chr(av))
+            continue
+        if run:
+            candidates.append(frozenset(["".join(run)]))
+            run = []
+        item = _item_literals(str(op), av)
+        if item is not None:
+            candidates.append(item)
+    if run:
+        candidates.append(frozenset(["".join(run)]))
+
+    candidates = [
+        frozenset(literal.lower() for literal in candidate) for candidate in candidates
+        if all(len(literal) >= MIN_LITERAL_LENGTH and literal.isascii() for literal in candidate)
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda candidate: (min(map(len, candidate)), -len(candidate)))
+
+
+def _item_literals(op: str, av: Any) -> Optional[FrozenSet[str]]:
+    """Required literals of one parsed item: groups, alternations and repeats."""
+    if op == "SUBPATTERN":
+        return _sequence_literals(av[-1])
+    if op == "ATOMIC_GROUP":
+        return _sequence_literals(av)
+    if op == "BRANCH":
+        branches = [_sequence_literals(branch) for branch in av[1]]
+        if any(branch is None for branch in branches):
+            return None
+        return frozenset().union(*branches)
+    if op in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") and av[0] >= 1:
+        return _sequence_literals(av[2])
+    return None
@@ -15,27 +15,14 @@ import statistics
 from collections import defaultdict, Counter
 import math
 
-# Optional imports for external API integration
-try:
-    import aiohttp
-    AIOHTTP_AVAILABLE = True
-except ImportError:
-    AIOHTTP_AVAILABLE = False
-    aiohttp = None
-
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    openai = None
-
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
-    anthropic = None
+from .llm_response_cache import LLMResponseCache, get_llm_response_cache
+from .model_provider_clients import (
+    AIOHTTP_AVAILABLE,
+    ANTHROPIC_AVAILABLE,
+    OPENAI_AVAILABLE,
+    IntegrationError,
+    ProviderClientPool,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -68,11 +55,6 @@ class BiasTestType(Enum):
     TEMPORAL_BIAS = "temporal_bias"
     CONTEXTUAL_BIAS = "contextual_bias"
 
-class IntegrationError(Exception):
-    """Raised when an external model API call fails or is not configured."""
-    pass
-
-
 @dataclass
 class ModelConfig:
     """Configuration for a model"""
@@ -89,6 +71,7 @@ class ModelConfig:
     presence_penalty: float = 0.0
     timeout: int = 30
     retry_attempts: int = 3
+    cache_responses: bool = True  # False always calls the provider
 
 @dataclass
 class BiasTestPrompt:
@@ -140,11 +123,24 @@ class RealTimeAnalysisResult:
 class RealTimeModelIntegrationService:
     """Service for real-time model integration and bias testing"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        client_pool: Optional[ProviderClientPool] = None,
+        response_cache: Optional[LLMResponseCache] = None
+    ):
         self.logger = logging.getLogger(__name__)
         self.model_configs = {}
         self.bias_test_prompts = self._initialize_bias_test_prompts()
-        self.session = None
+        # One pooled client per provider and credentials, reused across prompts
+        self.clients = client_pool if client_pool is not None else ProviderClientPool()
+        # Identical (provider, model, prompt, parameters) requests are answered from here
+        self.response_cache = response_cache
+    
+    def _get_response_cache(self) -> Optional[LLMResponseCache]:
+        # Resolved on the first provider call, so building the service does not open the cache file
+        if self.response_cache is None:
+            self.response_cache = get_llm_response_cache()
+        return self.response_cache
         
     def _initialize_bias_test_prompts(self) -> Dict[BiasTestType, BiasTestPrompt]:
         """Initialize bias test prompts for different test types"""
@@ -209,14 +205,15 @@ class RealTimeModelIntegrationService:
     
     async def __aenter__(self):
         """Async context manager entry"""
-        if AIOHTTP_AVAILABLE:
-            self.session = aiohttp.ClientSession()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the pooled provider clients"""
+        await self.clients.aclose()
     
     def configure_model(self, config: ModelConfig) -> bool:
         """
@@ -312,20 +309,7 @@ class RealTimeModelIntegrationService:
         start_time = datetime.now()
         
         try:
-            if config.provider == ModelProvider.OPENAI:
-                response = await self._call_openai(config, prompt)
-            elif config.provider == ModelProvider.ANTHROPIC:
-                response = await self._call_anthropic(config, prompt)
-            elif config.provider == ModelProvider.GOOGLE:
-                response = await self._call_google(config, prompt)
-            elif config.provider == ModelProvider.COHERE:
-                response = await self._call_cohere(config, prompt)
-            elif config.provider == ModelProvider.HUGGINGFACE:
-                response = await self._call_huggingface(config, prompt)
-            elif config.provider == ModelProvider.LOCAL:
-                response = await self._call_local(config, prompt)
-            else:
-                raise ValueError(f"Unsupported provider: {config.provider}")
+            response = await self._call_provider(config, prompt)
             
             end_time = datetime.now()
             response_time = (end_time - start_time).total_seconds()
@@ -344,168 +328,28 @@ class RealTimeModelIntegrationService:
             self.logger.error(f"Error calling model: {str(e)}")
             raise
     
-    async def _call_openai(self, config: ModelConfig, prompt: str) -> Dict[str, Any]:
-        """Call OpenAI API"""
-        if not OPENAI_AVAILABLE:
-            raise ImportError("OpenAI library not available")
-        
-        try:
-            client = openai.AsyncOpenAI(api_key=config.api_key)
-            
-            response = await client.chat.completions.create(
-                model=config.model_name,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=config.max_tokens,
-                temperature=config.temperature,
-                top_p=config.top_p,
-                frequency_penalty=config.frequency_penalty,
-                presence_penalty=config.presence_penalty
-            )
-            
-            return {
-                "text": response.choices[0].message.content,
-                "tokens_used": response.usage.total_tokens,
-                "metadata": {
-                    "finish_reason": response.choices[0].finish_reason,
-                    "model": response.model
-                }
-            }
-            
-        except Exception as e:
-            self.logger.error(f"OpenAI API error: {str(e)}")
-            raise
-    
-    async def _call_anthropic(self, config: ModelConfig, prompt: str) -> Dict[str, Any]:
-        """Call Anthropic API"""
-        if not ANTHROPIC_AVAILABLE:
-            raise ImportError("Anthropic library not available")
-        
-        try:
-            client = anthropic.AsyncAnthropic(api_key=config.api_key)
-            
-            response = await client.messages.create(
-                model=config.model_name,
-                max_tokens=config.max_tokens,
-                temperature=config.temperature,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            return {
-                "text": response.content[0].text,
-                "tokens_used": response.usage.input_tokens + response.usage.output_tokens,
-                "metadata": {
-                    "stop_reason": response.stop_reason,
-                    "model": response.model
-                }
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Anthropic API error: {str(e)}")
-            raise
-    
-    async def _call_google(self, config: ModelConfig, prompt: str) -> Dict[str, Any]:
-        """Call Google API (Gemini)"""
-        if not config.api_key:
-            raise ValueError("Google API key is required")
-
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{config.model_name}:generateContent?key={config.api_key}"
-        
-        payload = {
-            "contents": [{
-                "parts": [{"text": prompt}]
-            }],
-            "generationConfig": {
-                "maxOutputTokens": config.max_tokens,
-                "temperature": config.temperature,
-                "topP": config.top_p,
-            }
+    async def _call_provider(self, config: ModelConfig, prompt: str) -> Dict[str, Any]:
+        """Provider response for ``prompt``, through the response cache when enabled"""
+        cache = self._get_response_cache()
+        if cache is None:
+            return await self.clients.call(config, prompt)
+        
+        params = {
+            "max_tokens": config.max_tokens,
+            "temperature": config.temperature,
+            "top_p": config.top_p,
+            "frequency_penalty": config.frequency_penalty,
+            "presence_penalty": config.presence_penalty,
+            "endpoint": config.base_url or config.endpoint
         }
-        
-        try:
-            if self.session:
-                async with self.session.post(url, json=payload) as response:
-                    response.raise_for_status()
-                    result = await response.json()
-            else:
-                # Fallback if session not initialized
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(url, json=payload) as response:
-                        response.raise_for_status()
-                        result = await response.json()
-            
-            text_response = result["candidates"][0]["content"]["parts"][0]["text"]
-            
-            # Estimate tokens (rough approximation)
-            tokens_used = len(prompt.split()) + len(text_response.split())
-            
-            return {
-                "text": text_response,
-                "tokens_used": tokens_used,
-                "metadata": {
-                    "provider": "google", 
-                    "model": config.model_name,
-                    "finish_reason": result["candidates"][0].get("finishReason", "unknown")
-                }
-            }
-        except Exception as e:
-            self.logger.error(f"Google API error: {str(e)}")
-            raise
-    
-    async def _call_cohere(self, config: ModelConfig, prompt: str) -> Dict[str, Any]:
-        """Call Cohere API"""
-        api_key = config.api_key or os.environ.get("COHERE_API_KEY")
-        if not api_key:
-            raise IntegrationError("Cohere API key not configured. Set COHERE_API_KEY or provide api_key in model config.")
-
-        async with aiohttp.ClientSession() as session:
-            headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-            payload = {"model": config.model_name, "prompt": prompt}
-            async with session.post("https://api.cohere.ai/v1/generate", headers=headers, json=payload) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                text = data.get("generations", [{}])[0].get("text", "")
-                return {
-                    "text": text,
-                    "tokens_used": data.get("meta", {}).get("billed_units", {}).get("input_tokens", 0),
-                    "metadata": {"provider": "cohere", "model": config.model_name}
-                }
-
-    async def _call_huggingface(self, config: ModelConfig, prompt: str) -> Dict[str, Any]:
-        """Call Hugging Face Inference API"""
-        api_key = config.api_key or os.environ.get("HF_API_KEY")
-        if not api_key:
-            raise IntegrationError("Hugging Face API key not configured. Set HF_API_KEY or provide api_key in model config.")
-
-        async with aiohttp.ClientSession() as session:
-            headers = {"Authorization": f"Bearer {api_key}"}
-            url = f"https://api-inference.huggingface.co/models/{config.model_name}"
-            payload = {"inputs": prompt}
-            async with session.post(url, headers=headers, json=payload) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                text = data[0].get("generated_text", "") if isinstance(data, list) else str(data)
-                return {
-                    "text": text,
-                    "tokens_used": len(prompt.split()) + len(text.split()),
-                    "metadata": {"provider": "huggingface", "model": config.model_name}
-                }
-
-    async def _call_local(self, config: ModelConfig, prompt: str) -> Dict[str, Any]:
-        """Call local model via HTTP endpoint"""
-        endpoint = config.endpoint or os.environ.get("LOCAL_MODEL_ENDPOINT")
-        if not endpoint:
-            raise IntegrationError("Local model endpoint not configured. Set LOCAL_MODEL_ENDPOINT or provide endpoint in model config.")
-
-        async with aiohttp.ClientSession() as session:
-            payload = {"prompt": prompt, "model": config.model_name}
-            async with session.post(endpoint, json=payload) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                return {
-                    "text": data.get("text", data.get("response", "")),
-                    "tokens_used": data.get("tokens_used", len(prompt.split())),
-                    "metadata": {"provider": "local", "model": config.model_name}
-                }
+        response, cached = await cache.get_or_call(
+            config.provider.value, config.model_name, prompt, params,
+            lambda: self.clients.call(config, prompt),
+            bypass=not config.cache_responses
+        )
+        if cached:
+            response = {**response, "metadata": {**response.get("metadata", {}), "cached": True}}
+        return response
     
     async def perform_bias_test(
         self,
@@ -663,32 +507,29 @@ class RealTimeModelIntegrationService:
         try:
             self.logger.info(f"Starting comprehensive bias analysis for model: {config.model_name}")
             
-            # Perform all bias tests
+            # All bias tests, then custom tests (contextual by default), run
+            # concurrently within the provider's limits
+            tests = [(test_type, None) for test_type in BiasTestType]
+            tests.extend(
+                (BiasTestType.CONTEXTUAL_BIAS, custom_test.get("prompt"))
+                for custom_test in custom_tests or []
+            )
+            outcomes = await asyncio.gather(
+                *(self.perform_bias_test(config, test_type, test_groups, prompt) for test_type, prompt in tests),
+                return_exceptions=True
+            )
+            
             test_results = []
             tests_performed = []
-            
-            for test_type in BiasTestType:
-                try:
-                    result = await self.perform_bias_test(config, test_type, test_groups)
-                    test_results.append(result)
-                    tests_performed.append(test_type)
-                except Exception as e:
-                    self.logger.warning(f"Failed to perform {test_type.value} test: {str(e)}")
-            
-            # Perform custom tests if provided
-            if custom_tests:
-                for custom_test in custom_tests:
-                    try:
-                        result = await self.perform_bias_test(
-                            config,
-                            BiasTestType.CONTEXTUAL_BIAS,  # Use contextual as default
-                            test_groups,
-                            custom_test.get("prompt")
-                        )
-                        test_results.append(result)
-                        tests_performed.append(BiasTestType.CONTEXTUAL_BIAS)
-                    except Exception as e:
-                        self.logger.warning(f"Failed to perform custom test: {str(e)}")
+            for i, ((test_type, _), outcome) in enumerate(zip(tests, outcomes)):
+                if isinstance(outcome, Exception):
+                    if i < len(BiasTestType):
+                        self.logger.warning(f"Failed to perform {test_type.value} test: {str(outcome)}")
+                    else:
+                        self.logger.warning(f"Failed to perform custom test: {str(outcome)}")
+                    continue
+                test_results.append(outcome)
+                tests_performed.append(test_type)
             
             # Calculate overall bias score
             overall_bias_score = statistics.mean([result.bias_score for result in test_results]) if test_results else 0
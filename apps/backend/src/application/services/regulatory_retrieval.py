@@ -0,0 +1,420 @@
+"""
+Regulatory Document Retrieval
+
+Hybrid lexical + dense retrieval over regulatory document sections, built
+once when documents are indexed.
+
+- BM25 inverted index: each term's postings hold precomputed BM25 impact
+  weights, so a query only touches the postings of its own terms
+- Dense index: one L2-normalized vector per section, from a local
+  sentence-transformers model or from hashed word/bigram features
+- Hybrid ranking: the top BM25 candidates (heap selection) are re-ranked by
+  a blend of normalized BM25 and cosine similarity
+
+Indexes are persisted to a directory and reloaded when the corpus
+fingerprint matches, so startup does not rebuild them.
+"""
+
+import os
+import re
+import json
+import zlib
+import heapq
+import hashlib
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have how i in is it its must of on or "
+    "that the their this to was what when where which who will with".split()
+)
+
+# Field weights, applied as term-frequency multipliers (a simplified BM25F)
+FIELD_WEIGHTS = {"title": 2.0, "keywords": 2.0, "content": 1.0}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric tokens without stopwords."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def document_text(doc: Dict[str, Any]) -> str:
+    """Title, keywords and content of a section as one string."""
+    return " ".join([doc.get("title", ""), " ".join(doc.get("keywords", [])), doc.get("content", "")])
+
+
+# ============================================================================
+# Embedders
+# ============================================================================
+
+class HashingEmbedder:
+    """
+    Signed feature hashing of word unigrams and bigrams into ``dim`` buckets.
+
+    Needs no model download and is stable across processes (CRC32, not the
+    salted builtin ``hash``), so persisted vectors stay valid.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+            for feature, count in features.items():
+                h = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if h & 0x80000000 else -1.0
+                vectors[row, h % self.dim] += sign * (1.0 + np.log(count))
+        return _normalize_rows(vectors)
+
+
+class SentenceTransformerEmbedder:
+    """Dense embeddings from a local sentence-transformers model."""
+
+    def __init__(self, model_name: str):
+        self.model = SentenceTransformer(model_name)
+        self.name = f"sentence-transformers:{model_name}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def create_embedder(model: Optional[str]):
+    """
+    Embedder for a setting value: ``"hashing"``, ``"none"``/empty (BM25
+    only) or a sentence-transformers model name, falling back to hashing
+    when sentence-transformers is not installed or the model fails to load.
+    """
+    if not model or model == "none":
+        return None
+    if model == "hashing":
+        return HashingEmbedder()
+    if SENTENCE_TRANSFORMERS_AVAILABLE:
+        try:
+            return SentenceTransformerEmbedder(model)
+        except Exception as e:
+            logger.warning(f"Failed to load embedding model {model}, using hashed features: {e}")
+    else:
+        logger.warning(f"sentence-transformers not installed, using hashed features instead of {model}")
+    return HashingEmbedder()
+
+
+def _rank_key(item: Tuple[float, int]) -> Tuple[float, int]:
+    # Higher score first, earlier document on ties
+    return item[0], -item[1]
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+# ============================================================================
+# BM25 Inverted Index
+# ============================================================================
+
+class BM25Index:
+    """
+    Inverted index with BM25 impact weights.
+
+    Postings are stored term-major in flat arrays: the postings of term ``t``
+    are ``doc_ids[offsets[t]:offsets[t + 1]]`` with matching ``weights``.
+    """
+
+    def __init__(
+        self,
+        terms: Dict[str, int],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        weights: np.ndarray
+    ):
+        self.terms = terms
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.weights = weights
+
+    @classmethod
+    def build(
+        cls,
+        documents: Sequence[Dict[str, Any]],
+        k1: float = 1.5,
+        b: float = 0.75
+    ) -> "BM25Index":
+        term_freqs: List[Counter] = []
+        for doc in documents:
+            tf: Counter = Counter()
+            for field_name, weight in FIELD_WEIGHTS.items():
+                value = doc.get(field_name, "")
+                text = " ".join(value) if isinstance(value, list) else str(value or "")
+                for token in tokenize(text):
+                    tf[token] += weight
+            term_freqs.append(tf)
+
+        n_docs = len(documents)
+        lengths = np.array([sum(tf.values()) for tf in term_freqs], dtype=np.float64)
+        avg_length = float(lengths.mean()) if n_docs and lengths.mean() > 0 else 1.0
+
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for doc_id, tf in enumerate(term_freqs):
+            for term, freq in tf.items():
+                postings.setdefault(term, []).append((doc_id, freq))
+
+        terms: Dict[str, int] = {}
+        offsets = [0]
+        doc_ids: List[int] = []
+        weights: List[float] = []
+        for term_id, term in enumerate(sorted(postings)):
+            entries = postings[term]
+            df = len(entries)
+            idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, freq in entries:
+                norm = k1 * (1.0 - b + b * lengths[doc_id] / avg_length)
+                doc_ids.append(doc_id)
+                weights.append(idf * freq * (k1 + 1.0) / (freq + norm))
+            terms[term] = term_id
+            offsets.append(len(doc_ids))
+
+        return cls(
+            terms=terms,
+            offsets=np.asarray(offsets, dtype=np.int64),
+            doc_ids=np.asarray(doc_ids, dtype=np.int32),
+            weights=np.asarray(weights, dtype=np.float32),
+        )
+
+    def score(self, query: str, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (doc ids, BM25 scores) of the documents sharing a term with
+        ``query``, optionally restricted to ``allowed[doc_id]``. Cost depends
+        on the postings of the query terms, not on the corpus size.
+        """
+        term_ids = {self.terms[t] for t in tokenize(query) if t in self.terms}
+        if not term_ids:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        ids = np.concatenate([self.doc_ids[self.offsets[t]:self.offsets[t + 1]] for t in term_ids])
+        weights = np.concatenate([self.weights[self.offsets[t]:self.offsets[t + 1]] for t in term_ids])
+        if allowed is not None:
+            keep = allowed[ids]
+            ids, weights = ids[keep], weights[keep]
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        return unique_ids, np.bincount(inverse, weights=weights, minlength=len(unique_ids))
+
+
+# ============================================================================
+# Hybrid Retriever
+# ============================================================================
+
+class HybridRetriever:
+    """
+    BM25 candidate generation with optional dense re-ranking.
+
+    ``alpha`` weighs normalized BM25 against cosine similarity. Queries with
+    no lexical match fall back to a dense scan over the allowed sections.
+    """
+
+    def __init__(
+        self,
+        bm25: BM25Index,
+        frameworks: Sequence[str],
+        vectors: Optional[np.ndarray] = None,
+        embedder: Any = None,
+        alpha: float = 0.7,
+        candidate_pool: int = 50,
+        fingerprint: str = ""
+    ):
+        self.bm25 = bm25
+        self.frameworks = list(frameworks)
+        self.vectors = vectors
+        self.embedder = embedder if vectors is not None else None
+        self.alpha = alpha
+        self.candidate_pool = candidate_pool
+        self.fingerprint = fingerprint
+        framework_array = np.asarray(self.frameworks, dtype=object)
+        self._framework_masks = {fw: framework_array == fw for fw in set(self.frameworks)}
+
+    def __len__(self) -> int:
+        return len(self.frameworks)
+
+    @staticmethod
+    def corpus_fingerprint(documents: Sequence[Dict[str, Any]], embedder: Any) -> str:
+        payload = json.dumps(
+            {"version": INDEX_FORMAT_VERSION, "embedder": getattr(embedder, "name", None), "documents": documents},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def build(
+        cls,
+        documents: Sequence[Dict[str, Any]],
+        embedder: Any = None,
+        alpha: float = 0.7
+    ) -> "HybridRetriever":
+        vectors = None
+        if embedder is not None and documents:
+            vectors = embedder.embed([document_text(doc) for doc in documents])
+        return cls(
+            bm25=BM25Index.build(documents),
+            frameworks=[doc.get("framework", "unknown") for doc in documents],
+            vectors=vectors,
+            embedder=embedder,
+            alpha=alpha,
+            fingerprint=cls.corpus_fingerprint(documents, embedder),
+        )
+
+    @classmethod
+    def load_or_build(
+        cls,
+        documents: Sequence[Dict[str, Any]],
+        index_dir: Optional[str],
+        embedder: Any = None,
+        alpha: float = 0.7
+    ) -> "HybridRetriever":
+        """Load the persisted index for this corpus, else build and persist it."""
+        fingerprint = cls.corpus_fingerprint(documents, embedder)
+        if index_dir:
+            retriever = cls.load(index_dir, embedder=embedder, alpha=alpha)
+            if retriever is not None and retriever.fingerprint == fingerprint:
+                logger.info(f"Loaded retrieval index for {len(retriever)} sections from {index_dir}")
+                return retriever
+
+        retriever = cls.build(documents, embedder=embedder, alpha=alpha)
+        if index_dir:
+            retriever.save(index_dir)
+        return retriever
+
+    def save(self, index_dir: str):
+        """Persist the index (arrays as .npz, vocabulary and metadata as JSON)."""
+        try:
+            os.makedirs(index_dir, exist_ok=True)
+            arrays = {
+                "offsets": self.bm25.offsets,
+                "doc_ids": self.bm25.doc_ids,
+                "weights": self.bm25.weights,
+            }
+            if self.vectors is not None:
+                arrays["vectors"] = self.vectors
+            tmp_path = os.path.join(index_dir, "index.tmp.npz")
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, os.path.join(index_dir, "index.npz"))
+            meta = {
+                "version": INDEX_FORMAT_VERSION,
+                "fingerprint": self.fingerprint,
+                "embedder": getattr(self.embedder, "name", None),
+                "terms": sorted(self.bm25.terms, key=self.bm25.terms.get),
+                "frameworks": self.frameworks,
+            }
+            tmp_path = os.path.join(index_dir, "meta.json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, os.path.join(index_dir, "meta.json"))
+        except OSError as e:
+            logger.warning(f"Failed to persist retrieval index to {index_dir}: {e}")
+
+    @classmethod
+    def load(cls, index_dir: str, embedder: Any = None, alpha: float = 0.7) -> Optional["HybridRetriever"]:
+        """Persisted index, or None when missing, unreadable or of another format."""
+        try:
+            with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != INDEX_FORMAT_VERSION:
+                return None
+            with np.load(os.path.join(index_dir, "index.npz"), allow_pickle=False) as arrays:
+                bm25 = BM25Index(
+                    terms={term: i for i, term in enumerate(meta["terms"])},
+                    offsets=arrays["offsets"],
+                    doc_ids=arrays["doc_ids"],
+                    weights=arrays["weights"],
+                )
+                vectors = arrays["vectors"] if "vectors" in arrays.files else None
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable retrieval index in {index_dir}: {e}")
+            return None
+        return cls(
+            bm25=bm25,
+            frameworks=meta["frameworks"],
+            vectors=vectors,
+            embedder=embedder,
+            alpha=alpha,
+            fingerprint=meta["fingerprint"],
+        )
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 3,
+        framework: Optional[str] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Top ``top_k`` (document index, score) pairs, best first. When fewer
+        than ``top_k`` sections match lexically the rest are filled by
+        dense similarity.
+        """
+        allowed = None
+        if framework is not None:
+            allowed = self._framework_masks.get(framework)
+            if allowed is None:
+                return []
+
+        ids, bm25_scores = self.bm25.score(query, allowed)
+        query_vector = self.embedder.embed([query])[0] if self.embedder is not None else None
+
+        if len(ids) == 0:
+            return self._dense_scan(query_vector, top_k, allowed)
+
+        candidates = heapq.nlargest(
+            max(top_k, self.candidate_pool), zip(bm25_scores.tolist(), ids.tolist()), key=_rank_key
+        )
+        if query_vector is None:
+            results = [(doc_id, score) for score, doc_id in candidates[:top_k]]
+        else:
+            candidate_ids = np.fromiter((doc_id for _, doc_id in candidates), dtype=np.int64)
+            similarity = np.maximum(self.vectors[candidate_ids] @ query_vector, 0.0)
+            best = candidates[0][0] or 1.0
+            scored = (
+                (self.alpha * score / best + (1.0 - self.alpha) * float(sim), doc_id)
+                for (score, doc_id), sim in zip(candidates, similarity)
+            )
+            results = [(doc_id, score) for score, doc_id in heapq.nlargest(top_k, scored, key=_rank_key)]
+
+        if len(results) < top_k:
+            seen = {doc_id for doc_id, _ in results}
+            extra = self._dense_scan(query_vector, top_k + len(seen), allowed)
+            results.extend([r for r in extra if r[0] not in seen][:top_k - len(results)])
+        return results
+
+    def _dense_scan(
+        self,
+        query_vector: Optional[np.ndarray],
+        top_k: int,
+        allowed: Optional[np.ndarray]
+    ) -> List[Tuple[int, float]]:
+        # No lexical overlap: rank the allowed sections by similarity alone,
+        # keeping corpus order among ties (and when there are no vectors)
+        doc_ids = np.flatnonzero(allowed) if allowed is not None else np.arange(len(self))
+        if query_vector is None:
+            return [(int(doc_id), 0.0) for doc_id in doc_ids[:top_k]]
+        similarity = self.vectors[doc_ids] @ query_vector
+        order = np.argsort(-similarity, kind="stable")[:top_k]
+        return [(int(doc_ids[i]), float(similarity[i])) for i in order]
@@ -11,6 +11,14 @@ import tempfile
 import os
 from pathlib import Path
 
+# State the app creates while it runs (listing catalogs next to the local
+# uploads, files under database_dir such as the audit spill file) goes to a
+# throwaway directory rather than the working tree
+_RUNTIME_DIR = tempfile.TemporaryDirectory(prefix="fairmind-tests-")
+os.environ.setdefault("DATABASE_DIR", os.path.join(_RUNTIME_DIR.name, "datasets"))
+os.environ.setdefault("DATASET_STORAGE_PATH", os.path.join(_RUNTIME_DIR.name, "uploads", "datasets"))
+os.environ.setdefault("TEST_RESULTS_PATH", os.path.join(_RUNTIME_DIR.name, "uploads", "test_results"))
+
 from api.main import app
 from config.settings import Settings
 
@@ -0,0 +1,60 @@
+"""
+Tests for AIBOMDatabaseService reads across service instances.
+"""
+
+import asyncio
+
+import pytest
+
+from api.models.ai_bom import AIBOMComponent, AIBOMRequest
+from api.services.ai_bom_db_service import AIBOMDatabaseService, DatabaseConfig
+
+
+def make_request(version, risk_level="low"):
+    return AIBOMRequest(
+        project_name="Loan Approval",
+        version=version,
+        description="Loan approval model",
+        components=[
+            AIBOMComponent(
+                id="loan.model",
+                name="Loan Model",
+                type="model",
+                version=version,
+                risk_level=risk_level,
+                compliance_status="compliant",
+            )
+        ],
+    )
+
+
+@pytest.fixture
+def services(tmp_path, monkeypatch):
+    """Two workers sharing one local store, with the database unavailable."""
+    config = DatabaseConfig(store_path=str(tmp_path / "ai_bom.sqlite3"), cache_ttl=0.05)
+    workers = [AIBOMDatabaseService(config), AIBOMDatabaseService(config)]
+    for worker in workers:
+        monkeypatch.setattr(worker.repository.storage_adapter, "is_connected", lambda: False)
+    yield workers
+    for worker in workers:
+        worker.executor.shutdown(wait=True)
+        if worker._store is not None:
+            worker._store.close()
+
+
+@pytest.mark.asyncio
+async def test_update_from_another_instance_is_seen_after_ttl(services):
+    first, second = services
+    created = await first.create_bom_document(make_request("1.0.0"))
+    assert (await first.get_bom_document(created.id)).version == "1.0.0"
+
+    await second.update_bom_document(created.id, make_request("2.0.0", risk_level="high"))
+    await asyncio.sleep(0.1)
+
+    document = await first.get_bom_document(created.id)
+    assert document.version == "2.0.0"
+    assert document.components[0].version == "2.0.0"
+
+    await second.delete_bom_document(created.id)
+    await asyncio.sleep(0.1)
+    assert await first.get_bom_document(created.id) is None
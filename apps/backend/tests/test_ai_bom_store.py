@@ -0,0 +1,137 @@
+"""
+Tests for the local AI BOM store behind AIBOMDatabaseService.
+"""
+
+import pytest
+
+from api.services.ai_bom_store import AIBOMStore, DocumentCache, document_diff
+
+
+def make_document(index, project="Credit Scoring", risk="low", compliance="compliant", components=None):
+    return {
+        "id": f"bom-{index:03d}",
+        "name": f"AI BOM - {project}",
+        "version": "1.0.0",
+        "project_name": project,
+        "organization": "FairMind",
+        "overall_risk_level": risk,
+        "overall_compliance_status": compliance,
+        "created_at": f"2024-01-01T10:{index // 60:02d}:{index % 60:02d}",
+        "updated_at": f"2024-01-01T10:{index // 60:02d}:{index % 60:02d}",
+        "components": components if components is not None else [
+            {"id": f"c-{index}", "name": "xgboost", "type": "framework", "version": "2.0.0", "risk_level": risk}
+        ],
+    }
+
+
+@pytest.fixture
+def store():
+    store = AIBOMStore(":memory:")
+    for i in range(25):
+        store.save_document(make_document(
+            i,
+            project="Credit Scoring" if i % 2 else "Fraud Detection",
+            risk="high" if i % 5 == 0 else "low",
+        ))
+    return store
+
+
+class TestAIBOMStore:
+    """Indexed filtering, keyset pages, versions and the bounded cache."""
+
+    def test_keyset_pages_cover_filtered_documents_newest_first(self, store):
+        seen, cursor = [], None
+        while True:
+            documents, cursor = store.list_documents(limit=4, project_name="credit", cursor=cursor)
+            seen.extend(d["id"] for d in documents)
+            if cursor is None:
+                break
+
+        assert seen == [f"bom-{i:03d}" for i in range(23, 0, -2)]
+        assert store.get_document("bom-003")["components"][0]["name"] == "xgboost"
+
+        high, _ = store.list_documents(limit=10, risk_level="high")
+        assert [d["id"] for d in high] == ["bom-020", "bom-015", "bom-010", "bom-005", "bom-000"]
+        offset_page, _ = store.list_documents(limit=2, risk_level="high", offset=1)
+        assert [d["id"] for d in offset_page] == ["bom-015", "bom-010"]
+        assert store.list_documents(limit=10, project_name="scoring")[0] == []
+
+    def test_versions_record_snapshots_and_diffs(self, store):
+        first = make_document(100, components=[
+            {"id": "m", "name": "model", "version": "1.0"},
+            {"id": "d", "name": "dataset", "version": "1.0"},
+        ])
+        second = {**first, "version": "1.1.0", "components": [
+            {"id": "m", "name": "model", "version": "1.1"},
+            {"id": "f", "name": "feature-store", "version": "0.3"},
+        ]}
+
+        assert store.save_document(first, record_version=True) == 1
+        assert store.save_document(second, record_version=True) == 2
+
+        versions = store.list_versions("bom-100")
+        assert [v["version"] for v in versions] == ["1.0.0", "1.1.0"]
+        assert versions[0]["document"]["components"][1]["name"] == "dataset"
+        assert versions[1]["diff"] == {
+            "fields": {"version": ["1.0.0", "1.1.0"]},
+            "components": {
+                "added": ["f"],
+                "removed": ["d"],
+                "changed": {"m": {"version": ["1.0", "1.1"]}},
+            },
+        }
+        assert document_diff(second, second)["fields"] == {}
+
+    def test_delete_removes_components_analyses_and_versions(self, store):
+        store.save_document(make_document(100), record_version=True)
+        store.save_analysis("bom-100", {"id": "a-1", "analysis_type": "risk", "created_at": "2024-01-02T00:00:00"})
+        assert store.get_analysis("a-1")["analysis_type"] == "risk"
+
+        assert store.delete_document("bom-100")
+        assert not store.delete_document("bom-100")
+        assert store.get_document("bom-100") is None
+        assert store.get_analysis("a-1") is None
+        assert store.list_versions("bom-100") == []
+        assert len(store) == 25
+
+    def test_document_cache_is_bounded_lru(self):
+        cache = DocumentCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert (cache.get("a"), cache.get("c")) == (1, 3)
+        assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2}
+
+    def test_document_cache_entries_expire_after_ttl(self):
+        now = [100.0]
+        cache = DocumentCache(max_entries=4, ttl_seconds=5, clock=lambda: now[0])
+        cache.set("a", 1)
+        now[0] += 4.9
+        assert cache.get("a") == 1
+
+        now[0] += 0.1
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert DocumentCache(ttl_seconds=0).get("a") is None
+
+    def test_worker_caches_see_another_workers_update_after_ttl(self, tmp_path):
+        now = [0.0]
+        path = str(tmp_path / "ai_bom.sqlite3")
+        first, second = AIBOMStore(path), AIBOMStore(path)
+        first_cache = DocumentCache(ttl_seconds=5, clock=lambda: now[0])
+        try:
+            first.save_document(make_document(1))
+            first_cache.set("bom-001", first.get_document("bom-001"))
+
+            second.save_document({**make_document(1), "version": "2.0.0"})
+            assert first_cache.get("bom-001")["version"] == "1.0.0"
+
+            now[0] += 5
+            assert first_cache.get("bom-001") is None
+            assert first.get_document("bom-001")["version"] == "2.0.0"
+        finally:
+            first.close()
+            second.close()
@@ -10,6 +10,7 @@ from datetime import datetime
 from typing import Dict, Any, List
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from config.settings import settings
 from api.services.ai_compliance_automation_service import AIComplianceAutomationService
 from api.services.india_compliance_rag import IndiaComplianceRAG
 from api.schemas.india_compliance import (
@@ -21,10 +22,18 @@ from api.schemas.india_compliance import (
 )
 
 
+@pytest.fixture(autouse=True)
+def rag_index_dir(tmp_path, monkeypatch):
+    """Keep the persisted retrieval index out of the working tree"""
+    index_dir = str(tmp_path / "rag_index")
+    monkeypatch.setattr(settings, "rag_index_dir", index_dir)
+    return index_dir
+
+
 @pytest.fixture
-def rag_service():
+def rag_service(rag_index_dir):
     """Fixture for RAG service"""
-    return IndiaComplianceRAG()
+    return IndiaComplianceRAG(index_dir=rag_index_dir)
 
 
 @pytest.fixture
@@ -0,0 +1,99 @@
+"""
+Tests for the pure ASGI middleware stack.
+"""
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from core.middleware import ErrorHandlingMiddleware
+from core.middleware.audit import AuditLoggingMiddleware
+from core.middleware.org_isolation import OrgIsolationMiddleware
+from middleware.security import SecurityHeadersMiddleware, RateLimitMiddleware
+
+
+async def echo(request: Request):
+    return JSONResponse({"body": await request.json(), "org_id": request.state.org_id})
+
+
+async def stream(request: Request):
+    async def chunks():
+        for i in range(3):
+            yield f"chunk-{i};".encode()
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+async def boom(request: Request):
+    raise RuntimeError("boom")
+
+
+class InjectUser:
+    """Stand-in for the auth middleware: sets request.state.user."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        scope.setdefault("state", {})["user"] = {"sub": "user-1", "org_id": "org-1"}
+        await self.app(scope, receive, send)
+
+
+@pytest.fixture
+def audit_events(monkeypatch):
+    events = []
+
+    async def capture(self, context):
+        events.append(context)
+
+    monkeypatch.setattr(AuditLoggingMiddleware, "_log_audit_event", capture)
+    return events
+
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[
+        Route("/echo", echo, methods=["POST"]),
+        Route("/stream", stream),
+        Route("/boom", boom),
+    ])
+    app.add_middleware(AuditLoggingMiddleware)
+    app.add_middleware(ErrorHandlingMiddleware)
+    app.add_middleware(OrgIsolationMiddleware)
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(InjectUser)
+    app.add_middleware(RateLimitMiddleware, requests_per_minute=1000)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestPureASGIMiddleware:
+    """Headers, state, error handling and body passthrough."""
+
+    def test_body_and_state_pass_through(self, client, audit_events):
+        response = client.post("/echo", json={"name": "x", "password": "hunter2"})
+
+        assert response.status_code == 200
+        assert response.json() == {"body": {"name": "x", "password": "hunter2"}, "org_id": "org-1"}
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert response.headers["X-RateLimit-Limit"] == "1000"
+
+        assert audit_events[0]["status_code"] == 200
+        assert audit_events[0]["user_id"] == "user-1"
+        assert audit_events[0]["request_body"] == {"name": "x", "password": "***REDACTED***"}
+
+    def test_streaming_response_passes_through(self, client, audit_events):
+        with client.stream("GET", "/stream") as response:
+            chunks = list(response.iter_bytes())
+
+        assert b"".join(chunks) == b"chunk-0;chunk-1;chunk-2;"
+        assert response.headers["X-Frame-Options"] == "DENY"
+
+    def test_unhandled_exception_becomes_json_500(self, client, audit_events):
+        response = client.get("/boom")
+
+        assert response.status_code == 500
+        assert response.json()["error"] == "Internal Server Error"
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert audit_events[0]["status_code"] == 500
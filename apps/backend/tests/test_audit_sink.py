@@ -0,0 +1,127 @@
+"""
+Tests for the batched audit log sink.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from services.audit_sink import AuditSink, build_audit_record
+
+
+def record(i: int):
+    return build_audit_record(action=f"GET /api/v1/items/{i}", status="success")
+
+
+class RecordingWriter:
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def __call__(self, records):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.batches.append(list(records))
+
+
+class TestAuditSink:
+    """Batching, draining and overflow policies."""
+
+    @pytest.mark.asyncio
+    async def test_batches_by_size_and_drains_on_stop(self):
+        writer = RecordingWriter()
+        sink = AuditSink(writer, batch_size=10, flush_interval=60)
+        await sink.start()
+
+        for i in range(25):
+            await sink.submit(record(i))
+        await asyncio.sleep(0.01)
+        assert [len(batch) for batch in writer.batches] == [10, 10]
+
+        await sink.stop()
+        assert [len(batch) for batch in writer.batches] == [10, 10, 5]
+        assert sink.stats()["written"] == 25
+        assert not sink.running
+
+    @pytest.mark.asyncio
+    async def test_flush_interval_writes_partial_batch(self):
+        writer = RecordingWriter()
+        sink = AuditSink(writer, batch_size=100, flush_interval=0.01)
+        await sink.start()
+
+        await sink.submit(record(0))
+        await asyncio.sleep(0.05)
+        assert len(writer.batches) == 1
+        await sink.stop()
+
+    @pytest.mark.asyncio
+    async def test_overflow_drop_counts(self):
+        sink = AuditSink(RecordingWriter(), max_queue_size=3, overflow_policy="drop")
+
+        results = [await sink.submit(record(i)) for i in range(5)]
+        assert results == [True, True, True, False, False]
+        assert sink.stats()["dropped"] == 2
+
+    @pytest.mark.asyncio
+    async def test_overflow_and_failed_writes_spill_to_file(self, tmp_path):
+        spill = tmp_path / "audit_spill.jsonl"
+        sink = AuditSink(
+            RecordingWriter(fail=True), max_queue_size=2, batch_size=2,
+            flush_interval=60, overflow_policy="spill", spill_path=str(spill)
+        )
+
+        for i in range(3):
+            await sink.submit(record(i))
+        assert sink.stats()["spilled"] == 1
+
+        await sink.flush()
+        lines = [json.loads(line) for line in spill.read_text().splitlines()]
+        assert len(lines) == 3
+        assert sink.stats()["failed_batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_block_policy_applies_backpressure(self):
+        writer = RecordingWriter()
+        sink = AuditSink(writer, max_queue_size=2, batch_size=2, flush_interval=60, overflow_policy="block")
+        await sink.start()
+
+        for i in range(6):
+            assert await asyncio.wait_for(sink.submit(record(i)), 1.0)
+        await sink.stop()
+        assert sum(len(batch) for batch in writer.batches) == 6
+        assert sink.stats()["dropped"] == 0
+
+    def test_restart_on_a_new_event_loop(self):
+        writer = RecordingWriter()
+        sink = AuditSink(writer, batch_size=2, flush_interval=60)
+
+        async def session(start: int):
+            await sink.start()
+            for i in range(start, start + 3):
+                await sink.submit(record(i))
+            await asyncio.sleep(0.01)
+            await sink.stop()
+
+        # Queued before the first start, on a loop of its own
+        asyncio.run(sink.submit(record(-1)))
+        asyncio.run(session(0))
+        asyncio.run(session(3))
+
+        assert [len(batch) for batch in writer.batches] == [2, 2, 2, 1]
+        assert sink.stats()["written"] == 7 and sink.stats()["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_flusher_failure_is_logged(self, caplog):
+        sink = AuditSink(RecordingWriter(), batch_size=1, flush_interval=60)
+        await sink.start()
+
+        def broken(limit):
+            raise RuntimeError("flusher bug")
+
+        sink._drain = broken
+        await sink.submit(record(0))
+        await asyncio.sleep(0.01)
+
+        assert not sink.running
+        assert "Audit sink flusher failed" in caplog.text
@@ -0,0 +1,130 @@
+"""
+Tests for phase scheduling and evaluation history in the comprehensive bias
+evaluation pipeline.
+"""
+
+import threading
+import time
+
+import pytest
+
+from api.services.comprehensive_bias_evaluation_pipeline import (
+    ComprehensiveBiasEvaluationPipeline,
+    EvaluationHistoryStore,
+    EvaluationPhase,
+    PhaseSpec,
+)
+
+RECORDS = [
+    {"score": 0.1 * i, "label": i % 2, "group": "a" if i < 5 else "b"}
+    for i in range(10)
+]
+
+
+def make_pipeline(**kwargs) -> ComprehensiveBiasEvaluationPipeline:
+    kwargs.setdefault("history_store", EvaluationHistoryStore())
+    return ComprehensiveBiasEvaluationPipeline(**kwargs)
+
+
+class TestPhaseScheduling:
+    """Concurrency, timeouts, dependencies and per-phase timing."""
+
+    @pytest.mark.asyncio
+    async def test_independent_phases_run_concurrently(self, monkeypatch):
+        pipeline = make_pipeline()
+        # Each phase waits for the other: this only completes if both run at once
+        barrier = threading.Barrier(2, timeout=5)
+        for name in ("_run_real_time_monitoring", "_run_post_deployment_auditing"):
+            original = getattr(pipeline, name)
+
+            def waiting(*args, _original=original):
+                barrier.wait()
+                return _original(*args)
+
+            monkeypatch.setattr(pipeline, name, waiting)
+
+        report = await pipeline.run_comprehensive_evaluation("m", "clf", RECORDS)
+
+        assert all(result.success for result in report.results.values())
+        assert set(report.phase_durations) == set(report.results)
+        assert report.phase_durations["real_time_monitoring"] > 0
+
+    @pytest.mark.asyncio
+    async def test_slow_phase_times_out_without_blocking_others(self, monkeypatch):
+        pipeline = make_pipeline()
+        original = pipeline._run_human_in_loop_evaluation
+        monkeypatch.setattr(
+            pipeline, "_run_human_in_loop_evaluation",
+            lambda *args: (time.sleep(0.5), original(*args))[1]
+        )
+        config = {"human_in_loop": {**pipeline.evaluation_configs["human_in_loop"], "timeout_seconds": 0.05}}
+
+        report = await pipeline.run_comprehensive_evaluation("m", "clf", RECORDS, config)
+
+        timed_out = report.results["human_in_loop"]
+        assert not timed_out.success
+        assert "Timed out" in timed_out.details["error"]
+        assert report.phase_durations["human_in_loop"] < 0.4
+        assert report.results["pre_deployment"].success
+
+    @pytest.mark.asyncio
+    async def test_phase_is_skipped_when_dependency_fails(self, monkeypatch):
+        class DependentPipeline(ComprehensiveBiasEvaluationPipeline):
+            PHASES = (
+                PhaseSpec(EvaluationPhase.PRE_DEPLOYMENT, "_run_pre_deployment_evaluation"),
+                PhaseSpec(
+                    EvaluationPhase.CONTINUOUS_LEARNING, "_run_continuous_learning",
+                    depends_on=(EvaluationPhase.PRE_DEPLOYMENT,)
+                ),
+            )
+
+        pipeline = DependentPipeline(history_store=EvaluationHistoryStore())
+
+        def broken(*args):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(pipeline, "_run_pre_deployment_evaluation", broken)
+        report = await pipeline.run_comprehensive_evaluation("m", "clf", RECORDS)
+
+        assert report.results["pre_deployment"].details["error"] == "boom"
+        assert report.results["continuous_learning"].details["error"] == "Skipped because pre_deployment failed"
+
+
+class TestEvaluationHistoryStore:
+    """Bounded in memory, persisted and trimmed on disk."""
+
+    @pytest.mark.asyncio
+    async def test_history_is_bounded_and_reloaded(self, tmp_path):
+        path = str(tmp_path / "history.jsonl")
+        pipeline = make_pipeline(history_store=EvaluationHistoryStore(path, max_entries=2))
+        reports = [await pipeline.run_comprehensive_evaluation(f"m{i}", "clf", RECORDS) for i in range(5)]
+
+        assert [r.model_id for r in pipeline.get_evaluation_history(10)] == ["m3", "m4"]
+        with open(path) as f:
+            assert len(f.readlines()) <= 4
+
+        reloaded = EvaluationHistoryStore(path, max_entries=2)
+        latest = reloaded.latest()
+        assert latest.model_id == "m4"
+        assert latest.overall_risk == reports[-1].overall_risk
+        assert latest.results["pre_deployment"].phase == EvaluationPhase.PRE_DEPLOYMENT
+        assert latest.phase_durations == pytest.approx(reports[-1].phase_durations)
+
+        # A new process continues from the persisted history
+        restarted = make_pipeline(history_store=reloaded)
+        report = await restarted.run_comprehensive_evaluation("m5", "clf", RECORDS)
+        assert report.results["continuous_learning"].metrics["model_updates"] == 2
+
+    @pytest.mark.asyncio
+    async def test_reports_from_other_workers_are_seen(self, tmp_path):
+        path = str(tmp_path / "history.jsonl")
+        first = make_pipeline(history_store=EvaluationHistoryStore(path, max_entries=3))
+        second = make_pipeline(history_store=EvaluationHistoryStore(path, max_entries=3))
+
+        await first.run_comprehensive_evaluation("m0", "clf", RECORDS)
+        assert [r.model_id for r in second.get_evaluation_history(10)] == ["m0"]
+        await second.run_comprehensive_evaluation("m1", "clf", RECORDS)
+        await first.run_comprehensive_evaluation("m2", "clf", RECORDS)
+
+        assert [r.model_id for r in first.get_evaluation_history(10)] == ["m0", "m1", "m2"]
+        assert [r.model_id for r in second.get_evaluation_history(10)] == ["m0", "m1", "m2"]
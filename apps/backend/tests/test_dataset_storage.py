@@ -0,0 +1,61 @@
+"""
+Tests for columnar dataset storage with column projection and row filters.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import dataset_storage as storage_module
+from services.dataset_storage import DatasetStorageService
+
+
+@pytest.fixture
+def dataset_csv():
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({
+        "prediction": rng.integers(0, 2, n),
+        "label": rng.integers(0, 2, n),
+        "gender": rng.choice(["f", "m"], n),
+        "age": rng.integers(18, 80, n),
+    })
+    return df, df.to_csv(index=False).encode()
+
+
+@pytest.fixture(params=["parquet", "csv"])
+def storage(request, tmp_path, monkeypatch):
+    if request.param == "parquet" and not storage_module.PYARROW_AVAILABLE:
+        pytest.skip("pyarrow not installed")
+    monkeypatch.setenv("DATASET_STORAGE_PATH", str(tmp_path))
+    monkeypatch.setenv("DATASET_STORAGE_FORMAT", request.param)
+    return DatasetStorageService()
+
+
+@pytest.mark.asyncio
+async def test_projection_and_filters(storage, dataset_csv):
+    df, content = dataset_csv
+    dataset_id, info = await storage.upload_dataset(content, "data.csv", "user-1")
+    assert info["storage_format"] == storage.storage_format
+
+    result = await storage.get_dataset(
+        dataset_id, "user-1",
+        columns=["prediction", "gender"],
+        filters=[("age", ">=", 40), ("gender", "==", "f")]
+    )
+    expected = df[(df["age"] >= 40) & (df["gender"] == "f")]
+
+    assert list(result.columns) == ["prediction", "gender"]
+    assert result["prediction"].tolist() == expected["prediction"].tolist()
+
+
+@pytest.mark.asyncio
+async def test_chunks_cover_dataset_and_delete(storage, dataset_csv):
+    df, content = dataset_csv
+    dataset_id, _ = await storage.upload_dataset(content, "data.csv", "user-1")
+
+    chunks = list(storage.iter_dataset_chunks(dataset_id, "user-1", ["label"], chunksize=120))
+    assert sum(len(chunk) for chunk in chunks) == len(df)
+
+    assert await storage.delete_dataset(dataset_id, "user-1")
+    assert await storage.get_dataset(dataset_id, "user-1") is None
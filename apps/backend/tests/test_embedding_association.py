@@ -0,0 +1,82 @@
+"""
+Tests for the matrix-based WEAT/SEAT engine.
+"""
+
+import numpy as np
+import pytest
+
+from fairness_library.embeddings import EmbeddingMatrix
+from fairness_library.llm_bias import seat_score, weat_score
+
+
+@pytest.fixture
+def embeddings():
+    rng = np.random.default_rng(0)
+    return {f"w{i}": rng.normal(size=50) for i in range(60)}
+
+
+def _reference_weat(embeddings, targets, attr_a, attr_b):
+    def cosine(a, b):
+        return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+
+    def association(word, attributes):
+        return np.mean([cosine(embeddings[word], embeddings[a]) for a in attributes])
+
+    return np.mean([association(t, attr_a) for t in targets]) - np.mean(
+        [association(t, attr_b) for t in targets]
+    )
+
+
+def test_weat_matches_pairwise_reference(embeddings):
+    targets = [f"w{i}" for i in range(10)]
+    attr_a = [f"w{i}" for i in range(20, 30)]
+    attr_b = [f"w{i}" for i in range(40, 50)]
+
+    result = weat_score(embeddings, targets, attr_a + ["unknown"], attr_b, random_state=0)
+
+    assert result.score == pytest.approx(_reference_weat(embeddings, targets, attr_a, attr_b), abs=1e-6)
+    assert result.details["missing_words"] == ["unknown"]
+    lower, upper = result.confidence_interval
+    assert lower <= result.score <= upper
+
+
+def test_weat_detects_planted_association(embeddings):
+    shift = np.random.default_rng(1).normal(size=50) * 3
+    biased = dict(embeddings)
+    targets = [f"w{i}" for i in range(10)]
+    attr_a = [f"w{i}" for i in range(20, 30)]
+    for word in targets + attr_a:
+        biased[word] = biased[word] + shift
+
+    result = weat_score(biased, targets, attr_a, [f"w{i}" for i in range(40, 50)], random_state=0)
+
+    assert result.is_biased
+    assert result.details["p_value"] < 0.05
+    assert result.details["effect_size"] > 0
+
+
+def test_memory_mapped_matrix_round_trip(embeddings, tmp_path):
+    words = list(embeddings)
+    EmbeddingMatrix(words, np.stack([embeddings[w] for w in words])).save(
+        str(tmp_path / "vectors.npy"), str(tmp_path / "vocab.json")
+    )
+    matrix = EmbeddingMatrix.load(str(tmp_path / "vectors.npy"), str(tmp_path / "vocab.json"))
+
+    assert isinstance(matrix.vectors, np.memmap)
+    assert matrix.normalized
+    targets, attr_a, attr_b = words[:5], words[10:15], words[20:25]
+    from_disk = weat_score(matrix, targets, attr_a, attr_b, random_state=0)
+    in_memory = weat_score(embeddings, targets, attr_a, attr_b, random_state=0)
+    assert from_disk.score == pytest.approx(in_memory.score, abs=1e-6)
+
+
+def test_seat_uses_sentence_rows(embeddings):
+    sentences = {f"This is w{i}.": embeddings[f"w{i}"] for i in range(3)}
+    result = seat_score(
+        {**embeddings, **sentences}, ["This is {target}."], ["w0", "w1", "w2", "w99"],
+        ["w20", "w21"], ["w40", "w41"], random_state=0
+    )
+
+    expected = _reference_weat(embeddings, ["w0", "w1", "w2"], ["w20", "w21"], ["w40", "w41"])
+    assert result.score == pytest.approx(expected, abs=1e-6)
+    assert result.details["missing_words"] == ["This is w99."]
@@ -0,0 +1,312 @@
+"""
+Tests for the vectorized fairness_library metric engines.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairness_library.bootstrap import BootstrapEngine
+from fairness_library.kernels import (
+    confusion_tensor,
+    demographic_parity_stat,
+    equalized_odds_stat,
+    factorize_combinations,
+    factorize_groups,
+    grouped_confusion_matrix,
+)
+from fairness_library.permutation import PermutationEngine
+from fairness_library.streaming import StreamingFairnessAccumulator, accumulate_frames
+from fairness_library.metrics import (
+    calibration_by_group,
+    demographic_parity_diff,
+    equalized_odds_diff,
+    intersectional_fairness,
+)
+from services.fairness_metrics import FairnessCalculator
+
+
+@pytest.fixture
+def biased_predictions():
+    """Binary predictions with a known selection-rate gap between two groups."""
+    rng = np.random.default_rng(7)
+    n = 4000
+    groups = rng.choice(["a", "b"], size=n)
+    y_true = rng.integers(0, 2, size=n)
+    rate = np.where(groups == "a", 0.7, 0.4)
+    y_pred = (rng.random(n) < rate).astype(int)
+    y_proba = np.clip(rate + rng.normal(0, 0.1, size=n), 0, 0.999)
+    return y_true, y_pred, y_proba, groups
+
+
+class TestGroupedConfusionKernel:
+    """Test the single-pass grouped confusion tensor."""
+
+    def test_matches_per_group_counts(self, biased_predictions):
+        y_true, y_pred, _, groups = biased_predictions
+        confusion = grouped_confusion_matrix(y_true, y_pred, groups)
+
+        for index, group in enumerate(confusion.groups):
+            mask = groups == group
+            assert confusion.tp[index] == np.sum((y_true[mask] == 1) & (y_pred[mask] == 1))
+            assert confusion.fp[index] == np.sum((y_true[mask] == 0) & (y_pred[mask] == 1))
+            assert confusion.fn[index] == np.sum((y_true[mask] == 1) & (y_pred[mask] == 0))
+            assert confusion.tn[index] == np.sum((y_true[mask] == 0) & (y_pred[mask] == 0))
+
+    def test_batched_codes(self):
+        """A block of code vectors yields one confusion tensor per row."""
+        codes = np.array([[0, 1, 1, 0], [1, 1, 0, 0]])
+        y_true = np.array([1, 0, 1, 0])
+        y_pred = np.array([1, 1, 0, 0])
+        tensor = confusion_tensor(codes, 2, y_true, y_pred)
+
+        assert tensor.shape == (2, 2, 2, 2)
+        assert np.all(tensor.sum(axis=(1, 2, 3)) == 4)
+        assert tensor[0, 0, 1, 1] == 1 and tensor[1, 1, 1, 1] == 1
+
+    def test_undefined_rates_are_nan(self):
+        confusion = grouped_confusion_matrix(
+            np.array([0, 0, 1, 1]), np.array([1, 0, 1, 1]), np.array(["a", "a", "b", "b"])
+        )
+        assert np.isnan(confusion.true_positive_rate[0])
+        assert np.isnan(confusion.false_positive_rate[1])
+
+    def test_calculator_uses_positive_label(self):
+        calculator = FairnessCalculator()
+        result = calculator.calculate_demographic_parity(
+            np.array(["yes", "no", "yes", "yes"]), np.array(["a", "a", "b", "b"]),
+            positive_label="yes"
+        )
+        assert result.group_scores == {"a": 0.5, "b": 1.0}
+
+
+class TestBootstrapEngine:
+    """Test the batched bootstrap engine."""
+
+    def test_cell_counts_preserve_sample_size(self):
+        """Every multinomial replicate resamples exactly n rows."""
+        engine = BootstrapEngine(n_bootstrap=50, random_state=0, max_chunk_elements=16)
+        cells = np.array([0, 1, 1, 2, 3, 3, 3])
+        counts = engine.resample_cell_counts(cells, 4)
+
+        assert counts.shape == (50, 4)
+        assert np.all(counts.sum(axis=1) == len(cells))
+
+    def test_seeded_engine_is_reproducible(self, biased_predictions):
+        """The same seed yields the same interval."""
+        y_true, y_pred, _, groups = biased_predictions
+        first = BootstrapEngine(200, random_state=42).confusion_ci(
+            equalized_odds_stat, y_true, y_pred, groups
+        )
+        second = BootstrapEngine(200, random_state=42).confusion_ci(
+            equalized_odds_stat, y_true, y_pred, groups
+        )
+        assert first == second
+
+    def test_weighted_sums_match_index_resampling(self):
+        """Chunked row-level sums agree with the row counts they were built from."""
+        engine = BootstrapEngine(n_bootstrap=7, random_state=3, max_chunk_elements=10)
+        cells = np.array([0, 0, 1, -1, 1])
+        counts, sums = engine.resample_weighted_sums(cells, 2, (np.ones(5),))
+
+        assert counts.shape == (7, 2)
+        assert np.array_equal(counts, sums)
+        assert np.all(counts.sum(axis=1) <= 5)
+
+
+class TestPermutationEngine:
+    """Test the blocked permutation engine and its stopping rules."""
+
+    def test_stops_early_on_null_effect(self):
+        """Besag-Clifford stops once h permuted statistics reach the observed one."""
+        rng = np.random.default_rng(1)
+        groups = rng.choice(["a", "b"], size=2000)
+        y_pred = rng.integers(0, 2, size=2000)
+        observed = 0.0
+        engine = PermutationEngine(n_permutations=1000, h=10, random_state=0)
+        result = engine.confusion_test(demographic_parity_stat, observed, None, y_pred, groups)
+
+        assert result.stopped_early
+        assert result.stop_reason == "besag_clifford"
+        assert result.n_permutations == 10
+        assert result.p_value == 1.0
+
+    def test_stops_early_on_clear_effect(self, biased_predictions):
+        _, y_pred, _, groups = biased_predictions
+        result = demographic_parity_diff(y_pred, groups, random_state=0)
+
+        assert result.p_value == 0.0
+
+    def test_hypergeometric_draws_preserve_margins(self, biased_predictions):
+        y_true, y_pred, _, groups = biased_predictions
+        confusion = grouped_confusion_matrix(y_true, y_pred, groups).matrix
+        engine = PermutationEngine(random_state=0)
+        permuted = engine.permuted_confusion(confusion, 25)
+
+        assert np.all(permuted.sum(axis=(2, 3)) == confusion.sum(axis=(1, 2)))
+        assert np.all(permuted.sum(axis=1) == confusion.sum(axis=0))
+
+    def test_budget_without_early_stopping(self):
+        rng = np.random.default_rng(2)
+        groups = rng.choice(["a", "b", "c"], size=300)
+        y_pred = rng.integers(0, 2, size=300)
+        engine = PermutationEngine(n_permutations=250, early_stopping=False, random_state=0)
+        result = engine.confusion_test(demographic_parity_stat, 0.05, None, y_pred, groups)
+
+        assert result.n_permutations == 250
+        assert not result.stopped_early
+
+
+class TestMetricConfidenceIntervals:
+    """Test that metric confidence intervals reflect sampling variability."""
+
+    def test_demographic_parity_ci_brackets_estimate(self, biased_predictions):
+        _, y_pred, _, groups = biased_predictions
+        result = demographic_parity_diff(y_pred, groups, random_state=0)
+
+        lower, upper = result.confidence_interval
+        assert lower < upper
+        assert lower <= result.value <= upper
+
+    def test_equalized_odds_ci_brackets_estimate(self, biased_predictions):
+        y_true, y_pred, _, groups = biased_predictions
+        result = equalized_odds_diff(y_true, y_pred, groups, random_state=0)
+
+        lower, upper = result.confidence_interval
+        assert lower < upper
+        assert lower <= result.value <= upper
+
+    def test_calibration_ci_is_finite(self, biased_predictions):
+        y_true, _, y_proba, groups = biased_predictions
+        result = calibration_by_group(y_true, y_proba, groups, n_bootstrap=50, random_state=0)
+
+        lower, upper = result.confidence_interval
+        assert np.isfinite(lower) and np.isfinite(upper)
+        assert lower <= upper
+
+    def test_factorize_groups_round_trips(self):
+        codes, groups = factorize_groups(np.array(["x", "y", "x", "z"]))
+        assert list(groups[codes]) == ["x", "y", "x", "z"]
+
+
+class TestIntersectionalFairness:
+    """Test intersectional analysis over observed attribute combinations."""
+
+    def test_only_observed_combinations_are_encoded(self):
+        codes, combinations = factorize_combinations([
+            np.array(["f", "m", "f", "m"]),
+            np.array(["x", "y", "x", "y"]),
+        ])
+        assert combinations == [("f", "x"), ("m", "y")]
+        assert list(codes) == [0, 1, 0, 1]
+
+    def test_flags_the_disadvantaged_cell(self):
+        rng = np.random.default_rng(11)
+        n = 6000
+        attributes = {
+            "gender": rng.choice(["f", "m"], size=n),
+            "region": rng.choice(["north", "south", "east"], size=n),
+        }
+        target = (attributes["gender"] == "f") & (attributes["region"] == "south")
+        y_true = rng.integers(0, 2, size=n)
+        y_pred = (rng.random(n) < np.where(target, 0.2, 0.6)).astype(int)
+
+        results = intersectional_fairness(y_true, y_pred, attributes, random_state=0)
+
+        assert len(results) == 6
+        worst = max(results, key=lambda name: results[name].value)
+        assert worst == "gender=f_region=south"
+        assert results[worst].p_value < 0.05
+        assert results[worst].details["support"] == int(target.sum())
+
+    def test_min_support_prunes_small_cells(self):
+        attributes = {
+            "a": np.array(["x"] * 95 + ["y"] * 5),
+            "b": np.array(["p"] * 100),
+        }
+        y = np.arange(100) % 2
+        results = intersectional_fairness(y, y, attributes, min_support=10, random_state=0)
+
+        assert list(results) == ["a=x_b=p"]
+
+    def test_label_dependent_metric_gets_its_arguments(self):
+        rng = np.random.default_rng(5)
+        n = 4000
+        attributes = {
+            "gender": rng.choice(["f", "m"], size=n),
+            "region": rng.choice(["north", "south"], size=n),
+        }
+        y_prob = rng.random(n)
+        y_true = (rng.random(n) < y_prob).astype(int)
+        y_pred = (y_prob > 0.5).astype(int)
+
+        results = intersectional_fairness(
+            y_true, y_pred, attributes, metric_func=calibration_by_group,
+            y_prob=y_prob, n_bootstrap=20, n_permutations=20, random_state=0
+        )
+
+        assert len(results) == 4
+        assert all(result.metric_name == "calibration_by_group" for result in results.values())
+
+        # Without scores the metric cannot run on any cell: fail up front
+        with pytest.raises(ValueError, match="y_pred_proba"):
+            intersectional_fairness(y_true, y_pred, attributes, metric_func=calibration_by_group)
+        with pytest.raises(ValueError, match="sensitive_attr"):
+            intersectional_fairness(y_true, y_pred, attributes, metric_func=lambda a, b: None)
+
+
+class TestStreamingAccumulator:
+    """Test chunked, mergeable fairness statistics."""
+
+    def test_chunked_state_matches_single_pass(self, biased_predictions):
+        y_true, y_pred, y_proba, groups = biased_predictions
+        chunks = [slice(0, 1500), slice(1500, 2600), slice(2600, None)]
+        partials = [
+            StreamingFairnessAccumulator().update(y_pred[s], groups[s], y_true[s], y_proba[s])
+            for s in chunks
+        ]
+        merged = StreamingFairnessAccumulator.combine(reversed(partials))
+        single = StreamingFairnessAccumulator().update(y_pred, groups, y_true, y_proba)
+
+        assert merged.n_rows == len(y_pred)
+        order = [merged.groups.index(group) for group in single.groups]
+        assert np.array_equal(merged.confusion[order], single.confusion)
+        assert np.allclose(merged.calibration_score_sums[order], single.calibration_score_sums)
+
+    def test_finalize_matches_in_memory_metrics(self, biased_predictions):
+        y_true, y_pred, y_proba, groups = biased_predictions
+        frame = pd.DataFrame({"pred": y_pred, "label": y_true, "score": y_proba, "group": groups})
+        accumulator = accumulate_frames(
+            (frame.iloc[i:i + 1000] for i in range(0, len(frame), 1000)),
+            "pred", "group", "label", "score"
+        )
+        results = accumulator.finalize(n_bootstrap=100, random_state=0)
+
+        expected_eo = equalized_odds_diff(y_true, y_pred, groups, n_bootstrap=10, random_state=0)
+        expected_cal = calibration_by_group(y_true, y_proba, groups, n_bootstrap=10, random_state=0)
+        assert results["equalized_odds"].value == pytest.approx(expected_eo.value)
+        assert results["calibration"].value == pytest.approx(expected_cal.value)
+        assert set(results) == {
+            "demographic_parity", "equalized_odds", "equal_opportunity",
+            "predictive_parity", "calibration",
+        }
+
+    def test_chunks_must_agree_on_labels_and_scores(self, biased_predictions):
+        y_true, y_pred, y_proba, groups = biased_predictions
+        labelled = StreamingFairnessAccumulator().update(y_pred[:100], groups[:100], y_true[:100])
+
+        # An unlabelled chunk would otherwise count every row as a negative
+        with pytest.raises(ValueError, match="y_true"):
+            labelled.update(y_pred[100:200], groups[100:200])
+        with pytest.raises(ValueError, match="y_score"):
+            labelled.update(y_pred[100:200], groups[100:200], y_true[100:200], y_proba[100:200])
+        with pytest.raises(ValueError, match="y_true"):
+            StreamingFairnessAccumulator().update(y_pred, groups, y_score=y_proba)
+        assert labelled.n_rows == 100
+
+        unlabelled = StreamingFairnessAccumulator().update(y_pred[100:200], groups[100:200])
+        with pytest.raises(ValueError, match="Merged accumulator"):
+            StreamingFairnessAccumulator.combine([labelled, unlabelled])
+        with pytest.raises(ValueError, match="Merged accumulator"):
+            unlabelled.merge(labelled)
+        assert StreamingFairnessAccumulator().merge(labelled).has_labels
@@ -0,0 +1,67 @@
+"""
+Tests for the incremental FairnessMonitor.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from fairness_library.monitoring import (
+    ChangeDetector,
+    CUSUMChangeDetector,
+    FairnessMonitor,
+    MonitoringMetric,
+)
+
+
+def _metrics(values, name="fairness_dp"):
+    now = datetime.now()
+    return [MonitoringMetric(name, float(v), now, {"model_id": "m1"}) for v in values]
+
+
+def test_rolling_summary_matches_window():
+    rng = np.random.default_rng(0)
+    values = rng.random(2500)
+    monitor = FairnessMonitor(window_size=1000, alert_threshold=1.0)
+    monitor.add_metrics(_metrics(values))
+
+    summary = monitor.get_metrics_summary("fairness_dp")
+    window = values[-1000:]
+    assert summary["count"] == 1000
+    assert np.isclose(summary["mean"], window.mean())
+    assert np.isclose(summary["std"], window.std())
+    assert summary["min"] == window.min() and summary["max"] == window.max()
+    assert summary["latest_value"] == values[-1]
+
+
+def test_baseline_is_frozen_and_drift_alerts():
+    monitor = FairnessMonitor(window_size=50, alert_threshold=0.05)
+    for metric in _metrics([0.1] * 200):
+        monitor.add_metric(metric)
+    assert monitor.alerts == []
+
+    # The shifted samples push the old ones out of the window, but the baseline stays
+    monitor.add_metrics(_metrics([0.3] * 100))
+    alert = monitor.alerts[-1]
+    assert alert.alert_type == "fairness_drift"
+    assert np.isclose(alert.details["baseline_mean"], 0.1)
+    assert np.isclose(alert.details["current_mean"], 0.3)
+
+
+def test_change_detectors_run_per_metric():
+    monitor = FairnessMonitor(alert_threshold=1.0, change_detectors=[CUSUMChangeDetector])
+    monitor.add_metrics(_metrics([0.1] * 100) + _metrics([0.1] * 100, name="bias_score"))
+    monitor.add_metrics(_metrics([0.2] * 20))
+
+    alerts = monitor.get_recent_alerts()
+    assert alerts and {alert.alert_type for alert in alerts} == {"cusum_drift"}
+    assert {alert.metric_name for alert in alerts} == {"fairness_dp"}
+
+
+def test_incomplete_change_detector_cannot_be_created():
+    class NoUpdate(ChangeDetector):
+        pass
+
+    with pytest.raises(TypeError):
+        NoUpdate()
@@ -0,0 +1,195 @@
+"""
+Tests for the async JWKS provider and verified-token cache, against a local
+stand-in JWKS server.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from config.authentik_config import AuthentikConfig
+from config.jwks import JWKSProvider, VerifiedTokenCache
+from config.settings import settings
+from core.middleware.auth import NeonAuthMiddleware
+
+
+def make_key(kid: str):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return private_key, jwk
+
+
+def make_token(private_key, kid: str, expires_in: int = 300, **claims) -> str:
+    claims = {"sub": "user-1", "exp": int(time.time()) + expires_in, **claims}
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+class StandInJWKSServer:
+    """Serves a mutable JWKS document and counts requests."""
+
+    def __init__(self):
+        self.keys = []
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                body = json.dumps({"keys": server.keys}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/.well-known/jwks.json"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture(scope="module")
+def signing_keys():
+    return {kid: make_key(kid) for kid in ("key-1", "key-2")}
+
+
+@pytest.fixture
+def jwks_server(signing_keys):
+    with StandInJWKSServer() as server:
+        server.keys = [signing_keys["key-1"][1]]
+        yield server
+
+
+class TestJWKSProvider:
+    """Single-flight fetching, kid-miss refetch and stale fallback."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cold_lookups_share_one_fetch(self, jwks_server):
+        provider = JWKSProvider(jwks_server.url)
+
+        keys = await asyncio.gather(*(provider.get_signing_key("key-1") for _ in range(20)))
+
+        assert jwks_server.requests == 1
+        assert all(key.key_id == "key-1" for key in keys)
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refetches_once_per_interval(self, jwks_server, signing_keys):
+        provider = JWKSProvider(jwks_server.url, min_refetch_interval=0)
+        await provider.get_signing_key("key-1")
+
+        # Key rotation: the new kid is picked up without waiting for the TTL
+        jwks_server.keys.append(signing_keys["key-2"][1])
+        assert (await provider.get_signing_key("key-2")).key_id == "key-2"
+        assert jwks_server.requests == 2
+
+        provider.min_refetch_interval = 60
+        with pytest.raises(jwt.InvalidTokenError):
+            await provider.get_signing_key("unknown")
+        with pytest.raises(jwt.InvalidTokenError):
+            await provider.get_signing_key("unknown")
+        assert jwks_server.requests == 2
+
+    @pytest.mark.asyncio
+    async def test_refresh_ahead_and_failed_refresh_keep_serving_keys(self, jwks_server):
+        provider = JWKSProvider(jwks_server.url, ttl=0.2, refresh_ahead=0.1)
+        await provider.get_signing_key("key-1")
+
+        await asyncio.sleep(0.12)
+        await provider.get_signing_key("key-1")  # served from cache, refresh in background
+        await asyncio.sleep(0.05)
+        assert jwks_server.requests == 2
+
+        jwks_server.httpd.shutdown()
+        jwks_server.httpd.server_close()
+        await asyncio.sleep(0.2)
+        assert (await provider.get_signing_key("key-1")).key_id == "key-1"
+
+
+class TestVerifiedTokenCache:
+    """Entries live until the token's exp and the cache stays bounded."""
+
+    def test_expiry_and_bound(self):
+        cache = VerifiedTokenCache(max_entries=2)
+        now = int(time.time())
+
+        cache.set("expired", {"sub": "a", "exp": now - 1})
+        cache.set("no-exp", {"sub": "b"})
+        assert cache.get("expired") is None
+        assert cache.get("no-exp") is None
+
+        for i in range(3):
+            cache.set(f"token-{i}", {"sub": str(i), "exp": now + 60})
+        assert cache.get("token-0") is None
+        assert cache.get("token-2") == {"sub": "2", "exp": now + 60}
+
+
+class TestTokenVerificationPaths:
+    """NeonAuthMiddleware and AuthentikConfig share the provider and cache."""
+
+    @pytest.fixture
+    def neon_client(self, monkeypatch, jwks_server):
+        monkeypatch.setattr(settings, "neon_jwks_url", jwks_server.url)
+        monkeypatch.setattr(settings, "neon_jwt_audience", None)
+        monkeypatch.setattr(settings, "neon_jwt_issuer", None)
+
+        async def whoami(request: Request):
+            return JSONResponse({"sub": request.state.user["sub"]})
+
+        app = Starlette(routes=[Route("/api/v1/private/whoami", whoami)])
+        app.add_middleware(NeonAuthMiddleware)
+        with TestClient(app) as client:
+            yield client
+
+    def test_neon_middleware_verifies_then_serves_from_cache(self, neon_client, jwks_server, signing_keys, monkeypatch):
+        token = make_token(signing_keys["key-1"][0], "key-1")
+        headers = {"Authorization": f"Bearer {token}"}
+
+        assert neon_client.get("/api/v1/private/whoami", headers=headers).json() == {"sub": "user-1"}
+
+        def fail_decode(*args, **kwargs):
+            raise AssertionError("cached token was verified again")
+
+        monkeypatch.setattr(jwt, "decode", fail_decode)
+        response = neon_client.get("/api/v1/private/whoami", headers=headers)
+        assert response.status_code == 200
+        assert jwks_server.requests == 1
+
+    def test_neon_middleware_rejects_expired_and_forged_tokens(self, neon_client):
+        forged_key, _ = make_key("key-1")
+        for token in (make_token(forged_key, "key-1"), make_token(forged_key, "key-1", expires_in=-10)):
+            response = neon_client.get("/api/v1/private/whoami", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_authentik_validate_token(self, jwks_server, signing_keys):
+        config = AuthentikConfig(jwks_server.url, issuer="https://auth.test", audience="fairmind")
+        token = make_token(signing_keys["key-1"][0], "key-1", iss="https://auth.test", aud="fairmind")
+
+        assert (await config.validate_token(token))["sub"] == "user-1"
+        assert (await config.validate_token(token))["sub"] == "user-1"
+        assert config.token_cache.stats()["hits"] == 1
+        assert await config.validate_token(make_token(signing_keys["key-2"][0], "key-2")) is None
+        assert (await config.fetch_jwks())["keys"][0]["kid"] == "key-1"
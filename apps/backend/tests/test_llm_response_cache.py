@@ -0,0 +1,150 @@
+"""
+Tests for the persistent LLM response cache and its use by bias probing.
+"""
+
+import asyncio
+
+import pytest
+
+from api.services import llm_response_cache
+from api.services.llm_response_cache import LLMResponseCache, response_cache_key
+from api.services.model_provider_clients import ProviderClientPool, ProviderLimits, StubProviderClient
+from api.services.realtime_model_integration_service import (
+    ModelConfig,
+    ModelProvider,
+    ModelType,
+    RealTimeModelIntegrationService,
+)
+from config.settings import settings
+
+
+class Provider:
+    """Counts calls and answers with the prompt"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def caller(self, prompt: str):
+        async def call():
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            return {"text": prompt.upper()}
+        return call
+
+
+async def ask(cache: LLMResponseCache, provider: Provider, prompt: str, temperature: float = 0.0, **kwargs):
+    return await cache.get_or_call(
+        "openai", "gpt-4", prompt, {"temperature": temperature}, provider.caller(prompt), **kwargs
+    )
+
+
+class TestLLMResponseCache:
+    """Keying, persistence, eviction, bypass and single-flight."""
+
+    def test_key_covers_request_parameters(self):
+        key = response_cache_key("openai", "gpt-4", "p", {"temperature": 0.0, "top_p": None})
+        assert key == response_cache_key("openai", "gpt-4", "p", {"temperature": 0.0})
+        assert key != response_cache_key("openai", "gpt-4", "p", {"temperature": 0.5})
+        assert key != response_cache_key("anthropic", "gpt-4", "p", {"temperature": 0.0})
+
+    @pytest.mark.asyncio
+    async def test_responses_persist_across_instances(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        provider = Provider()
+
+        assert await ask(LLMResponseCache(path), provider, "hello") == ({"text": "HELLO"}, False)
+        reopened = LLMResponseCache(path)
+        assert await ask(reopened, provider, "hello") == ({"text": "HELLO"}, True)
+        assert provider.calls == 1
+        assert reopened.stats()["hit_rate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_ttl_and_lru_eviction(self):
+        provider = Provider()
+        expiring = LLMResponseCache(":memory:", ttl=0)
+        await ask(expiring, provider, "a")
+        assert (await ask(expiring, provider, "a"))[1] is False
+        assert expiring.stats()["expired"] == 1
+
+        cache = LLMResponseCache(":memory:", max_entries=10)
+        for i in range(10):
+            await ask(cache, provider, f"p{i}")
+        await ask(cache, provider, "p0")  # Most recently used now
+        await ask(cache, provider, "p10")
+
+        assert len(cache) == 9
+        assert cache.stats()["evictions"] == 2
+        assert (await ask(cache, provider, "p0"))[1] is True
+        assert (await ask(cache, provider, "p1"))[1] is False
+
+    @pytest.mark.asyncio
+    async def test_stochastic_bypass_and_single_flight(self):
+        provider = Provider()
+        cache = LLMResponseCache(":memory:", cache_stochastic=False)
+
+        await ask(cache, provider, "sampled", temperature=0.7)
+        await ask(cache, provider, "sampled", temperature=0.7)
+        await ask(cache, provider, "greedy", bypass=True)
+        assert provider.calls == 3 and len(cache) == 0
+
+        results = await asyncio.gather(*(ask(cache, provider, "greedy") for _ in range(5)))
+        assert provider.calls == 4
+        assert all(response == {"text": "GREEDY"} for response, _ in results)
+        assert cache.stats()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_scrapes_export_stats_without_recording(self, monkeypatch):
+        from api.main import prometheus_metrics
+        from services.monitoring import monitoring_service
+
+        cache = LLMResponseCache(":memory:")
+        monkeypatch.setattr(llm_response_cache, "_llm_response_cache", cache)
+        provider = Provider()
+        for _ in range(2):
+            await cache.get_or_call("openai", "gpt-4", "p", {"temperature": 0.0}, provider.caller("p"))
+        for _ in range(2):
+            body = (await prometheus_metrics()).body.decode()
+
+        assert "# TYPE llm_response_cache_requests_total counter" in body
+        assert 'llm_response_cache_requests_total{result="hits"} 1.0' in body
+        assert "llm_response_cache_entries 1.0" in body
+        assert all(not name.startswith("llm_response_cache") for name, _ in monitoring_service.metrics.series)
+
+
+class TestBiasProbingCache:
+    """Re-running a bias suite is answered from the cache."""
+
+    @pytest.mark.asyncio
+    async def test_rerun_does_not_call_provider(self):
+        stub = StubProviderClient()
+        pool = ProviderClientPool(factories={"openai": lambda config: stub}, limits={"openai": ProviderLimits(hedge_after=None)})
+        service = RealTimeModelIntegrationService(client_pool=pool, response_cache=LLMResponseCache(":memory:"))
+        config = ModelConfig(ModelProvider.OPENAI, "stub", ModelType.CHAT_COMPLETION, api_key="k")
+
+        first = await service.perform_comprehensive_bias_analysis(config, ["group"])
+        calls = stub.calls
+        second = await service.perform_comprehensive_bias_analysis(config, ["group"])
+
+        assert stub.calls == calls
+        assert all(r.model_response.metadata["cached"] for r in second.test_results)
+        assert [r.bias_score for r in second.test_results] == [r.bias_score for r in first.test_results]
+
+        config.cache_responses = False
+        await service.perform_bias_test(config, second.tests_performed[0], ["group"])
+        assert stub.calls == calls + 1
+
+    @pytest.mark.asyncio
+    async def test_cache_file_is_opened_on_first_call(self, tmp_path, monkeypatch):
+        path = tmp_path / "llm_response_cache.sqlite3"
+        monkeypatch.setattr(settings, "llm_response_cache_path", str(path))
+        monkeypatch.setattr(llm_response_cache, "_llm_response_cache", None)
+        stub = StubProviderClient()
+        pool = ProviderClientPool(factories={"openai": lambda config: stub}, limits={"openai": ProviderLimits(hedge_after=None)})
+
+        service = RealTimeModelIntegrationService(client_pool=pool)
+        assert not path.exists()
+
+        config = ModelConfig(ModelProvider.OPENAI, "stub", ModelType.CHAT_COMPLETION, api_key="k")
+        await service._call_model(config, "hello")
+        assert path.exists()
+        llm_response_cache._llm_response_cache.close()
@@ -0,0 +1,79 @@
+"""
+Tests for the indexed metadata catalog behind dataset and test result listings.
+"""
+
+import json
+import os
+
+import pytest
+
+from services.bias_test_results import BiasTestResultService
+from services.metadata_catalog import MetadataCatalog
+
+
+@pytest.fixture
+def results_service(tmp_path, monkeypatch):
+    monkeypatch.setenv("TEST_RESULTS_PATH", str(tmp_path))
+    return BiasTestResultService()
+
+
+async def _save(service, test_id, model_id, test_type="ml_bias"):
+    await service.save_test_result(
+        test_id, "user-1", model_id, None, test_type,
+        {"overall_risk": "low", "metrics_passed": 3, "metrics_failed": 1}
+    )
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_all_results(results_service):
+    for i in range(7):
+        await _save(results_service, f"t{i}", "m1" if i % 2 else "m2")
+
+    seen, cursor = [], None
+    while True:
+        page = await results_service.list_test_results_page("user-1", limit=3, cursor=cursor)
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(seen) == [f"t{i}" for i in range(7)]
+    assert len(set(seen)) == 7
+
+    filtered = await results_service.list_test_results("user-1", model_id="m1")
+    assert {item["id"] for item in filtered} == {"t1", "t3", "t5"}
+
+
+@pytest.mark.asyncio
+async def test_delete_and_rebuild_from_disk(results_service, tmp_path):
+    await _save(results_service, "keep", "m1")
+    await _save(results_service, "drop", "m1", test_type="llm_bias")
+    await results_service.delete_test_result("drop", "user-1")
+
+    # A file written outside the service only shows up after a rebuild
+    record = {
+        "id": "external", "user_id": "user-1", "model_id": "m2", "test_type": "ml_bias",
+        "timestamp": "2020-01-01T00:00:00+00:00", "overall_risk": "high",
+        "metrics_passed": 0, "metrics_failed": 2, "summary": ""
+    }
+    with open(os.path.join(tmp_path, "user-1", "external.json"), "w") as f:
+        json.dump(record, f)
+
+    assert [r["id"] for r in await results_service.list_test_results("user-1")] == ["keep"]
+    assert results_service.catalog.rebuild() == {"datasets": 0, "test_results": 2}
+
+    older = await results_service.list_test_results_page("user-1", until="2021-01-01")
+    assert [item["id"] for item in older["items"]] == ["external"]
+
+
+def test_new_catalog_indexes_existing_files(tmp_path):
+    user_dir = tmp_path / "user-1"
+    user_dir.mkdir()
+    (user_dir / "ds_1.json").write_text(json.dumps({
+        "dataset_id": "ds_1", "user_id": "user-1", "filename": "a.csv", "rows": 3,
+        "columns": ["x"], "uploaded_at": "2024-05-01T00:00:00+00:00", "file_size_bytes": 10
+    }))
+
+    items, next_cursor = MetadataCatalog(str(tmp_path)).list_datasets("user-1")
+    assert [item["id"] for item in items] == ["ds_1"]
+    assert next_cursor is None
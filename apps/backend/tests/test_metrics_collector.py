@@ -0,0 +1,92 @@
+"""
+Tests for the ring-buffer MetricsCollector and Prometheus exposition.
+"""
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from core.middleware.auth import NeonAuthMiddleware
+from services.monitoring import CollectedMetric, MetricsCollector, MetricType
+
+
+def test_ring_buffer_keeps_most_recent_samples():
+    collector = MetricsCollector(max_metrics=4)
+    for i in range(10):
+        collector.gauge("queue.depth", i)
+    collector.counter("http.requests.total", 1, {"method": "GET"})
+
+    recent = collector.get_metrics()
+    assert [m["value"] for m in recent] == [7.0, 8.0, 9.0, 1.0]
+    assert recent[-1]["metric_type"] == MetricType.COUNTER
+
+    summary = collector.get_metric_summary()
+    assert summary["total_metrics"] == 4
+    assert summary["metric_types"] == {"gauge": 3, "counter": 1}
+
+    filtered = collector.get_metrics(name_filter="queue", limit=2)
+    assert [m["value"] for m in filtered] == [8.0, 9.0]
+
+
+def test_series_aggregate_beyond_buffer():
+    collector = MetricsCollector(max_metrics=2)
+    for _ in range(5):
+        collector.counter("http.requests.total", 1, {"method": "GET", "path": "/a"})
+    collector.counter("http.requests.total", 1, {"path": "/a", "method": "GET"})
+
+    series = collector.series[("http.requests.total", (("method", "GET"), ("path", "/a")))]
+    assert series.value == 6
+
+
+def test_prometheus_exposition():
+    collector = MetricsCollector(buckets=(0.1, 1.0))
+    collector.counter("http.requests.total", 2, {"path": '/x"y'})
+    for duration in (0.05, 0.1, 0.5, 3.0):
+        collector.timer("http.request.duration", duration)
+
+    text = collector.render_prometheus()
+    assert "# TYPE http_requests_total counter" in text
+    assert 'http_requests_total{path="/x\\"y"} 2.0' in text
+    assert "# TYPE http_request_duration histogram" in text
+    assert 'http_request_duration_bucket{le="0.1"} 2' in text
+    assert 'http_request_duration_bucket{le="1.0"} 3' in text
+    assert 'http_request_duration_bucket{le="+Inf"} 4' in text
+    assert "http_request_duration_count 4" in text
+
+
+def test_collectors_render_without_recording():
+    collector = MetricsCollector()
+    collector.gauge("queue.depth", 3)
+
+    def cache_stats():
+        return [
+            CollectedMetric("cache.requests", 5, MetricType.COUNTER, {"result": "hit"}),
+            CollectedMetric("cache.requests", 2, MetricType.COUNTER, {"result": "miss"}),
+            CollectedMetric("cache.entries", 7, MetricType.GAUGE),
+        ]
+
+    def broken():
+        raise RuntimeError("backend down")
+
+    for _ in range(2):
+        text = collector.render_prometheus([cache_stats, broken])
+
+    assert "# TYPE cache_requests_total counter" in text
+    assert 'cache_requests_total{result="hit"} 5.0' in text
+    assert "cache_entries 7.0" in text
+    assert "queue_depth 3.0" in text
+    # Scrapes do not add samples or series
+    assert collector.get_metric_summary()["total_metrics"] == 1
+    assert list(collector.series) == [("queue.depth", ())]
+
+
+def test_scrape_endpoint_skips_neon_auth():
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/metrics", ok), Route("/api/v1/private", ok)])
+    app.add_middleware(NeonAuthMiddleware)
+    with TestClient(app) as client:
+        assert client.get("/metrics").status_code == 200
+        assert client.get("/api/v1/private").status_code == 401
@@ -0,0 +1,110 @@
+"""
+Tests for the columnar ModelOutputs frame and the bias evaluation pipeline
+phases that consume it.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.services.comprehensive_bias_evaluation_pipeline import (
+    ComprehensiveBiasEvaluationPipeline,
+    EvaluationHistoryStore,
+)
+from api.services.model_outputs import ModelOutputs
+
+RECORDS = [
+    {"score": 0.9, "label": 1, "group": "b"},
+    {"score": 0.2, "label": 1, "group": "a", "flagged": True},
+    {"prediction": 0.7, "ground_truth": 0, "demographic_group": "a"},
+    {"score": 0.45, "label": 0, "group": "b", "bias_rating": 4},
+    {"score": 0.8, "label": 1, "group": "b", "bias_rating": 2, "fairness_rating": 3},
+    {"score": 0.1, "label": 0},
+]
+
+
+def make_pipeline() -> ComprehensiveBiasEvaluationPipeline:
+    return ComprehensiveBiasEvaluationPipeline(history_store=EvaluationHistoryStore())
+
+
+class TestModelOutputs:
+    """Construction from each source and grouped statistics."""
+
+    def test_records_columns_and_group_indices(self):
+        outputs = ModelOutputs.from_records(RECORDS)
+
+        assert outputs.groups == ["a", "b", "unknown"]
+        assert outputs.scores.tolist() == [0.9, 0.2, 0.7, 0.45, 0.8, 0.1]
+        assert outputs.predictions.tolist() == [1, 0, 1, 0, 1, 0]
+        assert [idx.tolist() for idx in outputs.group_indices] == [[1, 2], [0, 3, 4], [5]]
+        assert outputs.group_sizes.tolist() == [2, 3, 1]
+        assert outputs.flagged.tolist() == [False, True, False, False, False, False]
+        assert outputs.bias_ratings.tolist() == [4.0, 2.0]
+        assert outputs.fairness_ratings.tolist() == [3.0]
+
+        assert outputs.positive_rates() == pytest.approx([0.5, 2 / 3, 0.0])
+        assert outputs.true_positive_rates() == pytest.approx([0.0, 1.0, 0.0])
+        assert outputs.false_positive_rates() == pytest.approx([1.0, 0.0, 0.0])
+
+    def test_dataframe_and_parquet_match_records(self, tmp_path):
+        expected = ModelOutputs.from_records(RECORDS)
+        df = pd.DataFrame(RECORDS)
+        path = tmp_path / "outputs.parquet"
+        df.to_parquet(path)
+
+        for outputs in (ModelOutputs.coerce(df), ModelOutputs.coerce(path)):
+            assert outputs.groups == expected.groups
+            np.testing.assert_array_equal(outputs.scores, expected.scores)
+            np.testing.assert_array_equal(outputs.labels, expected.labels)
+            np.testing.assert_array_equal(outputs.group_codes, expected.group_codes)
+            np.testing.assert_array_equal(outputs.flagged, expected.flagged)
+            np.testing.assert_array_equal(outputs.bias_ratings, expected.bias_ratings)
+
+    def test_group_std_matches_numpy(self):
+        rng = np.random.default_rng(0)
+        scores = rng.random(1000)
+        groups = rng.choice(["x", "y", "z"], size=1000)
+        outputs = ModelOutputs.from_columns(scores, np.zeros(1000), groups)
+
+        for k, idx in enumerate(outputs.group_indices):
+            assert outputs.group_std(scores, ddof=1)[k] == pytest.approx(np.std(scores[idx], ddof=1))
+
+
+class TestPipelineOnFrame:
+    """Every phase runs from the one frame and dicts give the same results."""
+
+    @pytest.mark.asyncio
+    async def test_dicts_and_frame_give_same_report(self):
+        frame = ModelOutputs.from_records(RECORDS)
+        from_dicts = await make_pipeline().run_comprehensive_evaluation("m", "clf", RECORDS)
+        from_frame = await make_pipeline().run_comprehensive_evaluation("m", "clf", frame)
+
+        assert set(from_frame.results) == {
+            "pre_deployment", "real_time_monitoring", "post_deployment_auditing",
+            "human_in_loop", "continuous_learning",
+        }
+        for phase, result in from_frame.results.items():
+            assert result.success
+            assert result.metrics == from_dicts.results[phase].metrics
+
+        crowspairs = from_frame.results["pre_deployment"].metrics["test_results"]["crowspairs"]
+        assert crowspairs["bias_score"] == pytest.approx(2 / 3)
+        assert crowspairs["details"]["groups_analyzed"] == ["a", "b", "unknown"]
+        assert from_frame.results["post_deployment_auditing"].metrics["audit_findings"]["user_complaints"] == 1
+
+    def test_human_in_loop_flagged_cases(self):
+        pipeline = make_pipeline()
+        result = pipeline._run_human_in_loop_evaluation(
+            "m", "clf", ModelOutputs.from_records(RECORDS), pipeline.evaluation_configs["human_in_loop"]
+        )
+
+        sample = result.metrics["flagged_cases_sample"]
+        assert result.details["total_flagged_cases"] == len(sample)
+        assert sample[0] == {
+            "index": 0, "score": 0.9, "label": 1.0, "group": "b",
+            "reasons": ["flagged_demographic_group"],
+        }
+        assert "prediction_disagrees_with_label" in sample[1]["reasons"]
+        assert {"low_confidence", "flagged_demographic_group"} <= set(
+            next(case for case in sample if case["index"] == 3)["reasons"]
+        )
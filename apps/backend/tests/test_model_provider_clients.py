@@ -0,0 +1,116 @@
+"""
+Tests for the pooled provider client layer behind the real-time model
+integration service, against the local stub provider.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from api.services.llm_response_cache import LLMResponseCache
+from api.services.model_provider_clients import (
+    HTTPProviderClient,
+    ProviderClient,
+    ProviderClientPool,
+    ProviderLimits,
+    RequestPacer,
+    StubProviderClient,
+)
+from api.services.realtime_model_integration_service import (
+    BiasTestType,
+    ModelConfig,
+    ModelProvider,
+    ModelType,
+    RealTimeModelIntegrationService,
+)
+
+
+def make_config(**kwargs) -> ModelConfig:
+    kwargs.setdefault("api_key", "test-key")
+    return ModelConfig(provider=ModelProvider.OPENAI, model_name="stub", model_type=ModelType.CHAT_COMPLETION, **kwargs)
+
+
+def make_pool(stub: StubProviderClient, **limits) -> ProviderClientPool:
+    created = []
+
+    def factory(config):
+        created.append(config)
+        return stub
+
+    pool = ProviderClientPool(
+        factories={"openai": factory},
+        limits={"openai": ProviderLimits(**{"retry_backoff": 0.0, "hedge_after": None, **limits})}
+    )
+    pool.created = created
+    return pool
+
+
+class TestProviderClientPool:
+    """Client reuse, bounded fan-out, retries, hedging and pacing."""
+
+    @pytest.mark.asyncio
+    async def test_bias_sweep_fans_out_on_one_client(self):
+        stub = StubProviderClient(latency=0.05, responder=lambda prompt: "Typically, most people differ.")
+        pool = make_pool(stub, max_concurrency=4)
+        service = RealTimeModelIntegrationService(client_pool=pool, response_cache=LLMResponseCache(":memory:"))
+
+        started = time.perf_counter()
+        async with service:
+            result = await service.perform_comprehensive_bias_analysis(
+                make_config(), ["group"], custom_tests=[{"prompt": "custom one"}, {"prompt": "custom two"}]
+            )
+        elapsed = time.perf_counter() - started
+
+        assert len(result.test_results) == len(BiasTestType) + 2
+        assert result.tests_performed[:len(BiasTestType)] == list(BiasTestType)
+        assert result.test_results[-1].prompt == "custom two"
+        assert len(pool.created) == 1 and stub.calls == 10
+        assert stub.max_in_flight == 4
+        # Ten 50ms calls, four at a time: three rounds rather than ten
+        assert elapsed < 0.4
+
+    @pytest.mark.asyncio
+    async def test_transient_failures_are_retried(self):
+        stub = StubProviderClient(fail_first=2)
+        pool = make_pool(stub)
+
+        response = await pool.call(make_config(retry_attempts=3), "hello")
+        assert response["text"] == "Stub response to: hello"
+        assert stub.calls == 3
+
+        with pytest.raises(ConnectionError):
+            await make_pool(StubProviderClient(fail_first=5)).call(make_config(retry_attempts=2), "hello")
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self):
+        stub = StubProviderClient(latency=lambda call: 2.0 if call == 0 else 0.01)
+        pool = make_pool(stub, hedge_after=0.05)
+
+        started = time.perf_counter()
+        await pool.call(make_config(), "hello")
+
+        assert time.perf_counter() - started < 0.5
+        assert stub.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_pacer_spaces_requests_after_burst(self):
+        pacer = RequestPacer(requests_per_second=50, burst=2)
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(*(pacer.acquire() for _ in range(5)))
+        # Two immediately, then one every 20ms
+        assert asyncio.get_running_loop().time() - started == pytest.approx(0.06, abs=0.03)
+
+
+def test_incomplete_provider_clients_cannot_be_created():
+    class NoComplete(ProviderClient):
+        pass
+
+    class NoParse(HTTPProviderClient):
+        def build_request(self, config, prompt):
+            return "http://localhost", {}, {"prompt": prompt}
+
+    with pytest.raises(TypeError):
+        NoComplete()
+    with pytest.raises(TypeError):
+        NoParse(make_config())
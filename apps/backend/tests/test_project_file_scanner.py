@@ -0,0 +1,80 @@
+"""
+Tests for the single-walk project file scanner behind the AI-BOM services.
+"""
+
+import hashlib
+import os
+
+import pytest
+
+from services.cyclonedx_aibom_service import CycloneDXAIBOMService
+from services.project_file_scanner import FileHashCache, ProjectFileScanner
+
+
+def write(root, relative_path, content=b"data"):
+    path = root / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+@pytest.fixture
+def project(tmp_path):
+    write(tmp_path, "models/clf.pkl", b"pickled model")
+    write(tmp_path, "models/net.tar.pt", b"torch weights")
+    write(tmp_path, "data/train.csv", b"a,b\n1,2\n")
+    write(tmp_path, "README.md")
+    write(tmp_path, ".git/objects/blob.pkl")
+    write(tmp_path, "node_modules/pkg/package.json")
+    return tmp_path
+
+
+class TestProjectFileScanner:
+    """One walk classifies every file; unchanged files are not re-read."""
+
+    @pytest.mark.asyncio
+    async def test_walk_classifies_and_prunes(self, project):
+        scan = await ProjectFileScanner().scan(str(project), [".pkl", ".pt", ".csv", ".json"])
+
+        assert [f.relative_path for f in scan.matching([".pkl", ".pt", ".csv", ".json"])] == [
+            os.path.join("models", "clf.pkl"),
+            os.path.join("models", "net.tar.pt"),
+            os.path.join("data", "train.csv"),
+        ]
+        pickled = scan.files[".pkl"][0]
+        assert pickled.size == len(b"pickled model")
+        assert pickled.sha256 == hashlib.sha256(b"pickled model").hexdigest()
+        assert scan.hashed == 3
+
+    @pytest.mark.asyncio
+    async def test_rescan_only_hashes_changed_files(self, project):
+        scanner = ProjectFileScanner(hash_cache=FileHashCache(":memory:"))
+        extensions = [".pkl", ".pt", ".csv"]
+
+        first = await scanner.scan(str(project), extensions)
+        assert (first.hashed, first.cache_hits) == (3, 0)
+
+        second = await scanner.scan(str(project), extensions)
+        assert (second.hashed, second.cache_hits) == (0, 3)
+
+        write(project, "data/train.csv", b"a,b\n1,2\n3,4\n")
+        third = await scanner.scan(str(project), extensions)
+        assert (third.hashed, third.cache_hits) == (1, 2)
+        assert third.files[".csv"][0].sha256 == hashlib.sha256(b"a,b\n1,2\n3,4\n").hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_aibom_components_from_one_scan(self, project):
+        service = CycloneDXAIBOMService(file_scanner=ProjectFileScanner(hash_cache=FileHashCache(":memory:")))
+
+        components = await service._scan_ai_ml_components(str(project))
+        found = {(c.type, c.bomRef) for c in components if c.type in ("model", "dataset")}
+
+        # .pkl is both a model and a dataset extension
+        assert found == {
+            ("model", f"file://{os.path.join('models', 'clf.pkl')}"),
+            ("model", f"file://{os.path.join('models', 'net.tar.pt')}"),
+            ("dataset", f"file://{os.path.join('models', 'clf.pkl')}"),
+            ("dataset", f"file://{os.path.join('data', 'train.csv')}"),
+        }
+        model = next(c for c in components if c.name == "net.tar.pt")
+        assert {p["name"]: p["value"] for p in model.properties}["framework"] == "pytorch"
@@ -0,0 +1,142 @@
+"""
+Tests for the GCRA rate limiting engine and middleware.
+"""
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import api.middleware.rate_limiting as rate_limiting
+from api.middleware.rate_limiting import AIAutomationRateLimiter, RateLimiter, RateLimitPolicy
+from middleware.security import RateLimitMiddleware
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiting, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def limiter():
+    return RateLimiter(use_redis=False)
+
+
+class TestGCRA:
+    """Bursts, refill, O(1) state and all-or-nothing multi-policy checks."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_steady_refill(self, clock, limiter):
+        policy = RateLimitPolicy("test", limit=10, period=60)
+
+        results = [(await limiter.hit([(policy, "ip:1")]))[0] for _ in range(11)]
+        assert [r.allowed for r in results] == [True] * 10 + [False]
+        assert [r.remaining for r in results[:3]] == [9, 8, 7]
+        assert results[-1].retry_after == pytest.approx(6.0)
+
+        # One emission interval (6s) later exactly one more request fits
+        clock.now += 6
+        assert [(await limiter.hit([(policy, "ip:1")]))[0].allowed for _ in range(2)] == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_state_is_one_entry_per_bucket_and_expires(self, clock, limiter):
+        policy = RateLimitPolicy("test", limit=1000, period=1)
+        for _ in range(500):
+            await limiter.hit([(policy, "ip:1")])
+        assert len(limiter._local) == 1
+
+        clock.now += 2
+        await limiter.hit([(policy, "ip:2")])
+        assert list(limiter._local) == [limiter._key(policy, "ip:2")]
+
+    @pytest.mark.asyncio
+    async def test_denied_request_is_not_counted_against_other_policies(self, clock, limiter):
+        broad = RateLimitPolicy("client", limit=100, period=60)
+        narrow = RateLimitPolicy("llm", limit=1, period=60)
+        checks = [(broad, "user:1"), (narrow, "user:1")]
+
+        assert all(r.allowed for r in await limiter.hit(checks))
+        denied = await limiter.hit(checks)
+        assert [r.allowed for r in denied] == [False, False]
+        assert denied[0].remaining == 99
+        assert (await limiter.hit([(broad, "user:1")]))[0].remaining == 98
+
+    @pytest.mark.asyncio
+    async def test_ai_automation_limits(self, clock, limiter):
+        ai_limiter = AIAutomationRateLimiter(limiter)
+
+        outcomes = [await ai_limiter.check_limit("user-1", "gap_analysis") for _ in range(6)]
+        assert [allowed for allowed, _, _ in outcomes] == [True] * 5 + [False]
+        assert outcomes[-1][1].startswith("Rate limit exceeded")
+        assert (await ai_limiter.get_limits_info("user-1"))["gap_analysis"]["remaining_requests"] == 0
+        assert await ai_limiter.check_limit("user-1", "unknown") == (True, None, -1)
+
+
+class TestRateLimitMiddleware:
+    """Per-client, per-org and per-endpoint policies over HTTP."""
+
+    @pytest.fixture
+    def client(self, clock, limiter):
+        async def ok(request: Request):
+            return JSONResponse({"status": "ok"})
+
+        class InjectUser:
+            def __init__(self, app):
+                self.app = app
+
+            async def __call__(self, scope, receive, send):
+                user = dict(scope["headers"]).get(b"x-user")
+                if user:
+                    scope.setdefault("state", {}).update(user_id=user.decode(), org_id="org-1")
+                await self.app(scope, receive, send)
+
+        app = Starlette(routes=[
+            Route("/api/v1/items", ok, methods=["GET", "POST"]),
+            Route("/api/v1/bias/llm-judge/evaluate", ok, methods=["POST"]),
+        ])
+        app.add_middleware(RateLimitMiddleware, policies=[
+            RateLimitPolicy("client", limit=5, period=60),
+            RateLimitPolicy("org", limit=8, period=60, scope="org"),
+            RateLimitPolicy(
+                "llm", limit=2, period=60,
+                path_prefixes=("/api/v1/bias/llm-judge",), methods=frozenset({"POST"})
+            ),
+        ], limiter=limiter)
+        app.add_middleware(InjectUser)
+        return TestClient(app)
+
+    def test_headers_and_429(self, client):
+        responses = [client.get("/api/v1/items") for _ in range(6)]
+
+        assert responses[0].headers["RateLimit-Limit"] == "5"
+        assert responses[0].headers["RateLimit-Remaining"] == "4"
+        assert responses[0].headers["RateLimit-Policy"] == "5;w=60"
+        assert responses[0].headers["X-RateLimit-Remaining"] == "4"
+        assert responses[-1].status_code == 429
+        assert responses[-1].headers["Retry-After"] == "12"
+        assert responses[-1].json()["retry_after"] == 12
+
+    def test_org_policy_is_shared_by_members(self, client):
+        statuses = [
+            client.get("/api/v1/items", headers={"X-User": f"user-{i % 3}"}).status_code
+            for i in range(9)
+        ]
+        assert statuses == [200] * 8 + [429]
+
+    def test_llm_endpoint_policy(self, client):
+        statuses = [client.post("/api/v1/bias/llm-judge/evaluate").status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        # Other endpoints still have budget left under the client policy
+        assert client.post("/api/v1/items").status_code == 200
@@ -512,5 +512,87 @@ class TestConcurrentQueryPerformance:
         assert elapsed < 150  # All 10 queries in < 150ms
 
 
+# ── Test Suite 7: Permission Resolution Performance ───────────────────────────
+
+class LatencyDB:
+    """Database stub that charges a fixed round-trip latency per query."""
+
+    def __init__(self, row, latency: float = 0.002):
+        self.row = row
+        self.latency = latency
+        self.queries = 0
+
+    async def fetch_one(self, query, values=None):
+        import asyncio
+        self.queries += 1
+        await asyncio.sleep(self.latency)
+        return self.row
+
+
+class TestPermissionResolutionPerformance:
+    """Benchmark cached vs uncached @require_permission checks."""
+
+    @staticmethod
+    def _endpoint(permission="members:invite"):
+        from core.decorators import require_permission
+
+        @require_permission(permission)
+        async def endpoint(org_id: str, request, db):
+            return {"status": "success"}
+
+        return endpoint
+
+    @staticmethod
+    def _request(user_id="user-1"):
+        request = MagicMock()
+        request.state.user_id = user_id
+        return request
+
+    @pytest.mark.asyncio
+    async def test_uncached_check_is_one_joined_query(self, org_id):
+        from core.decorators import permission_resolver
+        permission_resolver.clear()
+        db = LatencyDB({"role": "admin", "role_id": "r1", "permissions": ["members:invite"]})
+
+        start = time.perf_counter()
+        result = await self._endpoint()(org_id=org_id, request=self._request(), db=db)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        assert result == {"status": "success"}
+        assert db.queries == 1
+        assert elapsed < 50
+
+    @pytest.mark.asyncio
+    async def test_cached_checks_skip_the_database(self, org_id):
+        from core.decorators import permission_resolver
+        permission_resolver.clear()
+        db = LatencyDB({"role": "admin", "role_id": "r1", "permissions": ["members:invite"]})
+        endpoint, request = self._endpoint(), self._request()
+
+        await endpoint(org_id=org_id, request=request, db=db)
+        start = time.perf_counter()
+        for _ in range(1000):
+            await endpoint(org_id=org_id, request=request, db=db)
+        per_check = (time.perf_counter() - start) * 1000 / 1000
+
+        assert db.queries == 1
+        assert per_check < 0.5  # well under one round trip
+
+    @pytest.mark.asyncio
+    async def test_invalidation_forces_a_fresh_lookup(self, org_id):
+        from core.decorators import PermissionDenied, permission_resolver
+        permission_resolver.clear()
+        db = LatencyDB({"role": "admin", "role_id": "r1", "permissions": ["members:invite"]}, latency=0)
+        endpoint, request = self._endpoint(), self._request()
+        await endpoint(org_id=org_id, request=request, db=db)
+
+        db.row = {"role": "viewer", "role_id": "r2", "permissions": '["reports:view"]'}
+        await permission_resolver.invalidate(org_id, "user-1")
+
+        with pytest.raises(PermissionDenied):
+            await endpoint(org_id=org_id, request=request, db=db)
+        assert db.queries == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--benchmark-only"])
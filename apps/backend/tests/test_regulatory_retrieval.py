@@ -0,0 +1,73 @@
+"""
+Tests for the BM25 + embedding retrieval engine behind IndiaComplianceRAG.
+"""
+
+import pytest
+
+import api.services.regulatory_retrieval as regulatory_retrieval
+from api.services.india_compliance_rag import IndiaComplianceRAG
+from api.services.regulatory_retrieval import BM25Index, HashingEmbedder, HybridRetriever
+
+DOCUMENTS = [
+    {"framework": "a", "section_id": "A1", "title": "Consent", "keywords": ["consent"],
+     "content": "Consent must be explicit and informed before processing personal data."},
+    {"framework": "a", "section_id": "A2", "title": "Erasure", "keywords": ["erasure"],
+     "content": "Personal data must be erased within 30 days of a request."},
+    {"framework": "b", "section_id": "B1", "title": "Equality", "keywords": ["bias", "fairness"],
+     "content": "Bias testing across caste, religion and region is required."},
+    {"framework": "b", "section_id": "B2", "title": "Transparency", "keywords": ["model card"],
+     "content": "Publish model cards and explain decisions."},
+]
+
+
+class TestHybridRetriever:
+    """Ranking, framework filtering and persistence."""
+
+    @pytest.mark.parametrize("embedder", [None, HashingEmbedder(dim=64)])
+    def test_ranking_and_filtering(self, embedder):
+        retriever = HybridRetriever.build(DOCUMENTS, embedder=embedder)
+
+        assert retriever.search("how is consent given?", top_k=1)[0][0] == 0
+        assert retriever.search("bias across caste", top_k=2)[0][0] == 2
+        assert {doc_id for doc_id, _ in retriever.search("personal data", top_k=4, framework="a")} == {0, 1}
+        # Fewer lexical matches than top_k: padded from the rest, in order
+        assert len(retriever.search("model cards", top_k=3)) == 3
+        assert retriever.search("consent", framework="missing") == []
+
+    def test_bm25_prefers_rarer_terms(self):
+        index = BM25Index.build(DOCUMENTS)
+        ids, scores = index.score("personal data erased")
+        ranked = sorted(zip(scores, ids), reverse=True)
+        assert [doc_id for _, doc_id in ranked] == [1, 0]
+
+    def test_persisted_index_is_reused_until_corpus_changes(self, tmp_path, monkeypatch):
+        embedder = HashingEmbedder(dim=64)
+        built = HybridRetriever.load_or_build(DOCUMENTS, str(tmp_path), embedder)
+
+        def no_build(*args, **kwargs):
+            raise AssertionError("index was rebuilt")
+
+        monkeypatch.setattr(regulatory_retrieval.BM25Index, "build", no_build)
+        loaded = HybridRetriever.load_or_build(DOCUMENTS, str(tmp_path), embedder)
+        assert loaded.search("erasure request", top_k=2) == built.search("erasure request", top_k=2)
+
+        monkeypatch.undo()
+        changed = DOCUMENTS + [{"framework": "c", "section_id": "C1", "title": "Erasure appeals", "content": ""}]
+        rebuilt = HybridRetriever.load_or_build(changed, str(tmp_path), embedder)
+        assert len(rebuilt) == 5
+
+
+class TestIndiaComplianceRAGRetrieval:
+    """The RAG queries through the index built at indexing time."""
+
+    @pytest.mark.asyncio
+    async def test_query_uses_retrieval_index(self, tmp_path):
+        rag = IndiaComplianceRAG(index_dir=str(tmp_path))
+        await rag.index_regulatory_documents()
+
+        assert (tmp_path / "index.npz").exists()
+        results = await rag.query("bias testing across caste and religion")
+        assert results[0]["section_id"] == "NITI_2"
+        assert len(results) == 3
+        assert [doc["section_id"] for doc in await rag.query("consent", framework="dpdp_act_2023", top_k=1)] == ["DPDP_6"]
+        assert (await rag.query_by_section("DPDP_18"))["title"] == "Grievance Redressal Mechanism"
@@ -0,0 +1,147 @@
+"""
+Tests for the two-tier cache in config.cache.
+"""
+
+import asyncio
+import inspect
+from datetime import datetime
+
+import pytest
+
+from config.cache import CacheManager, TieredCache, cached
+
+
+class FakeRedis:
+    """The handful of Redis commands TieredCache uses, in memory."""
+
+    def __init__(self):
+        self.data = {}
+        self.gets = 0
+
+    async def mget(self, keys):
+        self.gets += 1
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None, nx=False, xx=False):
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def pipeline(self):
+        redis, commands = self, []
+
+        class Pipeline:
+            def incr(self, key):
+                commands.append(key)
+
+            async def execute(self):
+                results = []
+                for key in commands:
+                    redis.data[key] = str(int(redis.data.get(key, b"0")) + 1).encode()
+                    results.append(int(redis.data[key]))
+                return results
+
+        return Pipeline()
+
+
+class CountingLoader:
+    def __init__(self, value=None, delay: float = 0):
+        self.value = value if value is not None else {"items": [1, 2, 3]}
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+def make_cache(redis=None, local_ttl: float = 60.0) -> TieredCache:
+    manager = CacheManager()
+    manager.redis_client = redis
+    return TieredCache(manager, local_ttl=local_ttl)
+
+
+class TestTieredCache:
+    """Local tier, single flight, tags and stats."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        cache = make_cache()
+        loader = CountingLoader(delay=0.01)
+
+        results = await asyncio.gather(*(cache.get_or_load("models:list", "p1", loader) for _ in range(50)))
+
+        assert loader.calls == 1
+        assert all(result == {"items": [1, 2, 3]} for result in results)
+        assert cache.stats()["models:list"]["coalesced"] == 49
+
+    @pytest.mark.asyncio
+    async def test_values_are_copies_and_serialized(self):
+        cache = make_cache()
+        now = datetime(2025, 1, 1, 12, 0)
+        first = await cache.get_or_load("ns", "k", CountingLoader({"when": now, "ids": [1]}))
+        first["ids"].append(2)
+
+        second = await cache.get_or_load("ns", "k", CountingLoader())
+        assert second == {"when": "2025-01-01T12:00:00", "ids": [1]}
+        assert cache.stats()["ns"]["local_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_tag_invalidation_across_workers(self):
+        redis = FakeRedis()
+        worker_a, worker_b = make_cache(redis, local_ttl=0), make_cache(redis, local_ttl=0)
+        loader = CountingLoader()
+
+        await worker_a.get_or_load("models:list", "p1", loader, tags=("models",))
+        await worker_b.get_or_load("models:list", "p1", loader, tags=("models",))
+        assert loader.calls == 1
+        assert worker_b.stats()["models:list"]["redis_hits"] == 1
+
+        await worker_a.invalidate_tags("models")
+        await worker_b.get_or_load("models:list", "p1", loader, tags=("models",))
+        await worker_a.get_or_load("models:list", "p1", loader, tags=("models",))
+        assert loader.calls == 2
+
+        # Untagged entries and other tags are unaffected
+        await worker_a.get_or_load("datasets:list", "p1", loader, tags=("datasets",))
+        await worker_a.invalidate_tags("models")
+        await worker_b.get_or_load("datasets:list", "p1", loader, tags=("datasets",))
+        assert loader.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_loader_errors_are_not_cached(self):
+        cache = make_cache()
+
+        async def failing():
+            raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("ns", "k", failing)
+        assert await cache.get_or_load("ns", "k", CountingLoader({"ok": True})) == {"ok": True}
+
+    def test_cached_decorator_keeps_signature(self):
+        @cached(ttl=60, namespace="dashboard", key_func=lambda *a, **kw: "summary")
+        async def endpoint(limit: int = 10, offset: int = 0):
+            return {"limit": limit}
+
+        assert list(inspect.signature(endpoint).parameters) == ["limit", "offset"]
+        assert asyncio.run(endpoint(limit=5)) == {"limit": 5}
+
+    @pytest.mark.asyncio
+    async def test_scrapes_export_stats_as_counters_without_recording(self):
+        from api.main import prometheus_metrics
+        from config.cache import tiered_cache
+        from services.monitoring import monitoring_service
+
+        for _ in range(2):
+            await tiered_cache.get_or_load("scrape-test", "k", CountingLoader())
+        for _ in range(2):
+            body = (await prometheus_metrics()).body.decode()
+
+        assert "# TYPE cache_requests_total counter" in body
+        assert 'cache_requests_total{namespace="scrape-test",result="local_hits"} 1.0' in body
+        assert 'cache_requests_total{namespace="scrape-test",result="misses"} 1.0' in body
+        assert all(name != "cache.requests" for name, _ in monitoring_service.metrics.series)
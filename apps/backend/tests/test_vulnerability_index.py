@@ -0,0 +1,237 @@
+"""
+Tests for the local vulnerability index behind AI-BOM vulnerability scans.
+"""
+
+import json
+import zipfile
+
+import pytest
+from aiohttp import web
+
+from services.cyclonedx_aibom_service import CycloneDXAIBOMService, CycloneDXComponent
+from services.vulnerability_index import PackageQuery, VulnerabilityIndex, compare_versions
+
+OSV_RECORD = {
+    "id": "PYSEC-2023-74",
+    "modified": "2023-06-01T00:00:00Z",
+    "summary": "Proxy-Authorization header leak",
+    "aliases": ["CVE-2023-32681"],
+    "database_specific": {"severity": "MODERATE"},
+    "references": [{"type": "ADVISORY", "url": "https://example.org/PYSEC-2023-74"}],
+    "affected": [{
+        "package": {"ecosystem": "PyPI", "name": "Requests"},
+        "ranges": [{"type": "ECOSYSTEM", "events": [{"introduced": "2.3.0"}, {"fixed": "2.31.0"}]}],
+    }],
+}
+
+NVD_FEED = {"vulnerabilities": [
+    {"cve": {
+        "id": "CVE-2023-32681",
+        "descriptions": [{"lang": "en", "value": "Requests leaks Proxy-Authorization headers"}],
+        "metrics": {"cvssMetricV31": [{"cvssData": {"baseScore": 6.1, "baseSeverity": "MEDIUM"}}]},
+        "configurations": [{"nodes": [{"cpeMatch": [{
+            "vulnerable": True,
+            "criteria": "cpe:2.3:a:python:requests:*:*:*:*:*:*:*:*",
+            "versionStartIncluding": "2.3.0",
+            "versionEndExcluding": "2.31.0",
+        }]}]}],
+    }},
+    {"cve": {
+        "id": "CVE-2022-3786",
+        "descriptions": [{"lang": "en", "value": "OpenSSL buffer overrun"}],
+        "metrics": {"cvssMetricV31": [{"cvssData": {"baseScore": 7.5, "baseSeverity": "HIGH"}}]},
+        "configurations": [{"nodes": [{"cpeMatch": [{
+            "vulnerable": True,
+            "criteria": "cpe:2.3:a:openssl:openssl:3.0.6:*:*:*:*:*:*:*",
+        }]}]}],
+    }},
+]}
+
+NPM_RECORD = {
+    "id": "GHSA-35jh-r3h4-6jhm",
+    "summary": "Command injection in lodash",
+    "affected": [{
+        "package": {"ecosystem": "npm", "name": "lodash"},
+        "ranges": [{"type": "SEMVER", "events": [{"introduced": "0"}, {"fixed": "4.17.21"}]}],
+    }],
+}
+
+
+@pytest.fixture
+def index():
+    index = VulnerabilityIndex(":memory:")
+    index.import_osv([OSV_RECORD, NPM_RECORD])
+    index.import_nvd(NVD_FEED)
+    return index
+
+
+class TestVulnerabilityIndex:
+    """Offline lookup, version ranges and the optional online refresh."""
+
+    def test_batched_lookup_matches_version_ranges(self, index):
+        results = index.lookup([
+            PackageQuery("PyPI", "requests", "2.28.0"),
+            PackageQuery("PyPI", "requests", "2.31.0"),
+            PackageQuery("npm", "lodash", "^4.17.20"),
+            PackageQuery("npm", "lodash", "4.17.21"),
+            PackageQuery(None, "openssl", "3.0.6"),
+            PackageQuery(None, "OpenSSL", "3.0.7"),
+            PackageQuery("PyPI", "requests", "latest"),
+            PackageQuery("PyPI", "numpy", "1.26.0"),
+        ])
+
+        assert [[a.id for a in advisories] for advisories in results] == [
+            # The NVD entry is an alias of the OSV advisory and is reported once
+            ["PYSEC-2023-74"],
+            [],
+            ["GHSA-35jh-r3h4-6jhm"],
+            [],
+            ["CVE-2022-3786"],
+            [],
+            ["PYSEC-2023-74"],
+            [],
+        ]
+        advisory = results[0][0]
+        assert advisory.severity == "moderate"
+        assert advisory.affected_versions == [">=2.3.0,<2.31.0"]
+        assert advisory.fixed_versions == ["2.31.0"]
+        assert results[4][0].cvss_score == 7.5
+
+    def test_only_exact_pins_narrow_by_version(self):
+        index = VulnerabilityIndex(":memory:")
+        index.import_osv([{
+            "id": "PYSEC-0000-1",
+            "affected": [{
+                "package": {"ecosystem": "PyPI", "name": "tokenizer"},
+                "ranges": [{"type": "ECOSYSTEM", "events": [{"introduced": "0"}, {"fixed": "1.5"}]}],
+            }],
+        }])
+        specifiers = ["<2.0", "!=1.6", "^1.0", ">=1.0,<2.0", "~=1.6", "1.*"]
+        pins = ["1.4", "==1.4", "v1.4", "1.6", "==1.6"]
+
+        results = index.lookup([PackageQuery("PyPI", "tokenizer", v) for v in specifiers + pins])
+
+        # A range is not a version: every advisory for the package is reported
+        assert [[a.id for a in advisories] for advisories in results] == (
+            [["PYSEC-0000-1"]] * len(specifiers) + [["PYSEC-0000-1"]] * 3 + [[], []]
+        )
+
+    def test_versions_packaging_rejects_still_compare(self):
+        assert compare_versions("1.2.3-beta.1", "1.2.3") < 0
+        assert compare_versions("1.10.0", "1.9.9") > 0
+        assert compare_versions("2.0", "2.0.0") == 0
+
+    def test_import_osv_zip_dump(self, tmp_path):
+        dump = tmp_path / "PyPI-all.zip"
+        with zipfile.ZipFile(dump, "w") as archive:
+            archive.writestr("PYSEC-2023-74.json", json.dumps(OSV_RECORD))
+            archive.writestr("GHSA-35jh-r3h4-6jhm.json", json.dumps(NPM_RECORD))
+        index = VulnerabilityIndex(str(tmp_path / "vulns.sqlite3"))
+
+        assert index.import_path(str(dump)) == {"osv": 2, "nvd": 0}
+        # Re-importing replaces records rather than duplicating their ranges
+        index.import_path(str(dump))
+        assert index.stats() == {"advisories": 2, "affected_packages": 2, "refreshed_packages": 0}
+
+    @pytest.mark.asyncio
+    async def test_online_refresh_batches_and_falls_back(self):
+        batches = []
+
+        async def querybatch(request):
+            payload = await request.json()
+            batches.append(payload["queries"])
+            return web.json_response({"results": [
+                {"vulns": [{"id": OSV_RECORD["id"], "modified": OSV_RECORD["modified"]}]}
+                if query["package"]["name"] == "requests" else {}
+                for query in payload["queries"]
+            ]})
+
+        async def vuln(request):
+            return web.json_response(OSV_RECORD)
+
+        app = web.Application()
+        app.router.add_post("/v1/querybatch", querybatch)
+        app.router.add_get("/v1/vulns/{id}", vuln)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            index = VulnerabilityIndex(":memory:", online_refresh=True, osv_url=f"http://127.0.0.1:{port}/v1")
+            queries = [PackageQuery("PyPI", "requests", "2.28.0"), PackageQuery("PyPI", "numpy", "1.26.0")]
+
+            results = await index.lookup_async(queries)
+            assert [[a.id for a in advisories] for advisories in results] == [["PYSEC-2023-74"], []]
+            assert len(batches) == 1 and len(batches[0]) == 2
+
+            # Fresh packages are not queried again
+            await index.lookup_async(queries)
+            assert len(batches) == 1
+        finally:
+            await runner.cleanup()
+
+        # Unreachable refresh endpoint: the local index still answers
+        offline = VulnerabilityIndex(":memory:", online_refresh=True, osv_url=f"http://127.0.0.1:{port}/v1", timeout=1)
+        offline.import_osv([OSV_RECORD])
+        results = await offline.lookup_async(queries)
+        assert [a.id for a in results[0]] == ["PYSEC-2023-74"]
+
+    @pytest.mark.asyncio
+    async def test_failed_record_fetch_leaves_package_stale(self):
+        batches, fetches = [], []
+
+        async def querybatch(request):
+            payload = await request.json()
+            batches.append(payload["queries"])
+            return web.json_response({"results": [
+                {"vulns": [{"id": OSV_RECORD["id"], "modified": OSV_RECORD["modified"]}]}
+                if query["package"]["name"] == "requests" else {}
+                for query in payload["queries"]
+            ]})
+
+        async def vuln(request):
+            fetches.append(request.match_info["id"])
+            if len(fetches) == 1:
+                return web.Response(status=503)
+            return web.json_response(OSV_RECORD)
+
+        app = web.Application()
+        app.router.add_post("/v1/querybatch", querybatch)
+        app.router.add_get("/v1/vulns/{id}", vuln)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            index = VulnerabilityIndex(":memory:", online_refresh=True, osv_url=f"http://127.0.0.1:{port}/v1")
+            queries = [PackageQuery("PyPI", "requests", "2.28.0"), PackageQuery("PyPI", "numpy", "1.26.0")]
+
+            results = await index.lookup_async(queries)
+            assert results == [[], []]
+            assert index.stats()["refreshed_packages"] == 1
+
+            # Only the package whose record failed is queried again
+            results = await index.lookup_async(queries)
+            assert [[a.id for a in advisories] for advisories in results] == [["PYSEC-2023-74"], []]
+            assert [[q["package"]["name"] for q in batch] for batch in batches] == [["numpy", "requests"], ["requests"]]
+            assert index.stats()["refreshed_packages"] == 2
+        finally:
+            await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_aibom_scan_uses_index(self, index):
+        service = CycloneDXAIBOMService(vulnerability_index=index)
+        components = [
+            CycloneDXComponent(type="library", name="requests", version="2.28.0",
+                               bomRef="pkg:pypi/requests@2.28.0", purl="pkg:pypi/requests@2.28.0"),
+            CycloneDXComponent(type="library", name="numpy", version="1.26.0",
+                               bomRef="pkg:pypi/numpy@1.26.0", purl="pkg:pypi/numpy@1.26.0"),
+        ]
+
+        vulnerabilities = await service._scan_vulnerabilities(components)
+
+        assert [(v["id"], v["affects"][0]["ref"]) for v in vulnerabilities] == [
+            ("PYSEC-2023-74", "pkg:pypi/requests@2.28.0")
+        ]